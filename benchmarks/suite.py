@@ -0,0 +1,524 @@
+"""
+Performance benchmark suite for the calculator.
+
+Each benchmark measures one number (a duration or a throughput) and the
+results are compared against the JSON baseline in benchmarks/baseline.json
+with a relative tolerance, so slowdowns are caught before they ship.
+
+Run standalone:
+
+    python -m benchmarks.suite                   # run and compare against the baseline
+    python -m benchmarks.suite --update          # run and store the results as the new baseline
+    python -m benchmarks.suite --only dispatch   # run the benchmarks whose name contains "dispatch"
+
+or from pytest with CALCULATOR_BENCHMARKS=1 (see tests/test_benchmarks.py).
+
+Baselines are machine specific; refresh them with --update on the machine
+that runs the regression gate.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+import subprocess
+from array import array
+from contextlib import redirect_stderr, redirect_stdout
+from decimal import Decimal, localcontext
+from calculator import bigmath
+from calculator.columns import ColumnEngine
+from calculator.commands import Command, CommandContext, CommandHandler
+from calculator.deadlines import Budget, Budgets
+from calculator.jsonlog import JsonFormatter, install_record_factory
+from calculator.journal import Journal, JournalEntry, JournalReader
+from calculator.loader import load_plugins, scan_plugins
+from calculator.logfilters import SamplingFilter
+from calculator.logrotate import CompressingRotatingFileHandler
+from calculator.numeric import create_backend
+from calculator.sinks import create_sink
+from calculator.streamstats import summarize
+from calculator.vectors import fold, make_vector
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCHMARKS = {}
+
+def benchmark(name: str, unit: str, better: str = "lower"):
+    """
+    Registers a benchmark function.
+
+    Args:
+        name (str): The benchmark name used in the baseline.
+        unit (str): The unit of the measured value, e.g. "us" or "ops/s".
+        better (str): "lower" if smaller values are better, "higher" otherwise.
+
+    Returns:
+        function: The decorator.
+    """
+    def register(function):
+        BENCHMARKS[name] = (function, unit, better)
+        return function
+    return register
+
+def best_time(function, repeat: int = 5, min_time: float = 0.05) -> float:
+    """
+    Measures the best per-call time of a function.
+
+    The number of calls per sample is grown until one sample takes at least
+    min_time, then the fastest of `repeat` samples is used.
+
+    Args:
+        function: The callable to time.
+        repeat (int): The number of samples.
+        min_time (float): The minimum duration of a sample in seconds.
+
+    Returns:
+        float: Seconds per call.
+    """
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+    samples = [elapsed]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append(time.perf_counter() - started)
+    return min(samples) / number
+
+class _NoopCommand(Command):
+    def execute(self, *args):
+        pass
+
+def _quiet_plugins():
+    """Raises the plugin loggers to WARNING so benchmarks measure computation, not logging."""
+    logging.getLogger("calculator").setLevel(logging.WARNING)
+
+@benchmark("cold_start_subprocess", "ms")
+def bench_cold_start_subprocess():
+    """Wall time of a fresh interpreter constructing Calculator(), median of 5 runs."""
+    code = "from calculator import Calculator; Calculator()"
+    samples = []
+    for _ in range(5):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+@benchmark("cold_start_oneshot", "ms")
+def bench_cold_start_oneshot():
+    """Wall time of `python main.py add 1 2` in a fresh interpreter, median of 5 runs."""
+    samples = []
+    for _ in range(5):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", "add", "1", "2"], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+@benchmark("calculator_init", "ms")
+def bench_calculator_init():
+    """In-process Calculator() construction with modules already imported."""
+    from calculator import Calculator  # pylint: disable=import-outside-toplevel
+    with redirect_stderr(io.StringIO()):
+        return best_time(Calculator, repeat=3) * 1000
+
+@benchmark("load_plugins_scan_per_plugin", "us")
+def bench_load_plugins_scan():
+    """Scanning the plugin package and instantiating every command, per command."""
+    _quiet_plugins()
+    count = len(scan_plugins(CommandHandler()))
+    return best_time(lambda: scan_plugins(CommandHandler())) / count * 1e6
+
+@benchmark("load_plugins_manifest_per_plugin", "us")
+def bench_load_plugins_manifest():
+    """Registering lazy commands from an up-to-date manifest, per command."""
+    _quiet_plugins()
+    path = os.path.join(ROOT, ".cache", "benchmark_manifest.json")
+    load_plugins(CommandHandler(), path)
+    handler = CommandHandler()
+    load_plugins(handler, path)
+    count = len(handler.commands)
+    return best_time(lambda: load_plugins(CommandHandler(), path)) / count * 1e6
+
+@benchmark("dispatch_overhead", "ns")
+def bench_dispatch_overhead():
+    """execute_command on a command that does nothing."""
+    handler = CommandHandler()
+    handler.register_command("noop", _NoopCommand())
+    return best_time(lambda: handler.execute_command("noop", "1", "2")) * 1e9
+
+@benchmark("dispatch_add", "us")
+def bench_dispatch_add():
+    """`add 1 2` end to end: argument parsing, the calculation and the printed result."""
+    _quiet_plugins()
+    handler = CommandHandler()
+    scan_plugins(handler)
+    with redirect_stdout(io.StringIO()) as output:
+        def dispatch():
+            handler.execute_command("add", "1", "2")
+            output.seek(0)
+            output.truncate()
+        return best_time(dispatch) * 1e6
+
+@benchmark("dispatch_add_budgeted", "us")
+def bench_dispatch_add_budgeted():
+    """`add 1 2` end to end with the default operand-size budget checked."""
+    _quiet_plugins()
+    handler = CommandHandler(budgets=Budgets(Budget(max_length=100000, max_exponent=999999)))
+    scan_plugins(handler)
+    with redirect_stdout(io.StringIO()) as output:
+        def dispatch():
+            handler.execute_command("add", "1.5e3", "2")
+            output.seek(0)
+            output.truncate()
+        return best_time(dispatch) * 1e6
+
+@benchmark("dispatch_add_supervised", "us")
+def bench_dispatch_add_supervised():
+    """`add 1 2` end to end with a deadline, so it runs in a watchdog worker process."""
+    _quiet_plugins()
+    budgets = Budgets(Budget(timeout=10))
+    handler = CommandHandler(budgets=budgets)
+    scan_plugins(handler)
+    try:
+        with redirect_stdout(io.StringIO()) as output:
+            def dispatch():
+                handler.execute_command("add", "1", "2")
+                output.seek(0)
+                output.truncate()
+            return best_time(dispatch) * 1e6
+    finally:
+        budgets.close()
+
+def _write_journal(path: str, entries: int):
+    journal = Journal(path, fsync_interval=60)
+    for index in range(entries):
+        journal.append(JournalEntry(0.0, "add", (str(index), "2"), "ok", str(index + 2)))
+    journal.close()
+
+@benchmark("journal_replay_per_entry", "us")
+def bench_journal_replay():
+    """`replay` of a 20,000-entry journal of additions, per entry."""
+    _quiet_plugins()
+    handler = CommandHandler()
+    scan_plugins(handler)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "replay.journal")
+        _write_journal(path, 20000)
+        with redirect_stdout(io.StringIO()):
+            return best_time(lambda: handler.execute_command("replay", path), repeat=3) / 20000 * 1e6
+
+@benchmark("journal_recent_10", "us")
+def bench_journal_recent():
+    """Reading the 10 most recent entries of a 200,000-entry journal."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "recent.journal")
+        _write_journal(path, 200000)
+        def recent():
+            with JournalReader(path) as reader:
+                reader.recent(10)
+        return best_time(recent) * 1e6
+
+def _logging_cost(formatter) -> float:
+    install_record_factory()
+    bench_logger = logging.getLogger("benchmarks.logging")
+    bench_logger.propagate = False
+    bench_logger.setLevel(logging.INFO)
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(formatter)
+    bench_logger.addHandler(handler)
+    try:
+        def emit():
+            bench_logger.info("Addition result: %s + %s = %s", 1, 2, 3)
+            handler.stream.seek(0)
+            handler.stream.truncate()
+        return best_time(emit) * 1e6
+    finally:
+        bench_logger.removeHandler(handler)
+
+@benchmark("log_record_text", "us")
+def bench_log_record_text():
+    """Cost of one INFO record through a text formatter into memory."""
+    return _logging_cost(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+@benchmark("log_record_json", "us")
+def bench_log_record_json():
+    """Cost of one INFO record through the JSON formatter into memory."""
+    return _logging_cost(JsonFormatter())
+
+@benchmark("log_record_sampled_out", "us")
+def bench_log_record_sampled_out():
+    """Cost of one INFO record rejected by a sampling filter in front of the JSON formatter."""
+    install_record_factory()
+    bench_logger = logging.getLogger("benchmarks.sampling")
+    bench_logger.propagate = False
+    bench_logger.setLevel(logging.INFO)
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(JsonFormatter())
+    handler.addFilter(SamplingFilter(rate=0.0))
+    bench_logger.addHandler(handler)
+    try:
+        def emit():
+            for _ in range(1000):
+                bench_logger.info("Addition result: %s + %s = %s", 1, 2, 3)
+        return best_time(emit) / 1000 * 1e6
+    finally:
+        bench_logger.removeHandler(handler)
+
+@benchmark("log_record_rotating_file", "us")
+def bench_log_record_rotating_file():
+    """Cost of one JSON INFO record through the compressing rotating file handler, rotating every 256 KiB."""
+    install_record_factory()
+    bench_logger = logging.getLogger("benchmarks.rotation")
+    bench_logger.propagate = False
+    bench_logger.setLevel(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        handler = CompressingRotatingFileHandler(os.path.join(directory, "app.log"), max_bytes=256 * 1024,
+                                                 retention_bytes=1024 * 1024)
+        handler.setFormatter(JsonFormatter())
+        bench_logger.addHandler(handler)
+        try:
+            def emit():
+                for _ in range(1000):
+                    bench_logger.info("Addition result: %s + %s = %s", 1, 2, 3)
+            return best_time(emit) / 1000 * 1e6
+        finally:
+            bench_logger.removeHandler(handler)
+            handler.close()
+
+def _decimal_throughput(command_name: str, digits: int) -> float:
+    handler = CommandHandler()
+    scan_plugins(handler)
+    calculate = handler.commands[command_name].calculate
+    a = Decimal("7" * digits + "." + "3" * digits)
+    b = Decimal("3" * digits + "." + "1" * digits)
+    with localcontext() as context:
+        context.prec = digits * 2
+        return 1 / best_time(lambda: calculate(a, b))
+
+for _operation in ("add", "subtract", "multiply", "divide"):
+    for _digits in (28, 1000):
+        benchmark(f"decimal_{_operation}_{_digits}_digits", "ops/s", better="higher")(
+            lambda operation=_operation, digits=_digits: _decimal_throughput(operation, digits))
+
+def _bigmath_cost(function, digits: int, uncached: bool = False) -> float:
+    """Milliseconds per high-precision calculation at a decimal precision, without the constant cache if uncached."""
+    def calculate():
+        if uncached:
+            bigmath.clear_constants()
+        function()
+    with localcontext() as context:
+        context.prec = digits
+        return best_time(calculate, repeat=3) * 1e3
+
+_BIGMATH_FUNCTIONS = {
+    "pi": (lambda: bigmath.constant("pi"), True),
+    "e": (lambda: bigmath.constant("e"), True),
+    "sqrt": (lambda: bigmath.sqrt(Decimal(2)), False),
+    "nthroot": (lambda: bigmath.nthroot(Decimal(2), 3), False),
+    "pow": (lambda: bigmath.power(Decimal(2), Decimal("2.125")), False),
+    "factorial": (lambda: bigmath.factorial(Decimal(5000)), False),
+}
+
+for _function, (_calculate, _uncached) in _BIGMATH_FUNCTIONS.items():
+    for _digits in (100, 1000, 10000):
+        benchmark(f"bigmath_{_function}_{_digits}_digits", "ms")(
+            lambda calculate=_calculate, digits=_digits, uncached=_uncached: _bigmath_cost(calculate, digits, uncached))
+
+def _backend_throughput(backend_name: str, command_name: str) -> float:
+    """Parsing two operands and computing with a numeric backend, as the arithmetic commands do."""
+    _quiet_plugins()
+    handler = CommandHandler()
+    scan_plugins(handler)
+    calculate = handler.commands[command_name].calculate
+    backend = create_backend(backend_name)
+    parse, apply = backend.parse, backend.apply
+    return 1 / best_time(lambda: apply(calculate, parse("1234.5678"), parse("8.765")))
+
+for _backend in ("float", "decimal", "fraction"):
+    for _operation in ("add", "divide"):
+        benchmark(f"backend_{_backend}_{_operation}", "ops/s", better="higher")(
+            lambda backend=_backend, operation=_operation: _backend_throughput(backend, operation))
+
+def _vector_throughput(backend_name: str, size: int = 100000) -> float:
+    """Elementwise multiplication of two vectors, as `multiply @a @b` computes it."""
+    _quiet_plugins()
+    handler = CommandHandler()
+    scan_plugins(handler)
+    calculate = handler.commands["multiply"].calculate
+    backend = create_backend(backend_name)
+    a = make_vector([backend.parse(str(index % 1000 + 0.5)) for index in range(size)], backend)
+    b = make_vector([backend.parse(str(index % 7 + 1)) for index in range(size)], backend)
+    return size / best_time(lambda: fold(calculate, [a, b], backend, "multiply"), repeat=3)
+
+for _backend in ("float", "decimal"):
+    benchmark(f"vector_{_backend}_multiply", "elements/s", better="higher")(
+        lambda backend=_backend: _vector_throughput(backend))
+
+def _sink_cost(output_format: str) -> float:
+    """Rendering one `add` result through a sink into memory, including the buffered writes."""
+    context = CommandContext("add", ("1", "2"))
+    context.result, context.output = Decimal(3), "The Solution of addition is 3\n"
+    stream = io.BytesIO() if output_format == "binary" else io.StringIO()
+    sink = create_sink(output_format, stream)
+    def render():
+        for _ in range(1000):
+            sink.emit(context)
+        sink.flush()
+        stream.seek(0)
+        stream.truncate()
+    return best_time(render) / 1000 * 1e9
+
+for _format in ("text", "jsonl", "csv", "binary"):
+    benchmark(f"sink_{_format}_per_result", "ns")(lambda output_format=_format: _sink_cost(output_format))
+
+def _stats_throughput(backend_name: str, size: int) -> float:
+    """One-pass summary (sum, variance, extremes and quantile sketch) of a raw float64 file, as `mean @file` reads it."""
+    backend = create_backend(backend_name)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "values.f64")
+        with open(path, "wb") as raw_file:
+            array("d", (index % 1000 * 0.25 for index in range(size))).tofile(raw_file)
+        return size / best_time(lambda: backend.apply(summarize, [f"@{path}"], backend), repeat=3)
+
+benchmark("stats_float_values_per_sec", "values/s", better="higher")(lambda: _stats_throughput("float", 1000000))
+benchmark("stats_decimal_values_per_sec", "values/s", better="higher")(lambda: _stats_throughput("decimal", 100000))
+
+@benchmark("column_rows_per_sec", "rows/s", better="higher")
+def bench_column_rows():
+    """`column divide` over a 200,000-row CSV file, two columns referenced by name."""
+    _quiet_plugins()
+    handler = CommandHandler()
+    scan_plugins(handler)
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "data.csv")
+        with open(source, "w", encoding="utf-8") as data:
+            data.write("id,price,qty\n")
+            data.writelines(f"{index},{index % 997}.25,{index % 89 + 1}\n" for index in range(200000))
+        engine = ColumnEngine(handler.commands["divide"].calculate)
+        output = os.path.join(directory, "out.csv")
+        return 200000 / best_time(lambda: engine.run(source, "price", "qty", output), repeat=3)
+
+def run_benchmarks(only: str = None) -> dict:
+    """
+    Runs the registered benchmarks.
+
+    Args:
+        only (str): Run only the benchmarks whose name contains this text.
+
+    Returns:
+        dict: Results by benchmark name, each with value, unit and better.
+    """
+    results = {}
+    for name, (function, unit, better) in BENCHMARKS.items():
+        if only and only not in name:
+            continue
+        results[name] = {"value": round(function(), 3), "unit": unit, "better": better}
+    return results
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    """
+    Loads a stored baseline.
+
+    Args:
+        path (str): The baseline file.
+
+    Returns:
+        dict: The baseline with "results" and optional per-benchmark "tolerances", or an empty baseline.
+    """
+    try:
+        with open(path, encoding="utf-8") as baseline_file:
+            return json.load(baseline_file)
+    except FileNotFoundError:
+        return {"results": {}, "tolerances": {}}
+
+def save_baseline(results: dict, path: str = BASELINE_PATH):
+    """
+    Stores results as the new baseline, keeping any configured tolerances.
+
+    Args:
+        results (dict): Results from run_benchmarks.
+        path (str): The baseline file.
+    """
+    baseline = load_baseline(path)
+    baseline["results"] = {**baseline.get("results", {}), **results}
+    baseline.setdefault("tolerances", {})
+    with open(path, "w", encoding="utf-8") as baseline_file:
+        json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """
+    Compares results against a baseline.
+
+    Args:
+        results (dict): Results from run_benchmarks.
+        baseline (dict): A baseline from load_baseline.
+        tolerance (float): The allowed relative slowdown, unless the baseline sets one per benchmark.
+
+    Returns:
+        list: One message per benchmark that regressed beyond its tolerance.
+    """
+    regressions = []
+    tolerances = baseline.get("tolerances", {})
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None or not reference["value"]:
+            continue
+        allowed = tolerances.get(name, tolerance)
+        change = result["value"] / reference["value"] - 1
+        regressed = change > allowed if result["better"] == "lower" else change < -allowed
+        if regressed:
+            regressions.append(f"{name}: {result['value']} {result['unit']} vs baseline "
+                               f"{reference['value']} {reference['unit']} ({change:+.0%}, tolerance {allowed:.0%})")
+    return regressions
+
+def main(argv=None) -> int:
+    """
+    Runs the benchmark suite from the command line.
+
+    Args:
+        argv (list): The command-line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 if no benchmark regressed, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="Run the calculator benchmarks.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file (default: %(default)s)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative regression (default: %(default)s)")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this text")
+    parser.add_argument("--update", action="store_true", help="store the results as the new baseline")
+    arguments = parser.parse_args(argv)
+
+    results = run_benchmarks(arguments.only)
+    baseline = load_baseline(arguments.baseline)
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name, {}).get("value", "-")
+        print(f"{name:40} {result['value']:>14} {result['unit']:6} (baseline {reference})")
+    if arguments.update:
+        save_baseline(results, arguments.baseline)
+        print(f"Baseline written to {arguments.baseline}")
+        return 0
+    regressions = compare(results, baseline, arguments.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Client shim for the warm calculator daemon.
+
+Usage is the same as main.py for single commands and stdin batches:
+
+    python calc.py add 1 2
+    python calc.py < commands.txt
+
+The request is sent to the daemon started with `python main.py --daemon`,
+and its output and exit status are relayed. This script deliberately imports
+nothing from the calculator package, so it starts as fast as the interpreter
+does. If no daemon is listening, it falls back to running main.py.
+
+The socket path is CALCULATOR_DAEMON_SOCKET, or .cache/calculator.sock.
+"""
+
+import os
+import sys
+import json
+import socket
+import struct
+
+FRAME_HEADER = struct.Struct(">cI")  # Must match calculator.daemon.FRAME_HEADER.
+
+def receive_exactly(connection, size):
+    """
+    Reads exactly size bytes from the connection.
+
+    Args:
+        connection (socket.socket): The daemon connection.
+        size (int): The number of bytes to read.
+
+    Returns:
+        bytes: The data, shorter than size only if the daemon closed the connection.
+    """
+    parts = []
+    while size:
+        data = connection.recv(min(size, 1 << 20))
+        if not data:
+            break
+        parts.append(data)
+        size -= len(data)
+    return b"".join(parts)
+
+def run(argv, socket_path):
+    """
+    Sends one request to the daemon and relays the response.
+
+    Args:
+        argv (list): The command and its arguments; empty to send stdin as a batch.
+        socket_path (str): The daemon's Unix socket.
+
+    Returns:
+        int: The exit status reported by the daemon.
+
+    Raises:
+        OSError: If the daemon cannot be reached.
+    """
+    stdin = None if argv or sys.stdin.isatty() else sys.stdin.read()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps({"argv": argv, "stdin": stdin}).encode("utf-8") + b"\n")
+        streams = {b"O": sys.stdout.buffer, b"E": sys.stderr.buffer}
+        while True:
+            header = receive_exactly(connection, FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                sys.stderr.write("Error: the calculator daemon closed the connection\n")
+                return 1
+            kind, size = FRAME_HEADER.unpack(header)
+            if kind == b"X":
+                return size
+            streams[kind].write(receive_exactly(connection, size))
+            streams[kind].flush()
+
+def main():
+    """
+    Runs the request through the daemon, or through main.py if no daemon is listening.
+
+    Returns:
+        int: The process exit status.
+    """
+    argv = sys.argv[1:]
+    socket_path = os.environ.get("CALCULATOR_DAEMON_SOCKET") or os.path.join(".cache", "calculator.sock")
+    try:
+        return run(argv, socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        os.execv(sys.executable, [sys.executable, main_path] + argv)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,44 @@
 """
 Calculator module for managing the command-line interface (CLI) calculator.
 Supports dynamically loading plugins that extend functionality.
+
+Subsystems that only some invocations need (batch workers, asynchronous
+logging, logging.config, python-dotenv) are imported when first used, so a
+one-shot calculation such as `python main.py add 1 2` starts quickly.
 """
 
 import os
-import pkgutil
-import importlib
-import inspect
 import logging
-import logging.config
-from dotenv import load_dotenv
-from calculator.commands import CommandHandler, Command
-import calculator.plugins  # Import the plugins package
+from calculator.commands import CommandHandler, capture_output, split_command_line
+from calculator.loader import DEFAULT_MANIFEST_PATH, load_plugins
+from calculator.jsonlog import install_record_factory
+from calculator.cache import ResultCache
+from calculator.metrics import CommandMetrics, PrometheusFileExporter
+from calculator.settings import Settings
+from calculator.journal import DEFAULT_JOURNAL_PATH, Journal
+from calculator.numeric import MAX_PRECISION, create_backend, set_default_backend, set_max_precision
+
+class _DeferredLoggingSetup(logging.Handler):
+    """
+    Root handler that configures logging when the first record is emitted, then hands the record on.
+    """
+
+    def __init__(self, setup):
+        super().__init__()
+        self._setup = setup
+
+    def handle(self, record):
+        root = logging.getLogger()
+        # Replace the list rather than mutating it: the logger is still iterating the old one.
+        root.handlers = [handler for handler in root.handlers if handler is not self]
+        self._setup()
+        for handler in root.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record):
+        pass
 
 class Calculator:
     """
@@ -20,78 +47,264 @@ class Calculator:
 
     Attributes:
         command_handler (CommandHandler): Manages and executes commands in the calculator CLI.
-        settings (dict): Stores environment variables.
+        settings (Settings): Lazy, typed view of the environment variables.
+        async_logging (AsyncLogging): The background logging pipeline, or None when logging is synchronous.
+        metrics_exporter (PrometheusFileExporter): Writes the command metrics to a file, or None.
+        plugin_watcher (PluginWatcher): Reloads changed plugins while the calculator runs, or None.
     """
 
-    def __init__(self):
+    def __init__(self, lazy: bool = False):
         """
         Initializes the Calculator with a CommandHandler instance.
         Loads environment variables and configures logging.
+
+        Args:
+            lazy (bool): For short-lived one-shot invocations: defer the logging setup (including
+                creating the 'logs' directory) until the first warning, and do not open the history
+                journal, so a successful call writes no log or journal files.
         """
-        self.setup_logging()
-        load_dotenv()
+        self.async_logging = None
+        self.metrics_exporter = None
+        self.plugin_watcher = None
         self.settings = self.load_environment_variables()
-        self.command_handler = CommandHandler()
+        if lazy:
+            self.defer_logging()
+        else:
+            self.settings.load()
+            self.setup_logging()
+        self.configure_numeric_backend()
+        self.command_handler = CommandHandler(result_cache=self.create_result_cache(),
+                                              metrics=self.create_metrics(),
+                                              journal=None if lazy else self.create_journal(),
+                                              budgets=self.create_budgets())
         self.load_plugins()
 
     def setup_logging(self):
         """
         Configures logging settings, creating a 'logs' directory if it doesn't exist.
         Loads logging configuration from 'logging.conf' or sets basic logging configuration.
+        The file handler in 'logging.conf' writes JSON lines (see calculator.jsonlog), and the
+        [filter_*] sections attach sampling, rate-limiting and duplicate filters to the handlers
+        (see calculator.logfilters).
+
+        Setting CALCULATOR_ASYNC_LOGGING=true moves the configured handlers behind a bounded
+        queue drained by a background thread. CALCULATOR_LOG_QUEUE_SIZE sets the queue size and
+        CALCULATOR_LOG_OVERFLOW the overflow policy (block, drop-oldest or drop).
         """
+        self.shutdown_logging()
+        install_record_factory()
         os.makedirs('logs', exist_ok=True)
         logging_conf_path = 'logging.conf'
         if os.path.exists(logging_conf_path):
-            logging.config.fileConfig(logging_conf_path, disable_existing_loggers=False)
+            from logging.config import fileConfig  # pylint: disable=import-outside-toplevel
+            fileConfig(logging_conf_path, disable_existing_loggers=False)
+            from calculator.logfilters import install_filters  # pylint: disable=import-outside-toplevel
+            install_filters(logging_conf_path)
         else:
             logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        if self.settings.get_bool("CALCULATOR_ASYNC_LOGGING"):
+            from calculator.asynclog import AsyncLogging  # pylint: disable=import-outside-toplevel
+            self.async_logging = AsyncLogging(
+                queue_size=self.settings.get_int("CALCULATOR_LOG_QUEUE_SIZE", 10000),
+                policy=self.settings.get_str("CALCULATOR_LOG_OVERFLOW", "block"))
+            self.async_logging.start()
         logging.info("Logging initialized.")
 
+    def defer_logging(self):
+        """
+        Postpones setup_logging() until the first record at WARNING level or above is logged.
+
+        The root logger gets WARNING level and a placeholder handler, so the basicConfig()
+        calls made by plugin modules on import do not configure logging first, and the INFO
+        records of a call that goes well neither set up logging nor cost a log write. Once
+        set up, logging has the configured levels.
+        """
+        install_record_factory()
+        root = logging.getLogger()
+        if not root.handlers:
+            root.setLevel(logging.WARNING)
+            root.addHandler(_DeferredLoggingSetup(self.setup_logging))
+
+    def shutdown_logging(self):
+        """
+        Flushes and stops the asynchronous logging pipeline, if one is running.
+        """
+        if self.async_logging is not None:
+            self.async_logging.stop()
+            self.async_logging = None
+
     def load_environment_variables(self):
         """
-        Loads environment variables into a dictionary and logs the process.
+        Creates the settings view of the environment variables.
+
+        Nothing is read or copied here: the .env file is loaded on first access to a setting.
+
+        Returns:
+            Settings: A lazy, typed view of the environment variables.
+        """
+        return Settings()
+
+    def configure_numeric_backend(self):
+        """
+        Sets the default numeric backend of the arithmetic commands from the settings.
+
+        CALCULATOR_NUMERIC_BACKEND selects decimal (the default), float or fraction;
+        CALCULATOR_DECIMAL_PRECISION and CALCULATOR_DECIMAL_ROUNDING configure decimal.
+        Sessions can still choose another backend with the mode command. CALCULATOR_MAX_PRECISION
+        (default 100000) limits the decimal precision and the digits of the constants.
+        """
+        try:
+            set_max_precision(self.settings.get_int("CALCULATOR_MAX_PRECISION", MAX_PRECISION))
+        except ValueError as e:
+            logging.warning("Invalid maximum precision, using %d: %s", MAX_PRECISION, e)
+            set_max_precision(MAX_PRECISION)
+        name = self.settings.get_str("CALCULATOR_NUMERIC_BACKEND", "decimal")
+        try:
+            backend = create_backend(name, self.settings.get_int("CALCULATOR_DECIMAL_PRECISION"),
+                                     self.settings.get_str("CALCULATOR_DECIMAL_ROUNDING"))
+        except ValueError as e:
+            logging.warning("Invalid numeric backend settings, using decimal: %s", e)
+            backend = create_backend("decimal")
+        set_default_backend(backend)
+
+    def create_result_cache(self):
+        """
+        Creates the result cache for pure commands if it is enabled in the settings.
+
+        CALCULATOR_RESULT_CACHE sets the maximum number of cached results (0 or unset
+        disables caching) and CALCULATOR_RESULT_CACHE_BYTES their maximum total size.
 
         Returns:
-            dict: A dictionary containing environment variables.
+            ResultCache: The cache, or None if caching is disabled.
         """
-        settings = dict(os.environ.items())  # Replaced the comprehension with the suggested method
-        logging.info("Environment variables loaded.")
-        return settings
+        max_entries = self.settings.get_int("CALCULATOR_RESULT_CACHE", 0)
+        if max_entries <= 0:
+            return None
+        max_bytes = self.settings.get_int("CALCULATOR_RESULT_CACHE_BYTES", 4 * 1024 * 1024)
+        logging.info("Result cache enabled: %d entries, %d bytes.", max_entries, max_bytes)
+        return ResultCache(max_entries=max_entries, max_bytes=max_bytes)
+
+    def create_metrics(self):
+        """
+        Creates the per-command metrics unless CALCULATOR_METRICS is set to false.
+
+        If CALCULATOR_METRICS_FILE is set, the metrics are also written to that file in the
+        Prometheus text format every CALCULATOR_METRICS_INTERVAL seconds (default 15).
+
+        Returns:
+            CommandMetrics: The metrics, or None if they are disabled.
+        """
+        if not self.settings.get_bool("CALCULATOR_METRICS", True):
+            return None
+        metrics = CommandMetrics()
+        metrics_path = self.settings.get_str("CALCULATOR_METRICS_FILE")
+        if metrics_path:
+            self.metrics_exporter = PrometheusFileExporter(
+                metrics, metrics_path, self.settings.get_float("CALCULATOR_METRICS_INTERVAL", 15.0))
+            self.metrics_exporter.start()
+        return metrics
+
+    def create_budgets(self):
+        """
+        Creates the per-command budgets from the settings.
+
+        CALCULATOR_COMMAND_TIMEOUT (seconds, default 0 for none) is the deadline of pure commands,
+        enforced by running them in a supervised worker process. CALCULATOR_MAX_OPERAND_LENGTH
+        (default 100000 characters) and CALCULATOR_MAX_EXPONENT (default 999999, the decimal
+        module's largest exponent) limit every argument. CALCULATOR_COMMAND_BUDGETS overrides
+        them per command, e.g. "multiply:timeout=1;divide:timeout=2,max_length=5000".
+
+        Returns:
+            Budgets: The budgets.
+
+        Raises:
+            ValueError: If CALCULATOR_COMMAND_BUDGETS is malformed.
+        """
+        # pylint: disable=import-outside-toplevel
+        from calculator.deadlines import Budget, Budgets, parse_budgets
+        default = Budget(timeout=self.settings.get_float("CALCULATOR_COMMAND_TIMEOUT", 0.0),
+                         max_length=self.settings.get_int("CALCULATOR_MAX_OPERAND_LENGTH", 100000),
+                         max_exponent=self.settings.get_int("CALCULATOR_MAX_EXPONENT", 999999))
+        overrides = parse_budgets(self.settings.get_str("CALCULATOR_COMMAND_BUDGETS", ""), default)
+        return Budgets(default, overrides,
+                       manifest_path=self.settings.get_str("CALCULATOR_PLUGIN_MANIFEST", DEFAULT_MANIFEST_PATH))
+
+    def create_journal(self):
+        """
+        Opens the command history journal read by the history, recall and replay commands.
+
+        CALCULATOR_JOURNAL sets the journal file (default logs/history.journal; "off" disables
+        it) and CALCULATOR_JOURNAL_FSYNC_INTERVAL the minimum seconds between fsync calls.
+
+        Returns:
+            Journal: The journal, or None if it is disabled or cannot be opened.
+        """
+        path = self.settings.get_str("CALCULATOR_JOURNAL", DEFAULT_JOURNAL_PATH)
+        if path.lower() in ("off", "none", "false", "0"):
+            return None
+        try:
+            return Journal(path, fsync_interval=self.settings.get_float("CALCULATOR_JOURNAL_FSYNC_INTERVAL", 1.0))
+        except (OSError, ValueError) as e:
+            logging.warning("Command history disabled, cannot open journal %s: %s", path, e)
+            return None
 
     def load_plugins(self):
         """
-        Dynamically loads all plugins from the `calculator.plugins` package and registers commands.
-        Logs each plugin load and command registration.
+        Registers all commands from the `calculator.plugins` package.
+
+        Commands are registered as lazy proxies from the cached plugin manifest when it is
+        up to date, so plugin modules are only imported on first use. The manifest location
+        can be set with the CALCULATOR_PLUGIN_MANIFEST environment variable.
         """
-        all_package = calculator.plugins
-        
-        for _, module_name, _ in pkgutil.iter_modules(
-                all_package.__path__, all_package.__name__ + "."):
-            try:
-                module = importlib.import_module(module_name)
-                logging.info("Loaded plugin module: %s", module_name)  # Changed to lazy formatting
-            except ImportError as e:
-                logging.error("Error loading plugin %s: %s", module_name, e)  # Changed to lazy formatting
-                continue
-
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
-                if isinstance(attr, type) and issubclass(attr, Command) and attr is not Command:
-                    try:
-                        init_signature = inspect.signature(attr.__init__)
-                        command_instance = attr(self.command_handler) if "command_handler" in init_signature.parameters else attr()
-                        command_name = getattr(command_instance, 'command_name', module_name.split(".")[-1])
-                        self.command_handler.register_command(command_name, command_instance)
-                        logging.info("Registered command: %s", command_name)  # Changed to lazy formatting
-                    except TypeError as e:
-                        logging.warning("Skipping %s due to error: %s", attr_name, e)  # Changed to lazy formatting
-
-    def start(self):
+        manifest_path = self.settings.get_str("CALCULATOR_PLUGIN_MANIFEST", DEFAULT_MANIFEST_PATH)
+        load_plugins(self.command_handler, manifest_path)
+
+    def watch_plugins(self):
+        """
+        Starts reloading changed plugins in the background if CALCULATOR_PLUGIN_RELOAD is true.
+
+        CALCULATOR_PLUGIN_RELOAD_INTERVAL sets the seconds between checks (default 1).
+        Only long-running modes, the interactive prompt and the server, call this.
+        """
+        if self.plugin_watcher is not None or not self.settings.get_bool("CALCULATOR_PLUGIN_RELOAD"):
+            return
+        from calculator.watcher import PluginWatcher  # pylint: disable=import-outside-toplevel
+        self.plugin_watcher = PluginWatcher(self.command_handler,
+                                            interval=self.settings.get_float("CALCULATOR_PLUGIN_RELOAD_INTERVAL", 1.0))
+        self.plugin_watcher.start()
+
+    def execute_to_sink(self, sink, command_name: str, *args):
+        """
+        Executes a command and renders its result through an output sink instead of printing it.
+
+        Args:
+            sink (Sink): The sink the result is written to (see calculator.sinks).
+            command_name (str): The command name.
+            *args: The command arguments.
+
+        Returns:
+            CommandContext: The result of the command.
+        """
+        with capture_output() as output:
+            context = self.command_handler.execute_command(command_name, *args)
+        context.output = output.getvalue()
+        sink.emit(context)
+        return context
+
+    def start(self, output_format: str = "text"):
         """
         Starts the CLI loop for the calculator, accepting user commands until 'quit' is entered.
         Handles invalid inputs and logs errors.
+
+        Args:
+            output_format (str): How results are shown: text, jsonl, csv or binary (see calculator.sinks).
         """
         logging.info("Calculator CLI started.")
+        self.watch_plugins()
+        sink = None
+        if output_format != "text":
+            from calculator.sinks import create_sink  # pylint: disable=import-outside-toplevel
+            sink = create_sink(output_format)
         print("Calculator CLI - Type 'quit' to exit OR Menu to Continue")
         while True:
             try:
@@ -99,13 +312,15 @@ class Calculator:
                 if user_input.lower() == "quit":
                     logging.info("Exiting calculator.")
                     print("Goodbye!")
+                    self.shutdown_logging()
                     break
                 
-                parts = user_input.split(maxsplit=1)
-                command_name = parts[0] if parts else ''
-                args = parts[1].split() if len(parts) > 1 else []
+                command_name, args = split_command_line(user_input)
 
-                if command_name:
+                if command_name and sink is not None:
+                    self.execute_to_sink(sink, command_name, *args)
+                    sink.flush()
+                elif command_name:
                     self.command_handler.execute_command(command_name, *args)
                 else:
                     logging.warning("Invalid command entered.")
@@ -113,11 +328,64 @@ class Calculator:
             except KeyboardInterrupt:
                 logging.info("Calculator interrupted by user.")
                 print("\nExiting calculator. Goodbye!")
+                self.shutdown_logging()
                 break
             except ImportError as e:
                 logging.error("Unexpected error: %s", e)  # Changed to lazy formatting
                 print("An unexpected error occurred. Check logs for details.")
 
+    def run_batch(self, stream, *, fail_fast=True, output=None, jobs=1, chunk_size=256,  # pylint: disable=too-many-arguments
+                  output_format="text"):
+        """
+        Executes command lines from a stream without the interactive prompt.
+
+        Args:
+            stream: An iterable of text lines, such as an open file or sys.stdin.
+            fail_fast (bool): Stop at the first failing line instead of collecting errors.
+            output: The stream results are written to. Defaults to sys.stdout.
+            jobs (int): The number of worker processes; 1 runs in this process, 0 uses every CPU.
+            chunk_size (int): The number of lines sent to a worker process at a time.
+            output_format (str): How results are written: text, jsonl, csv or binary (see calculator.sinks).
+
+        Returns:
+            int: The exit status, 0 if every line succeeded and 1 otherwise.
+        """
+        from calculator.batch import BatchRunner, ParallelBatchRunner  # pylint: disable=import-outside-toplevel
+        logging.info("Calculator batch started.")
+        if jobs == 1:
+            runner = BatchRunner(self.command_handler, fail_fast=fail_fast, output_format=output_format)
+        else:
+            manifest_path = self.settings.get_str("CALCULATOR_PLUGIN_MANIFEST", DEFAULT_MANIFEST_PATH)
+            runner = ParallelBatchRunner(self.command_handler, fail_fast=fail_fast, jobs=jobs or None,
+                                         chunk_size=chunk_size, manifest_path=manifest_path,
+                                         output_format=output_format)
+        status = runner.run(stream, output=output)
+        runner.report()
+        return status
+
+    def run_command(self, command_name: str, *args, output_format: str = "text") -> int:
+        """
+        Executes a single command, as for `python main.py add 1 2`.
+
+        Args:
+            command_name (str): The command name.
+            *args: The command arguments.
+            output_format (str): How the result is written: text, jsonl, csv or binary (see calculator.sinks).
+
+        Returns:
+            int: The exit status, 0 if the command succeeded and 1 otherwise.
+        """
+        try:
+            if output_format == "text":
+                outcome = self.command_handler.execute_command(command_name, *args).outcome
+            else:
+                from calculator.sinks import create_sink  # pylint: disable=import-outside-toplevel
+                with create_sink(output_format) as sink:
+                    outcome = self.execute_to_sink(sink, command_name, *args).outcome
+        finally:
+            self.shutdown_logging()
+        return 0 if outcome == "ok" else 1
+
 if __name__ == "__main__":
     calculator = Calculator()
     calculator.start()
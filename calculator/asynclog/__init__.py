@@ -0,0 +1,204 @@
+"""
+Module for moving log output off the command hot path.
+
+The AsyncLogging class replaces the handlers of a logger (the root logger by
+default) with a BoundedQueueHandler, and a background QueueListener thread
+passes the queued records on to the original handlers. Commands then only pay
+for enqueuing a record, while formatting to disk and stderr happens on the
+listener thread. The queue is bounded, and its overflow policy decides what
+happens when the listener falls behind:
+
+    block        wait for room in the queue (no record is lost)
+    drop-oldest  discard the oldest queued record to make room
+    drop         discard the new record
+
+Dropped records are counted and reported when logging is stopped.
+
+The original handlers' levels and filters (see calculator.logfilters) are
+applied on the logging thread before a record is prepared, so a record no
+handler wants is never formatted or queued, and the listener only passes each
+record to the handlers that accepted it.
+"""
+
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop-oldest", "drop")
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded queue with a configurable overflow policy.
+
+    Attributes:
+        policy (str): One of OVERFLOW_POLICIES.
+        targets (list): The handlers whose levels and filters are applied before queuing, or None.
+        dropped (int): The number of records discarded because the queue was full.
+    """
+
+    def __init__(self, record_queue: queue.Queue, policy: str = "block", targets: list = None):
+        """
+        Initializes the BoundedQueueHandler.
+
+        Args:
+            record_queue (queue.Queue): The bounded queue records are put on.
+            policy (str): One of OVERFLOW_POLICIES.
+            targets (list): The handlers the listener passes records to. When given, a record is
+                only prepared and queued if one of them accepts it, and it carries the accepting
+                handlers to the listener.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy!r}, expected one of {', '.join(OVERFLOW_POLICIES)}")
+        super().__init__(record_queue)
+        self.policy = policy
+        self.targets = targets
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def emit(self, record):
+        """
+        Prepares and queues a record, skipping it if no target handler accepts it.
+
+        Args:
+            record (logging.LogRecord): The record to queue.
+        """
+        if self.targets is None:
+            super().emit(record)
+            return
+        targets = [handler for handler in self.targets if record.levelno >= handler.level and handler.filter(record)]
+        if not targets:
+            return
+        try:
+            prepared = self.prepare(record)
+            prepared.queue_targets = targets
+            self.enqueue(prepared)
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handleError(record)
+
+    def enqueue(self, record):
+        """
+        Puts a record on the queue, applying the overflow policy if it is full.
+
+        Args:
+            record (logging.LogRecord): The prepared record.
+        """
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                with self._dropped_lock:
+                    self.dropped += 1
+                if self.policy == "drop":
+                    return
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+
+class _FlushingQueueListener(QueueListener):
+    """
+    QueueListener whose stop sentinel waits for room instead of failing on a full queue,
+    and which passes records to the handlers that accepted them on the logging thread.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+    def handle(self, record):
+        targets = record.__dict__.pop("queue_targets", None)
+        if targets is None:
+            super().handle(record)
+            return
+        for handler in targets:
+            handler.acquire()
+            try:
+                handler.emit(record)
+            finally:
+                handler.release()
+
+class AsyncLogging:
+    """
+    Routes the records of a logger through a bounded queue to a background listener.
+
+    Attributes:
+        queue_size (int): The maximum number of queued records.
+        policy (str): One of OVERFLOW_POLICIES.
+        target (logging.Logger): The logger whose handlers are moved behind the queue.
+    """
+
+    _active = None  # The started instance, stopped when another one starts.
+
+    def __init__(self, queue_size: int = 10000, policy: str = "block", target: logging.Logger = None):
+        """
+        Initializes AsyncLogging without starting it.
+
+        Args:
+            queue_size (int): The maximum number of queued records.
+            policy (str): One of OVERFLOW_POLICIES.
+            target (logging.Logger): The logger to make asynchronous. Defaults to the root logger.
+        """
+        self.queue_size = queue_size
+        self.policy = policy
+        self.target = target if target is not None else logging.getLogger()
+        self.handler = None
+        self._listener = None
+        self._handlers = []
+
+    @property
+    def dropped(self) -> int:
+        """int: The number of records dropped so far."""
+        return self.handler.dropped if self.handler is not None else 0
+
+    def start(self):
+        """
+        Moves the target's handlers behind the queue and starts the listener thread.
+
+        Any previously started AsyncLogging is stopped first, so that reconfiguring
+        logging never leaves a listener writing to closed handlers.
+        """
+        if AsyncLogging._active is not None:
+            AsyncLogging._active.stop()
+        self._handlers = list(self.target.handlers)
+        self.handler = BoundedQueueHandler(queue.Queue(self.queue_size), self.policy, self._handlers)
+        for handler in self._handlers:
+            self.target.removeHandler(handler)
+        self.target.addHandler(self.handler)
+        self._listener = _FlushingQueueListener(self.handler.queue, *self._handlers, respect_handler_level=True)
+        self._listener.start()
+        atexit.register(self.stop)
+        AsyncLogging._active = self
+        logger.info("Asynchronous logging started (queue size %d, overflow policy %s).", self.queue_size, self.policy)
+
+    def stop(self):
+        """
+        Drains the queue, stops the listener and restores the original handlers.
+
+        Safe to call more than once.
+        """
+        if self._listener is None:
+            return
+        self.target.removeHandler(self.handler)
+        self._listener.stop()
+        self._listener = None
+        for handler in self._handlers:
+            self.target.addHandler(handler)
+            handler.flush()
+        atexit.unregister(self.stop)
+        if AsyncLogging._active is self:
+            AsyncLogging._active = None
+        if self.handler.dropped:
+            logger.warning("Asynchronous logging dropped %d records (overflow policy %s).",
+                           self.handler.dropped, self.policy)
+
+__all__ = ["AsyncLogging", "BoundedQueueHandler", "OVERFLOW_POLICIES"]
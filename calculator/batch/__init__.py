@@ -0,0 +1,345 @@
+"""
+Module for running the calculator non-interactively over a stream of command lines.
+
+This module provides the BatchRunner class, which reads command lines from a
+file or stdin with a generator, dispatches each one through a CommandHandler
+and writes the results through a buffered output sink (see calculator.sinks),
+by default the text the commands print, instead of the interactive prompt
+loop. It reports throughput when the batch finishes and
+can either stop at the first failing line or collect every error.
+
+ParallelBatchRunner spreads the lines over a pool of worker processes for
+CPU-heavy batches. Lines are sent in chunks, each worker builds its own
+CommandHandler once, with the budgets and result cache limits of the
+parent's handler, and results are written in input order. The parent
+records the metrics and journal entries of every line. Lines are
+executed independently, so a batch relying on session state from earlier
+lines (such as `let` variables) must run sequentially.
+
+Batches run in a non-interactive session: commands do not read standard
+input as data (`sum -`), since it may hold the batch itself.
+"""
+
+import io
+import os
+import sys
+import time
+import logging
+from itertools import islice
+from collections import deque
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from calculator.commands import CommandContext, CommandHandler, split_command_line
+from calculator.loader import DEFAULT_MANIFEST_PATH
+from calculator.numeric import current_backend, max_precision, set_default_backend, set_max_precision
+from calculator.session import Session, use_session
+from calculator.sinks import DiscardStream, TextSink, create_sink
+from calculator.workers import start_worker
+
+logger = logging.getLogger(__name__)
+
+def read_command_lines(stream):
+    """
+    Yields the command lines of a batch stream.
+
+    Blank lines and lines starting with '#' are skipped, and a 'quit' line
+    ends the batch just as it ends the interactive loop.
+
+    Args:
+        stream: An iterable of text lines, such as an open file or sys.stdin.
+
+    Yields:
+        tuple: The 1-based line number and the stripped line.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.lower() == "quit":
+            return
+        yield line_number, line
+
+def run_line(command_handler: CommandHandler, line_number: int, line: str) -> CommandContext:
+    """
+    Executes one batch line, turning unexpected exceptions into an error outcome.
+
+    Args:
+        command_handler (CommandHandler): The handler used to execute the command.
+        line_number (int): The 1-based line number, for logging.
+        line (str): The command line.
+
+    Returns:
+        CommandContext: The result of the line; its outcome is the exception type name if it raised.
+    """
+    command_name, args = split_command_line(line)
+    try:
+        return command_handler.execute_command(command_name, *args)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Line %d raised %s: %s", line_number, type(e).__name__, e)
+        context = CommandContext(command_name, tuple(args))
+        context.outcome = type(e).__name__
+        return context
+
+class BatchError:
+    """
+    Describes a batch line that failed.
+
+    Attributes:
+        line_number (int): The 1-based line number in the input.
+        line (str): The command line that failed.
+        outcome (str): The error kind reported for the line.
+    """
+
+    __slots__ = ("line_number", "line", "outcome")
+
+    def __init__(self, line_number: int, line: str, outcome: str):
+        self.line_number = line_number
+        self.line = line
+        self.outcome = outcome
+
+    def __str__(self):
+        return f"line {self.line_number}: {self.line!r} ({self.outcome})"
+
+class BatchRunner:
+    """
+    Executes command lines from a stream through a CommandHandler.
+
+    Attributes:
+        command_handler (CommandHandler): Executes each command line.
+        fail_fast (bool): Stop at the first failing line instead of collecting errors.
+        errors (list): The BatchError entries collected during the last run.
+        lines_processed (int): The number of command lines executed during the last run.
+        elapsed (float): Wall time in seconds of the last run.
+        output_format (str): The sink the results are written through: text, jsonl, csv or binary.
+    """
+
+    def __init__(self, command_handler: CommandHandler, fail_fast: bool = True, output_format: str = "text"):
+        """
+        Initializes the BatchRunner.
+
+        Args:
+            command_handler (CommandHandler): The handler used to execute commands.
+            fail_fast (bool): Stop at the first failing line instead of collecting errors.
+            output_format (str): The sink the results are written through: text, jsonl, csv or binary.
+        """
+        self.command_handler = command_handler
+        self.fail_fast = fail_fast
+        self.output_format = output_format
+        self.errors = []
+        self.lines_processed = 0
+        self.elapsed = 0.0
+
+    def run(self, stream, output=None) -> int:
+        """
+        Executes every command line read from the stream.
+
+        Args:
+            stream: An iterable of text lines, such as an open file or sys.stdin.
+            output: The stream results are written to. Defaults to sys.stdout.
+
+        Returns:
+            int: The exit status, 0 if every line succeeded and 1 otherwise.
+        """
+        self.errors = []
+        self.lines_processed = 0
+        sink = create_sink(self.output_format, output)
+        # The text sink takes what commands print as it is printed; the others render the results.
+        text = isinstance(sink, TextSink)
+        started = time.perf_counter()
+        try:
+            with use_session(Session(interactive=False)), redirect_stdout(sink if text else DiscardStream()):
+                for line_number, line in read_command_lines(stream):
+                    self.lines_processed += 1
+                    context = run_line(self.command_handler, line_number, line)
+                    if not text:
+                        sink.emit(context)
+                    if context.outcome != "ok":
+                        self.errors.append(BatchError(line_number, line, context.outcome))
+                        if self.fail_fast:
+                            break
+        finally:
+            sink.flush()
+            self.elapsed = time.perf_counter() - started
+        return 1 if self.errors else 0
+
+    def report(self, stream=None):
+        """
+        Writes a throughput summary and any collected errors.
+
+        Args:
+            stream: The text stream to write the report to. Defaults to sys.stderr.
+        """
+        stream = stream if stream is not None else sys.stderr
+        rate = self.lines_processed / self.elapsed if self.elapsed > 0 else 0.0
+        stream.write(f"Processed {self.lines_processed} lines in {self.elapsed:.3f}s "
+                     f"({rate:.0f} lines/sec), {len(self.errors)} error(s)\n")
+        for error in self.errors:
+            stream.write(f"Error: {error}\n")
+        logger.info("Batch finished: %d lines, %d errors, %.0f lines/sec",
+                    self.lines_processed, len(self.errors), rate)
+
+class _WorkerState:
+    """The state of a batch worker process, set once by _initialize_worker."""
+
+    command_handler = None
+    session = None
+
+def _initialize_worker(manifest_path: str, backend, precision_limit: int, budgets, result_cache):
+    """
+    Builds the worker process's CommandHandler once, when the process starts, with the parent's
+    numeric backend, maximum precision, budgets and result cache limits (see start_worker()).
+
+    Metrics and the journal stay with the parent, which records every line.
+    """
+    set_default_backend(backend)
+    set_max_precision(precision_limit)
+    _WorkerState.session = Session(interactive=False)
+    _WorkerState.command_handler = start_worker(manifest_path, budgets=budgets, result_cache=result_cache)
+
+def _run_chunk(chunk):
+    """
+    Executes a chunk of lines in a worker process.
+
+    Args:
+        chunk (list): (line_number, line) pairs.
+
+    Returns:
+        list: The (output, outcome, result, seconds) of each line, in order.
+    """
+    results = []
+    for line_number, line in chunk:
+        output = io.StringIO()
+        with use_session(_WorkerState.session), redirect_stdout(output):
+            context = run_line(_WorkerState.command_handler, line_number, line)
+        results.append((output.getvalue(), context.outcome, context.result, time.perf_counter() - context.started))
+    return results
+
+class ParallelBatchRunner(BatchRunner):
+    """
+    Executes command lines from a stream on a pool of worker processes.
+
+    Attributes:
+        jobs (int): The number of worker processes.
+        chunk_size (int): The number of lines sent to a worker at a time.
+        manifest_path (str): The plugin manifest the workers load their commands from.
+    """
+
+    def __init__(self, command_handler: CommandHandler = None, *, fail_fast: bool = True, jobs: int = None,  # pylint: disable=too-many-arguments
+                 chunk_size: int = 256, manifest_path: str = DEFAULT_MANIFEST_PATH, output_format: str = "text"):
+        """
+        Initializes the ParallelBatchRunner.
+
+        Args:
+            command_handler (CommandHandler): The handler whose budgets and result cache limits the workers'
+                handlers get, and whose metrics and journal record the lines; None for workers without them.
+            fail_fast (bool): Stop at the first failing line instead of collecting errors.
+            jobs (int): The number of worker processes. Defaults to the number of CPUs.
+            chunk_size (int): The number of lines sent to a worker at a time.
+            manifest_path (str): The plugin manifest the workers load their commands from.
+            output_format (str): The sink the results are written through: text, jsonl, csv or binary.
+        """
+        super().__init__(command_handler, fail_fast=fail_fast, output_format=output_format)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.manifest_path = manifest_path
+
+    def run(self, stream, output=None) -> int:
+        """
+        Executes every command line read from the stream on the worker pool.
+
+        At most two chunks per worker are in flight, so memory stays bounded
+        for inputs of any size. Results are written in input order.
+
+        Args:
+            stream: An iterable of text lines, such as an open file or sys.stdin.
+            output: The stream results are written to. Defaults to sys.stdout.
+
+        Returns:
+            int: The exit status, 0 if every line succeeded and 1 otherwise.
+        """
+        self.errors = []
+        self.lines_processed = 0
+        sink = create_sink(self.output_format, output)
+        text = isinstance(sink, TextSink)
+        lines = read_command_lines(stream)
+        started = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(self.jobs, initializer=_initialize_worker,
+                                     initargs=self._worker_arguments()) as executor:
+                pending = deque()
+                while True:
+                    while len(pending) < 2 * self.jobs:
+                        chunk = list(islice(lines, self.chunk_size))
+                        if not chunk:
+                            break
+                        pending.append((chunk, executor.submit(_run_chunk, chunk)))
+                    if not pending:
+                        break
+                    chunk, future = pending.popleft()
+                    try:
+                        results = future.result()
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        # A worker that died (BrokenProcessPool) or a result that could not be sent back.
+                        self._fail_chunk(sink, text, chunk, e)
+                        stop = True
+                    else:
+                        stop = self._write_results(sink, text, chunk, results)
+                    if stop:
+                        for _, future in pending:
+                            future.cancel()
+                        break
+        finally:
+            sink.flush()
+            self.elapsed = time.perf_counter() - started
+        return 1 if self.errors else 0
+
+    def _worker_arguments(self) -> tuple:
+        """Returns the arguments of _initialize_worker(); budgets and caches are pickled with their limits only."""
+        command_handler = self.command_handler
+        budgets = command_handler.budgets if command_handler is not None else None
+        result_cache = command_handler.result_cache if command_handler is not None else None
+        return self.manifest_path, current_backend(), max_precision(), budgets, result_cache
+
+    def _write_results(self, sink, text: bool, chunk: list, results: list) -> bool:
+        """Writes the results of a chunk in order; returns True if the batch stops at a failed line."""
+        recorded = self.command_handler is not None and (self.command_handler.metrics is not None
+                                                         or self.command_handler.journal is not None)
+        for (line_number, line), (printed, outcome, result, seconds) in zip(chunk, results):
+            self.lines_processed += 1
+            if text:
+                sink.write(printed)
+            if recorded or not text:
+                command_name, args = split_command_line(line)
+                context = CommandContext(command_name, tuple(args))
+                context.outcome, context.result = outcome, result
+                if not text:
+                    sink.emit(context)
+                if recorded:
+                    self._record(context, seconds)
+            if outcome != "ok":
+                self.errors.append(BatchError(line_number, line, outcome))
+                if self.fail_fast:
+                    return True
+        return False
+
+    def _fail_chunk(self, sink, text: bool, chunk: list, error: Exception):
+        """Records every line of a chunk whose worker failed as an error, with the exception type as outcome."""
+        outcome = type(error).__name__
+        logger.error("Batch lines %d to %d failed in a worker: %s: %s", chunk[0][0], chunk[-1][0], outcome, error)
+        for line_number, line in chunk:
+            self.lines_processed += 1
+            if not text:
+                command_name, args = split_command_line(line)
+                context = CommandContext(command_name, tuple(args))
+                context.outcome = outcome
+                sink.emit(context)
+            self.errors.append(BatchError(line_number, line, outcome))
+
+    def _record(self, context: CommandContext, seconds: float):
+        """Records a line executed by a worker in the handler's metrics and journal, as execute_command would."""
+        if self.command_handler.metrics is not None:
+            self.command_handler.metrics.record(context.command_name, context.outcome, seconds)
+        if self.command_handler.journal is not None:
+            self.command_handler.journal.record(context)
+
+__all__ = ["BatchRunner", "ParallelBatchRunner", "BatchError", "read_command_lines", "run_line"]
@@ -0,0 +1,647 @@
+"""
+Module for high-precision powers, roots, factorials and constants.
+
+The pow, sqrt, nthroot, factorial, binomial, pi and e commands compute in
+the session's numeric backend. With the decimal backend, results are
+accurate to the precision of the decimal context, so `mode decimal 1000`
+gives a thousand significant digits, computed with algorithms whose cost
+grows slowly with the number of digits:
+
+    pow        binary exponentiation (square and multiply) for integer
+               exponents; x**(p/q) as nthroot(x, q)**p for fractional
+               exponents with small denominators
+    nthroot    Newton's iteration from a float estimate, doubling the working
+               precision at each step, so only the last step runs at full
+               precision
+    factorial  products of consecutive integers split in halves (binary
+    binomial   splitting), so the large multiplications are balanced
+    pi, e      binary-splitting summation of the Chudnovsky series and of
+               the series of 1/k!, cached at the highest precision computed
+               so far, so lower precisions only round the cached value
+
+Intermediate results carry GUARD_DIGITS more digits than the context, and
+only the final result is rounded with the context's precision and rounding
+mode. With the fraction backend, roots of perfect powers are exact and
+irrational results are approximated at the decimal context's precision.
+
+Results too large for the backend (beyond the decimal context's Emax,
+float's range, or the digits Python prints of an integer) fail with
+Overflow before anything is computed, so `factorial 1e9` fails at once
+rather than running for hours.
+"""
+
+import sys
+import math
+import decimal
+import logging
+import threading
+from abc import abstractmethod
+from decimal import Decimal, DivisionByZero, InvalidOperation, Overflow, localcontext
+from fractions import Fraction
+from calculator.commands import Command, report_error, report_result
+from calculator.numeric import current_backend, max_precision
+from calculator.signatures import Param, Signature
+
+logger = logging.getLogger(__name__)
+
+# Digits carried beyond the context's precision while computing.
+GUARD_DIGITS = 5
+
+# The largest denominator q for which pow computes x**(p/q) as nthroot(x, q)**p.
+MAX_ROOT_DEGREE = 1000
+
+# The most digits of an integer argument, such as the n of factorial.
+MAX_INTEGER_DIGITS = 1000
+
+# The precision from which Newton's iteration computes square roots faster than Decimal.sqrt().
+NEWTON_SQRT_PRECISION = 200
+
+# Consecutive integers multiplied as ints at the leaves of a product.
+_LEAF_SIZE = 16
+
+_LN10 = math.log(10)
+
+# Exact integer arithmetic for the binary-splitting series.
+_EXACT = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+
+# The value of each constant computed at the highest precision so far, by name.
+_constants = {}
+_constants_lock = threading.Lock()
+
+def _working_context(extra: int = 0) -> decimal.Context:
+    """Returns a copy of the current context with guard digits and an unbounded exponent range."""
+    context = decimal.getcontext().copy()
+    context.prec += GUARD_DIGITS + extra
+    context.Emax, context.Emin = decimal.MAX_EMAX, decimal.MIN_EMIN
+    return context
+
+def _whole(value, name: str) -> int:
+    """
+    Converts an integral number of any backend to an int.
+
+    Raises:
+        InvalidOperation: If the value is not an integer.
+        Overflow: If it has more than MAX_INTEGER_DIGITS digits.
+    """
+    if isinstance(value, Decimal) and value.is_finite() and value.adjusted() >= MAX_INTEGER_DIGITS:
+        raise Overflow(f"{name} has more than {MAX_INTEGER_DIGITS} digits")
+    try:
+        integer = int(value)
+    except (ValueError, OverflowError):
+        raise InvalidOperation(f"{name} must be an integer, got {value}") from None
+    if integer != value:
+        raise InvalidOperation(f"{name} must be an integer, got {value}")
+    return integer
+
+def _check_magnitude(log10_result: float, number_type: type):
+    """
+    Fails early for results far beyond what the number type can hold.
+
+    Args:
+        log10_result (float): An estimate of the base-10 logarithm of the result's magnitude.
+        number_type (type): The type the result is computed in.
+
+    Raises:
+        Overflow: If the result would be too large.
+    """
+    if number_type is Decimal:
+        limit = decimal.getcontext().Emax
+    elif number_type is float:
+        limit = sys.float_info.max_10_exp
+    else:
+        limit = sys.get_int_max_str_digits() if hasattr(sys, "get_int_max_str_digits") else 0
+        if not limit:
+            return
+    # The estimate is only accurate to a few digits; results near the limit fail when they are converted.
+    if log10_result > limit + 3:
+        raise Overflow(f"The result has about {log10_result:.0f} digits, more than the limit of {limit}")
+
+def _log10(value) -> float:
+    """Returns log10(abs(value)) of a non-zero number, without converting huge or tiny Decimals to float."""
+    if isinstance(value, Decimal):
+        exponent = value.adjusted()
+        return exponent + math.log10(float(abs(value).scaleb(-exponent)))
+    if isinstance(value, Fraction):
+        return math.log10(abs(value.numerator)) - math.log10(value.denominator)
+    return math.log10(abs(value))
+
+def _approximate(function, *args) -> Fraction:
+    """Computes an irrational result for the fraction backend at the decimal context's precision."""
+    with localcontext(_working_context()):
+        result = function(*(Decimal(arg.numerator) / arg.denominator if isinstance(arg, Fraction) else arg
+                            for arg in args))
+    return Fraction(+result)
+
+def _integer_root(value: int, degree: int) -> int:
+    """Returns the floor of the root of a non-negative int, by Newton's iteration on ints."""
+    if value < 2:
+        return value
+    if degree == 2:
+        return math.isqrt(value)
+    # Start above the root, from a power of two, and descend monotonically.
+    root = 1 << -(-value.bit_length() // degree)
+    while True:
+        estimate = ((degree - 1) * root + value // root ** (degree - 1)) // degree
+        if estimate >= root:
+            return root
+        root = estimate
+
+def _exact_root(value: Fraction, degree: int) -> Fraction:
+    """Returns the positive root of a non-negative Fraction if it is rational, else None."""
+    numerator, denominator = _integer_root(value.numerator, degree), _integer_root(value.denominator, degree)
+    if numerator ** degree == value.numerator and denominator ** degree == value.denominator:
+        return Fraction(numerator, denominator)
+    return None
+
+def _newton_root(value: Decimal, degree: int) -> Decimal:
+    """
+    Computes the positive root of a positive Decimal with Newton's iteration and precision doubling.
+
+    Each iteration about doubles the number of correct digits, so it runs at twice the precision of the previous
+    one, starting from a float estimate good to about 15 digits.
+    """
+    context = decimal.getcontext()
+    log10_root = _log10(value) / degree
+    whole = math.floor(log10_root)
+    root = Decimal(repr(10 ** (log10_root - whole))).scaleb(whole)
+    precisions = []
+    precision = context.prec + 2
+    while precision > 15:
+        precisions.append(precision)
+        precision = precision // 2 + 1
+    # The last iteration repeats the full precision, to absorb the error of the float estimate.
+    for precision in reversed([context.prec + 2] + precisions):
+        with localcontext() as step:
+            step.prec = precision
+            root = ((degree - 1) * root + value / root ** (degree - 1)) / degree
+    return +root
+
+def _exact_decimal_root(root: Decimal, value: Decimal, degree: int) -> Decimal:
+    """Gives an exact root the exponent Decimal.sqrt() would, e.g. 3 rather than 3.0 for the cube root of 27."""
+    ideal = value.as_tuple().exponent // degree
+    if root.as_tuple().exponent >= ideal:
+        return root
+    reduced = root.quantize(Decimal(1).scaleb(ideal))
+    if reduced != root:
+        return root
+    with localcontext(_EXACT):
+        exact = reduced ** degree == value
+    return reduced if exact else root
+
+def _decimal_root(value: Decimal, degree: int) -> Decimal:
+    """Returns the root of degree 2 or more of a positive Decimal, rounded to the context."""
+    if not value.is_finite():
+        return value
+    if degree == 2 and decimal.getcontext().prec < NEWTON_SQRT_PRECISION:
+        return value.sqrt()
+    with localcontext(_working_context()):
+        # Newton's iteration needs a relative error well below 1/degree to start from.
+        root = _newton_root(value, degree) if degree <= MAX_ROOT_DEGREE else value ** (Decimal(1) / degree)
+    return _exact_decimal_root(+root, value, degree)
+
+def _positive_root(value, degree: int):
+    """Returns the root of degree 2 or more of a positive number, of the number's type."""
+    if isinstance(value, Decimal):
+        return _decimal_root(value, degree)
+    if isinstance(value, Fraction):
+        root = _exact_root(value, degree)
+        return root if root is not None else _approximate(nthroot, value, degree)
+    if degree == 2:
+        return math.sqrt(value)
+    # One Newton step corrects the last bit of the power, e.g. 27 ** (1 / 3) == 3.0000000000000004.
+    root = value ** (1 / degree)
+    return root - (root ** degree - value) / (degree * root ** (degree - 1))
+
+def _reciprocal_root(value, degree: int):
+    """Returns 1 over the positive-degree root of a number, computed with guard digits for Decimal."""
+    if value == 0:
+        raise DivisionByZero("Division by zero is not allowed.")
+    if not isinstance(value, Decimal):
+        return 1 / nthroot(value, degree)
+    with localcontext(_working_context()):
+        reciprocal = 1 / nthroot(value, degree)
+    return +reciprocal
+
+def nthroot(radicand, degree):
+    """
+    Computes the nth root of a number.
+
+    Args:
+        radicand (number): The number whose root is computed; negative only for odd degrees.
+        degree (number): The degree n, a non-zero integer.
+
+    Returns:
+        number: The root, of the radicand's type. Exact for fractions that are perfect powers.
+
+    Raises:
+        InvalidOperation: If the degree is not a non-zero integer or the radicand is negative for an even degree.
+        DivisionByZero: If the radicand is zero and the degree negative.
+    """
+    whole_degree = _whole(degree, "n")
+    if whole_degree == 0:
+        raise InvalidOperation("The root degree cannot be 0")
+    if radicand < 0 and whole_degree % 2 == 0:
+        raise InvalidOperation(f"The root of degree {whole_degree} of a negative number is not real")
+    if whole_degree < 0:
+        return _reciprocal_root(radicand, -whole_degree)
+    if radicand < 0:
+        return -nthroot(-radicand, whole_degree)
+    if whole_degree == 1 or radicand == 0:
+        return radicand
+    return _positive_root(radicand, whole_degree)
+
+def sqrt(value):
+    """
+    Computes the square root of a number.
+
+    Args:
+        value (number): A non-negative number.
+
+    Returns:
+        number: The square root, of the value's type.
+
+    Raises:
+        InvalidOperation: If the value is negative.
+    """
+    return nthroot(value, 2)
+
+def _exponent_ratio(exponent) -> Fraction:
+    """Returns an exponent as an exact Fraction, or None if it is not finite or has too many digits to convert."""
+    if isinstance(exponent, Decimal):
+        convertible = exponent.is_finite() and abs(exponent.as_tuple().exponent) <= MAX_INTEGER_DIGITS and \
+            exponent.adjusted() < MAX_INTEGER_DIGITS
+        return Fraction(exponent) if convertible else None
+    if isinstance(exponent, float) and not math.isfinite(exponent):
+        return None
+    return Fraction(exponent)
+
+def _log10_power(base, ratio: Fraction) -> float:
+    """Estimates the digits of a non-zero base to a rational power, as printed in the base's type."""
+    if isinstance(base, Fraction):
+        # Both the numerator and the denominator of a fraction are printed in full.
+        return float(max(math.log10(abs(base.numerator)), math.log10(base.denominator)) * abs(ratio))
+    return float(_log10(base) * ratio)
+
+def _rational_power(base, exponent, ratio: Fraction):
+    """Computes base**(p/q) as nthroot(base, q)**p, for a denominator q from 2 to MAX_ROOT_DEGREE."""
+    if isinstance(base, Decimal):
+        # The root's relative error grows p times in its pth power.
+        with localcontext(_working_context(len(str(ratio.numerator)))):
+            result = nthroot(base, ratio.denominator) ** ratio.numerator
+        return +result
+    if isinstance(base, Fraction):
+        root = _exact_root(abs(base), ratio.denominator)
+        if root is not None:
+            return (root if base > 0 else -root) ** ratio.numerator
+        return _approximate(power, base, exponent)
+    return nthroot(base, ratio.denominator) ** ratio.numerator
+
+def power(base, exponent):
+    """
+    Raises a number to a power.
+
+    Integer exponents use binary exponentiation: the number types' own powers, which square and multiply. A
+    fractional exponent p/q with q up to MAX_ROOT_DEGREE is computed as nthroot(base, q)**p, which is much faster
+    than the decimal module's exp(y*ln(x)) at high precision; other exponents use the number type's power.
+
+    Args:
+        base (number): The base.
+        exponent (number): The exponent.
+
+    Returns:
+        number: The base to the power of the exponent, of the base's type.
+
+    Raises:
+        InvalidOperation: If the power of a negative base is not real.
+        DivisionByZero: If the base is zero and the exponent negative.
+        Overflow: If the result is too large.
+    """
+    ratio = _exponent_ratio(exponent)
+    if base == 0 and exponent < 0:
+        raise DivisionByZero("Division by zero is not allowed.")
+    if ratio is not None and base != 0:
+        _check_magnitude(_log10_power(base, ratio), type(base))
+    if ratio is not None and ratio.denominator == 1:
+        if isinstance(base, float):
+            return math.pow(base, exponent)
+        return base ** (int(ratio) if isinstance(base, Fraction) else exponent)
+    if base < 0 and (ratio is None or ratio.denominator % 2 == 0 or ratio.denominator > MAX_ROOT_DEGREE):
+        raise InvalidOperation(f"The power {exponent} of a negative number is not real")
+    if ratio is not None and ratio.denominator <= MAX_ROOT_DEGREE:
+        return _rational_power(base, exponent, ratio)
+    if isinstance(base, Fraction):
+        return _approximate(power, base, exponent)
+    return base ** exponent
+
+def _product(low: int, high: int) -> Decimal:
+    """Multiplies the integers from low to high - 1 in the current context, splitting the range in halves."""
+    if high - low <= _LEAF_SIZE:
+        result = 1
+        for factor in range(low, high):
+            result *= factor
+        return Decimal(result)
+    middle = (low + high) // 2
+    return _product(low, middle) * _product(middle, high)
+
+def _log10_binomial(total: int, chosen: int) -> float:
+    """Estimates the base-10 logarithm of the binomial coefficient total over chosen, for chosen <= total / 2."""
+    if total < 10 ** 15:
+        return (math.lgamma(total + 1) - math.lgamma(chosen + 1) - math.lgamma(total - chosen + 1)) / _LN10
+    return chosen * math.log10(total) - math.lgamma(chosen + 1) / _LN10
+
+def factorial(value):
+    """
+    Computes the factorial of a non-negative integer.
+
+    Args:
+        value (number): A non-negative integer n.
+
+    Returns:
+        number: n!, of the value's type; rounded to the context's precision for Decimal.
+
+    Raises:
+        InvalidOperation: If the value is negative or not an integer.
+        Overflow: If the result is too large.
+    """
+    number_type = type(value)
+    integer = _whole(value, "n")
+    if integer < 0:
+        raise InvalidOperation(f"The factorial of a negative number is undefined, got {value}")
+    _check_magnitude(math.lgamma(integer + 1) / _LN10, number_type)
+    if number_type is Decimal:
+        with localcontext(_working_context(len(str(integer)))):
+            result = _product(2, integer + 1)
+        return +result
+    # math.factorial multiplies by binary splitting too, on ints.
+    return _convert_int(math.factorial(integer), number_type)
+
+def binomial(total, chosen):
+    """
+    Computes the binomial coefficient n over k, the number of ways to choose k items of n.
+
+    Args:
+        total (number): A non-negative integer n.
+        chosen (number): An integer k; the result is 0 unless 0 <= k <= n.
+
+    Returns:
+        number: The binomial coefficient, of the total's type; rounded to the context's precision for Decimal.
+
+    Raises:
+        InvalidOperation: If n is negative or n or k is not an integer.
+        Overflow: If the result is too large.
+    """
+    number_type = type(total)
+    n_integer, k_integer = _whole(total, "n"), _whole(chosen, "k")
+    if n_integer < 0:
+        raise InvalidOperation(f"n must not be negative, got {total}")
+    if not 0 <= k_integer <= n_integer:
+        return number_type(0)
+    k_integer = min(k_integer, n_integer - k_integer)
+    _check_magnitude(_log10_binomial(n_integer, k_integer), number_type)
+    if number_type is Decimal:
+        with localcontext(_working_context(len(str(k_integer)))):
+            result = _product(n_integer - k_integer + 1, n_integer + 1) / _product(1, k_integer + 1)
+        return +result
+    return _convert_int(math.comb(n_integer, k_integer), number_type)
+
+def _convert_int(value: int, number_type: type):
+    """Converts an exact int result to a backend type, failing cleanly where it does not fit."""
+    if number_type is float:
+        try:
+            return float(value)
+        except OverflowError:
+            raise Overflow(f"The result is more than the limit of 1e{sys.float_info.max_10_exp}") from None
+    limit = sys.get_int_max_str_digits() if hasattr(sys, "get_int_max_str_digits") else 0
+    # Such an int cannot be printed; bit_length() * log10(2) bounds its digits from below.
+    if limit and value.bit_length() * 0.30103 > limit:
+        raise Overflow(f"The result has more than {limit} digits")
+    return number_type(value)
+
+def _chudnovsky(low: int, high: int) -> tuple:
+    """Returns the P, Q and T of the Chudnovsky series terms low to high - 1, by binary splitting."""
+    if high - low == 1:
+        if low == 0:
+            p = q = Decimal(1)
+        else:
+            p = Decimal((6 * low - 5) * (2 * low - 1) * (6 * low - 1))
+            q = Decimal(low) ** 3 * 10939058860032000
+        t = p * (13591409 + 545140134 * low)
+        return p, q, -t if low % 2 else t
+    middle = (low + high) // 2
+    p1, q1, t1 = _chudnovsky(low, middle)
+    p2, q2, t2 = _chudnovsky(middle, high)
+    return p1 * p2, q1 * q2, q2 * t1 + p1 * t2
+
+def _compute_pi() -> Decimal:
+    """Computes pi at the current context's precision; each Chudnovsky term adds about 14 digits."""
+    context = decimal.getcontext()
+    terms = context.prec // 14 + 2
+    with localcontext(_EXACT):
+        _, q, t = _chudnovsky(0, terms)
+    return (q * 426880 * sqrt(Decimal(10005))) / t
+
+def _exponential_series(low: int, high: int) -> tuple:
+    """Returns P and Q with P / Q = sum of low! / k! for k from low + 1 to high, by binary splitting."""
+    if high - low == 1:
+        return Decimal(1), Decimal(high)
+    middle = (low + high) // 2
+    p1, q1 = _exponential_series(low, middle)
+    p2, q2 = _exponential_series(middle, high)
+    return p1 * q2 + p2, q1 * q2
+
+def _compute_e() -> Decimal:
+    """Computes e at the current context's precision as 1 + the sum of 1/k! for k >= 1."""
+    context = decimal.getcontext()
+    # Enough terms that the first term left out, 1/terms!, is below the last digit.
+    terms = 2
+    while math.lgamma(terms + 1) / _LN10 < context.prec + 1:
+        terms *= 2
+    with localcontext(_EXACT):
+        p, q = _exponential_series(0, terms)
+    return 1 + p / q
+
+_CONSTANTS = {"pi": (_compute_pi, math.pi), "e": (_compute_e, math.e)}
+
+def constant(name: str, number_type: type = Decimal):
+    """
+    Returns a mathematical constant at the current context's precision.
+
+    Values are cached per constant at the highest precision computed so far; lower precisions round the cached
+    value.
+
+    Args:
+        name (str): "pi" or "e".
+        number_type (type): The type of the result: Decimal, float or Fraction.
+
+    Returns:
+        number: The constant.
+
+    Raises:
+        KeyError: If the constant is unknown.
+        ValueError: If the context's precision is more than max_precision().
+    """
+    compute, float_value = _CONSTANTS[name]
+    if number_type is float:
+        return float_value
+    context = decimal.getcontext()
+    if context.prec > max_precision():
+        raise ValueError(f"Cannot compute {name} to {context.prec} digits, more than the limit of {max_precision()}")
+    digits = context.prec + GUARD_DIGITS
+    with _constants_lock:
+        cached = _constants.get(name)
+    if cached is None or cached[0] < digits:
+        with localcontext() as working:
+            working.prec = digits
+            value = compute()
+        logger.info("Computed %s to %d digits", name, digits)
+        with _constants_lock:
+            if name not in _constants or _constants[name][0] < digits:
+                _constants[name] = (digits, value)
+        cached = (digits, value)
+    value = context.plus(cached[1])
+    return Fraction(value) if number_type is Fraction else value
+
+def clear_constants():
+    """
+    Empties the cache of computed constants.
+    """
+    with _constants_lock:
+        _constants.clear()
+
+def number(text: str):
+    """
+    Parses an argument with the session's numeric backend; the Param type of the high-precision commands.
+
+    Args:
+        text (str): The argument text.
+
+    Returns:
+        A number of the backend's type.
+
+    Raises:
+        InvalidOperation: If the text is not a number.
+    """
+    return current_backend().parse(text)
+
+class FunctionCommand(Command):
+    """
+    Base class of the high-precision commands, which print one function of their arguments.
+
+    Subclasses set signature and label and implement calculate(), which expressions call too. Plugins import this
+    module rather than the class, so that the loader does not register the base class as a command.
+    """
+
+    pure = True
+    label = None
+
+    def execute(self, *args):
+        """
+        Computes calculate() with the session's numeric backend and prints the result.
+
+        Args:
+            *args: The arguments, parsed by the command's signature.
+        """
+        description = self.describe(args)
+        logger.info("Computing the %s", description)
+        try:
+            result = current_backend().apply(self.calculate, *args)
+        except ZeroDivisionError:
+            report_error("division_by_zero")
+            logger.error("Division by zero computing the %s", description)
+            print("Error: Division by zero is not allowed.")
+            return
+        except (Overflow, OverflowError) as e:
+            report_error("overflow")
+            logger.error("Overflow computing the %s: %s", description, e)
+            print(f"Error: {_message(e, 'The result is too large.')}")
+            return
+        except (InvalidOperation, ValueError) as e:
+            report_error("invalid_input")
+            logger.error("Cannot compute the %s: %s", description, e)
+            print(f"Error: {_message(e, 'Invalid input. Please enter valid numbers.')}")
+            return
+        report_result(result)
+        logger.info("The %s is %s", description, result)
+        print(f"The {self.label} is {result}")
+
+    def describe(self, args: tuple) -> str:
+        """
+        Describes a call for the log, e.g. "power of 2, 10".
+
+        Args:
+            args (tuple): The parsed arguments.
+
+        Returns:
+            str: The label and the arguments.
+        """
+        return f"{self.label} of {', '.join(map(str, args))}"
+
+    @abstractmethod
+    def calculate(self, *args):
+        """
+        Computes the command's function.
+
+        Args:
+            *args: Numbers of the session's backend.
+
+        Returns:
+            number: The result.
+        """
+
+class ConstantCommand(FunctionCommand):
+    """
+    Base class of the commands printing a constant at the decimal context's precision, or to a number of
+    significant digits, e.g. `pi 1000`.
+
+    Subclasses set label and constant_name, a constant known to constant().
+    """
+
+    signature = Signature(Param("digits", int, optional=True, minimum=1))
+    constant_name = None
+
+    def calculate(self, digits=None):  # pylint: disable=arguments-differ
+        """
+        Computes the constant in the session's numeric backend.
+
+        Args:
+            digits: The number of significant digits, an int or an integral number of any backend (as
+                passed from expressions), or None for the decimal context's precision.
+
+        Returns:
+            number: The constant.
+
+        Raises:
+            ValueError: If digits are given with the float backend, or are more than max_precision() (see constant()).
+            InvalidOperation: If digits are not a positive integer.
+        """
+        backend_type = current_backend().type
+        if digits is None:
+            return constant(self.constant_name, backend_type)
+        if backend_type is float:
+            raise ValueError("Digits are not available in float mode; use mode decimal or mode fraction")
+        digits = _whole(digits, "digits")
+        if digits < 1:
+            raise InvalidOperation(f"digits must be positive, got {digits}")
+        with localcontext() as context:
+            context.prec = digits
+            return constant(self.constant_name, backend_type)
+
+    def describe(self, args: tuple) -> str:
+        """
+        Describes a call for the log, e.g. "value of pi to 1000 digits".
+
+        Args:
+            args (tuple): The parsed arguments: the digits, if given.
+
+        Returns:
+            str: The label and the digits.
+        """
+        digits = args[0] if args else None
+        return self.label if digits is None else f"{self.label} to {digits} digits"
+
+def _message(error: Exception, default: str) -> str:
+    """Returns the message of an error raised here, or a default for the decimal module's own signals."""
+    return error.args[0] if error.args and isinstance(error.args[0], str) else default
+
+__all__ = ["power", "sqrt", "nthroot", "factorial", "binomial", "constant", "clear_constants", "number",
+           "FunctionCommand", "ConstantCommand", "GUARD_DIGITS", "MAX_ROOT_DEGREE", "MAX_INTEGER_DIGITS"]
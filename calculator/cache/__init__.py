@@ -0,0 +1,165 @@
+"""
+Module for memoizing the results of pure commands.
+
+The ResultCache class is an LRU cache bounded both by entry count and by an
+approximate byte size. CommandHandler consults it for commands that declare
+themselves pure (Command.pure = True): a hit replays the command's printed
+output and reported outcome without parsing the operands or recomputing.
+Keys include the session's numeric backend and, for Decimal, the precision
+and rounding mode, so changing any of them never returns a result computed
+under other settings.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from calculator.numeric import current_backend
+
+class CachedResult:
+    """
+    A cached command execution.
+
+    Attributes:
+        output (str): The text the command printed.
+        outcome (str): The outcome the command reported.
+        result: The result the command reported.
+        size (int): The approximate size of the entry in bytes.
+    """
+
+    __slots__ = ("output", "outcome", "result", "size")
+
+    def __init__(self, output: str, outcome: str, result, size: int):
+        self.output = output
+        self.outcome = outcome
+        self.result = result
+        self.size = size
+
+class ResultCache:
+    """
+    LRU cache of command results bounded by entry count and byte size.
+
+    Attributes:
+        max_entries (int): The maximum number of cached results.
+        max_bytes (int): The maximum approximate total size of cached results.
+        hits (int): The number of lookups that found a result.
+        misses (int): The number of lookups that did not.
+        evictions (int): The number of results evicted to stay within bounds.
+        size (int): The approximate total size of cached results in bytes.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 4 * 1024 * 1024):
+        """
+        Initializes an empty ResultCache.
+
+        Args:
+            max_entries (int): The maximum number of cached results.
+            max_bytes (int): The maximum approximate total size of cached results.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __reduce__(self):
+        # A copy for another process, such as a batch worker, starts empty with the same bounds.
+        return ResultCache, (self.max_entries, self.max_bytes)
+
+    @staticmethod
+    def cacheable(args: tuple) -> bool:
+        """
+        Tells whether an invocation's result depends only on its arguments.
+
+        Arguments referencing a file (@path) are not cacheable, as the file may change.
+
+        Args:
+            args (tuple): The raw arguments.
+
+        Returns:
+            bool: True if the result may be cached.
+        """
+        return not any(arg.startswith("@") for arg in args)
+
+    @staticmethod
+    def make_key(command_name: str, args: tuple) -> tuple:
+        """
+        Builds the cache key for a command invocation under the session's numeric backend.
+
+        Args:
+            command_name (str): The name of the command.
+            args (tuple): The raw arguments.
+
+        Returns:
+            tuple: The cache key.
+        """
+        return (command_name, args) + current_backend().key()
+
+    def get(self, key: tuple):
+        """
+        Looks up a cached result, marking it as most recently used.
+
+        Args:
+            key (tuple): A key from make_key.
+
+        Returns:
+            CachedResult: The cached result, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, output: str, outcome: str, result):
+        """
+        Caches a result, evicting least recently used entries to stay within bounds.
+
+        Entries larger than max_bytes on their own are not cached.
+
+        Args:
+            key (tuple): A key from make_key.
+            output (str): The text the command printed.
+            outcome (str): The outcome the command reported.
+            result: The result the command reported.
+        """
+        size = (sys.getsizeof(output) + sys.getsizeof(result)
+                + sum(sys.getsizeof(arg) for arg in key[1]))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous.size
+            self._entries[key] = CachedResult(output, outcome, result, size)
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+                self.evictions += 1
+
+    def clear(self):
+        """Removes all cached results. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: Entries, bytes, hits, misses and evictions.
+        """
+        return {"entries": len(self._entries), "bytes": self.size, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+__all__ = ["ResultCache", "CachedResult"]
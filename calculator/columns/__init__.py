@@ -0,0 +1,220 @@
+"""
+Module for applying arithmetic commands to columns of large CSV files.
+
+ColumnEngine memory-maps the input file and walks it in chunks that end on
+a line boundary. For each row it splits the line only up to the last
+referenced column, parses just the referenced fields with the session's
+numeric backend and applies a command's calculate() method, either between
+two columns or between a column and a scalar. Results are streamed to the
+output file, one line per input row, so the output lines up with the input.
+
+Pages of the input that have been processed are released from the mapping,
+so memory use depends on the chunk size, not on the file size. Rows whose
+referenced fields are missing or not numbers are skipped (their output
+line is empty) and counted, with a warning for the first few.
+
+Columns are referenced by their header name or as $N, the N-th column
+counting from 1. Any other reference is a scalar number. Quoted fields are
+supported through the csv module, which is only used for lines containing
+a quote.
+"""
+
+import os
+import csv
+import mmap
+import sys
+import time
+import logging
+from decimal import DivisionByZero, InvalidOperation
+from calculator.numeric import current_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+MAX_ROW_WARNINGS = 10
+
+class ColumnError(Exception):
+    """Raised for column jobs that cannot run, such as unknown columns."""
+
+def parse_fields(line: str, max_index: int) -> list:
+    """
+    Splits a CSV line far enough to reach a column.
+
+    Args:
+        line (str): The line, without its newline.
+        max_index (int): The 0-based index of the last column needed.
+
+    Returns:
+        list: The fields; fields after max_index may remain joined.
+    """
+    if '"' in line:
+        return next(csv.reader([line]), [])
+    return line.split(",", max_index + 1)
+
+class ColumnEngine:
+    """
+    Applies a calculation row-wise to columns of a CSV file.
+
+    Attributes:
+        calculate (callable): The calculation, e.g. AddCommand().calculate.
+        backend (NumericBackend): Parses the fields and runs the calculation.
+        chunk_size (int): The approximate number of bytes processed at a time.
+        rows (int): The number of data rows processed by the last run.
+        malformed (int): The number of rows skipped because a field was missing or not a number.
+        failed (int): The number of rows whose calculation failed, e.g. by dividing by zero.
+        elapsed (float): Wall time in seconds of the last run.
+    """
+
+    def __init__(self, calculate, backend=None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Initializes the ColumnEngine.
+
+        Args:
+            calculate (callable): The calculation taking two parsed numbers.
+            backend (NumericBackend): The numeric backend. Defaults to the session's.
+            chunk_size (int): The approximate number of bytes processed at a time.
+        """
+        self.calculate = calculate
+        self.backend = backend if backend is not None else current_backend()
+        self.chunk_size = max(chunk_size, mmap.PAGESIZE)
+        self.rows = 0
+        self.malformed = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    def resolve(self, reference: str, header: list):
+        """
+        Resolves an operand reference to a column index or a scalar.
+
+        Args:
+            reference (str): A header name, $N, or a number.
+            header (list): The header fields, or None if the file has no header.
+
+        Returns:
+            tuple: ("column", 0-based index) or ("scalar", parsed number).
+
+        Raises:
+            ColumnError: If the reference is neither a known column nor a number.
+        """
+        if header is not None and reference in header:
+            return "column", header.index(reference)
+        if reference.startswith("$") and reference[1:].isdigit() and int(reference[1:]) >= 1:
+            return "column", int(reference[1:]) - 1
+        try:
+            return "scalar", self.backend.parse(reference)
+        except InvalidOperation:
+            raise ColumnError(f"Unknown column {reference!r}") from None
+
+    def run(self, input_path: str, left: str, right: str, output_path: str, header: bool = True) -> int:
+        """
+        Computes left OP right for every row of the input file.
+
+        Args:
+            input_path (str): The CSV file to read.
+            left (str): The left operand: a header name, $N or a number.
+            right (str): The right operand: a header name, $N or a number.
+            output_path (str): The file the results are written to, one line per input row.
+            header (bool): Whether the first line of the input is a header.
+
+        Returns:
+            int: The number of data rows processed.
+
+        Raises:
+            OSError: If a file cannot be read or written.
+            ColumnError: If an operand is neither a known column nor a number, or both are scalars.
+        """
+        self.rows = self.malformed = self.failed = 0
+        started = time.perf_counter()
+        with open(input_path, "rb") as input_file:
+            size = os.fstat(input_file.fileno()).st_size
+            data = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        try:
+            position = 0
+            header_fields = None
+            if header and size:
+                end = data.find(b"\n")
+                end = size if end < 0 else end + 1
+                header_fields = [field.strip() for field in
+                                 next(csv.reader([data[:end].decode("utf-8", "replace").rstrip("\r\n")]), [])]
+                position = end
+            operands = (self.resolve(left, header_fields), self.resolve(right, header_fields))
+            if operands[0][0] == operands[1][0] == "scalar":
+                raise ColumnError("At least one operand must be a column")
+            if hasattr(data, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                data.madvise(mmap.MADV_SEQUENTIAL)
+            with open(output_path, "w", encoding="utf-8", buffering=1024 * 1024) as output:
+                if header_fields is not None:
+                    output.write("result\n")
+                self._stream(data, position, size, operands, output)
+        finally:
+            if size:
+                data.close()
+            self.elapsed = time.perf_counter() - started
+        return self.rows
+
+    def _stream(self, data, position: int, size: int, operands: tuple, output):
+        released = 0
+        release = hasattr(data, "madvise") and hasattr(mmap, "MADV_DONTNEED")
+        while position < size:
+            end = min(position + self.chunk_size, size)
+            if end < size:
+                newline = data.rfind(b"\n", position, end)
+                if newline < 0:  # A line longer than the chunk.
+                    newline = data.find(b"\n", end)
+                end = size if newline < 0 else newline + 1
+            lines = data[position:end].decode("utf-8", "replace").split("\n")
+            if lines[-1] == "":
+                lines.pop()
+            output.write(self._process(lines, operands))
+            position = end
+            if release:
+                boundary = position - position % mmap.PAGESIZE
+                if boundary > released:
+                    data.madvise(mmap.MADV_DONTNEED, released, boundary - released)
+                    released = boundary
+
+    def _process(self, lines: list, operands: tuple) -> str:  # pylint: disable=too-many-locals
+        # The row loop is the hot path: operands and bound methods are kept in locals.
+        (left_kind, left), (right_kind, right) = operands
+        max_index = max(value for kind, value in operands if kind == "column")
+        parse, apply, calculate = self.backend.parse, self.backend.apply, self.calculate
+        results = []
+        first_row = self.rows + 1
+        for row, line in enumerate(lines, start=first_row):
+            fields = parse_fields(line, max_index)
+            try:
+                a = parse(fields[left]) if left_kind == "column" else left
+                b = parse(fields[right]) if right_kind == "column" else right
+            except (IndexError, InvalidOperation):
+                self.malformed += 1
+                if self.malformed <= MAX_ROW_WARNINGS:
+                    logger.warning("Skipping malformed row %d: %r", row, line[:200])
+                results.append("")
+                continue
+            try:
+                results.append(str(apply(calculate, a, b)))
+            except (DivisionByZero, InvalidOperation, ArithmeticError) as e:
+                self.failed += 1
+                if self.failed <= MAX_ROW_WARNINGS:
+                    logger.warning("Row %d failed: %s", row, type(e).__name__)
+                results.append("")
+        self.rows += len(lines)
+        return "\n".join(results) + "\n" if results else ""
+
+    def report(self, stream=None):
+        """
+        Writes a throughput summary of the last run.
+
+        Args:
+            stream: The text stream to write to. Defaults to sys.stdout.
+        """
+        stream = stream if stream is not None else sys.stdout
+        rate = self.rows / self.elapsed if self.elapsed > 0 else 0.0
+        stream.write(f"Processed {self.rows} rows in {self.elapsed:.3f}s ({rate:.0f} rows/sec), "
+                     f"{self.malformed} malformed, {self.failed} failed\n")
+        if self.malformed > MAX_ROW_WARNINGS:
+            logger.warning("%d malformed rows skipped in total.", self.malformed)
+        logger.info("Column job finished: %d rows, %d malformed, %d failed, %.0f rows/sec",
+                    self.rows, self.malformed, self.failed, rate)
+
+__all__ = ["ColumnEngine", "ColumnError", "parse_fields", "DEFAULT_CHUNK_SIZE"]
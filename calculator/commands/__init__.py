@@ -3,47 +3,296 @@ Module defining the Command pattern for managing operations.
 
 This module provides an abstract base class Command for creating specific
 commands and a CommandHandler class to register and execute those commands.
+It also tracks the outcome of the command currently being executed, so that
+callers such as batch mode can tell successful commands from failed ones
+without parsing their printed output. Commands that declare a signature
+(see calculator.signatures) are invoked with converted arguments.
+
+CommandHandler may be shared between threads. Registration copies the
+registry and swaps it in, so dispatch reads it without locking, and
+execute_many() runs commands on a thread pool with each command's printed
+output captured separately (see capture_output()).
+
+With budgets (see calculator.deadlines), calls whose arguments exceed their
+command's size limits are rejected before parsing, and calls with a timeout
+that may run in another process (see Command.supervisable()) run under a
+watchdog that kills them when they overrun.
+
+Remote sessions (see calculator.session) may not run local-only commands,
+such as those reading or writing the server's files, and their commands are
+not recorded in the history journal.
 """
 
+import io
+import os
+import sys
+import time
+import logging
+import threading
 from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Overflow
+from calculator.session import current_session
+from calculator.signatures import SignatureError
+
+logger = logging.getLogger(__name__)
 
 class Command(ABC):
     """
     Abstract base class for defining command execution.
 
-    This class serves as a blueprint for creating concrete command classes 
+    This class serves as a blueprint for creating concrete command classes
     that will implement the `execute` method.
+
+    Attributes:
+        pure (bool): True if the command's output depends only on its arguments and
+            the decimal context, so its results may be cached. Defaults to False.
+        signature (Signature): The declared arguments; the command's execute method is then
+            called with converted values. None (the default) passes the raw strings.
+        local_only (bool): True if the command uses the files, standard input or history of the
+            process it runs in, so remote sessions may not run it. Defaults to False.
     """
 
+    pure = False
+    signature = None
+    local_only = False
+
     @abstractmethod
     def execute(self):
         """
         Abstract method that should be implemented by subclasses to execute a specific command.
         """
 
+    def supervisable(self, args) -> bool:  # pylint: disable=unused-argument
+        """
+        Tells whether a call may run in a worker process under the watchdog (see calculator.deadlines).
+
+        Args:
+            args (tuple): The raw arguments of the call.
+
+        Returns:
+            bool: True if the call neither reads nor changes session state, which another process
+            does not have. Defaults to whether the command is pure.
+        """
+        return self.pure
+
+class CommandContext:
+    """
+    Execution record for a single dispatched command.
+
+    Attributes:
+        command_name (str): The name the command was invoked with.
+        args (tuple): The raw arguments passed to the command.
+        outcome (str): "ok", or a short error kind reported by the command.
+        result: The value reported by the command, if any.
+        started (float): time.perf_counter() when execution started.
+        output (str): The text the command printed, if it was captured (see execute_many), else None.
+    """
+
+    __slots__ = ("command_name", "args", "outcome", "result", "started", "output")
+
+    def __init__(self, command_name: str, args: tuple):
+        self.command_name = command_name
+        self.args = args
+        self.outcome = "ok"
+        self.result = None
+        self.started = time.perf_counter()
+        self.output = None
+
+    @property
+    def ok(self) -> bool:
+        """bool: True if the command did not report an error."""
+        return self.outcome == "ok"
+
+_current_command: ContextVar = ContextVar("current_command", default=None)
+
+def current_command():
+    """
+    Returns the context of the command currently being executed.
+
+    Returns:
+        CommandContext: The active context, or None outside of execute_command.
+    """
+    return _current_command.get()
+
+def report_result(result):
+    """
+    Records the result of the command currently being executed.
+
+    Args:
+        result: The value computed by the command.
+    """
+    context = _current_command.get()
+    if context is not None:
+        context.result = result
+
+def report_error(outcome: str):
+    """
+    Marks the command currently being executed as failed.
+
+    Args:
+        outcome (str): A short error kind, e.g. "invalid_input" or "division_by_zero".
+    """
+    context = _current_command.get()
+    if context is not None:
+        context.outcome = outcome
+
+_captured_output: ContextVar = ContextVar("captured_output", default=None)
+_router_lock = threading.Lock()
+
+class OutputRouter:
+    """
+    Stand-in for sys.stdout that sends what is printed inside capture_output() to that capture.
+
+    The capture is looked up in the current context, so threads (and asyncio tasks)
+    capturing at the same time each get their own output. Everything else is written
+    to the wrapped stream.
+
+    Attributes:
+        stream: The stream written to outside of a capture.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        """
+        Writes text to the current context's capture, or to the wrapped stream.
+
+        Args:
+            text (str): The text to write.
+
+        Returns:
+            int: The number of characters written.
+        """
+        buffer = _captured_output.get()
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self):
+        """Flushes the current context's capture, or the wrapped stream."""
+        buffer = _captured_output.get()
+        (self.stream if buffer is None else buffer).flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+@contextmanager
+def capture_output():
+    """
+    Captures what the current thread or task prints, without affecting other threads.
+
+    Installs an OutputRouter as sys.stdout if it is not already there.
+
+    Yields:
+        io.StringIO: The captured output.
+    """
+    if not isinstance(sys.stdout, OutputRouter):
+        with _router_lock:
+            if not isinstance(sys.stdout, OutputRouter):
+                sys.stdout = OutputRouter(sys.stdout)
+    buffer = io.StringIO()
+    token = _captured_output.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _captured_output.reset(token)
+
+def split_command_line(line: str):
+    """
+    Splits a line of user input into a command name and its arguments.
+
+    Args:
+        line (str): The raw input line.
+
+    Returns:
+        tuple: The command name ('' for a blank line) and a list of argument strings.
+    """
+    parts = line.split(maxsplit=1)
+    command_name = parts[0] if parts else ''
+    args = parts[1].split() if len(parts) > 1 else []
+    return command_name, args
+
 class CommandHandler:
     """
     CommandHandler class to manage and execute commands.
 
     This class allows you to register and execute commands by name. It uses a dictionary
     to store registered commands, and executes the corresponding command when requested.
+    Registration replaces the dictionaries instead of changing them, so they must be
+    treated as read-only.
+
+    Attributes:
+        commands (dict): The registered commands by name.
+        parsers (dict): The compiled argument parser of each command, or None for commands without a signature.
+        result_cache (ResultCache): Optional cache for the results of pure commands.
+        metrics (CommandMetrics): Optional per-command call, error and latency metrics.
+        journal (Journal): Optional history journal that the commands of local sessions are appended to.
+        budgets (Budgets): Optional per-command time and operand-size budgets.
     """
 
-    def __init__(self):
+    def __init__(self, result_cache=None, metrics=None, journal=None, budgets=None):
         """
         Initializes the CommandHandler with an empty dictionary to store commands.
+
+        Args:
+            result_cache (ResultCache): Optional cache for the results of pure commands.
+            metrics (CommandMetrics): Optional per-command call, error and latency metrics.
+            journal (Journal): Optional history journal that executed commands are appended to.
+            budgets (Budgets): Optional per-command time and operand-size budgets.
         """
-        self.commands = {}
+        self._registry = ({}, {})
+        self._registry_lock = threading.Lock()
+        self.result_cache = result_cache
+        self.metrics = metrics
+        self.journal = journal
+        self.budgets = budgets
+
+    @property
+    def commands(self) -> dict:
+        """dict: The registered commands by name."""
+        return self._registry[0]
+
+    @property
+    def parsers(self) -> dict:
+        """dict: The compiled argument parser of each command, or None for commands without a signature."""
+        return self._registry[1]
 
     def register_command(self, command_name: str, command: Command):
         """
-        Registers a command with the given name.
+        Registers a command with the given name, compiling its signature if it declares one.
 
         Args:
             command_name (str): The name of the command to register.
             command (Command): The command object to be registered.
         """
-        self.commands[command_name] = command
+        self.update_commands({command_name: command})
+
+    def update_commands(self, commands: dict, removed=()):
+        """
+        Registers and unregisters several commands in a single swap of the registry.
+
+        Commands being executed see either none or all of the changes.
+
+        Args:
+            commands (dict): The commands to register by name, replacing any registered under the same name.
+            removed (iterable): The names of the commands to unregister; unknown names are ignored.
+        """
+        # A proxy for a plugin that is not imported yet gets no parser; resolving it registers the real command.
+        proxies = {name for name, command in commands.items() if hasattr(type(command), "resolve")}
+        compiled = {name: command.signature.compile(name) if command.signature is not None else None
+                    for name, command in commands.items() if name not in proxies}
+        with self._registry_lock:
+            registered, parsers = dict(self._registry[0]), dict(self._registry[1])
+            for command_name in removed:
+                registered.pop(command_name, None)
+                parsers.pop(command_name, None)
+            registered.update(commands)
+            for command_name in proxies:
+                parsers.pop(command_name, None)
+            parsers.update(compiled)
+            self._registry = (registered, parsers)
 
     def execute_command(self, command_name: str, *args):
         """
@@ -53,13 +302,157 @@ class CommandHandler:
             command_name (str): The name of the command to execute.
             *args: Any additional arguments to be passed to the command's execute method.
 
-        Raises:
-            KeyError: If the given command name is not found.
-        
+        Returns:
+            CommandContext: The outcome and reported result of the execution.
+
         This method uses the "Easier to ask for forgiveness than permission (EAFP)" approach:
         it tries to execute the command and handles the exception if the command is not found.
         """
+        context = CommandContext(command_name, args)
+        commands, parsers = self._registry
         try:
-            self.commands[command_name].execute(*args)
+            try:
+                command = commands[command_name]
+            except KeyError:
+                context.outcome = "unknown_command"
+                print(f"No such command: {command_name}")
+                return context
+            if self.budgets is not None:
+                problem = self.budgets.budget(command_name).check(args)
+                if problem is not None:
+                    context.outcome = "over_budget"
+                    logger.warning("Rejected %s over its budget: %s", command_name, problem)
+                    print(f"Error: {problem}")
+                    return context
+            if command.local_only and current_session().remote:
+                context.outcome = "not_permitted"
+                logger.warning("Refused %s to a remote session.", command_name)
+                print(f"Error: {command_name} is not available to remote clients")
+                return context
+            if self.result_cache is not None and command.pure and self.result_cache.cacheable(args):
+                return self._execute_cached(command, context, parsers)
+            token = _current_command.set(context)
+            try:
+                self._invoke(command, context, parsers)
+            finally:
+                _current_command.reset(token)
+            return context
+        except Overflow as e:
+            # A result too large for the decimal context, from a command that does not report it itself.
+            context.outcome = "overflow"
+            logger.error("Overflow executing %s: %s", command_name, e)
+            print("Error: The result is too large.")
+            return context
+        except Exception:
+            context.outcome = "exception"
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record(command_name, context.outcome, time.perf_counter() - context.started)
+            if self.journal is not None and not current_session().remote:
+                self.journal.record(context)
+
+    def _invoke(self, command: Command, context: CommandContext, parsers: dict):
+        if self.budgets is not None:
+            timeout = self.budgets.budget(context.command_name).timeout
+            if timeout and command.supervisable(context.args):
+                self._invoke_supervised(context, timeout)
+                return
+        try:
+            parse = parsers[context.command_name]
         except KeyError:
-            print(f"No such command: {command_name}")
+            # A lazily loaded plugin: importing it registers the real command and its parser.
+            if hasattr(command, "resolve"):
+                command = command.resolve()
+            parse = self.parsers.get(context.command_name)
+        if parse is None:
+            command.execute(*context.args)
+            return
+        try:
+            values = parse(context.args)
+        except SignatureError as e:
+            context.outcome = e.kind
+            logger.warning("Invalid arguments for %s: %s", context.command_name, e)
+            print(f"Error: {e}")
+            return
+        command.execute(*values)
+
+    def _invoke_supervised(self, context: CommandContext, timeout: float):
+        # Parsing runs in the worker too, so the deadline covers it. A missed deadline raises
+        # calculator.deadlines.DeadlineExceeded, a TimeoutError.
+        try:
+            output, context.outcome, context.result = self.budgets.watchdog.run(
+                context.command_name, context.args, timeout)
+        except TimeoutError as e:
+            context.outcome = "timeout"
+            logger.error("Stopped %s: %s", context.command_name, e)
+            print(f"Error: {e}")
+            return
+        sys.stdout.write(output)
+
+    def _execute_cached(self, command: Command, context: CommandContext, parsers: dict):
+        key = self.result_cache.make_key(context.command_name, context.args)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            sys.stdout.write(cached.output)
+            context.outcome = cached.outcome
+            context.result = cached.result
+            return context
+        output = io.StringIO()  # Replaced by the capture; empty if the capture could not start.
+        token = _current_command.set(context)
+        try:
+            with capture_output() as output:
+                self._invoke(command, context, parsers)
+        finally:
+            _current_command.reset(token)
+            sys.stdout.write(output.getvalue())
+        if context.outcome != "timeout":  # A deadline depends on the load, not only on the arguments.
+            self.result_cache.put(key, output.getvalue(), context.outcome, context.result)
+        return context
+
+    def _execute_captured(self, command_name: str, args) -> CommandContext:
+        with capture_output() as output:
+            context = self.execute_command(command_name, *args)
+        context.output = output.getvalue()
+        return context
+
+    def execute_many(self, commands, max_workers: int = None):
+        """
+        Executes commands concurrently on a thread pool, with each command's output captured.
+
+        Futures are yielded in input order, each once it is done, so a command that raised
+        does not stop the others: its future holds the exception. At most a few times
+        max_workers commands are in flight, so the input may be a long-running iterator.
+
+        Args:
+            commands (iterable): Command lines such as "add 1 2", or sequences such as ("add", "1", "2").
+            max_workers (int): The number of threads. Defaults to the ThreadPoolExecutor default.
+
+        Yields:
+            Future: Completed futures whose result() is the CommandContext, with its output
+                attribute holding what the command printed, or which raise the command's exception.
+        """
+        from concurrent.futures import ThreadPoolExecutor  # pylint: disable=import-outside-toplevel
+        pending = deque()
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)  # The ThreadPoolExecutor default.
+        window = max_workers * 4
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="command") as executor:
+            try:
+                for item in commands:
+                    if isinstance(item, str):
+                        command_name, args = split_command_line(item)
+                    else:
+                        command_name, *args = item
+                    pending.append(executor.submit(self._execute_captured, command_name, args))
+                    while len(pending) >= window or (pending and pending[0].done()):
+                        future = pending.popleft()
+                        future.exception()  # Waits for the command without raising.
+                        yield future
+                while pending:
+                    future = pending.popleft()
+                    future.exception()
+                    yield future
+            finally:
+                for future in pending:
+                    future.cancel()
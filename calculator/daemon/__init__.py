@@ -0,0 +1,289 @@
+"""
+Module for the warm calculator daemon.
+
+Even a lean one-shot invocation pays for interpreter startup and
+Calculator initialization. WarmDaemon does that work once: it builds a
+Calculator, imports every plugin, and then listens on a Unix socket. For
+each connection it forks a child that inherits the warm interpreter, runs
+the request and exits, so a call costs a fork and a socket round trip
+instead of a process start. Children are independent: state such as `let`
+variables does not carry over from one call to the next.
+
+The plugin files are fingerprinted before each fork (at most once per
+check interval). When they change, the plugin modules are dropped and the
+daemon warms up again, so clients never run stale plugins.
+
+Only the daemon rotates the log file: each child detaches the inherited
+CompressingRotatingFileHandler (see calculator.logrotate) and appends to
+the active file.
+
+Protocol: the client sends one JSON line {"argv": [...], "stdin": text or
+null}. A non-empty argv runs one command, as `python main.py add 1 2` does;
+an empty argv runs stdin as a batch. The child answers with frames of a
+one-byte kind and a four-byte big-endian length: b"O" and b"E" frames carry
+UTF-8 stdout and stderr text, and a final b"X" frame carries the exit
+status in place of the length. calc.py is the client shim.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import socket
+import signal
+import struct
+import logging
+import importlib
+from contextlib import redirect_stdout, redirect_stderr
+from calculator.loader import LazyCommand, plugin_fingerprint
+from calculator.logrotate import CompressingRotatingFileHandler
+from calculator.session import Session, use_session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = os.path.join(".cache", "calculator.sock")
+
+FRAME_HEADER = struct.Struct(">cI")
+MAX_REQUEST_LENGTH = 64 * 1024 * 1024
+
+class FrameWriter(io.TextIOBase):
+    """
+    Text stream sending what is written to it as protocol frames of one kind.
+
+    Attributes:
+        connection (socket.socket): The client connection.
+        kind (bytes): The frame kind, b"O" for stdout or b"E" for stderr.
+    """
+
+    def __init__(self, connection: socket.socket, kind: bytes, buffer_size: int = 65536):
+        super().__init__()
+        self.connection = connection
+        self.kind = kind
+        self.buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self._parts.append(data)
+        self._size += len(data)
+        if self._size >= self.buffer_size:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self._parts:
+            data = b"".join(self._parts)
+            self._parts.clear()
+            self._size = 0
+            self.connection.sendall(FRAME_HEADER.pack(self.kind, len(data)) + data)
+
+def read_request(connection: socket.socket) -> dict:
+    """
+    Reads the JSON request line from a client.
+
+    Args:
+        connection (socket.socket): The client connection.
+
+    Returns:
+        dict: The request with "argv" and "stdin".
+
+    Raises:
+        ValueError: If the request is malformed or too long.
+    """
+    parts = []
+    size = 0
+    while True:
+        data = connection.recv(65536)
+        if not data:
+            break
+        parts.append(data)
+        size += len(data)
+        if data.endswith(b"\n"):
+            break
+        if size > MAX_REQUEST_LENGTH:
+            raise ValueError("Request too long")
+    request = json.loads(b"".join(parts).decode("utf-8"))
+    if not isinstance(request, dict) or not isinstance(request.get("argv", []), list):
+        raise ValueError("Malformed request")
+    return request
+
+class WarmDaemon:
+    """
+    Keeps an initialized Calculator and forks a child per client request.
+
+    Attributes:
+        socket_path (str): The Unix socket the daemon listens on.
+        factory (callable): Builds the Calculator; called again when the plugins change.
+        check_interval (float): The minimum number of seconds between plugin fingerprint checks.
+        calculator (Calculator): The warm calculator children inherit.
+        generation (int): The number of times the daemon has warmed up.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, factory=None, check_interval: float = 1.0):
+        """
+        Initializes the WarmDaemon without warming it up.
+
+        Args:
+            socket_path (str): The Unix socket to listen on.
+            factory (callable): Builds the Calculator. Defaults to calculator.Calculator.
+            check_interval (float): The minimum number of seconds between plugin fingerprint checks.
+        """
+        if factory is None:
+            from calculator import Calculator  # pylint: disable=import-outside-toplevel
+            factory = Calculator
+        self.socket_path = socket_path
+        self.factory = factory
+        self.check_interval = check_interval
+        self.calculator = None
+        self.generation = 0
+        self._fingerprint = None
+        self._checked = 0.0
+        self._socket = None
+
+    def warm(self):
+        """
+        Builds the Calculator and imports every plugin so children start with everything loaded.
+
+        Plugin modules imported by an earlier warm-up are dropped first, so changed plugins are
+        imported afresh. Asynchronous logging is stopped, because its thread would not exist in
+        the children.
+        """
+        if self.calculator is not None:
+            self.calculator.shutdown_logging()
+            if getattr(self.calculator.command_handler, "journal", None) is not None:
+                self.calculator.command_handler.journal.close()
+            for module_name in [name for name in sys.modules if name.startswith("calculator.plugins.")]:
+                del sys.modules[module_name]
+            importlib.invalidate_caches()
+        self._fingerprint = plugin_fingerprint()
+        self._checked = time.monotonic()
+        self.calculator = self.factory()
+        self.calculator.shutdown_logging()
+        for command in list(self.calculator.command_handler.commands.values()):
+            if isinstance(command, LazyCommand):
+                command.resolve()
+        importlib.import_module("calculator.batch")
+        self.generation += 1
+        logger.info("Calculator daemon warmed up (generation %d, %d commands).",
+                    self.generation, len(self.calculator.command_handler.commands))
+
+    def check_plugins(self) -> bool:
+        """
+        Warms up again if the plugin files changed since the last warm-up.
+
+        Returns:
+            bool: True if the daemon warmed up again.
+        """
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return False
+        self._checked = now
+        if plugin_fingerprint() == self._fingerprint:
+            return False
+        logger.info("Plugin files changed, warming up again.")
+        self.warm()
+        return True
+
+    def handle_request(self, request: dict, stdout, stderr) -> int:
+        """
+        Executes a request with its output written to the given streams.
+
+        Args:
+            request (dict): The request with "argv" and "stdin".
+            stdout: The text stream standing in for stdout.
+            stderr: The text stream standing in for stderr.
+
+        Returns:
+            int: The exit status.
+        """
+        argv = [str(arg) for arg in request.get("argv") or []]
+        # The child's standard input is the daemon's, not the client's.
+        with use_session(Session(interactive=False)), redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                if argv:
+                    return self.calculator.run_command(*argv)
+                lines = io.StringIO(request.get("stdin") or "")
+                return self.calculator.run_batch(lines, fail_fast=True)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Daemon request %r raised %s: %s", argv, type(e).__name__, e)
+                print(f"Error: {type(e).__name__}: {e}", file=sys.stderr)
+                return 1
+
+    def _serve_child(self, connection: socket.socket):
+        """Runs one request in a forked child and exits."""
+        status = 1
+        try:
+            self._socket.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            for handler in logging.getLogger().handlers:
+                if isinstance(handler, CompressingRotatingFileHandler):
+                    handler.detach()
+            stdout = FrameWriter(connection, b"O")
+            stderr = FrameWriter(connection, b"E")
+            try:
+                request = read_request(connection)
+            except ValueError as e:
+                stderr.write(f"Error: {e}\n")
+            else:
+                status = self.handle_request(request, stdout, stderr)
+            stdout.flush()
+            stderr.flush()
+            connection.sendall(FRAME_HEADER.pack(b"X", status))
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Daemon child failed")
+        finally:
+            logging.shutdown()
+            os._exit(status)  # pylint: disable=protected-access
+
+    def bind(self):
+        """
+        Listens on the socket path, replacing a stale socket file left by a daemon that died.
+
+        Raises:
+            RuntimeError: If another daemon is already listening on the path.
+        """
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                os.unlink(self.socket_path)
+            else:
+                raise RuntimeError(f"A calculator daemon is already listening on {self.socket_path}")
+            finally:
+                probe.close()
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(self.socket_path)
+        self._socket.listen(128)
+
+    def serve_forever(self):
+        """
+        Warms up, then forks a child for every connection until interrupted or terminated.
+        """
+        self.warm()
+        self.bind()
+        # Children are reaped by the kernel; SIGTERM unwinds through the finally below.
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        logger.info("Calculator daemon listening on %s", self.socket_path)
+        try:
+            while True:
+                connection, _ = self._socket.accept()
+                with connection:
+                    self.check_plugins()
+                    if os.fork() == 0:
+                        self._serve_child(connection)
+        finally:
+            self._socket.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            logger.info("Calculator daemon stopped.")
+
+__all__ = ["WarmDaemon", "FrameWriter", "read_request", "DEFAULT_SOCKET_PATH", "FRAME_HEADER"]
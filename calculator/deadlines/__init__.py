@@ -0,0 +1,365 @@
+"""
+Module for per-command time and operand-size budgets.
+
+Decimal and Fraction accept operands such as 9e999999999, and one such
+operand can keep a command busy for a very long time, stalling the prompt or
+a server shared by many clients. A Budget limits the calls of a command:
+
+    timeout        seconds a call may run; 0 for no deadline
+    max_length     characters per argument; 0 for no limit
+    max_exponent   the largest absolute exponent written in an argument,
+                   such as the 999999999 of 9e999999999; 0 for no limit
+
+CommandHandler checks the raw arguments of every call against the command's
+budget before parsing them, so an over-budget call fails with the outcome
+"over_budget" before any computation.
+
+Deadlines are enforced by a Watchdog. Calls whose budget has a timeout run
+in a worker process if the command is supervisable (Command.supervisable()),
+which pure commands are; a call that overruns is answered with the outcome
+"timeout", and its worker is killed and replaced. Calls that read or change
+the session are not supervised, since the worker does not have it. Both
+outcomes are counted by the command metrics as error kinds.
+
+Expressions are budgeted as a whole: the operators and calls inside them
+invoke the commands' calculate() directly, so neither the size limits nor
+the timeouts of those commands apply. The size limits of expr and let cover
+the numbers written in the expression, not the intermediate results, and
+expr runs under the watchdog with its own timeout only when the expression
+uses no variables. Expressions with variables, and let, have no deadline.
+
+Configured with settings, e.g.:
+
+    CALCULATOR_COMMAND_TIMEOUT=5
+    CALCULATOR_MAX_OPERAND_LENGTH=100000
+    CALCULATOR_MAX_EXPONENT=999999
+    CALCULATOR_COMMAND_BUDGETS=multiply:timeout=1;divide:timeout=2,max_length=5000
+"""
+
+import io
+import re
+import logging
+import threading
+from contextlib import redirect_stdout
+
+logger = logging.getLogger(__name__)
+
+# An exponent written after the digits of a number, as in 1.5e10 or [1e5,2E-3].
+_EXPONENT = re.compile(r"(?<=[\d.])[eE]([+-]?\d+)")
+
+class DeadlineExceeded(TimeoutError):
+    """Raised by Watchdog.run() when a call overruns its timeout."""
+
+class Budget:
+    """
+    The time and operand-size limits of a command.
+
+    Attributes:
+        timeout (float): Seconds a call may run; 0 for no deadline.
+        max_length (int): The most characters per argument; 0 for no limit.
+        max_exponent (int): The largest absolute exponent written in an argument; 0 for no limit.
+    """
+
+    __slots__ = ("timeout", "max_length", "max_exponent", "_unchecked_length")
+
+    FIELDS = {"timeout": float, "max_length": int, "max_exponent": int}
+
+    def __init__(self, timeout: float = 0, max_length: int = 0, max_exponent: int = 0):
+        """
+        Initializes the Budget.
+
+        Args:
+            timeout (float): Seconds a call may run; 0 for no deadline.
+            max_length (int): The most characters per argument; 0 for no limit.
+            max_exponent (int): The largest absolute exponent written in an argument; 0 for no limit.
+
+        Raises:
+            ValueError: If a limit is negative.
+        """
+        if min(timeout, max_length, max_exponent) < 0:
+            raise ValueError("Budget limits cannot be negative")
+        self.timeout = timeout
+        self.max_length = max_length
+        self.max_exponent = max_exponent
+        # An argument of n characters has at most n - 2 exponent digits, so short ones cannot exceed the limit.
+        self._unchecked_length = len(str(max_exponent + 1)) + 1
+
+    def replace(self, **limits) -> "Budget":
+        """
+        Returns a copy of the budget with some limits changed.
+
+        Args:
+            **limits: New values for timeout, max_length or max_exponent.
+
+        Returns:
+            Budget: The new budget.
+        """
+        values = {name: getattr(self, name) for name in self.FIELDS}
+        values.update(limits)
+        return Budget(**values)
+
+    def check(self, args) -> str:
+        """
+        Checks the raw arguments of a call against the size limits.
+
+        Args:
+            args (tuple): The argument strings.
+
+        Returns:
+            str: What exceeds the budget, or None if the arguments are within it.
+        """
+        max_length, max_exponent, unchecked_length = self.max_length, self.max_exponent, self._unchecked_length
+        for arg in args:
+            if type(arg) is not str:  # pylint: disable=unidiomatic-typecheck
+                continue
+            if max_length and len(arg) > max_length:
+                return f"Argument of {len(arg)} characters exceeds the limit of {max_length}"
+            if max_exponent and len(arg) > unchecked_length and ("e" in arg or "E" in arg):
+                for exponent in _EXPONENT.findall(arg):
+                    digits = exponent.lstrip("+-").lstrip("0")
+                    # Compare lengths first: int() refuses very long digit strings.
+                    if len(digits) > len(str(max_exponent)) or int(digits or "0") > max_exponent:
+                        return f"Exponent {exponent} exceeds the limit of {max_exponent}"
+        return None
+
+    def __repr__(self):
+        return f"Budget(timeout={self.timeout}, max_length={self.max_length}, max_exponent={self.max_exponent})"
+
+def parse_budgets(text: str, default: Budget) -> dict:
+    """
+    Parses per-command budgets such as "multiply:timeout=1;divide:timeout=2,max_length=5000".
+
+    Args:
+        text (str): Semicolon-separated command:limit=value,... entries.
+        default (Budget): The budget whose limits apply where an entry sets none.
+
+    Returns:
+        dict: Budgets by command name.
+
+    Raises:
+        ValueError: If an entry is malformed or names an unknown limit.
+    """
+    budgets = {}
+    for entry in filter(None, (entry.strip() for entry in (text or "").split(";"))):
+        command_name, separator, limits = entry.partition(":")
+        if not separator or not command_name.strip():
+            raise ValueError(f"Invalid command budget {entry!r}, expected command:limit=value,...")
+        values = {}
+        for limit in filter(None, (limit.strip() for limit in limits.split(","))):
+            name, _, value = limit.partition("=")
+            name = name.strip()
+            if name not in Budget.FIELDS:
+                raise ValueError(f"Unknown budget limit {name!r}, expected one of {', '.join(Budget.FIELDS)}")
+            values[name] = Budget.FIELDS[name](value)
+        budgets[command_name.strip()] = default.replace(**values)
+    return budgets
+
+def _execute_call(command_handler, call) -> tuple:
+    """Executes one call received by a worker; returns what it printed, its outcome, its result and its error."""
+    # pylint: disable=import-outside-toplevel
+    from calculator.numeric import set_max_precision
+    from calculator.session import Session, use_session
+    command_name, args, backend, remote, precision_limit = call
+    set_max_precision(precision_limit)
+    output = io.StringIO()
+    try:
+        # The worker's standard input is not the user's, so commands may not read it.
+        with use_session(Session(remote, interactive=False)) as session, redirect_stdout(output):
+            session.backend = backend
+            context = command_handler.execute_command(command_name, *args)
+        return output.getvalue(), context.outcome, context.result, None
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return output.getvalue(), "exception", None, e
+
+def _serve(connection, manifest_path: str):
+    """
+    Runs in a worker process: loads the plugins, then executes the calls it receives until the pipe closes.
+
+    Args:
+        connection: The worker's end of the pipe.
+        manifest_path (str): The plugin manifest to load the commands from, or None to scan the plugins.
+    """
+    from calculator.workers import start_worker  # pylint: disable=import-outside-toplevel
+    command_handler = start_worker(manifest_path)
+    connection.send(None)
+    while True:
+        try:
+            call = connection.recv()
+        except EOFError:
+            return
+        response = _execute_call(command_handler, call)
+        try:
+            connection.send(response)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            connection.send((response[0], "exception", None, RuntimeError(f"Cannot return the result: {e}")))
+
+class _Worker:
+    """A worker process and the parent's end of its pipe."""
+
+    def __init__(self, manifest_path: str):
+        import multiprocessing  # pylint: disable=import-outside-toplevel
+        context = multiprocessing.get_context()
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child, manifest_path), name="command-worker", daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+
+    def kill(self):
+        """Kills the worker process, waits for it to exit and closes the pipe."""
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+class Watchdog:
+    """
+    Runs calls in worker processes, killing and replacing a worker whose call overruns its deadline.
+
+    Workers are started on demand, one per concurrent call, and kept for reuse.
+
+    Attributes:
+        manifest_path (str): The plugin manifest the workers load their commands from, or None to scan.
+        max_idle (int): The most idle workers kept.
+        timeouts (int): The number of calls that overran their deadline.
+    """
+
+    def __init__(self, manifest_path: str = None, max_idle: int = 2):
+        """
+        Initializes the Watchdog without starting a worker.
+
+        Args:
+            manifest_path (str): The plugin manifest the workers load their commands from, or None to scan.
+            max_idle (int): The most idle workers kept.
+        """
+        self.manifest_path = manifest_path
+        self.max_idle = max_idle
+        self.timeouts = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> _Worker:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return _Worker(self.manifest_path)
+
+    def _release(self, worker: _Worker):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(worker)
+                return
+        worker.kill()
+
+    def run(self, command_name: str, args: tuple, timeout: float) -> tuple:
+        """
+        Executes a call in a worker process with the session's numeric backend and restrictions.
+
+        The worker's start-up is not counted against the deadline.
+
+        Args:
+            command_name (str): The command.
+            args (tuple): The raw argument strings.
+            timeout (float): The deadline in seconds.
+
+        Returns:
+            tuple: What the command printed, its outcome and its result.
+
+        Raises:
+            DeadlineExceeded: If the call did not finish in time; the worker has been killed.
+            Exception: Whatever the command raised in the worker.
+        """
+        # pylint: disable=import-outside-toplevel
+        from calculator.numeric import current_backend, max_precision
+        from calculator.session import current_session
+        worker = self._acquire()
+        try:
+            if not worker.ready:
+                worker.connection.recv()
+                worker.ready = True
+            worker.connection.send((command_name, tuple(args), current_backend(), current_session().remote,
+                                    max_precision()))
+            if not worker.connection.poll(timeout):
+                raise DeadlineExceeded(f"{command_name} exceeded its deadline of {timeout:g}s")
+            output, outcome, result, error = worker.connection.recv()
+        except DeadlineExceeded:
+            with self._lock:
+                self.timeouts += 1
+            worker.kill()
+            # Start the replacement now, so the next call does not wait for it.
+            self._release(_Worker(self.manifest_path))
+            raise
+        except (EOFError, OSError):
+            worker.kill()
+            raise RuntimeError(f"The worker running {command_name} exited unexpectedly") from None
+        self._release(worker)
+        if error is not None:
+            raise error
+        return output, outcome, result
+
+    def close(self):
+        """
+        Stops the idle workers.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+
+class Budgets:
+    """
+    The budgets of all commands: a default and per-command overrides.
+
+    Attributes:
+        default (Budget): The budget of commands without an override.
+        overrides (dict): Budgets by command name.
+        manifest_path (str): The plugin manifest the watchdog's workers load, or None to scan.
+    """
+
+    def __init__(self, default: Budget = None, overrides: dict = None, manifest_path: str = None):
+        """
+        Initializes the Budgets.
+
+        Args:
+            default (Budget): The budget of commands without an override. Defaults to no limits.
+            overrides (dict): Budgets by command name.
+            manifest_path (str): The plugin manifest the watchdog's workers load, or None to scan.
+        """
+        self.default = default if default is not None else Budget()
+        self.overrides = dict(overrides or {})
+        self.manifest_path = manifest_path
+        self._watchdog = None
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # Worker processes get the same limits, and start their own watchdog when they need one.
+        return Budgets, (self.default, self.overrides, self.manifest_path)
+
+    def budget(self, command_name: str) -> Budget:
+        """
+        Returns the budget of a command.
+
+        Args:
+            command_name (str): The command name.
+
+        Returns:
+            Budget: The command's override, or the default budget.
+        """
+        return self.overrides.get(command_name, self.default)
+
+    @property
+    def watchdog(self) -> Watchdog:
+        """Watchdog: The watchdog running supervised calls, created on first use."""
+        if self._watchdog is None:
+            with self._lock:
+                if self._watchdog is None:
+                    self._watchdog = Watchdog(self.manifest_path)
+        return self._watchdog
+
+    def close(self):
+        """
+        Stops the watchdog's workers, if any were started.
+        """
+        if self._watchdog is not None:
+            self._watchdog.close()
+
+__all__ = ["Budget", "Budgets", "Watchdog", "DeadlineExceeded", "parse_budgets"]
@@ -0,0 +1,133 @@
+"""
+Module for embedding the calculator in other programs.
+
+Engine is the headless entry point: it loads the plugins into its own
+CommandHandler and returns the structured result of every command, a
+CommandContext with the operation (command_name), status (outcome) and
+value (result), instead of printing it:
+
+    with Engine() as engine:
+        result = engine.execute("add 1 2")
+        assert result.ok and result.result == 3
+
+What a command prints is captured into the result's output attribute and
+never reaches the terminal, and results can be rendered through any output
+sink (see calculator.sinks). By default the engine is quiet: the
+calculator's loggers are silenced and the plugins' logging.basicConfig()
+calls do not configure the root logger, and no journal, metrics or log
+directory are created. Closing the engine restores the logging levels.
+"""
+
+import logging
+from calculator.commands import CommandContext, CommandHandler, capture_output, split_command_line
+from calculator.loader import load_plugins, scan_plugins
+
+class Engine:
+    """
+    Headless calculator returning structured results.
+
+    Attributes:
+        command_handler (CommandHandler): Executes the commands.
+        quiet (bool): Whether the calculator's logging is silenced while the engine is open.
+    """
+
+    def __init__(self, quiet: bool = True, result_cache=None, metrics=None, manifest_path: str = None,  # pylint: disable=too-many-arguments
+                 budgets=None):
+        """
+        Initializes the Engine and registers the plugin commands.
+
+        Args:
+            quiet (bool): Silence the calculator's logging until the engine is closed.
+            result_cache (ResultCache): Optional cache for the results of pure commands.
+            metrics (CommandMetrics): Optional per-command metrics.
+            manifest_path (str): A plugin manifest to load the commands from lazily. By default
+                the plugins are scanned and no manifest is written.
+            budgets (Budgets): Optional per-command time and operand-size budgets; their
+                workers are stopped when the engine is closed.
+        """
+        self.quiet = quiet
+        self._logger_level = None
+        if quiet:
+            self._silence_logging()
+        self.command_handler = CommandHandler(result_cache=result_cache, metrics=metrics, budgets=budgets)
+        if manifest_path is None:
+            scan_plugins(self.command_handler)
+        else:
+            load_plugins(self.command_handler, manifest_path)
+
+    def _silence_logging(self):
+        calculator_logger = logging.getLogger("calculator")
+        self._logger_level = calculator_logger.level
+        calculator_logger.setLevel(logging.CRITICAL + 1)
+        root = logging.getLogger()
+        if not root.handlers:
+            # Plugin modules call logging.basicConfig() on import; give it nothing to do.
+            root.addHandler(logging.NullHandler())
+
+    def execute(self, command: str, *args) -> CommandContext:
+        """
+        Executes a command and returns its result.
+
+        Args:
+            command (str): A command line such as "add 1 2", or a command name if args are given.
+            *args: The command's arguments.
+
+        Returns:
+            CommandContext: The result, with its output attribute holding what the command printed.
+        """
+        if not args:
+            command, args = split_command_line(command)
+        with capture_output() as output:
+            context = self.command_handler.execute_command(command, *args)
+        context.output = output.getvalue()
+        return context
+
+    def execute_many(self, commands, max_workers: int = None):
+        """
+        Executes commands concurrently; see CommandHandler.execute_many.
+
+        Args:
+            commands (iterable): Command lines, or sequences of a command name and its arguments.
+            max_workers (int): The number of threads.
+
+        Yields:
+            Future: Completed futures whose result() is the CommandContext, in input order.
+        """
+        return self.command_handler.execute_many(commands, max_workers)
+
+    def run(self, commands, sink) -> int:
+        """
+        Executes command lines and renders their results through a sink.
+
+        Args:
+            commands (iterable): Command lines such as "add 1 2".
+            sink (Sink): The sink the results are written to; it is flushed at the end.
+
+        Returns:
+            int: The number of commands that failed.
+        """
+        failed = 0
+        try:
+            for line in commands:
+                context = self.execute(line)
+                sink.emit(context)
+                failed += not context.ok
+        finally:
+            sink.flush()
+        return failed
+
+    def close(self):
+        """Restores the logging level changed by a quiet engine and stops the budgets' workers."""
+        if self.command_handler.budgets is not None:
+            self.command_handler.budgets.close()
+        if self._logger_level is not None:
+            logging.getLogger("calculator").setLevel(self._logger_level)
+            self._logger_level = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+__all__ = ["Engine"]
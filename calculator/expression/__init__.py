@@ -0,0 +1,396 @@
+"""
+Module for parsing and evaluating arithmetic expressions.
+
+Expressions combine numbers, session variables and registered commands:
+
+    (2 + 3) * 4 / 7
+    a * b + c
+    add(2, multiply(3, 4))
+
+The operators + - * / are dispatched to the add, subtract, multiply and
+divide commands, and name(...) calls any registered command that provides a
+calculate() method, so plugins extend the expression language too.
+
+Parentheses and calls may be nested at most MAX_DEPTH deep, and a call must
+pass as many arguments as the command's calculate() method takes, so
+malformed input is reported as an ExpressionError instead of failing deep
+inside the evaluation.
+
+evaluate_for_command() evaluates text on behalf of the expr and let commands,
+reporting every failure as the command's outcome.
+
+compile_expression() turns the text into a tree of closures once and caches
+it by text, so evaluating the same formula again, for example a template
+like `a * b + c` over many variable bindings, skips tokenizing and parsing.
+Commands are looked up when the expression is evaluated, so a cached
+expression always uses the currently registered commands. Numbers and
+variables are likewise converted with the session's numeric backend when
+the expression is evaluated (see calculator.numeric).
+"""
+
+import re
+import inspect
+import logging
+from decimal import InvalidOperation, Overflow
+from functools import lru_cache
+from calculator.commands import report_error
+from calculator.numeric import current_backend
+
+logger = logging.getLogger(__name__)
+
+OPERATOR_COMMANDS = {"+": "add", "-": "subtract", "*": "multiply", "/": "divide"}
+
+MAX_DEPTH = 100
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(\S))")
+
+class ExpressionError(Exception):
+    """Raised for expressions that cannot be parsed or evaluated."""
+
+def tokenize(text: str) -> list:
+    """
+    Splits expression text into tokens.
+
+    Args:
+        text (str): The expression text.
+
+    Returns:
+        list: (kind, value) pairs, where kind is 'number', 'name' or 'symbol'.
+
+    Raises:
+        ExpressionError: If the text contains a character that is not part of the language.
+    """
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        number, name, symbol = match.groups()
+        if number is not None:
+            tokens.append(("number", number))
+        elif name is not None:
+            tokens.append(("name", name))
+        elif symbol in "+-*/(),":
+            tokens.append(("symbol", symbol))
+        else:
+            raise ExpressionError(f"Unexpected character {symbol!r} at position {match.start(3)}")
+        position = match.end()
+    return tokens
+
+def _lookup_command(commands, name):
+    try:
+        return commands[name].calculate
+    except KeyError:
+        raise ExpressionError(f"Unknown command: {name}") from None
+    except AttributeError:
+        raise ExpressionError(f"Command {name} cannot be used in expressions") from None
+
+@lru_cache(maxsize=256)
+def _arity(function) -> tuple:
+    """
+    Returns how many positional arguments a calculate() method accepts.
+
+    Args:
+        function (callable): The bound calculate() method.
+
+    Returns:
+        tuple: The minimum and maximum count; the maximum is None for variadic methods.
+    """
+    minimum, maximum = 0, 0
+    for parameter in inspect.signature(function).parameters.values():
+        if parameter.kind == parameter.VAR_POSITIONAL:
+            maximum = None
+        elif parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD):
+            minimum += parameter.default is parameter.empty
+            maximum = None if maximum is None else maximum + 1
+    return minimum, maximum
+
+def _constant(text):
+    values = {}  # Parsed once per number type.
+    def evaluate(_commands, _variables, backend):
+        try:
+            return values[backend.type]
+        except KeyError:
+            value = values[backend.type] = backend.parse(text)
+            return value
+    return evaluate
+
+def _variable(name):
+    def evaluate(_commands, variables, backend):
+        try:
+            return backend.convert(variables[name])
+        except KeyError:
+            raise ExpressionError(f"Undefined variable: {name}") from None
+    return evaluate
+
+def _negate(operand):
+    return lambda commands, variables, backend: -operand(commands, variables, backend)
+
+def _call(name, operands):
+    count = len(operands)
+    def evaluate(commands, variables, backend):
+        function = _lookup_command(commands, name)
+        minimum, maximum = _arity(function)
+        if count < minimum or (maximum is not None and count > maximum):
+            expected = minimum if minimum == maximum else f"{minimum} or more" if maximum is None else \
+                f"{minimum} to {maximum}"
+            raise ExpressionError(f"{name}() takes {expected} argument(s), got {count}")
+        return function(*(operand(commands, variables, backend) for operand in operands))
+    return evaluate
+
+def _chain(first, rest):
+    # Evaluates a run of left-associative operators in a loop, so long sums do not nest closures.
+    def evaluate(commands, variables, backend):
+        value = first(commands, variables, backend)
+        for name, operand in rest:
+            value = _lookup_command(commands, name)(value, operand(commands, variables, backend))
+        return value
+    return evaluate
+
+class _Parser:
+    """Recursive-descent parser compiling tokens into a tree of closures."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+        self.variables = set()
+        self.depth = 0
+
+    def peek(self):
+        """
+        Returns the next token without consuming it.
+
+        Returns:
+            tuple: The (kind, value) pair, or (None, None) at the end of the expression.
+        """
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self):
+        """
+        Consumes the next token.
+
+        Returns:
+            tuple: The (kind, value) pair.
+
+        Raises:
+            ExpressionError: If the expression has ended.
+        """
+        token = self.peek()
+        if token[0] is None:
+            raise ExpressionError("Unexpected end of expression")
+        self.position += 1
+        return token
+
+    def expect(self, symbol):
+        """
+        Consumes the next token, which must be the given symbol.
+
+        Args:
+            symbol (str): The expected symbol, e.g. ')'.
+
+        Raises:
+            ExpressionError: If the next token is something else.
+        """
+        if self.take() != ("symbol", symbol):
+            raise ExpressionError(f"Expected {symbol!r}")
+
+    def parse(self):
+        """
+        Parses the whole expression.
+
+        Returns:
+            callable: The root of the compiled tree.
+
+        Raises:
+            ExpressionError: If tokens are left over or the expression is malformed.
+        """
+        node = self.sum()
+        if self.position != len(self.tokens):
+            raise ExpressionError(f"Unexpected {self.tokens[self.position][1]!r}")
+        return node
+
+    def sum(self):
+        """
+        Parses products joined by + and -.
+
+        Returns:
+            callable: The compiled sum.
+        """
+        return self._operators(self.product, ("+", "-"))
+
+    def product(self):
+        """
+        Parses signed operands joined by * and /.
+
+        Returns:
+            callable: The compiled product.
+        """
+        return self._operators(self.unary, ("*", "/"))
+
+    def _operators(self, operand, symbols):
+        first = operand()
+        rest = []
+        while self.peek()[0] == "symbol" and self.peek()[1] in symbols:
+            rest.append((OPERATOR_COMMANDS[self.take()[1]], operand()))
+        return _chain(first, rest) if rest else first
+
+    def unary(self):
+        """
+        Parses an operand with any number of leading signs.
+
+        Returns:
+            callable: The compiled operand, negated if it has an odd number of minus signs.
+        """
+        negative = False
+        while self.peek() in (("symbol", "-"), ("symbol", "+")):
+            negative ^= self.take()[1] == "-"
+        node = self.primary()
+        return _negate(node) if negative else node
+
+    def primary(self):
+        """
+        Parses a number, a variable, a command call or a parenthesized sum.
+
+        Returns:
+            callable: The compiled operand.
+
+        Raises:
+            ExpressionError: If the next token cannot start an operand, or nesting exceeds MAX_DEPTH.
+        """
+        kind, value = self.take()
+        if kind == "number":
+            return _constant(value)
+        if kind == "name":
+            if self.peek() != ("symbol", "("):
+                self.variables.add(value)
+                return _variable(value)
+            self.take()
+            self._enter()
+            operands = []
+            if self.peek() != ("symbol", ")"):
+                operands.append(self.sum())
+                while self.peek() == ("symbol", ","):
+                    self.take()
+                    operands.append(self.sum())
+            self.expect(")")
+            self.depth -= 1
+            return _call(value, operands)
+        if (kind, value) == ("symbol", "("):
+            self._enter()
+            node = self.sum()
+            self.expect(")")
+            self.depth -= 1
+            return node
+        raise ExpressionError(f"Unexpected {value!r}")
+
+    def _enter(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise ExpressionError(f"Expression is nested more than {MAX_DEPTH} levels deep")
+
+class CompiledExpression:
+    """
+    A parsed expression, ready to be evaluated repeatedly.
+
+    Attributes:
+        text (str): The expression text.
+        variables (frozenset): The names of the variables the expression uses.
+    """
+
+    __slots__ = ("text", "variables", "_root")
+
+    def __init__(self, text: str, variables: frozenset, root):
+        self.text = text
+        self.variables = variables
+        self._root = root
+
+    def evaluate(self, command_handler, variables=None):
+        """
+        Evaluates the expression.
+
+        Args:
+            command_handler (CommandHandler): Provides the commands that operators and calls dispatch to.
+            variables (dict): Variable values by name.
+
+        Returns:
+            number: The value of the expression, in the session's numeric backend's type.
+
+        Raises:
+            ExpressionError: If a variable is undefined, a command is unknown or not usable in expressions,
+                or a call passes the wrong number of arguments.
+            DecimalException: If a command fails, e.g. DivisionByZero.
+        """
+        backend = current_backend()
+        return backend.apply(self._root, command_handler.commands, variables if variables is not None else {},
+                             backend)
+
+    def evaluate_many(self, command_handler, bindings):
+        """
+        Evaluates the expression once per set of variable bindings.
+
+        Args:
+            command_handler (CommandHandler): Provides the commands that operators and calls dispatch to.
+            bindings: An iterable of dictionaries of variable values.
+
+        Yields:
+            number: The value of the expression for each binding.
+        """
+        root = self._root
+        commands = command_handler.commands
+        backend = current_backend()
+        for variables in bindings:
+            yield backend.apply(root, commands, variables, backend)
+
+@lru_cache(maxsize=1024)
+def compile_expression(text: str) -> CompiledExpression:
+    """
+    Parses expression text, reusing the result for text that was compiled before.
+
+    Args:
+        text (str): The expression text.
+
+    Returns:
+        CompiledExpression: The compiled expression.
+
+    Raises:
+        ExpressionError: If the text is not a valid expression.
+    """
+    parser = _Parser(tokenize(text))
+    if not parser.tokens:
+        raise ExpressionError("Empty expression")
+    root = parser.parse()
+    return CompiledExpression(text, frozenset(parser.variables), root)
+
+def evaluate_for_command(command_handler, text: str, variables: dict):
+    """
+    Evaluates expression text for a command, reporting and printing any failure.
+
+    Args:
+        command_handler (CommandHandler): Provides the commands that operators and calls dispatch to.
+        text (str): The expression text.
+        variables (dict): Variable values by name.
+
+    Returns:
+        number: The value of the expression, or None if it failed and the error was reported.
+    """
+    try:
+        return current_backend().check(compile_expression(text).evaluate(command_handler, variables))
+    except ExpressionError as e:
+        report_error("invalid_expression")
+        logger.error("Invalid expression %r: %s", text, e)
+        print(f"Error: {e}")
+    except ZeroDivisionError:
+        report_error("division_by_zero")
+        logger.error("Division by zero in expression: %s", text)
+        print("Error: Division by zero is not allowed.")
+    except (Overflow, OverflowError):
+        report_error("overflow")
+        logger.error("Overflow in expression: %s", text)
+        print("Error: The result is too large.")
+    except (InvalidOperation, ValueError) as e:
+        report_error("invalid_input")
+        logger.error("Invalid operation in expression %r: %s", text, e)
+        print("Error: Invalid input. Please enter valid numbers.")
+    return None
+
+__all__ = ["CompiledExpression", "evaluate_for_command", "ExpressionError", "compile_expression", "tokenize", "OPERATOR_COMMANDS", "MAX_DEPTH"]
@@ -0,0 +1,339 @@
+"""
+Module for the append-only command history journal.
+
+Every command that computes a result or fails is appended to a compact
+binary journal: the command line, its outcome and its result. A record is a
+payload framed by its length on both sides,
+
+    [u32 length][payload][u32 length]
+
+so the file can be read forwards from the header and backwards from the
+end: reading the most recent entries touches only those records, however
+long the journal is. The payload is the timestamp as a big-endian double
+followed by the NUL-separated UTF-8 fields: command, outcome, result and
+the arguments.
+
+Journal appends each record with a single os.write() on a file opened with
+O_APPEND, so several processes (for example daemon children) can share one
+journal without interleaving records, and calls fsync at most once per
+fsync interval. A record torn by a crash is truncated when the journal is
+next opened. JournalReader memory-maps the file for reading.
+
+JournalCommand is the base class of the history and recall commands.
+"""
+
+import os
+import mmap
+import time
+import atexit
+import struct
+import logging
+from calculator.commands import Command
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CALCJRN\x01"
+DEFAULT_JOURNAL_PATH = os.path.join("logs", "history.journal")
+
+_LENGTH = struct.Struct(">I")
+_TIMESTAMP = struct.Struct(">d")
+
+class JournalEntry:
+    """
+    One journaled command execution.
+
+    Attributes:
+        timestamp (float): When the command finished, in seconds since the epoch.
+        command_name (str): The command name.
+        args (tuple): The command arguments.
+        outcome (str): "ok" or the error kind.
+        result (str): The reported result as text, or None if there was none.
+    """
+
+    __slots__ = ("timestamp", "command_name", "args", "outcome", "result")
+
+    def __init__(self, timestamp: float, command_name: str, args: tuple, outcome: str, result: str = None):
+        self.timestamp = timestamp
+        self.command_name = command_name
+        self.args = tuple(args)
+        self.outcome = outcome
+        self.result = result
+
+    @property
+    def line(self) -> str:
+        """str: The command line that was executed."""
+        return " ".join((self.command_name,) + self.args)
+
+    def __str__(self):
+        return f"{self.line} -> {self.result if self.outcome == 'ok' else self.outcome}"
+
+def encode_entry(entry: JournalEntry) -> bytes:
+    """
+    Encodes an entry as a framed journal record.
+
+    Args:
+        entry (JournalEntry): The entry.
+
+    Returns:
+        bytes: The record, including both length fields.
+    """
+    fields = (entry.command_name, entry.outcome, entry.result or "") + entry.args
+    text = "\0".join(fields)
+    if text.count("\0") != len(fields) - 1:
+        text = "\0".join(field.replace("\0", "") for field in fields)
+    payload = _TIMESTAMP.pack(entry.timestamp) + text.encode("utf-8")
+    length = _LENGTH.pack(len(payload))
+    return length + payload + length
+
+def decode_payload(payload) -> JournalEntry:
+    """
+    Decodes a record payload.
+
+    Args:
+        payload (bytes): The payload.
+
+    Returns:
+        JournalEntry: The entry.
+    """
+    (timestamp,) = _TIMESTAMP.unpack_from(payload, 0)
+    fields = payload[_TIMESTAMP.size:].decode("utf-8").split("\0")
+    return JournalEntry(timestamp, fields[0], tuple(fields[3:]), fields[1], fields[2] or None)
+
+def _valid_end(data, size: int) -> int:
+    """Returns the end offset of the last complete record, scanning forwards from the header."""
+    position = len(MAGIC)
+    while position + _LENGTH.size <= size:
+        (length,) = _LENGTH.unpack_from(data, position)
+        end = position + 2 * _LENGTH.size + length
+        if end > size or _LENGTH.unpack_from(data, end - _LENGTH.size)[0] != length:
+            break
+        position = end
+    return position
+
+class Journal:
+    """
+    Appends command executions to a journal file.
+
+    Attributes:
+        path (str): The journal file.
+        fsync_interval (float): The minimum number of seconds between fsync calls; 0 syncs every record.
+        records (int): The number of records appended by this instance.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH, fsync_interval: float = 1.0):
+        """
+        Opens or creates the journal, truncating a torn record left by a crash.
+
+        Args:
+            path (str): The journal file.
+            fsync_interval (float): The minimum number of seconds between fsync calls.
+
+        Raises:
+            ValueError: If the file exists but is not a journal.
+        """
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.records = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            self._check()
+        except Exception:
+            os.close(self._fd)
+            raise
+        self._synced = time.monotonic()
+        atexit.register(self.close)
+
+    def _check(self):
+        size = os.fstat(self._fd).st_size
+        if size == 0:
+            os.write(self._fd, MAGIC)
+            return
+        if os.pread(self._fd, len(MAGIC), 0) != MAGIC:
+            raise ValueError(f"{self.path} is not a calculator journal")
+        if size == len(MAGIC):
+            return
+        (length,) = _LENGTH.unpack(os.pread(self._fd, _LENGTH.size, size - _LENGTH.size))
+        start = size - 2 * _LENGTH.size - length
+        if start >= len(MAGIC) and _LENGTH.unpack(os.pread(self._fd, _LENGTH.size, start))[0] == length:
+            return
+        with mmap.mmap(self._fd, size, access=mmap.ACCESS_READ) as data:
+            end = _valid_end(data, size)
+        logger.warning("Truncating torn record at the end of journal %s (%d bytes).", self.path, size - end)
+        os.ftruncate(self._fd, end)
+
+    def append(self, entry: JournalEntry):
+        """
+        Appends an entry with a single write, syncing if the fsync interval has passed.
+
+        Args:
+            entry (JournalEntry): The entry.
+        """
+        os.write(self._fd, encode_entry(entry))
+        self.records += 1
+        now = time.monotonic()
+        if now - self._synced >= self.fsync_interval:
+            os.fsync(self._fd)
+            self._synced = now
+
+    def record(self, context):
+        """
+        Appends a dispatched command if it reported a result or an error.
+
+        Commands that only display something, such as menu or history, are not journaled.
+
+        Args:
+            context (CommandContext): The command's execution record.
+        """
+        if context.outcome == "ok" and context.result is None:
+            return
+        result = None if context.result is None else str(context.result)
+        self.append(JournalEntry(time.time(), context.command_name, context.args, context.outcome, result))
+
+    def sync(self):
+        """Flushes the journal to disk now."""
+        if self._fd is not None:
+            os.fsync(self._fd)
+            self._synced = time.monotonic()
+
+    def close(self):
+        """Syncs and closes the journal. Safe to call more than once."""
+        if self._fd is None:
+            return
+        self.sync()
+        os.close(self._fd)
+        self._fd = None
+        atexit.unregister(self.close)
+
+class JournalReader:
+    """
+    Memory-mapped read access to a journal file.
+
+    Only complete records are visible; a torn record at the end is ignored.
+    Use as a context manager, or call close().
+    """
+
+    def __init__(self, path: str):
+        """
+        Maps the journal file.
+
+        Args:
+            path (str): The journal file.
+
+        Raises:
+            OSError: If the file cannot be opened.
+            ValueError: If the file is not a journal.
+        """
+        self.path = path
+        with open(path, "rb") as journal_file:
+            self._size = os.fstat(journal_file.fileno()).st_size
+            if self._size < len(MAGIC):
+                raise ValueError(f"{path} is not a calculator journal")
+            self._data = mmap.mmap(journal_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:len(MAGIC)] != MAGIC:
+            self._data.close()
+            raise ValueError(f"{path} is not a calculator journal")
+        if not self._tail_is_valid():
+            self._size = _valid_end(self._data, self._size)
+
+    def _tail_is_valid(self) -> bool:
+        if self._size == len(MAGIC):
+            return True
+        if self._size < len(MAGIC) + 2 * _LENGTH.size:
+            return False
+        (length,) = _LENGTH.unpack_from(self._data, self._size - _LENGTH.size)
+        start = self._size - 2 * _LENGTH.size - length
+        return start >= len(MAGIC) and _LENGTH.unpack_from(self._data, start)[0] == length
+
+    def __iter__(self):
+        """Yields every entry, oldest first."""
+        data = self._data
+        position = len(MAGIC)
+        size = self._size
+        while position + _LENGTH.size <= size:
+            (length,) = _LENGTH.unpack_from(data, position)
+            end = position + _LENGTH.size + length
+            if end + _LENGTH.size > size:
+                return
+            yield decode_payload(data[position + _LENGTH.size:end])
+            position = end + _LENGTH.size
+
+    def reversed(self):
+        """Yields every entry, newest first, reading backwards from the end of the file."""
+        data = self._data
+        end = self._size
+        while end - 2 * _LENGTH.size >= len(MAGIC):
+            (length,) = _LENGTH.unpack_from(data, end - _LENGTH.size)
+            start = end - 2 * _LENGTH.size - length
+            if start < len(MAGIC) or _LENGTH.unpack_from(data, start)[0] != length:
+                return  # Corrupted record.
+            yield decode_payload(data[start + _LENGTH.size:end - _LENGTH.size])
+            end = start
+
+    def recent(self, count: int) -> list:
+        """
+        Returns the most recent entries without reading the rest of the journal.
+
+        Args:
+            count (int): The maximum number of entries.
+
+        Returns:
+            list: Up to count entries, oldest first.
+        """
+        entries = []
+        for entry in self.reversed():
+            if len(entries) >= count:
+                break
+            entries.append(entry)
+        entries.reverse()
+        return entries
+
+    def close(self):
+        """Unmaps the journal file."""
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class JournalCommand(Command):  # pylint: disable=abstract-method
+    """
+    Base class of the commands that read the history journal.
+
+    Plugins import this module rather than the class, so that the loader does not register the base class as a command.
+    """
+
+    local_only = True
+
+    def __init__(self, command_handler):
+        """
+        Initializes the command with a reference to the command handler.
+
+        Args:
+            command_handler: The handler whose journal is read.
+        """
+        self.command_handler = command_handler
+
+    def recent(self, count: int) -> list:
+        """
+        Reads the most recent journal entries, printing a notice if history is disabled.
+
+        Args:
+            count (int): The maximum number of entries.
+
+        Returns:
+            list: Up to count entries, oldest first, or None if history is disabled.
+        """
+        journal = self.command_handler.journal
+        if journal is None:
+            print("History is disabled (CALCULATOR_JOURNAL=off).")
+            return None
+        with JournalReader(journal.path) as reader:
+            return reader.recent(count)
+
+__all__ = ["Journal", "JournalEntry", "JournalReader", "JournalCommand", "encode_entry", "decode_payload",
+           "DEFAULT_JOURNAL_PATH", "MAGIC"]
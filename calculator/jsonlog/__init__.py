@@ -0,0 +1,93 @@
+"""
+Module for structured, JSON-lines log output.
+
+The JsonFormatter writes each record as one JSON object per line. Records
+emitted while a command is executing carry the command name, its operands,
+the outcome and result it reported, and the time elapsed since the command
+started, so logs can be filtered and aggregated by field (see
+calculator.logquery) instead of by text matching.
+
+The command fields are stamped onto records by a log record factory, which
+runs in the thread that emits the record. This keeps the fields correct when
+records are formatted later on a background thread by asynchronous logging.
+"""
+
+import json
+import time
+import logging
+from calculator.commands import current_command
+
+COMMAND_FIELDS = ("command", "operands", "outcome", "result", "duration_ms")
+
+class _CommandRecordFactory:
+    """
+    Log record factory that stamps the fields of the executing command onto the records it creates.
+
+    Attributes:
+        base_factory (callable): The factory that creates the records.
+    """
+
+    def __init__(self, base_factory):
+        self.base_factory = base_factory
+
+    def __call__(self, *args, **kwargs):
+        record = self.base_factory(*args, **kwargs)
+        context = current_command()
+        if context is not None:
+            record.command = context.command_name
+            record.operands = list(context.args)
+            record.outcome = context.outcome
+            record.result = None if context.result is None else str(context.result)
+            record.duration_ms = round((time.perf_counter() - context.started) * 1000, 3)
+        return record
+
+def install_record_factory():
+    """
+    Installs the log record factory that stamps command fields onto records.
+
+    Safe to call more than once; the factory is not installed again while it is the current one.
+    """
+    base_factory = logging.getLogRecordFactory()
+    if not isinstance(base_factory, _CommandRecordFactory):
+        logging.setLogRecordFactory(_CommandRecordFactory(base_factory))
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats log records as single-line JSON objects.
+
+    Every line has the fields ts (epoch seconds), time (ISO 8601), level,
+    logger and message. Records emitted during a command also have the
+    fields in COMMAND_FIELDS, and records with exception information have exc.
+    """
+
+    default_time_format = "%Y-%m-%dT%H:%M:%S"
+    default_msec_format = "%s.%03d"
+
+    def format(self, record):
+        """
+        Formats a record as a JSON object.
+
+        Args:
+            record (logging.LogRecord): The record to format.
+
+        Returns:
+            str: The JSON text, without a trailing newline.
+        """
+        entry = {
+            "ts": round(record.created, 6),
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in COMMAND_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+__all__ = ["JsonFormatter", "install_record_factory", "COMMAND_FIELDS"]
@@ -0,0 +1,289 @@
+"""
+Module for discovering plugins and registering their commands lazily.
+
+Importing every plugin package and instantiating every Command subclass on
+startup makes cold start grow with the number of plugins. This module keeps
+an on-disk manifest mapping each command name to the module and class that
+implement it, keyed by a fingerprint of the plugin files (paths, sizes and
+modification times). When the fingerprint matches, commands are registered
+as LazyCommand proxies that only import their module on first use; when any
+plugin file changes, the plugins are scanned again and the manifest rebuilt.
+The manifest also records whether each command's constructor takes the
+handler, so resolving a lazy command does not need to inspect signatures.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import importlib
+import threading
+from calculator.commands import Command, CommandHandler
+import calculator.plugins
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 3
+DEFAULT_MANIFEST_PATH = os.path.join(".cache", "plugin_manifest.json")
+
+def plugin_fingerprint(package=calculator.plugins) -> str:
+    """
+    Computes a fingerprint of the source files of a plugin package.
+
+    Only the directory tree is stat'ed; no plugin is imported.
+
+    Args:
+        package: The plugin package to fingerprint.
+
+    Returns:
+        str: A hex digest that changes whenever a plugin file is added, removed or modified.
+    """
+    digest = hashlib.sha1()
+    for root in package.__path__:
+        for directory, subdirectories, files in os.walk(root):
+            subdirectories[:] = sorted(d for d in subdirectories if d != "__pycache__")
+            for file_name in sorted(files):
+                if not file_name.endswith(".py"):
+                    continue
+                path = os.path.join(directory, file_name)
+                stat = os.stat(path)
+                digest.update(f"{os.path.relpath(path, root)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+def takes_handler(command_class) -> bool:
+    """
+    Tells whether a command class's constructor accepts the command handler.
+
+    Args:
+        command_class (type): The Command subclass.
+
+    Returns:
+        bool: True if the constructor has a command_handler parameter.
+    """
+    import inspect  # pylint: disable=import-outside-toplevel
+    return "command_handler" in inspect.signature(command_class.__init__).parameters
+
+def create_command(command_class, command_handler: CommandHandler, with_handler: bool = None) -> Command:
+    """
+    Instantiates a command class, passing the handler if its constructor accepts one.
+
+    Args:
+        command_class (type): The Command subclass to instantiate.
+        command_handler (CommandHandler): The handler the command is registered with.
+        with_handler (bool): Whether the constructor takes the handler; inspected when None.
+
+    Returns:
+        Command: The new command instance.
+    """
+    if with_handler is None:
+        with_handler = takes_handler(command_class)
+    if with_handler:
+        return command_class(command_handler)
+    return command_class()
+
+# Serializes first-use resolution, so concurrent first calls create the command only once.
+_resolve_lock = threading.RLock()
+
+class LazyCommand(Command):
+    """
+    Proxy for a plugin command whose module has not been imported yet.
+
+    On first use the proxy imports the module, instantiates the command and
+    replaces itself in the handler's registry, so later calls dispatch to the
+    real command directly.
+
+    Attributes:
+        command_name (str): The name the command is registered under.
+        module_name (str): The module defining the command class.
+        class_name (str): The name of the command class.
+        command_handler (CommandHandler): The handler the command is registered with.
+        pure (bool): The command class's purity flag, recorded in the manifest.
+        local_only (bool): The command class's local_only flag, recorded in the manifest.
+        with_handler (bool): Whether the command's constructor takes the handler, or None if unknown.
+    """
+
+    def __init__(self, command_name: str, entry: dict, command_handler: CommandHandler):
+        """
+        Initializes the proxy from the command's manifest entry.
+
+        Args:
+            command_name (str): The name the command is registered under.
+            entry (dict): The manifest entry, with the keys module and class, and optionally pure,
+                local_only and handler.
+            command_handler (CommandHandler): The handler the command is registered with.
+        """
+        self.command_name = command_name
+        self.module_name = entry["module"]
+        self.class_name = entry["class"]
+        self.command_handler = command_handler
+        self.pure = entry.get("pure", False)
+        self.local_only = entry.get("local_only", False)
+        self.with_handler = entry.get("handler")
+        self._command = None
+
+    def resolve(self) -> Command:
+        """
+        Imports and instantiates the real command, replacing the proxy in the handler.
+
+        Returns:
+            Command: The real command instance.
+        """
+        if self._command is None:
+            with _resolve_lock:
+                if self._command is None:
+                    module = importlib.import_module(self.module_name)
+                    command = create_command(getattr(module, self.class_name), self.command_handler,
+                                             self.with_handler)
+                    logger.info("Loaded plugin module on first use: %s", self.module_name)
+                    if self.command_handler.commands.get(self.command_name) is self:
+                        self.command_handler.register_command(self.command_name, command)
+                    self._command = command
+        return self._command
+
+    def execute(self, *args):
+        """
+        Resolves the real command and executes it.
+
+        Args:
+            *args: The arguments passed to the command.
+        """
+        return self.resolve().execute(*args)
+
+    def supervisable(self, args) -> bool:
+        """
+        Tells whether a call may run under the watchdog, importing the module only for impure commands.
+
+        Args:
+            args (tuple): The raw arguments of the call.
+
+        Returns:
+            bool: True if the call may run in a worker process.
+        """
+        return self.pure or self.resolve().supervisable(args)
+
+    def __getattr__(self, name):
+        # Only called for attributes the proxy itself lacks, such as plugin-specific ones.
+        if name.startswith("__") or name == "_command":
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+def plugin_commands(module, command_handler: CommandHandler) -> dict:
+    """
+    Instantiates each Command subclass defined or imported in a plugin module.
+
+    Args:
+        module: The imported plugin module.
+        command_handler (CommandHandler): The handler passed to constructors that take it.
+
+    Returns:
+        dict: (command, manifest entry) pairs by command name. The entry records the
+        command's module, class, purity and whether its constructor takes the handler.
+    """
+    commands = {}
+    for attr_name in dir(module):
+        attr = getattr(module, attr_name)
+        if isinstance(attr, type) and issubclass(attr, Command) and attr is not Command and attr is not LazyCommand:
+            try:
+                with_handler = takes_handler(attr)
+                command_instance = create_command(attr, command_handler, with_handler)
+                command_name = getattr(command_instance, 'command_name', module.__name__.split(".")[-1])
+                commands[command_name] = (command_instance, {"module": attr.__module__, "class": attr.__name__,
+                                                             "pure": bool(attr.pure), "local_only": bool(attr.local_only),
+                                                             "handler": with_handler})
+            except TypeError as e:
+                logger.warning("Skipping %s due to error: %s", attr_name, e)
+    return commands
+
+def scan_plugins(command_handler: CommandHandler, package=calculator.plugins) -> dict:
+    """
+    Imports every plugin module and registers an instance of each Command subclass.
+
+    Args:
+        command_handler (CommandHandler): The handler to register the commands with.
+        package: The plugin package to scan.
+
+    Returns:
+        dict: Manifest entries mapping each command name to its module, class, purity and
+        whether its constructor takes the handler.
+    """
+    import pkgutil  # pylint: disable=import-outside-toplevel
+    entries = {}
+    for _, module_name, _ in pkgutil.iter_modules(package.__path__, package.__name__ + "."):
+        try:
+            module = importlib.import_module(module_name)
+            logger.debug("Loaded plugin module: %s", module_name)
+        except ImportError as e:
+            logger.error("Error loading plugin %s: %s", module_name, e)
+            continue
+
+        for command_name, (command_instance, entry) in plugin_commands(module, command_handler).items():
+            command_handler.register_command(command_name, command_instance)
+            entries[command_name] = entry
+            logger.debug("Registered command: %s", command_name)
+    return entries
+
+def read_manifest(path: str):
+    """
+    Reads a plugin manifest from disk.
+
+    Args:
+        path (str): The manifest file path.
+
+    Returns:
+        dict: The manifest, or None if it is missing, unreadable or of another version.
+    """
+    try:
+        with open(path, encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+def write_manifest(path: str, fingerprint: str, entries: dict):
+    """
+    Writes a plugin manifest to disk atomically. Failures are logged, not raised.
+
+    Args:
+        path (str): The manifest file path.
+        fingerprint (str): The plugin fingerprint the entries were built from.
+        entries (dict): Manifest entries mapping command names to modules and classes.
+    """
+    manifest = {"version": MANIFEST_VERSION, "fingerprint": fingerprint, "commands": entries}
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+        os.replace(temporary_path, path)
+    except OSError as e:
+        logger.warning("Could not write plugin manifest %s: %s", path, e)
+
+def load_plugins(command_handler: CommandHandler, manifest_path: str = DEFAULT_MANIFEST_PATH,
+                 package=calculator.plugins) -> bool:
+    """
+    Registers all plugin commands, lazily when the cached manifest is up to date.
+
+    Args:
+        command_handler (CommandHandler): The handler to register the commands with.
+        manifest_path (str): The manifest file path.
+        package: The plugin package to load.
+
+    Returns:
+        bool: True if commands were registered from the cached manifest, False if the plugins were scanned.
+    """
+    fingerprint = plugin_fingerprint(package)
+    manifest = read_manifest(manifest_path)
+    if manifest is not None and manifest.get("fingerprint") == fingerprint:
+        for command_name, entry in manifest["commands"].items():
+            command_handler.register_command(command_name, LazyCommand(command_name, entry, command_handler))
+        logger.debug("Registered %d commands from plugin manifest %s", len(manifest["commands"]), manifest_path)
+        return True
+
+    logger.info("Plugin manifest %s is missing or stale, scanning plugins.", manifest_path)
+    entries = scan_plugins(command_handler, package)
+    write_manifest(manifest_path, fingerprint, entries)
+    return False
+
+__all__ = ["LazyCommand", "load_plugins", "scan_plugins", "plugin_commands", "plugin_fingerprint", "create_command", "takes_handler"]
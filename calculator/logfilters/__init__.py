@@ -0,0 +1,332 @@
+"""
+Module for thinning out log volume before records are formatted.
+
+Three filters cover the usual sources of log floods:
+
+    SamplingFilter    keeps a fraction of the INFO (and DEBUG) records of each logger
+    RateLimitFilter   a token bucket per logger and message template
+    DuplicateFilter   collapses consecutive identical records into one
+                      "Last message repeated N times" record
+
+Handlers run their filters before formatting a record, so a record a filter
+rejects costs a dictionary lookup and a comparison; its message is never
+built. The filters key on the message template (record.msg), not on the
+formatted message, for the same reason.
+
+Each filter instance is attached to one handler, because the filters keep
+state and a record reaching two handlers would otherwise be counted twice.
+Records counted as suppressed are reported through that handler as summary
+records, which every filter lets through.
+
+Filters are configured in logging.conf, in sections that fileConfig() ignores
+and install_filters() reads after it:
+
+    [filters]
+    keys=sampling
+
+    [filter_sampling]
+    class=calculator.logfilters.SamplingFilter
+    kwargs={'rate': 0.1, 'rates': {'calculator.plugins.menu': 0.0}}
+    handlers=fileHandler,consoleHandler
+"""
+
+import ast
+import time
+import logging
+import importlib
+import threading
+import configparser
+
+logger = logging.getLogger(__name__)
+
+def _level(level) -> int:
+    """Converts a level name such as "INFO" to its number; numbers are returned unchanged."""
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown log level {level!r}")
+    return value
+
+class SummaryRecord(logging.LogRecord):
+    """A record reporting suppressed records; filters always let it through."""
+
+class HandlerFilter(logging.Filter):
+    """
+    Base class of the filters, which report what they suppress through their handler.
+
+    Attributes:
+        handler (logging.Handler): The handler the filter is attached to, or None.
+    """
+
+    handler = None
+
+    def attach(self, handler: logging.Handler):
+        """
+        Adds the filter to a handler, which also receives its summary records.
+
+        Args:
+            handler (logging.Handler): The handler to filter.
+        """
+        self.handler = handler
+        handler.addFilter(self)
+
+    def summarize(self, record: logging.LogRecord, message: str, *args):
+        """
+        Emits a summary record through the handler, with the logger and level of a suppressed record.
+
+        Args:
+            record (logging.LogRecord): A record the summary is about.
+            message (str): The message template of the summary.
+            *args: The arguments of the message template.
+        """
+        if self.handler is None:
+            return
+        summary = SummaryRecord(record.name, record.levelno, record.pathname, record.lineno, message, args, None)
+        self.handler.handle(summary)
+
+class SamplingFilter(HandlerFilter):
+    """
+    Keeps a fixed fraction of the low-level records of each logger.
+
+    Sampling is deterministic: at a rate of 0.1 the first record of a logger is kept,
+    then every tenth. Records above the level always pass.
+
+    Attributes:
+        rate (float): The fraction of records kept for loggers without an entry in rates.
+        rates (dict): Rates by logger name; an entry also applies to the logger's children.
+        level (int): The highest level that is sampled.
+        sampled_out (int): The number of records rejected so far.
+    """
+
+    def __init__(self, rate: float = 1.0, rates: dict = None, level="INFO"):
+        """
+        Initializes the SamplingFilter.
+
+        Args:
+            rate (float): The fraction of records kept, between 0 and 1.
+            rates (dict): Rates by logger name, overriding rate for those loggers and their children.
+            level (int | str): The highest level that is sampled.
+
+        Raises:
+            ValueError: If a rate is not between 0 and 1 or the level is unknown.
+        """
+        super().__init__()
+        rates = dict(rates or {})
+        for value in [rate, *rates.values()]:
+            if not 0 <= value <= 1:
+                raise ValueError(f"Sampling rate {value!r} is not between 0 and 1")
+        self.rate = rate
+        self.rates = rates
+        self.level = _level(level)
+        self.sampled_out = 0
+        self._logger_rates = {}
+        self._credit = {}
+
+    def rate_for(self, name: str) -> float:
+        """
+        Looks up the rate of a logger: its own entry in rates, else its nearest ancestor's, else rate.
+
+        Args:
+            name (str): The logger name.
+
+        Returns:
+            float: The fraction of the logger's records that is kept.
+        """
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return self.rate
+
+    def filter(self, record):
+        if record.levelno > self.level or type(record) is SummaryRecord:  # pylint: disable=unidiomatic-typecheck
+            return True
+        name = record.name
+        try:
+            rate = self._logger_rates[name]
+        except KeyError:
+            rate = self._logger_rates[name] = self.rate_for(name)
+        if rate >= 1:
+            return True
+        # Starting at 1 - rate keeps the first record of every logger that is sampled at all.
+        credit = self._credit.get(name, 1 - rate) + rate
+        if credit >= 1 and rate:
+            self._credit[name] = credit - 1
+            return True
+        self._credit[name] = credit
+        self.sampled_out += 1
+        return False
+
+class RateLimitFilter(HandlerFilter):
+    """
+    Limits each message template of each logger to a rate, allowing bursts.
+
+    When a template is let through again after records were suppressed, a summary
+    record with the number suppressed is emitted before it.
+
+    Attributes:
+        rate (float): The sustained number of records per second per template.
+        burst (int): The number of records per template that may pass at once.
+        level (int): The highest level that is limited.
+        suppressed (int): The number of records rejected so far.
+    """
+
+    # Templates tracked before the buckets are reset, so formatted-in messages cannot grow them without bound.
+    MAX_TEMPLATES = 10000
+
+    def __init__(self, rate: float = 10.0, burst: int = None, level="CRITICAL"):
+        """
+        Initializes the RateLimitFilter.
+
+        Args:
+            rate (float): The sustained number of records per second per template.
+            burst (int): The bucket size; defaults to one second's worth of records, at least 1.
+            level (int | str): The highest level that is limited.
+
+        Raises:
+            ValueError: If the rate is not positive or the level is unknown.
+        """
+        super().__init__()
+        if rate <= 0:
+            raise ValueError(f"Rate limit {rate!r} is not positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.level = _level(level)
+        self.suppressed = 0
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > self.level or type(record) is SummaryRecord:  # pylint: disable=unidiomatic-typecheck
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.MAX_TEMPLATES:
+                    self._buckets.clear()
+                # [tokens, time of the last refill, records suppressed since the last one passed]
+                bucket = self._buckets[key] = [self.burst, now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] = tokens - 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            self.summarize(record, "Rate limit suppressed %d records like %r", suppressed, str(record.msg))
+        return True
+
+class DuplicateFilter(HandlerFilter):
+    """
+    Collapses runs of identical records (same logger, level, template and arguments).
+
+    The first record of a run passes; the repeats are counted, and a summary record
+    "Last message repeated N times" is emitted when a different record arrives, or
+    when the same record arrives after the window has passed.
+
+    Attributes:
+        window (float): The longest time in seconds repeats are collapsed into one summary.
+        repeated (int): The number of records rejected so far.
+    """
+
+    def __init__(self, window: float = 60.0):
+        """
+        Initializes the DuplicateFilter.
+
+        Args:
+            window (float): The longest time in seconds repeats are collapsed into one summary.
+        """
+        super().__init__()
+        self.window = window
+        self.repeated = 0
+        self._last = None
+        self._last_record = None
+        self._since = 0.0
+        self._repeats = 0
+        self._lock = threading.Lock()
+
+    def _same(self, key: tuple) -> bool:
+        try:
+            return bool(key == self._last)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Arguments without a plain equality (e.g. arrays) are never collapsed.
+            return False
+
+    def filter(self, record):
+        if type(record) is SummaryRecord:  # pylint: disable=unidiomatic-typecheck
+            return True
+        key = (record.name, record.levelno, record.msg, record.args)
+        now = time.monotonic()
+        with self._lock:
+            if self._same(key) and now - self._since < self.window:
+                self._repeats += 1
+                self.repeated += 1
+                return False
+            repeats, last_record = self._repeats, self._last_record
+            self._last, self._last_record, self._since, self._repeats = key, record, now, 0
+        if repeats:
+            self.summarize(last_record, "Last message repeated %d times", repeats)
+        return True
+
+def _named_handlers() -> dict:
+    """Returns the handlers of the root logger and of every configured logger by name."""
+    loggers = [logging.getLogger()]
+    loggers += [item for item in logging.Logger.manager.loggerDict.values() if isinstance(item, logging.Logger)]
+    return {handler.name: handler for item in loggers for handler in item.handlers if handler.name}
+
+def _resolve(name: str):
+    """Imports a class given by its dotted path; bare names are looked up in this module."""
+    module_name, _, class_name = name.rpartition(".")
+    if not module_name:
+        return globals()[class_name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+def install_filters(config_path: str = "logging.conf") -> list:
+    """
+    Attaches the filters configured in a logging configuration file to their handlers.
+
+    Call this after logging.config.fileConfig(), which names the handlers. Each
+    [filter_<key>] section gives the class, optional args and kwargs (Python
+    literals), and the handlers the filter is attached to; every handler gets
+    its own instance.
+
+    Args:
+        config_path (str): The logging configuration file.
+
+    Returns:
+        list: The filters installed.
+
+    Raises:
+        ValueError: If a section names a handler that is not configured.
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(config_path)
+    if not parser.has_section("filters"):
+        return []
+    handlers = _named_handlers()
+    installed = []
+    for key in [key.strip() for key in parser["filters"].get("keys", "").split(",") if key.strip()]:
+        section = parser[f"filter_{key}"]
+        filter_class = _resolve(section["class"])
+        args = ast.literal_eval(section.get("args", "()"))
+        kwargs = ast.literal_eval(section.get("kwargs", "{}"))
+        for handler_name in [name.strip() for name in section.get("handlers", "").split(",") if name.strip()]:
+            if handler_name not in handlers:
+                raise ValueError(f"Filter {key!r} names unknown handler {handler_name!r}")
+            log_filter = filter_class(*args, **kwargs)
+            if isinstance(log_filter, HandlerFilter):
+                log_filter.attach(handlers[handler_name])
+            else:
+                handlers[handler_name].addFilter(log_filter)
+            installed.append(log_filter)
+    logger.debug("Installed %d log filters from %s.", len(installed), config_path)
+    return installed
+
+__all__ = ["SamplingFilter", "RateLimitFilter", "DuplicateFilter", "HandlerFilter", "SummaryRecord",
+           "install_filters"]
@@ -0,0 +1,392 @@
+"""
+Module for querying the application log and its rotated files through an index.
+
+The LogIndex class keeps a small SQLite index next to the log (by default
+logs/app.log.index.sqlite) holding, for every record, the file it is in, its
+byte offset, and the fields used for filtering: timestamp, level, command and
+outcome. Updating the index only reads the bytes appended since the last
+update, and follows files through rotation by their inode, so app.log
+becoming app.log.1 does not trigger a rescan. Queries filter on the index
+and then seek directly to the matching lines.
+
+Segments compressed by calculator.logrotate are indexed too, with offsets
+into their decompressed bytes. A segment indexed before it was compressed
+keeps its records, since compression does not move them; only what was
+appended after the last update is read, by decompressing the archive once.
+Archives never change afterwards, so later updates do not open them.
+
+Both the JSON-lines format (calculator.jsonlog) and the older free-text
+"asctime - name - level - message" format are understood.
+
+Run `python -m calculator.logquery --help` for the command-line interface.
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import logging
+import sqlite3
+import argparse
+from datetime import datetime
+from calculator.logrotate import COMPRESSION_SUFFIXES, segment_pattern
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    inode INTEGER NOT NULL,
+    head BLOB NOT NULL,
+    indexed_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    file_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    levelno INTEGER NOT NULL,
+    command TEXT,
+    outcome TEXT
+);
+CREATE INDEX IF NOT EXISTS records_ts ON records (ts);
+CREATE INDEX IF NOT EXISTS records_command_ts ON records (command, ts);
+"""
+
+_HEAD_SIZE = 256
+_TEXT_LINE = re.compile(rb"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d),(\d{3}) - (\S+) - ([A-Z]+) - (.*)$")
+
+def parse_line(line: bytes):
+    """
+    Parses one log line in either the JSON-lines or the free-text format.
+
+    Args:
+        line (bytes): The line, without its trailing newline.
+
+    Returns:
+        dict: The record fields, or None for lines that are not records (e.g. traceback lines).
+    """
+    if line.startswith(b"{"):
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+    match = _TEXT_LINE.match(line)
+    if match is None:
+        return None
+    stamp, millis, name, level, message = (group.decode("utf-8", "replace") for group in match.groups())
+    return {"ts": time.mktime(time.strptime(stamp, "%Y-%m-%d %H:%M:%S")) + int(millis) / 1000,
+            "time": f"{stamp}.{millis}", "level": level, "logger": name, "message": message}
+
+def _archive_suffix(path: str) -> str:
+    """Returns the compression suffix of a log file, or "" if it is not compressed."""
+    return next((suffix for suffix in COMPRESSION_SUFFIXES.values() if suffix and path.endswith(suffix)), "")
+
+def _open_log(path: str):
+    """Opens a log file for reading bytes, decompressing compressed segments; the modules are imported on first use."""
+    # pylint: disable=import-outside-toplevel,consider-using-with
+    suffix = _archive_suffix(path)
+    if suffix == ".gz":
+        import gzip
+        return gzip.open(path, "rb")
+    if suffix == ".bz2":
+        import bz2
+        return bz2.open(path, "rb")
+    if suffix == ".xz":
+        import lzma
+        return lzma.open(path, "rb")
+    if suffix == ".zst":
+        import zstandard  # pylint: disable=import-error
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return open(path, "rb")
+
+def _level_number(level) -> int:
+    if isinstance(level, int):
+        return level
+    number = logging.getLevelName(str(level).upper())
+    return number if isinstance(number, int) else 0
+
+class LogIndex:
+    """
+    Incrementally updated index over a log file and its rotated backups.
+
+    Attributes:
+        log_path (str): The path of the active log file; backups are log_path.1, log_path.2, ...
+        index_path (str): The path of the SQLite index.
+    """
+
+    def __init__(self, log_path: str = os.path.join("logs", "app.log"), index_path: str = None):
+        """
+        Opens (creating if needed) the index for a log file.
+
+        Args:
+            log_path (str): The path of the active log file.
+            index_path (str): The path of the SQLite index. Defaults to log_path + '.index.sqlite'.
+        """
+        self.log_path = log_path
+        self.index_path = index_path if index_path is not None else log_path + ".index.sqlite"
+        self._db = sqlite3.connect(self.index_path)
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        """Closes the index database."""
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def log_files(self) -> list:
+        """
+        Lists the active log file and its rotated backups, newest first.
+
+        Backups are the numbered files of RotatingFileHandler and the segments of
+        CompressingRotatingFileHandler, compressed or not. A compressed segment is left
+        out while the file it is being compressed from still exists.
+
+        Returns:
+            list: The paths of the existing log files.
+        """
+        directory = os.path.dirname(self.log_path) or "."
+        base = os.path.basename(self.log_path)
+        segment = segment_pattern(base)
+        backups, segments = [], []
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            suffix = name[len(base) + 1:]
+            if name.startswith(base + ".") and suffix.isdigit():
+                backups.append((int(suffix), os.path.join(directory, name)))
+            else:
+                match = segment.match(name)
+                if match and not (match.group(2) and name[:-len(match.group(2))] in names):
+                    segments.append((match.group(1), os.path.join(directory, name)))
+        files = [self.log_path] if base in names else []
+        return files + [path for _, path in sorted(segments, reverse=True)] + [path for _, path in sorted(backups)]
+
+    def update(self) -> int:
+        """
+        Brings the index up to date with the log files on disk.
+
+        Appended bytes are indexed, rotated files are followed by inode, truncated
+        or replaced files are re-indexed, and files that no longer exist are dropped.
+
+        Returns:
+            int: The number of newly indexed records.
+        """
+        known = {row[0]: row for row in self._db.execute("SELECT id, path, inode, head, indexed_size FROM files")}
+        seen = set()
+        indexed = 0
+        with self._db:
+            for path in self.log_files():
+                if _archive_suffix(path):
+                    indexed += self._update_archive(known, seen, path)
+                    continue
+                try:
+                    stat = os.stat(path)
+                    with open(path, "rb") as log_file:
+                        head = log_file.read(_HEAD_SIZE)
+                except FileNotFoundError:
+                    continue
+                file_id = self._match_file(known, seen, stat.st_ino, head, stat.st_size)
+                if file_id is None:
+                    file_id = self._db.execute(
+                        "INSERT INTO files (path, inode, head, indexed_size) VALUES (?, ?, ?, 0)",
+                        (path, stat.st_ino, head)).lastrowid
+                    start = 0
+                else:
+                    start = known[file_id][4]
+                seen.add(file_id)
+                end, count = self._index_file(file_id, path, start)
+                self._db.execute("UPDATE files SET path = ?, head = ?, indexed_size = ? WHERE id = ?",
+                                 (path, head, end, file_id))
+                indexed += count
+            for file_id in set(known) - seen:
+                self._db.execute("DELETE FROM records WHERE file_id = ?", (file_id,))
+                self._db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        return indexed
+
+    def _update_archive(self, known, seen, path):
+        try:
+            inode = os.stat(path).st_ino
+        except FileNotFoundError:
+            return 0
+        for file_id, (_, known_path, known_inode, _, _) in known.items():
+            if file_id not in seen and known_path == path and known_inode == inode:
+                seen.add(file_id)
+                return 0  # Archives do not change once written.
+        # The segment this archive was compressed from keeps its records: their offsets are unchanged.
+        original = path[:-len(_archive_suffix(path))]
+        file_id, start = next(((file_id, row[4]) for file_id, row in known.items()
+                               if file_id not in seen and row[1] == original), (None, 0))
+        if file_id is not None:
+            seen.add(file_id)
+        try:
+            with _open_log(path) as archive:
+                head = archive.read(_HEAD_SIZE)
+            if file_id is None:
+                file_id = self._db.execute(
+                    "INSERT INTO files (path, inode, head, indexed_size) VALUES (?, ?, ?, 0)",
+                    (path, inode, head)).lastrowid
+            end, count = self._index_file(file_id, path, start)
+        except (OSError, EOFError) as e:
+            # A damaged archive: keep what was indexed before it was compressed and retry next time.
+            logger.warning("Could not index %s: %s", path, e)
+            if file_id not in known:
+                self._db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+            return 0
+        self._db.execute("UPDATE files SET path = ?, inode = ?, head = ?, indexed_size = ? WHERE id = ?",
+                         (path, inode, head, end, file_id))
+        return count
+
+    def _match_file(self, known, seen, inode, head, size):
+        for file_id, (_, _, known_inode, known_head, indexed_size) in known.items():
+            if file_id in seen or known_inode != inode:
+                continue
+            if size >= indexed_size and head.startswith(known_head[:min(len(head), indexed_size)]):
+                return file_id
+            # Same inode but truncated or rewritten: forget what was indexed for it.
+            self._db.execute("DELETE FROM records WHERE file_id = ?", (file_id,))
+            self._db.execute("UPDATE files SET indexed_size = 0 WHERE id = ?", (file_id,))
+            known[file_id] = known[file_id][:4] + (0,)
+            return file_id
+        return None
+
+    def _index_file(self, file_id, path, start):
+        rows = []
+        offset = start
+        with _open_log(path) as log_file:
+            log_file.seek(start)
+            for line in log_file:
+                if not line.endswith(b"\n"):
+                    break  # Partially written line; index it on the next update.
+                record = parse_line(line.rstrip(b"\r\n"))
+                if record is not None and "ts" in record:
+                    rows.append((file_id, offset, record["ts"], _level_number(record.get("level")),
+                                 record.get("command"), record.get("outcome")))
+                offset += len(line)
+        self._db.executemany(
+            "INSERT INTO records (file_id, offset, ts, levelno, command, outcome) VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return offset, len(rows)
+
+    @staticmethod
+    def _where(since=None, until=None, command=None, level=None, outcome=None):
+        clauses, parameters = [], []
+        for clause, value in (("records.ts >= ?", since), ("records.ts < ?", until),
+                              ("records.command = ?", command), ("records.outcome = ?", outcome)):
+            if value is not None:
+                clauses.append(clause)
+                parameters.append(value)
+        if level is not None:
+            clauses.append("records.levelno >= ?")
+            parameters.append(_level_number(level))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", parameters
+
+    def count(self, since=None, until=None, command=None, level=None, outcome=None) -> int:
+        """
+        Counts the indexed records matching the filters.
+
+        Args:
+            since (float): Only records at or after this epoch time.
+            until (float): Only records before this epoch time.
+            command (str): Only records emitted while this command ran.
+            level: Only records at or above this level (name or number).
+            outcome (str): Only records with this command outcome.
+
+        Returns:
+            int: The number of matching records.
+        """
+        where, parameters = self._where(since, until, command, level, outcome)
+        return self._db.execute("SELECT COUNT(*) FROM records" + where, parameters).fetchone()[0]
+
+    def query(self, limit=None, **filters) -> list:
+        """
+        Returns the indexed records matching the filters, oldest first.
+
+        Args:
+            limit (int): Return at most this many records (the newest ones).
+            **filters: The filters taken by count(): since, until, command, level and outcome.
+
+        Returns:
+            list: The matching records as dictionaries.
+        """
+        where, parameters = self._where(**filters)
+        sql = ("SELECT files.path, records.offset FROM records JOIN files ON files.id = records.file_id"
+               + where + " ORDER BY records.ts DESC")
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        locations = self._db.execute(sql, parameters).fetchall()
+        records = []
+        handles = {}
+        try:
+            for path, offset in reversed(locations):
+                if path not in handles:
+                    handles[path] = _open_log(path)
+                handles[path].seek(offset)
+                record = parse_line(handles[path].readline().rstrip(b"\r\n"))
+                if record is not None:
+                    records.append(record)
+        finally:
+            for handle in handles.values():
+                handle.close()
+        return records
+
+def parse_time(text: str) -> float:
+    """
+    Parses a point in time given as a relative age (30s, 15m, 2h, 7d) or an ISO 8601 timestamp.
+
+    Args:
+        text (str): The time specification.
+
+    Returns:
+        float: The epoch time.
+
+    Raises:
+        ValueError: If the text is not a valid time specification.
+    """
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if text[-1:] in units and text[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(text[:-1]) * units[text[-1]]
+    return datetime.fromisoformat(text).timestamp()
+
+def main(argv=None) -> int:
+    """
+    Runs the log query command-line interface.
+
+    Args:
+        argv (list): The command-line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The process exit status.
+    """
+    parser = argparse.ArgumentParser(prog="python -m calculator.logquery",
+                                     description="Query the calculator log and its rotated files.")
+    parser.add_argument("--log", default=os.path.join("logs", "app.log"), help="active log file (default: %(default)s)")
+    parser.add_argument("--since", type=parse_time, help="start time: an age like 1h or an ISO timestamp")
+    parser.add_argument("--until", type=parse_time, help="end time: an age like 10m or an ISO timestamp")
+    parser.add_argument("--command", help="only records from this command")
+    parser.add_argument("--level", help="only records at or above this level")
+    parser.add_argument("--outcome", help="only records with this outcome, e.g. division_by_zero")
+    parser.add_argument("--limit", type=int, help="show at most this many (most recent) records")
+    parser.add_argument("--count", action="store_true", help="print the number of matching records only")
+    arguments = parser.parse_args(argv)
+
+    filters = {"since": arguments.since, "until": arguments.until, "command": arguments.command,
+               "level": arguments.level, "outcome": arguments.outcome}
+    with LogIndex(arguments.log) as index:
+        index.update()
+        if arguments.count:
+            print(index.count(**filters))
+        else:
+            for record in index.query(limit=arguments.limit, **filters):
+                sys.stdout.write(json.dumps(record, default=str) + "\n")
+    return 0
+
+__all__ = ["LogIndex", "parse_line", "parse_time", "main"]
@@ -0,0 +1,8 @@
+"""
+Entry point for `python -m calculator.logquery`.
+"""
+
+import sys
+from calculator.logquery import main
+
+sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Module for rotating the log file without stalling the thread that logs.
+
+RotatingFileHandler renames every backup on each rotation (app.log.4 to
+app.log.5, and so on) inside the emit() of whichever record crossed the
+size limit, and keeps a fixed number of files. CompressingRotatingFileHandler
+instead rotates with a single rename of the active file to a segment named
+after the UTC time of the rotation,
+
+    logs/app.log.20261017-194130-123456
+
+and reopens it, which is all the logging thread pays for. A background
+thread then compresses the segment (gzip, bz2, xz, or zstd when the
+zstandard package is installed) and deletes the oldest segments until the
+archived ones fit a retention budget in bytes.
+
+Rotation happens when the active file would exceed max_bytes, or when the
+current time interval ends (intervals are aligned to the epoch, so 86400
+rotates at midnight UTC), whichever comes first; 0 disables either policy.
+Segments left uncompressed by an earlier process are compressed on start.
+A process forked after the handler was opened (the daemon's children)
+must call detach(): the child keeps appending to the active file and
+leaves rotation to the parent, whose compression thread it did not inherit.
+
+Configured in logging.conf:
+
+    [handler_fileHandler]
+    class=calculator.logrotate.CompressingRotatingFileHandler
+    args=('logs/app.log',)
+    kwargs={'max_bytes': 10485760, 'interval': 86400, 'retention_bytes': 268435456, 'compression': 'gzip'}
+"""
+
+import os
+import re
+import sys
+import time
+import queue
+import shutil
+import logging
+import threading
+import importlib.util
+
+# File name suffixes of the compressed segments by compression name.
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst", "none": ""}
+
+def segment_pattern(base_name: str):
+    """
+    Builds the pattern matching the segments of a log file.
+
+    Args:
+        base_name (str): The file name of the active log file, e.g. "app.log".
+
+    Returns:
+        re.Pattern: Matches segment file names; group 1 is the timestamp and group 2 the compression suffix.
+    """
+    suffixes = "|".join(re.escape(suffix) for suffix in COMPRESSION_SUFFIXES.values() if suffix)
+    return re.compile(re.escape(base_name) + r"\.(\d{8}-\d{6}-\d{6})(" + suffixes + r")?$")
+
+def _open_compressed(compression: str, path: str):
+    """Opens a compressed file for writing; the modules are imported on first use."""
+    # pylint: disable=import-outside-toplevel
+    if compression == "gzip":
+        import gzip
+        return gzip.open(path, "wb", compresslevel=6)
+    if compression == "bz2":
+        import bz2
+        return bz2.open(path, "wb")
+    if compression == "xz":
+        import lzma
+        return lzma.open(path, "wb")
+    import zstandard  # pylint: disable=import-error
+    return zstandard.ZstdCompressor().stream_writer(open(path, "wb"))  # pylint: disable=consider-using-with
+
+class CompressingRotatingFileHandler(logging.FileHandler):
+    """
+    File handler rotating by size or time, compressing and pruning segments in the background.
+
+    The size of the active file is read before each record, so records appended by detached
+    children count toward max_bytes; records are measured in characters, which equals bytes for
+    the ASCII JSON log lines.
+
+    Attributes:
+        max_bytes (int): Rotate before the active file grows beyond this size; 0 for no limit.
+        interval (float): Rotate when an interval of this many seconds ends; 0 for no time limit.
+        retention_bytes (int): The total size the segments are pruned to, oldest first; 0 keeps all.
+        compression (str): One of COMPRESSION_SUFFIXES.
+    """
+
+    def __init__(self, filename: str, mode: str = "a", *, max_bytes: int = 0, interval: float = 0,  # pylint: disable=too-many-arguments
+                 retention_bytes: int = 0, compression: str = "gzip", encoding: str = None, delay: bool = False):
+        """
+        Initializes the handler and opens the log file unless delay is set.
+
+        Args:
+            filename (str): The active log file.
+            mode (str): The mode the log file is opened with.
+            max_bytes (int): Rotate before the active file grows beyond this size; 0 for no limit.
+            interval (float): Rotate when an interval of this many seconds ends; 0 for no time limit.
+            retention_bytes (int): The total size the segments are pruned to, oldest first; 0 keeps all.
+            compression (str): gzip, bz2, xz, zstd or none. zstd falls back to gzip if the
+                zstandard package is not installed.
+            encoding (str): The encoding of the log file.
+            delay (bool): Open the file when the first record is emitted.
+
+        Raises:
+            ValueError: If the compression is unknown.
+        """
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression {compression!r}, expected one of {', '.join(COMPRESSION_SUFFIXES)}")
+        if compression == "zstd" and importlib.util.find_spec("zstandard") is None:
+            sys.stderr.write("zstandard is not installed, compressing log segments with gzip.\n")
+            compression = "gzip"
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.retention_bytes = retention_bytes
+        self.compression = compression
+        self._size = 0
+        super().__init__(filename, mode, encoding, delay)
+        self._pattern = segment_pattern(os.path.basename(self.baseFilename))
+        self._rollover_at = self._next_rollover(time.time())
+        self._queue = queue.Queue()
+        self._worker = None
+        leftovers = [path for path, suffix in self.segments() if not suffix and compression != "none"]
+        for path in leftovers:
+            self._submit(path)
+
+    def _open(self):
+        stream = super()._open()
+        self._size = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def _next_rollover(self, now: float) -> float:
+        if not self.interval:
+            return float("inf")
+        return (now // self.interval + 1) * self.interval
+
+    def segments(self) -> list:
+        """
+        Lists the rotated segments of the log file, oldest first.
+
+        Returns:
+            list: (path, compression suffix) pairs; the suffix is "" for uncompressed segments.
+        """
+        directory = os.path.dirname(self.baseFilename)
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        found = []
+        for name in names:
+            match = self._pattern.match(name)
+            if match:
+                found.append((match.group(1), os.path.join(directory, name), match.group(2) or ""))
+        return [(path, suffix) for _, path, suffix in sorted(found)]
+
+    def emit(self, record):
+        """
+        Writes a record, rotating first if the size limit or the interval is reached.
+
+        Args:
+            record (logging.LogRecord): The record to write.
+        """
+        try:
+            message = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            elif self.max_bytes:
+                self._size = os.fstat(self.stream.fileno()).st_size
+            if ((self.max_bytes and self._size + len(message) > self.max_bytes and self._size)
+                    or time.time() >= self._rollover_at):
+                self.doRollover()
+            self.stream.write(message)
+            self._size += len(message)
+            self.flush()
+        except RecursionError:
+            raise
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handleError(record)
+
+    def doRollover(self):  # pylint: disable=invalid-name
+        """
+        Renames the active file to a new segment, reopens it and queues the segment for compression.
+        """
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        now = time.time()
+        self._rollover_at = self._next_rollover(now)
+        if self._size and os.path.exists(self.baseFilename):
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(now))
+            microseconds = int(now % 1 * 1e6)
+            while self._segment_exists(f"{self.baseFilename}.{stamp}-{microseconds:06d}"):
+                microseconds += 1
+            segment = f"{self.baseFilename}.{stamp}-{microseconds:06d}"
+            os.rename(self.baseFilename, segment)
+            self._submit(segment)
+        self.stream = self._open()
+
+    def detach(self):
+        """
+        Stops rotating in a forked child, which keeps appending to the active file.
+
+        fork() does not copy the compression thread, and a child renaming the active file would
+        race the parent's rotation, so the child turns both rotation policies off and drops the
+        queue it inherited; the parent alone rotates.
+        """
+        self.max_bytes = 0
+        self.interval = 0
+        self._rollover_at = float("inf")
+        self._queue = queue.Queue()
+        self._worker = None
+
+    @staticmethod
+    def _segment_exists(segment: str) -> bool:
+        return any(os.path.exists(segment + suffix) for suffix in COMPRESSION_SUFFIXES.values())
+
+    def _submit(self, segment: str):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._work, name="log-rotation", daemon=True)
+            self._worker.start()
+        self._queue.put(segment)
+
+    def _work(self):
+        while True:
+            segment = self._queue.get()
+            if segment is None:
+                return
+            try:
+                if self.compression != "none":
+                    self.compress(segment)
+                self.prune()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # Logging from here could rotate again; report on stderr like logging's handleError().
+                sys.stderr.write(f"Log rotation of {segment} failed: {type(e).__name__}: {e}\n")
+
+    def compress(self, segment: str) -> str:
+        """
+        Compresses a segment and deletes the uncompressed file.
+
+        Args:
+            segment (str): The path of an uncompressed segment.
+
+        Returns:
+            str: The path of the compressed segment.
+        """
+        target = segment + COMPRESSION_SUFFIXES[self.compression]
+        temporary = target + ".tmp"
+        with open(segment, "rb") as source, _open_compressed(self.compression, temporary) as destination:
+            shutil.copyfileobj(source, destination, 1024 * 1024)
+        os.replace(temporary, target)
+        os.remove(segment)
+        return target
+
+    def prune(self):
+        """
+        Deletes the oldest segments until their total size fits the retention budget.
+        """
+        if not self.retention_bytes:
+            return
+        sizes = []
+        for path, _ in self.segments():
+            try:
+                sizes.append((path, os.path.getsize(path)))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size in sizes)
+        for path, size in sizes:
+            if total <= self.retention_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def wait(self):
+        """
+        Blocks until every queued segment is compressed and pruned.
+        """
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def close(self):
+        """
+        Finishes the queued compression, then closes the file.
+        """
+        self.wait()
+        super().close()
+
+__all__ = ["CompressingRotatingFileHandler", "segment_pattern", "COMPRESSION_SUFFIXES"]
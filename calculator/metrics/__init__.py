@@ -0,0 +1,195 @@
+"""
+Module for per-command metrics.
+
+CommandMetrics records, for every command name, the number of calls, the
+number of errors by kind (for example invalid_input for InvalidOperation,
+division_by_zero for DivisionByZero, unknown_command) and a latency
+histogram with fixed bucket bounds. Each command's buckets are allocated
+once, the first time the command is seen, so recording a call only bisects
+the bounds and increments counters.
+
+The metrics can be shown with the `stats` command, or written periodically
+in the Prometheus text exposition format by PrometheusFileExporter, for
+example into the directory scraped by node_exporter's textfile collector.
+"""
+
+import os
+import atexit
+import logging
+import threading
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency buckets, in seconds. An implicit +Inf bucket follows.
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNKNOWN_COMMAND = "<unknown>"
+
+class CommandStats:
+    """
+    Counters and latency histogram of one command.
+
+    Attributes:
+        calls (int): The number of calls.
+        errors (dict): The number of failed calls by error kind.
+        buckets (list): Non-cumulative call counts per latency bucket, the last one being +Inf.
+        total_seconds (float): The summed latency of all calls.
+    """
+
+    __slots__ = ("calls", "errors", "buckets", "total_seconds")
+
+    def __init__(self, bucket_count: int):
+        self.calls = 0
+        self.errors = {}
+        self.buckets = [0] * (bucket_count + 1)
+        self.total_seconds = 0.0
+
+    def quantile(self, fraction: float, bounds=LATENCY_BUCKETS) -> float:
+        """
+        Estimates a latency quantile as the upper bound of the bucket containing it.
+
+        Args:
+            fraction (float): The quantile, between 0 and 1.
+            bounds (tuple): The bucket bounds the histogram was recorded with.
+
+        Returns:
+            float: The estimated latency in seconds (inf if it falls in the last bucket), or 0.0 with no calls.
+        """
+        if not self.calls:
+            return 0.0
+        target = fraction * self.calls
+        cumulative = 0
+        for index, count in enumerate(self.buckets):
+            cumulative += count
+            if cumulative >= target:
+                return bounds[index] if index < len(bounds) else float("inf")
+        return float("inf")
+
+class CommandMetrics:
+    """
+    Per-command call counters, error counters and latency histograms.
+
+    Attributes:
+        bounds (tuple): The latency bucket upper bounds in seconds.
+        commands (dict): CommandStats by command name. Unknown commands are grouped under UNKNOWN_COMMAND.
+    """
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        """
+        Initializes empty metrics.
+
+        Args:
+            bounds (tuple): The latency bucket upper bounds in seconds, ascending.
+        """
+        self.bounds = tuple(bounds)
+        self.commands = {}
+        self._lock = threading.Lock()
+
+    def record(self, command_name: str, outcome: str, seconds: float):
+        """
+        Records one command execution.
+
+        Args:
+            command_name (str): The command name.
+            outcome (str): "ok" or the error kind.
+            seconds (float): The execution time.
+        """
+        if outcome == "unknown_command":
+            command_name = UNKNOWN_COMMAND
+        bucket = bisect_left(self.bounds, seconds)
+        with self._lock:
+            stats = self.commands.get(command_name)
+            if stats is None:
+                stats = self.commands[command_name] = CommandStats(len(self.bounds))
+            stats.calls += 1
+            stats.total_seconds += seconds
+            stats.buckets[bucket] += 1
+            if outcome != "ok":
+                stats.errors[outcome] = stats.errors.get(outcome, 0) + 1
+
+    def reset(self):
+        """Discards all recorded metrics."""
+        self.commands = {}
+
+    def render_prometheus(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        with self._lock:
+            commands = sorted(self.commands.items())
+        lines = ["# HELP calculator_command_calls_total Commands executed.",
+                 "# TYPE calculator_command_calls_total counter"]
+        lines += [f'calculator_command_calls_total{{command="{name}"}} {stats.calls}' for name, stats in commands]
+        lines += ["# HELP calculator_command_errors_total Commands that failed, by error kind.",
+                  "# TYPE calculator_command_errors_total counter"]
+        for name, stats in commands:
+            lines += [f'calculator_command_errors_total{{command="{name}",kind="{kind}"}} {count}'
+                      for kind, count in sorted(stats.errors.items())]
+        lines += ["# HELP calculator_command_duration_seconds Command execution time.",
+                  "# TYPE calculator_command_duration_seconds histogram"]
+        for name, stats in commands:
+            cumulative = 0
+            for bound, count in zip(self.bounds + ("+Inf",), stats.buckets):
+                cumulative += count
+                lines.append(f'calculator_command_duration_seconds_bucket{{command="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'calculator_command_duration_seconds_sum{{command="{name}"}} {stats.total_seconds:.9f}')
+            lines.append(f'calculator_command_duration_seconds_count{{command="{name}"}} {stats.calls}')
+        return "\n".join(lines) + "\n"
+
+class PrometheusFileExporter:
+    """
+    Background thread that periodically writes metrics to a Prometheus text file.
+
+    The file is replaced atomically, so a scraper never reads a partial file.
+
+    Attributes:
+        metrics (CommandMetrics): The metrics to export.
+        path (str): The output file, e.g. a .prom file in node_exporter's textfile directory.
+        interval (float): Seconds between writes.
+    """
+
+    def __init__(self, metrics: CommandMetrics, path: str, interval: float = 15.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def write(self):
+        """Writes the current metrics to the file now."""
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(temporary_path, "w", encoding="utf-8") as metrics_file:
+                metrics_file.write(self.metrics.render_prometheus())
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write metrics file %s: %s", self.path, e)
+
+    def start(self):
+        """Starts the background writer thread."""
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        logger.info("Exporting metrics to %s every %.0fs.", self.path, self.interval)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+    def stop(self):
+        """Stops the writer thread and writes the metrics one last time."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        atexit.unregister(self.stop)
+        self.write()
+
+__all__ = ["CommandMetrics", "CommandStats", "PrometheusFileExporter", "LATENCY_BUCKETS", "UNKNOWN_COMMAND"]
@@ -0,0 +1,340 @@
+"""
+Module for the numeric backends of the arithmetic commands.
+
+A backend decides how operands are parsed and in which number type the
+arithmetic commands and expressions compute:
+
+    decimal   Decimal, exact decimal semantics (the default), optionally with
+              its own precision and rounding mode
+    float     binary floating point, the fastest
+    fraction  Fraction, exact rationals; operands may be written "1/3"
+
+The backend is chosen per session with the `mode` command, or for the whole
+process with the CALCULATOR_NUMERIC_BACKEND, CALCULATOR_DECIMAL_PRECISION
+and CALCULATOR_DECIMAL_ROUNDING settings.
+
+Errors are reported the same way by every backend, with the decimal
+module's exception types that the commands already handle: an operand that
+cannot be parsed or is not finite (such as "inf" or "nan") raises
+InvalidOperation, dividing by zero raises DivisionByZero, and a result too
+large to be finite (a float infinity or a decimal overflow) raises Overflow. The decimal precision is limited to
+max_precision() digits (MAX_PRECISION unless set with set_max_precision(),
+e.g. from the CALCULATOR_MAX_PRECISION setting), so one `mode` command cannot
+make every later calculation of the session arbitrarily slow.
+"""
+
+from math import isfinite
+import decimal
+from decimal import Decimal, DivisionByZero, InvalidOperation, Overflow
+from fractions import Fraction
+from calculator.session import current_session
+
+# The default of the largest decimal precision, see set_max_precision().
+MAX_PRECISION = 100000
+
+class NumericBackend:
+    """
+    Base class of the numeric backends.
+
+    Attributes:
+        name (str): The backend name used by the mode command and the settings.
+        type (type): The number type the backend computes in.
+    """
+
+    name = None
+    type = object  # The number type of each backend.
+
+    def parse(self, text: str):
+        """
+        Parses an operand.
+
+        Args:
+            text (str): The operand text.
+
+        Returns:
+            The number.
+
+        Raises:
+            InvalidOperation: If the text is not a finite number.
+        """
+        try:
+            return self.type(text)
+        except (ValueError, TypeError, ZeroDivisionError, ArithmeticError):
+            raise InvalidOperation(f"Invalid number: {text!r}") from None
+
+    def convert(self, value):
+        """
+        Converts a number computed by another backend, such as a session variable.
+
+        Args:
+            value: The number.
+
+        Returns:
+            The number in this backend's type.
+        """
+        if isinstance(value, self.type):
+            return value
+        return self.parse(str(value))
+
+    def apply(self, function, *operands):
+        """
+        Calls a calculation with this backend's arithmetic settings in effect.
+
+        Args:
+            function (callable): The calculation, e.g. a command's calculate method.
+            *operands: The parsed operands.
+
+        Returns:
+            The result of the calculation.
+        """
+        return function(*operands)
+
+    @staticmethod
+    def is_finite(value) -> bool:  # pylint: disable=unused-argument
+        """
+        Tells whether a number of this backend's type is finite.
+
+        Args:
+            value: The number.
+
+        Returns:
+            bool: False for infinities and NaN.
+        """
+        return True
+
+    def check(self, value):
+        """
+        Checks that a result is a finite number.
+
+        Args:
+            value: The result of a calculation.
+
+        Returns:
+            The value, unchanged.
+
+        Raises:
+            Overflow: If the value is infinite or not a number.
+        """
+        if not self.is_finite(value):
+            raise Overflow(f"The result is not a finite number: {value}")
+        return value
+
+    def key(self) -> tuple:
+        """
+        Returns what distinguishes results computed by this backend, for cache keys.
+
+        Returns:
+            tuple: The backend name and any arithmetic settings.
+        """
+        return (self.name,)
+
+    def describe(self) -> str:
+        """
+        Describes the backend for the user.
+
+        Returns:
+            str: The description.
+        """
+        return self.name
+
+class FloatBackend(NumericBackend):
+    """Binary floating point arithmetic."""
+
+    name = "float"
+    type = float
+    is_finite = staticmethod(isfinite)
+
+    def parse(self, text: str) -> float:
+        try:
+            value = float(text)
+        except (ValueError, TypeError):
+            raise InvalidOperation(f"Invalid number: {text!r}") from None
+        if isfinite(value):
+            return value
+        raise InvalidOperation(f"Invalid number: {text!r}")
+
+class FractionBackend(NumericBackend):
+    """Exact rational arithmetic."""
+
+    name = "fraction"
+    type = Fraction
+
+    def convert(self, value):
+        if isinstance(value, Fraction):
+            return value
+        if isinstance(value, float):
+            value = repr(value)
+        return self.parse(value) if isinstance(value, str) else Fraction(value)
+
+class DecimalBackend(NumericBackend):
+    """
+    Decimal arithmetic, optionally with its own precision and rounding mode.
+
+    Attributes:
+        precision (int): The number of significant digits, or None for the current decimal context's.
+        rounding (str): The rounding mode, e.g. ROUND_HALF_UP, or None for the current decimal context's.
+    """
+
+    name = "decimal"
+    type = Decimal
+    is_finite = staticmethod(Decimal.is_finite)
+
+    def __init__(self, precision: int = None, rounding: str = None):
+        """
+        Initializes the DecimalBackend.
+
+        Args:
+            precision (int): The number of significant digits, or None for the current context's.
+            rounding (str): A decimal rounding mode such as "ROUND_HALF_UP" or "half_up", or None.
+
+        Raises:
+            ValueError: If the precision is not between 1 and max_precision() or the rounding mode is unknown.
+        """
+        if precision is not None and not 1 <= precision <= max_precision():
+            raise ValueError(f"Decimal precision must be between 1 and {max_precision()}, got {precision}")
+        self.precision = precision
+        self.rounding = normalize_rounding(rounding) if rounding else None
+        self._context = None
+        if precision is not None or rounding:
+            self._context = decimal.getcontext().copy()
+            self._context.prec = precision or self._context.prec
+            self._context.rounding = self.rounding or self._context.rounding
+
+    def parse(self, text: str) -> Decimal:
+        try:
+            value = Decimal(text)
+        except (ValueError, TypeError, ArithmeticError):
+            raise InvalidOperation(f"Invalid number: {text!r}") from None
+        if value.is_finite():
+            return value
+        raise InvalidOperation(f"Invalid number: {text!r}")
+
+    def convert(self, value):
+        if isinstance(value, Decimal):
+            return value
+        if isinstance(value, Fraction):
+            return self.apply(lambda a, b: a / b, Decimal(value.numerator), Decimal(value.denominator))
+        return self.parse(repr(value) if isinstance(value, float) else str(value))
+
+    def apply(self, function, *operands):
+        if self._context is None:
+            return function(*operands)
+        with decimal.localcontext(self._context):
+            return function(*operands)
+
+    def key(self) -> tuple:
+        context = self._context or decimal.getcontext()
+        return (self.name, context.prec, context.rounding)
+
+    def describe(self) -> str:
+        context = self._context or decimal.getcontext()
+        return f"decimal (precision {context.prec}, rounding {context.rounding})"
+
+BACKENDS = {"decimal": DecimalBackend, "float": FloatBackend, "fraction": FractionBackend}
+
+def normalize_rounding(rounding: str) -> str:
+    """
+    Normalizes a rounding mode name.
+
+    Args:
+        rounding (str): A decimal rounding mode, with or without the ROUND_ prefix, in any case.
+
+    Returns:
+        str: The decimal module's name for the rounding mode.
+
+    Raises:
+        ValueError: If the rounding mode is unknown.
+    """
+    name = rounding.upper()
+    if not name.startswith("ROUND_"):
+        name = "ROUND_" + name
+    if not name.isidentifier() or not isinstance(getattr(decimal, name, None), str):
+        raise ValueError(f"Unknown rounding mode: {rounding}")
+    return name
+
+def create_backend(name: str, precision: int = None, rounding: str = None) -> NumericBackend:
+    """
+    Creates a backend by name.
+
+    Args:
+        name (str): "decimal", "float" or "fraction".
+        precision (int): The decimal precision; only valid for the decimal backend.
+        rounding (str): The decimal rounding mode; only valid for the decimal backend.
+
+    Returns:
+        NumericBackend: The backend.
+
+    Raises:
+        ValueError: If the name, precision or rounding mode is invalid.
+    """
+    try:
+        backend_class = BACKENDS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown numeric backend {name!r}, expected one of {', '.join(BACKENDS)}") from None
+    if backend_class is DecimalBackend:
+        return DecimalBackend(precision, rounding)
+    if precision is not None or rounding:
+        raise ValueError(f"Precision and rounding only apply to the decimal backend, not {name}")
+    return backend_class()
+
+class _Defaults:
+    """The process-wide settings, set by set_default_backend() and set_max_precision()."""
+
+    backend = DecimalBackend()
+    precision = MAX_PRECISION
+
+def set_default_backend(backend: NumericBackend):
+    """
+    Sets the backend of sessions that did not choose one with the mode command.
+
+    Args:
+        backend (NumericBackend): The backend.
+    """
+    _Defaults.backend = backend
+
+def default_backend() -> NumericBackend:
+    """
+    Returns the process-wide default backend.
+
+    Returns:
+        NumericBackend: The backend.
+    """
+    return _Defaults.backend
+
+def set_max_precision(digits: int):
+    """
+    Sets the largest decimal precision, of the mode command and of the digits of the constants.
+
+    Args:
+        digits (int): The most significant digits.
+
+    Raises:
+        ValueError: If the limit is not positive.
+    """
+    if digits < 1:
+        raise ValueError(f"The maximum precision must be positive, got {digits}")
+    _Defaults.precision = digits
+
+def max_precision() -> int:
+    """
+    Returns the largest decimal precision.
+
+    Returns:
+        int: The most significant digits a calculation may use.
+    """
+    return _Defaults.precision
+
+def current_backend() -> NumericBackend:
+    """
+    Returns the backend of the current session.
+
+    Returns:
+        NumericBackend: The session's backend, or the default backend.
+    """
+    backend = current_session().backend
+    return backend if backend is not None else _Defaults.backend
+
+__all__ = ["NumericBackend", "DecimalBackend", "FloatBackend", "FractionBackend", "BACKENDS", "create_backend",
+           "current_backend", "default_backend", "set_default_backend", "max_precision", "set_max_precision",
+           "normalize_rounding",
+           "DivisionByZero", "InvalidOperation", "Overflow", "MAX_PRECISION"]
@@ -1,15 +1,18 @@
 """
-Module for the AddCommand class that performs addition of two numerical arguments.
+Module for the AddCommand class that performs addition of numerical arguments.
 
-This module defines the AddCommand class, which is used to add two numerical
-values provided as arguments. The command inherits from the base Command class 
-and implements the execute method to carry out the addition. It includes error 
-handling for invalid input and ensures exactly two arguments are provided.
+This module defines the AddCommand class, which is used to add two or more
+numerical values or vectors provided as arguments. The command inherits from
+the base Command class and implements the execute method to carry out the
+addition. Its signature ensures at least two operands are provided.
 """
 
 import logging
-from decimal import Decimal, InvalidOperation
-from calculator.commands import Command
+from decimal import InvalidOperation, Overflow
+from calculator.commands import Command, report_error, report_result
+from calculator.numeric import current_backend
+from calculator.signatures import Param, Signature
+from calculator.vectors import ShapeMismatch, fold, operand
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,55 +20,54 @@ logger = logging.getLogger(__name__)
 
 class AddCommand(Command):
     """
-    AddCommand class to perform the addition of two numerical arguments.
+    AddCommand class to perform the addition of numerical arguments.
 
     This command class inherits from the Command class and implements the
-    execute method to perform addition of two numbers passed as arguments.
+    execute method to add the numbers or vectors passed as arguments.
     """
 
-    def execute(self, *args):
+    pure = True
+    signature = Signature(Param("operand", operand, variadic=True, min_count=2))
+
+    def execute(self, *operands):
         """
-        Executes the addition command with the given arguments.
+        Executes the addition command with the given operands.
 
         Args:
-            *args: Two numerical arguments to be added.
-
-        Raises:
-            ValueError: If the number of arguments is not exactly two.
-            InvalidOperation: If the arguments cannot be converted to Decimal.
+            *operands: Two or more numbers or vectors, parsed with the session's numeric backend.
         """
-        logger.info("Executing addition command with arguments: %s", args)
-
-        if not self.validate_args(args):
-            return
+        logger.info("Executing addition command with operands: %s", operands)
 
         try:
-            # Convert arguments to Decimal and perform addition
-            a, b = map(Decimal, args)
-            result = a + b
-            logger.info("Addition result: %s + %s = %s", a, b, result)
+            result = fold(self.calculate, operands, current_backend(), "add")
+            report_result(result)
+            logger.info("Addition result: %s", result)
             print(f"The Solution of addition is {result}")
         except InvalidOperation:
-            logger.error("Invalid input: Unable to convert arguments to Decimal.")
+            report_error("invalid_input")
+            logger.error("Invalid operation in addition: %s", operands)
             print("Error: Invalid input")
+        except Overflow as e:
+            report_error("overflow")
+            logger.error("Overflow in addition: %s", e)
+            print("Error: The result is not a finite number.")
+        except ShapeMismatch as e:
+            report_error("shape_mismatch")
+            logger.error("Shape mismatch in addition: %s", e)
+            print(f"Error: {e}")
 
-    def validate_args(self, args):
+    def calculate(self, left, right):
         """
-        Validates the arguments for the addition operation.
+        Adds two numbers.
 
         Args:
-            args: A tuple of arguments to be validated.
+            left (number): The first operand.
+            right (number): The second operand.
 
         Returns:
-            bool: True if the arguments are valid (exactly two numbers), 
-                  False otherwise.
+            number: The sum, of the operands' type.
         """
-        if len(args) != 2:
-            logger.warning("Error: Addition requires exactly two numerical arguments, received %d", len(args))
-            print("Error: Addition requires exactly two numerical arguments")
-            return False
-        logger.info("Arguments validated successfully: %s", args)
-        return True
+        return left + right
 
 # Expose the AddCommand class for external use
 __all__ = ["AddCommand"]
@@ -0,0 +1,43 @@
+"""
+Module for the BinomialCommand class that computes a binomial coefficient.
+
+This module defines the BinomialCommand class, which computes the binomial
+coefficient n over k, the number of ways to choose k items of n, with the
+session's numeric backend (see calculator.bigmath) as a ratio of
+binary-splitting products.
+"""
+
+import logging
+from calculator import bigmath
+from calculator.signatures import Param, Signature
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class BinomialCommand(bigmath.FunctionCommand):
+    """
+    BinomialCommand class to compute a binomial coefficient.
+
+    This command class inherits from the FunctionCommand class, which computes
+    the calculate method with the session's numeric backend and prints the result.
+    """
+
+    signature = Signature(Param("n", bigmath.number), Param("k", bigmath.number))
+    label = "binomial coefficient"
+
+    def calculate(self, n, k):  # pylint: disable=arguments-differ
+        """
+        Computes the binomial coefficient.
+
+        Args:
+            n (number): A non-negative integer.
+            k (number): The number of items chosen.
+
+        Returns:
+            number: The binomial coefficient n over k.
+        """
+        return bigmath.binomial(n, k)
+
+# Expose the BinomialCommand class for external use
+__all__ = ["BinomialCommand"]
@@ -0,0 +1,89 @@
+"""
+Module for the ColumnCommand class.
+
+This module provides the ColumnCommand class, which applies an arithmetic
+command to the columns of a CSV file, row by row, and streams the results
+to an output file, e.g. `column multiply sales.csv price 1.2 gross.csv`.
+"""
+
+import inspect
+import logging
+from calculator.columns import ColumnEngine, ColumnError
+from calculator.commands import Command, report_error, report_result
+from calculator.signatures import Param, Signature
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def takes_two_operands(calculate) -> bool:
+    """
+    Tells whether a calculate() method can be called with a left and a right operand.
+
+    Args:
+        calculate (callable): The bound calculate() method of a command.
+
+    Returns:
+        bool: True if the method accepts exactly two positional operands.
+    """
+    try:
+        inspect.signature(calculate).bind(None, None)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+class ColumnCommand(Command):
+    """
+    ColumnCommand class to run arithmetic over CSV columns.
+
+    This command class inherits from the Command class and implements the
+    execute method to run a ColumnEngine with the calculation of another command.
+    """
+
+    local_only = True
+    signature = Signature(Param("operation"), Param("input"), Param("left"), Param("right"), Param("output"),
+                          Param("options", optional=True, choices=("--no-header",)))
+
+    def __init__(self, command_handler):
+        """
+        Initializes the ColumnCommand with a reference to the command handler.
+
+        Args:
+            command_handler: The handler providing the operations.
+        """
+        self.command_handler = command_handler
+
+    def execute(self, operation, input_path, left, right, output_path, *options):  # pylint: disable=arguments-differ
+        """
+        Computes LEFT OPERATION RIGHT for every row of INPUT and writes the results to OUTPUT.
+
+        Args:
+            operation (str): The arithmetic command, e.g. add.
+            input_path (str): The CSV file to read.
+            left (str): The left operand: a header name, a $N column number or a number.
+            right (str): The right operand: a header name, a $N column number or a number.
+            output_path (str): The file the results are written to.
+            *options (str): "--no-header" if the first line of the input is data.
+        """
+        header = not options
+        calculate = getattr(self.command_handler.commands.get(operation), "calculate", None)
+        if calculate is None or not takes_two_operands(calculate):
+            report_error("invalid_input")
+            logger.warning("Column operation %s is not a binary arithmetic command.", operation)
+            print(f"Error: {operation} cannot be applied to columns")
+            return
+
+        engine = ColumnEngine(calculate)
+        logger.info("Running column %s over %s: %s, %s -> %s", operation, input_path, left, right, output_path)
+        try:
+            rows = engine.run(input_path, left, right, output_path, header=header)
+        except (OSError, ColumnError) as e:
+            report_error("invalid_input")
+            logger.error("Column job failed: %s", e)
+            print(f"Error: {e}")
+            return
+        report_result(rows)
+        engine.report()
+
+# Expose the ColumnCommand class for external use
+__all__ = ["ColumnCommand", "takes_two_operands"]
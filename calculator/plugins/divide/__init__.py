@@ -1,14 +1,17 @@
 """
 Module for the DivideCommand class.
 
-This module provides the DivideCommand class, which performs the division 
-of two numerical arguments while handling errors such as invalid input and 
-division by zero.
+This module provides the DivideCommand class, which divides the first
+numerical argument or vector by the following ones while handling errors such
+as invalid input and division by zero.
 """
 
 import logging
-from decimal import Decimal, InvalidOperation, DivisionByZero
-from calculator.commands import Command
+from decimal import InvalidOperation, DivisionByZero, Overflow
+from calculator.commands import Command, report_error, report_result
+from calculator.numeric import current_backend
+from calculator.signatures import Param, Signature
+from calculator.vectors import ShapeMismatch, fold, operand
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,41 +19,63 @@ logger = logging.getLogger(__name__)
 
 class DivideCommand(Command):
     """
-    DivideCommand class to perform the division of two numerical arguments.
+    DivideCommand class to perform the division of numerical arguments.
 
     This command class inherits from the Command class and implements the
-    execute method to perform division of two numbers passed as arguments.
+    execute method to divide the numbers or vectors passed as arguments from left to right.
     """
 
-    def execute(self, *args):
+    pure = True
+    signature = Signature(Param("operand", operand, variadic=True, min_count=2))
+
+    def execute(self, *operands):
         """
-        Executes the division command with the given arguments.
+        Executes the division command with the given operands.
 
         Args:
-            *args: Two numerical arguments to be divided.
-
-        Raises:
-            InvalidOperation: If the arguments cannot be converted to Decimal.
-            DivisionByZero: If division by zero is attempted.
+            *operands: Two or more numbers or vectors, parsed with the session's numeric backend.
         """
-        logger.info("Executing division command with arguments: %s", args)
+        logger.info("Executing division command with operands: %s", operands)
 
         try:
-            # Convert arguments to Decimal and perform division
-            a, b = map(Decimal, args)
-            if b == 0:
-                logger.error("Division by zero attempted with arguments: %s", args)
-                print("Error: Division by zero is not allowed.")
-                return
-            quotient = a / b
-            logger.info("Division result: %s / %s = %s", a, b, quotient)
+            quotient = fold(self.calculate, operands, current_backend(), "divide")
+            report_result(quotient)
+            logger.info("Division result: %s", quotient)
             print(f"The solution of division is {quotient}")
         except InvalidOperation:
-            logger.error("Invalid input: Unable to convert arguments to Decimal. Arguments: %s", args)
+            report_error("invalid_input")
+            logger.error("Invalid operation in division. Operands: %s", operands)
             print("Error: Invalid input. Please enter valid numbers.")
+        except Overflow as e:
+            report_error("overflow")
+            logger.error("Overflow in division: %s", e)
+            print("Error: The result is not a finite number.")
+        except ShapeMismatch as e:
+            report_error("shape_mismatch")
+            logger.error("Shape mismatch during division: %s", e)
+            print(f"Error: {e}")
         except DivisionByZero:
-            logger.error("Attempted division by zero with arguments: %s", args)
-            print("Error: Cannot divide by zero.")
+            report_error("division_by_zero")
+            logger.error("Division by zero attempted with operands: %s", operands)
+            print("Error: Division by zero is not allowed.")
+
+    def calculate(self, left, right):
+        """
+        Divides the first number by the second.
+
+        Args:
+            left (number): The dividend.
+            right (number): The divisor.
+
+        Returns:
+            number: The quotient, of the operands' type.
+
+        Raises:
+            DivisionByZero: If the divisor is zero.
+        """
+        if right == 0:
+            raise DivisionByZero("Division by zero is not allowed.")
+        return left / right
 
 # Expose the DivideCommand class for external use
 __all__ = ["DivideCommand"]
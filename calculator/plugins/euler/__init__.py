@@ -0,0 +1,31 @@
+"""
+Module for the ECommand class that prints the constant e.
+
+This module defines the ECommand class, registered as the `e` command, which
+prints e at the decimal context's precision, or with the number of
+significant digits given, e.g. `e 1000`. The value is summed from the series
+of 1/k! by binary splitting (see calculator.bigmath) and cached, so printing
+it again at the same or a lower precision only rounds the cached value.
+"""
+
+import logging
+from calculator import bigmath
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ECommand(bigmath.ConstantCommand):
+    """
+    ECommand class to print the constant e.
+
+    This command class inherits from the ConstantCommand class and takes the
+    number of significant digits as an optional argument.
+    """
+
+    command_name = "e"
+    label = "value of e"
+    constant_name = "e"
+
+# Expose the ECommand class for external use
+__all__ = ["ECommand"]
@@ -0,0 +1,71 @@
+"""
+Module for the ExprCommand class.
+
+This module provides the ExprCommand class, which evaluates an arithmetic
+expression such as `(2 + 3) * 4 / 7` in one step. Operators and calls are
+dispatched to the registered plugin commands, and variables bound with the
+`let` command can be used by name. Expressions without variables may run
+under the watchdog, within the expr command's own budget.
+"""
+
+import logging
+from calculator.commands import Command, report_result
+from calculator.expression import ExpressionError, compile_expression, evaluate_for_command
+from calculator.session import current_session
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ExprCommand(Command):
+    """
+    ExprCommand class to evaluate arithmetic expressions.
+
+    This command class inherits from the Command class and implements the
+    execute method to evaluate the expression formed by its arguments.
+    """
+
+    command_name = "expr"
+
+    def __init__(self, command_handler):
+        """
+        Initializes the ExprCommand with a reference to the command handler.
+
+        Args:
+            command_handler: The handler providing the commands expressions dispatch to.
+        """
+        self.command_handler = command_handler
+
+    def supervisable(self, args) -> bool:
+        """
+        Lets the watchdog run expressions that use no variables, which only this session has.
+
+        Args:
+            args (tuple): The tokens of the expression.
+
+        Returns:
+            bool: True if the expression is valid and uses no variables.
+        """
+        try:
+            return not compile_expression(" ".join(args)).variables
+        except ExpressionError:
+            return False
+
+    def execute(self, *args):
+        """
+        Evaluates the expression formed by the arguments and prints its value.
+
+        Args:
+            *args: The tokens of the expression, e.g. "(2", "+", "3)", "*", "4".
+        """
+        text = " ".join(args)
+        logger.info("Evaluating expression: %s", text)
+        value = evaluate_for_command(self.command_handler, text, current_session().variables)
+        if value is None:
+            return
+        report_result(value)
+        logger.info("Expression result: %s = %s", text, value)
+        print(f"The result of the expression is {value}")
+
+# Expose the ExprCommand class for external use
+__all__ = ["ExprCommand"]
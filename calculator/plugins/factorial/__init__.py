@@ -0,0 +1,42 @@
+"""
+Module for the FactorialCommand class that computes the factorial of a number.
+
+This module defines the FactorialCommand class, which computes the factorial
+of a non-negative integer with the session's numeric backend (see
+calculator.bigmath) as a binary-splitting product, rounded to the decimal
+context's precision with the decimal backend.
+"""
+
+import logging
+from calculator import bigmath
+from calculator.signatures import Param, Signature
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class FactorialCommand(bigmath.FunctionCommand):
+    """
+    FactorialCommand class to compute the factorial of a number.
+
+    This command class inherits from the FunctionCommand class, which computes
+    the calculate method with the session's numeric backend and prints the result.
+    """
+
+    signature = Signature(Param("n", bigmath.number))
+    label = "factorial"
+
+    def calculate(self, n):  # pylint: disable=arguments-differ
+        """
+        Computes the factorial.
+
+        Args:
+            n (number): A non-negative integer.
+
+        Returns:
+            number: n!.
+        """
+        return bigmath.factorial(n)
+
+# Expose the FactorialCommand class for external use
+__all__ = ["FactorialCommand"]
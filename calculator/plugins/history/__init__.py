@@ -0,0 +1,42 @@
+"""
+Module for the HistoryCommand class.
+
+This module provides the HistoryCommand class, which lists the most recent
+entries of the command history journal. Only the listed entries are read,
+however long the journal is.
+"""
+
+import logging
+from calculator import journal
+from calculator.signatures import Param, Signature
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class HistoryCommand(journal.JournalCommand):
+    """
+    HistoryCommand class to list recent journal entries.
+
+    This command class inherits from the JournalCommand class and implements the
+    execute method to print the last entries, numbered for use with recall.
+    """
+
+    signature = Signature(Param("count", int, optional=True, minimum=0))
+
+    def execute(self, count=10):
+        """
+        Prints the most recent journal entries, oldest first. Entry 1 is the most recent.
+
+        Args:
+            count (int): The number of entries to show.
+        """
+        entries = self.recent(count)
+        if entries is None:
+            return
+        logger.info("Displaying %d history entries.", len(entries))
+        for number, entry in zip(range(len(entries), 0, -1), entries):
+            print(f"{number:>5}  {entry}")
+
+# Expose the HistoryCommand class for external use
+__all__ = ["HistoryCommand"]
@@ -0,0 +1,62 @@
+"""
+Module for the LetCommand class.
+
+This module provides the LetCommand class, which binds a session variable
+to the value of an expression, e.g. `let a = 2 * 3`, so it can be used in
+later `expr` commands.
+"""
+
+import logging
+from calculator.commands import Command, report_error, report_result
+from calculator.expression import evaluate_for_command
+from calculator.session import current_session
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class LetCommand(Command):
+    """
+    LetCommand class to bind session variables.
+
+    This command class inherits from the Command class and implements the
+    execute method to evaluate an expression and store its value by name.
+    """
+
+    command_name = "let"
+
+    def __init__(self, command_handler):
+        """
+        Initializes the LetCommand with a reference to the command handler.
+
+        Args:
+            command_handler: The handler providing the commands expressions dispatch to.
+        """
+        self.command_handler = command_handler
+
+    def execute(self, *args):
+        """
+        Binds a variable to the value of an expression.
+
+        Args:
+            *args: The variable name, an optional "=", and the tokens of the expression.
+        """
+        if args[1:2] == ("=",):
+            args = args[:1] + args[2:]
+        if len(args) < 2 or not args[0].isidentifier():
+            report_error("invalid_arity")
+            logger.warning("Invalid let command: %s", args)
+            print("Error: Usage is let NAME = EXPRESSION")
+            return
+        name, text = args[0], " ".join(args[1:])
+        variables = current_session().variables
+        value = evaluate_for_command(self.command_handler, text, variables)
+        if value is None:
+            return
+        variables[name] = value
+        report_result(value)
+        logger.info("Variable bound: %s = %s", name, value)
+        print(f"{name} = {value}")
+
+# Expose the LetCommand class for external use
+__all__ = ["LetCommand"]
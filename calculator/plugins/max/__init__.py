@@ -0,0 +1,39 @@
+"""
+Module for the MaxCommand class that computes the largest of numbers.
+
+This module defines the MaxCommand class, which reads numbers, inline lists,
+vector files, text files or standard input in one pass (see
+calculator.streamstats) and prints the largest of the values.
+"""
+
+import logging
+from calculator import streamstats
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class MaxCommand(streamstats.StatisticCommand):
+    """
+    MaxCommand class to compute the largest of numbers.
+
+    This command class inherits from the StatisticCommand class, which reads
+    the sources and prints the statistic computed by the statistic method.
+    """
+
+    label = "maximum"
+
+    def statistic(self, stats):
+        """
+        Computes the largest of the values.
+
+        Args:
+            stats (StreamingStats): The summary of the values.
+
+        Returns:
+            number: The largest value.
+        """
+        return stats.maximum
+
+# Expose the MaxCommand class for external use
+__all__ = ["MaxCommand"]
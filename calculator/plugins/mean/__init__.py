@@ -0,0 +1,40 @@
+"""
+Module for the MeanCommand class that computes the arithmetic mean of numbers.
+
+This module defines the MeanCommand class, which reads numbers, inline
+lists, vector files, text files or standard input in one pass (see
+calculator.streamstats) and prints the arithmetic mean of the values,
+computed with the compensated sum divided by the count.
+"""
+
+import logging
+from calculator import streamstats
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class MeanCommand(streamstats.StatisticCommand):
+    """
+    MeanCommand class to compute the arithmetic mean of numbers.
+
+    This command class inherits from the StatisticCommand class, which reads
+    the sources and prints the statistic computed by the statistic method.
+    """
+
+    label = "mean"
+
+    def statistic(self, stats):
+        """
+        Computes the arithmetic mean of the values.
+
+        Args:
+            stats (StreamingStats): The summary of the values.
+
+        Returns:
+            number: The mean of the values.
+        """
+        return stats.mean
+
+# Expose the MeanCommand class for external use
+__all__ = ["MeanCommand"]
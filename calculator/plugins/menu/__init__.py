@@ -8,6 +8,7 @@ view available commands and navigate the command-line interface.
 
 import logging
 from calculator.commands import Command
+from calculator.signatures import Signature
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,6 +23,8 @@ class MenuCommand(Command):
     command handler.
     """
 
+    signature = Signature()
+
     def __init__(self, command_handler):
         """
         Initializes the MenuCommand with a reference to the command handler.
@@ -0,0 +1,39 @@
+"""
+Module for the MinCommand class that computes the smallest of numbers.
+
+This module defines the MinCommand class, which reads numbers, inline lists,
+vector files, text files or standard input in one pass (see
+calculator.streamstats) and prints the smallest of the values.
+"""
+
+import logging
+from calculator import streamstats
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class MinCommand(streamstats.StatisticCommand):
+    """
+    MinCommand class to compute the smallest of numbers.
+
+    This command class inherits from the StatisticCommand class, which reads
+    the sources and prints the statistic computed by the statistic method.
+    """
+
+    label = "minimum"
+
+    def statistic(self, stats):
+        """
+        Computes the smallest of the values.
+
+        Args:
+            stats (StreamingStats): The summary of the values.
+
+        Returns:
+            number: The smallest value.
+        """
+        return stats.minimum
+
+# Expose the MinCommand class for external use
+__all__ = ["MinCommand"]
@@ -0,0 +1,55 @@
+"""
+Module for the ModeCommand class.
+
+This module provides the ModeCommand class, which shows or changes the
+numeric backend the arithmetic commands and expressions of the current
+session compute with: decimal (optionally with a precision and rounding
+mode), float or fraction.
+"""
+
+import logging
+from calculator.commands import Command, report_error
+from calculator.numeric import BACKENDS, create_backend, current_backend
+from calculator.session import current_session
+from calculator.signatures import Param, Signature
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ModeCommand(Command):
+    """
+    ModeCommand class to select the session's numeric backend.
+
+    This command class inherits from the Command class and implements the
+    execute method to print or replace the backend of the current session.
+    """
+
+    signature = Signature(Param("mode", str.lower, optional=True, choices=BACKENDS),
+                          Param("precision", int, optional=True, minimum=1), Param("rounding", optional=True))
+
+    def execute(self, name=None, precision=None, rounding=None):
+        """
+        Prints the session's numeric backend, or selects another one.
+
+        Args:
+            name (str): None to show the backend, or "decimal", "float" or "fraction" to select one.
+            precision (int): The decimal precision.
+            rounding (str): The decimal rounding mode.
+        """
+        if name is None:
+            print(f"Numeric mode: {current_backend().describe()}")
+            return
+        try:
+            backend = create_backend(name, precision, rounding)
+        except ValueError as e:
+            report_error("invalid_input")
+            logger.warning("Invalid mode command %s %s %s: %s", name, precision, rounding, e)
+            print(f"Error: {e}")
+            return
+        current_session().backend = backend
+        logger.info("Numeric mode set to %s", backend.describe())
+        print(f"Numeric mode: {backend.describe()}")
+
+# Expose the ModeCommand class for external use
+__all__ = ["ModeCommand"]
@@ -1,13 +1,16 @@
 """
 Module for the MultiplyCommand class.
 
-This module provides the MultiplyCommand class, which performs the multiplication 
-of two numerical arguments while handling invalid input errors.
+This module provides the MultiplyCommand class, which performs the multiplication
+of two or more numerical arguments or vectors while handling invalid input errors.
 """
 
 import logging
-from decimal import Decimal, InvalidOperation
-from calculator.commands import Command
+from decimal import InvalidOperation, Overflow
+from calculator.commands import Command, report_error, report_result
+from calculator.numeric import current_backend
+from calculator.signatures import Param, Signature
+from calculator.vectors import ShapeMismatch, fold, operand
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,37 +18,62 @@ logger = logging.getLogger(__name__)
 
 class MultiplyCommand(Command):
     """
-    MultiplyCommand class to perform multiplication of two numbers.
+    MultiplyCommand class to perform multiplication of numbers.
 
     This command class inherits from the Command class and implements the
-    execute method to multiply two decimal numbers and display the result.
+    execute method to multiply numbers or vectors and display the result.
     """
 
-    def execute(self, *args):
+    pure = True
+    signature = Signature(Param("operand", operand, variadic=True, min_count=2))
+
+    def execute(self, *operands):
         """
         Executes the multiplication command.
 
-        This method takes two arguments, attempts to convert them to decimals,
-        and performs the multiplication. If the input is invalid, it handles the
-        error and displays an appropriate message.
+        This method takes two or more operands, already parsed with the session's
+        numeric backend, and performs the multiplication. If the multiplication is
+        invalid, it handles the error and displays an appropriate message.
 
         Args:
-            *args: Two numerical arguments to be multiplied.
+            *operands: Two or more numbers or vectors to be multiplied.
 
         Prints:
-            The product of the two numbers if valid inputs are provided.
+            The product of the numbers if valid inputs are provided.
             Error message if invalid inputs are encountered.
         """
-        logger.info("Executing MultiplyCommand with arguments: %s", args)
-        
+        logger.info("Executing MultiplyCommand with operands: %s", operands)
+
         try:
-            a, b = map(Decimal, args)
-            product = a * b
+            product = fold(self.calculate, operands, current_backend(), "multiply")
             print(f"The solution of multiplication is {product}")
-            logger.info("Multiplication successful: %s * %s = %s", a, b, product)
+            report_result(product)
+            logger.info("Multiplication successful: %s", product)
         except InvalidOperation:
             print("Error: Invalid input. Please enter valid numbers.")
-            logger.error("Error: Invalid input. Unable to convert arguments to Decimal: %s", args)
+            report_error("invalid_input")
+            logger.error("Error: Invalid operation in multiplication: %s", operands)
+        except Overflow as e:
+            report_error("overflow")
+            logger.error("Overflow in multiplication: %s", e)
+            print("Error: The result is not a finite number.")
+        except ShapeMismatch as e:
+            print(f"Error: {e}")
+            report_error("shape_mismatch")
+            logger.error("Shape mismatch during multiplication: %s", e)
+
+    def calculate(self, left, right):
+        """
+        Multiplies two numbers.
+
+        Args:
+            left (number): The first operand.
+            right (number): The second operand.
+
+        Returns:
+            number: The product, of the operands' type.
+        """
+        return left * right
 
 # Expose the MultiplyCommand class for external use
 __all__ = ["MultiplyCommand"]
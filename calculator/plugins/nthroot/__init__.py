@@ -0,0 +1,43 @@
+"""
+Module for the NthrootCommand class that computes the nth root of a number.
+
+This module defines the NthrootCommand class, which computes the nth root of
+a number with the session's numeric backend (see calculator.bigmath), by
+Newton's iteration with precision doubling, e.g. `nthroot 2 3` for the
+cube root of 2.
+"""
+
+import logging
+from calculator import bigmath
+from calculator.signatures import Param, Signature
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class NthrootCommand(bigmath.FunctionCommand):
+    """
+    NthrootCommand class to compute the nth root of a number.
+
+    This command class inherits from the FunctionCommand class, which computes
+    the calculate method with the session's numeric backend and prints the result.
+    """
+
+    signature = Signature(Param("x", bigmath.number), Param("n", bigmath.number))
+    label = "root"
+
+    def calculate(self, x, n):  # pylint: disable=arguments-differ
+        """
+        Computes the root.
+
+        Args:
+            x (number): The radicand; negative only for odd n.
+            n (number): The degree, a non-zero integer.
+
+        Returns:
+            number: The nth root of x.
+        """
+        return bigmath.nthroot(x, n)
+
+# Expose the NthrootCommand class for external use
+__all__ = ["NthrootCommand"]
@@ -0,0 +1,30 @@
+"""
+Module for the PiCommand class that prints the constant pi.
+
+This module defines the PiCommand class, which prints pi at the decimal
+context's precision, or with the number of significant digits given, e.g.
+`pi 1000`. The value is summed from the Chudnovsky series by binary splitting
+(see calculator.bigmath) and cached, so printing it again at the same or a
+lower precision only rounds the cached value.
+"""
+
+import logging
+from calculator import bigmath
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class PiCommand(bigmath.ConstantCommand):
+    """
+    PiCommand class to print the constant pi.
+
+    This command class inherits from the ConstantCommand class and takes the
+    number of significant digits as an optional argument.
+    """
+
+    label = "value of pi"
+    constant_name = "pi"
+
+# Expose the PiCommand class for external use
+__all__ = ["PiCommand"]
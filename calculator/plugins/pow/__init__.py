@@ -0,0 +1,45 @@
+"""
+Module for the PowCommand class that raises a number to a power.
+
+This module defines the PowCommand class, which raises a number to a power
+with the session's numeric backend (see calculator.bigmath). Integer
+exponents use binary exponentiation, and fractional exponents with small
+denominators, such as `pow 2 1.5`, a root computed by Newton's iteration,
+so the result is accurate to the decimal context's precision at any
+number of digits.
+"""
+
+import logging
+from calculator import bigmath
+from calculator.signatures import Param, Signature
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class PowCommand(bigmath.FunctionCommand):
+    """
+    PowCommand class to raise a number to a power.
+
+    This command class inherits from the FunctionCommand class, which computes
+    the calculate method with the session's numeric backend and prints the result.
+    """
+
+    signature = Signature(Param("x", bigmath.number), Param("y", bigmath.number))
+    label = "power"
+
+    def calculate(self, x, y):  # pylint: disable=arguments-differ
+        """
+        Computes the power.
+
+        Args:
+            x (number): The base.
+            y (number): The exponent.
+
+        Returns:
+            number: x to the power y.
+        """
+        return bigmath.power(x, y)
+
+# Expose the PowCommand class for external use
+__all__ = ["PowCommand"]
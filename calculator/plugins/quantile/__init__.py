@@ -0,0 +1,55 @@
+"""
+Module for the QuantileCommand class that estimates a quantile of numbers.
+
+This module defines the QuantileCommand class, which reads numbers, inline
+lists, vector files, text files or standard input in one pass (see
+calculator.streamstats) and prints a quantile estimated from a mergeable
+sketch, e.g. `quantile 0.99 @latencies.f64` for the 99th percentile. The
+estimate is within 1% of a value of the requested rank.
+"""
+
+import logging
+from functools import partial
+from calculator import streamstats
+from calculator.signatures import Param, Signature
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class QuantileCommand(streamstats.StatisticCommand):
+    """
+    QuantileCommand class to estimate a quantile of numbers.
+
+    This command class inherits from the StatisticCommand class and takes the
+    quantile, between 0 and 1, before the sources.
+    """
+
+    signature = Signature(Param("q", float, minimum=0, maximum=1), Param("source", variadic=True, min_count=1))
+    quantiles = True
+
+    def execute(self, fraction, *sources):  # pylint: disable=arguments-differ
+        """
+        Estimates the quantile Q of the values of the sources.
+
+        Args:
+            fraction (float): The quantile Q, between 0 (the minimum) and 1 (the maximum).
+            *sources (str): Numbers, inline lists, @paths or "-" for standard input.
+        """
+        self.report(sources, partial(self.statistic, fraction=fraction), f"{fraction:g} quantile")
+
+    def statistic(self, stats, fraction: float = 0.5):
+        """
+        Estimates a quantile of the values.
+
+        Args:
+            stats (StreamingStats): The summary of the values.
+            fraction (float): The quantile, between 0 and 1. Defaults to the median.
+
+        Returns:
+            float: The estimate.
+        """
+        return stats.quantile(fraction)
+
+# Expose the QuantileCommand class for external use
+__all__ = ["QuantileCommand"]
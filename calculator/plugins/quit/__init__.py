@@ -8,6 +8,7 @@ the program gracefully with a farewell message.
 import sys
 import logging
 from calculator.commands import Command
+from calculator.signatures import Signature
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +22,8 @@ class QuitCommand(Command):
     execute method to terminate the program with a farewell message.
     """
 
+    signature = Signature()
+
     def execute(self):
         """
         Executes the quit command.
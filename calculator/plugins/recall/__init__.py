@@ -0,0 +1,46 @@
+"""
+Module for the RecallCommand class.
+
+This module provides the RecallCommand class, which shows one entry of the
+command history journal by its number in `history` (1 is the most recent).
+"""
+
+import logging
+from calculator import journal
+from calculator.commands import report_error
+from calculator.signatures import Param, Signature
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class RecallCommand(journal.JournalCommand):
+    """
+    RecallCommand class to show a journal entry.
+
+    This command class inherits from the JournalCommand class and implements the
+    execute method to print the N-th most recent journal entry.
+    """
+
+    signature = Signature(Param("n", int, minimum=1))
+
+    def execute(self, number):  # pylint: disable=arguments-differ
+        """
+        Prints the N-th most recent journal entry.
+
+        Args:
+            number (int): The entry number N, as listed by history.
+        """
+        entries = self.recent(number)
+        if entries is None:
+            return
+        if len(entries) < number:
+            report_error("invalid_input")
+            logger.warning("History entry %d does not exist (%d entries).", number, len(entries))
+            print(f"Error: There is no history entry {number}")
+            return
+        logger.info("Recalled history entry %d: %s", number, entries[0])
+        print(entries[0])
+
+# Expose the RecallCommand class for external use
+__all__ = ["RecallCommand"]
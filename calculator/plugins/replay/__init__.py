@@ -0,0 +1,108 @@
+"""
+Module for the ReplayCommand class.
+
+This module provides the ReplayCommand class, which executes every entry of
+a history journal again and reports the entries whose outcome or result
+differs from the recorded one, so a journal can serve as a regression
+fixture.
+"""
+
+import io
+import logging
+from contextlib import redirect_stdout
+from calculator.commands import Command, report_error
+from calculator.journal import JournalReader
+from calculator.session import Session, use_session
+from calculator.signatures import Param, Signature
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_MISMATCHES = 10
+
+# Commands that read the journal themselves; their entries are not replayed.
+JOURNAL_COMMANDS = ("history", "recall", "replay")
+
+class _Discard(io.TextIOBase):
+    """Text stream that drops everything written to it."""
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        return len(text)
+
+class ReplayCommand(Command):
+    """
+    ReplayCommand class to replay a history journal.
+
+    This command class inherits from the Command class and implements the
+    execute method to re-execute journal entries and compare their results.
+    """
+
+    local_only = True
+    signature = Signature(Param("file"))
+
+    def __init__(self, command_handler):
+        """
+        Initializes the ReplayCommand with a reference to the command handler.
+
+        Args:
+            command_handler: The handler the entries are executed with.
+        """
+        self.command_handler = command_handler
+
+    def execute(self, path):  # pylint: disable=arguments-differ
+        """
+        Re-executes every entry of a journal file and reports mismatches.
+
+        The entries run in a fresh session, with their output discarded, INFO logging
+        suppressed and journaling paused, so replaying does not grow the journal.
+        Entries of the commands that read the journal are skipped.
+
+        Args:
+            path (str): The journal file.
+        """
+        try:
+            reader = JournalReader(path)
+        except (OSError, ValueError) as e:
+            report_error("invalid_input")
+            logger.error("Cannot replay %s: %s", path, e)
+            print(f"Error: Cannot read journal {path}: {e}")
+            return
+
+        handler = self.command_handler
+        journal, handler.journal = handler.journal, None
+        disabled = logging.root.manager.disable
+        logging.disable(logging.INFO)
+        replayed = 0
+        mismatches = []
+        try:
+            with reader, use_session(Session()), redirect_stdout(_Discard()):
+                for entry in reader:
+                    if entry.command_name in JOURNAL_COMMANDS:
+                        continue
+                    replayed += 1
+                    try:
+                        context = handler.execute_command(entry.command_name, *entry.args)
+                        outcome, result = context.outcome, context.result
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        outcome, result = "exception", type(e).__name__
+                    result = None if result is None else str(result)
+                    if outcome != entry.outcome or (outcome == "ok" and result != entry.result):
+                        mismatches.append((entry, outcome, result))
+        finally:
+            logging.disable(disabled)
+            handler.journal = journal
+
+        logger.info("Replayed %d entries from %s: %d mismatches.", replayed, path, len(mismatches))
+        print(f"Replayed {replayed} entries from {path}: {len(mismatches)} mismatch(es)")
+        for entry, outcome, result in mismatches[:MAX_REPORTED_MISMATCHES]:
+            print(f"  {entry.line}: expected {entry.result if entry.outcome == 'ok' else entry.outcome}, "
+                  f"got {result if outcome == 'ok' else outcome}")
+        if mismatches:
+            report_error("replay_mismatch")
+
+# Expose the ReplayCommand class for external use
+__all__ = ["ReplayCommand"]
@@ -0,0 +1,41 @@
+"""
+Module for the SqrtCommand class that computes the square root of a number.
+
+This module defines the SqrtCommand class, which computes the square root of
+a number with the session's numeric backend (see calculator.bigmath), by
+Newton's iteration with precision doubling at high precision.
+"""
+
+import logging
+from calculator import bigmath
+from calculator.signatures import Param, Signature
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class SqrtCommand(bigmath.FunctionCommand):
+    """
+    SqrtCommand class to compute the square root of a number.
+
+    This command class inherits from the FunctionCommand class, which computes
+    the calculate method with the session's numeric backend and prints the result.
+    """
+
+    signature = Signature(Param("x", bigmath.number))
+    label = "square root"
+
+    def calculate(self, x):  # pylint: disable=arguments-differ
+        """
+        Computes the square root.
+
+        Args:
+            x (number): A non-negative number.
+
+        Returns:
+            number: The square root of x.
+        """
+        return bigmath.sqrt(x)
+
+# Expose the SqrtCommand class for external use
+__all__ = ["SqrtCommand"]
@@ -0,0 +1,65 @@
+"""
+Module for the StatsCommand class.
+
+This module provides the StatsCommand class, which displays the per-command
+metrics recorded by the command handler: call and error counts and latency
+estimates taken from the latency histograms.
+"""
+
+import logging
+from calculator.commands import Command
+from calculator.signatures import Param, Signature
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class StatsCommand(Command):
+    """
+    StatsCommand class to display command metrics.
+
+    This command class inherits from the Command class and implements the
+    execute method to print a table of the metrics of every command run so far.
+    """
+
+    signature = Signature(Param("action", optional=True, choices=("reset",)))
+
+    def __init__(self, command_handler):
+        """
+        Initializes the StatsCommand with a reference to the command handler.
+
+        Args:
+            command_handler: The handler whose metrics are displayed.
+        """
+        self.command_handler = command_handler
+
+    def execute(self, action=None):
+        """
+        Prints the metrics of every command, or resets them with `stats reset`.
+
+        Args:
+            action (str): None, or "reset".
+        """
+        metrics = self.command_handler.metrics
+        if metrics is None:
+            print("Metrics are disabled (CALCULATOR_METRICS=false).")
+            return
+        if action == "reset":
+            metrics.reset()
+            logger.info("Command metrics reset.")
+            print("Metrics reset.")
+            return
+
+        logger.info("Displaying metrics for %d commands.", len(metrics.commands))
+        print(f"{'command':<12} {'calls':>8} {'errors':>7} {'mean ms':>9} {'p50 ms':>8} {'p99 ms':>8}  error kinds")
+        for name, stats in sorted(metrics.commands.items()):
+            errors = sum(stats.errors.values())
+            mean = stats.total_seconds / stats.calls * 1000
+            kinds = ", ".join(f"{kind}={count}" for kind, count in sorted(stats.errors.items()))
+            row = (f"{name:<12} {stats.calls:>8} {errors:>7} {mean:>9.3f} "
+                   f"{stats.quantile(0.5, metrics.bounds) * 1000:>8.3f} "
+                   f"{stats.quantile(0.99, metrics.bounds) * 1000:>8.3f}  {kinds}")
+            print(row.rstrip())
+
+# Expose the StatsCommand class for external use
+__all__ = ["StatsCommand"]
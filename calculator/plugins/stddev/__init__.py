@@ -0,0 +1,40 @@
+"""
+Module for the StddevCommand class that computes the sample standard deviation of numbers.
+
+This module defines the StddevCommand class, which reads numbers, inline
+lists, vector files, text files or standard input in one pass (see
+calculator.streamstats) and prints the sample standard deviation of the
+values, computed with Welford's algorithm, as for the var command.
+"""
+
+import logging
+from calculator import streamstats
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class StddevCommand(streamstats.StatisticCommand):
+    """
+    StddevCommand class to compute the sample standard deviation of numbers.
+
+    This command class inherits from the StatisticCommand class, which reads
+    the sources and prints the statistic computed by the statistic method.
+    """
+
+    label = "standard deviation"
+
+    def statistic(self, stats):
+        """
+        Computes the sample standard deviation of the values.
+
+        Args:
+            stats (StreamingStats): The summary of the values.
+
+        Returns:
+            number: The sample standard deviation of the values.
+        """
+        return stats.stddev()
+
+# Expose the StddevCommand class for external use
+__all__ = ["StddevCommand"]
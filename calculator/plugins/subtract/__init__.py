@@ -1,13 +1,17 @@
 """
 Module for the SubtractCommand class.
 
-This module provides the SubtractCommand class, which performs the subtraction 
-of two numerical arguments while handling invalid input errors.
+This module provides the SubtractCommand class, which subtracts the second and
+any further numerical arguments or vectors from the first while handling
+invalid input errors.
 """
 
 import logging
-from decimal import Decimal, InvalidOperation
-from calculator.commands import Command
+from decimal import InvalidOperation, Overflow
+from calculator.commands import Command, report_error, report_result
+from calculator.numeric import current_backend
+from calculator.signatures import Param, Signature
+from calculator.vectors import ShapeMismatch, fold, operand
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,27 +19,52 @@ logger = logging.getLogger(__name__)
 
 class SubtractCommand(Command):
     """
-    SubtractCommand class for subtracting two numbers.
+    SubtractCommand class for subtracting numbers.
 
     This class inherits from the Command class and implements the execute method
-    to subtract two numerical arguments.
+    to subtract numerical arguments or vectors from left to right.
     """
 
-    def execute(self, *args):
+    pure = True
+    signature = Signature(Param("operand", operand, variadic=True, min_count=2))
+
+    def execute(self, *operands):
         """
         Executes the subtract command.
 
-        This method takes two arguments, subtracts them, and prints the result. If
-        the inputs are invalid, an error message is displayed.
+        This method takes two or more operands, subtracts them from left to right,
+        and prints the result. If the subtraction is invalid, an error message is displayed.
         """
         try:
-            a, b = map(Decimal, args)
-            difference = a - b
+            difference = fold(self.calculate, operands, current_backend(), "subtract")
             print(f"The solution of subtraction is {difference}")
-            logger.info("Subtraction result: %s", {difference})
+            report_result(difference)
+            logger.info("Subtraction result: %s", difference)
         except InvalidOperation:
             print("Error: Invalid input. Please enter valid numbers.")
+            report_error("invalid_input")
             logger.error("Invalid input during subtraction.")
+        except Overflow as e:
+            report_error("overflow")
+            logger.error("Overflow in subtraction: %s", e)
+            print("Error: The result is not a finite number.")
+        except ShapeMismatch as e:
+            print(f"Error: {e}")
+            report_error("shape_mismatch")
+            logger.error("Shape mismatch during subtraction: %s", e)
+
+    def calculate(self, left, right):
+        """
+        Subtracts the second number from the first.
+
+        Args:
+            left (number): The first operand.
+            right (number): The second operand.
+
+        Returns:
+            number: The difference, of the operands' type.
+        """
+        return left - right
 
 # Expose the SubtractCommand class for external use
 __all__ = ["SubtractCommand"]
@@ -0,0 +1,41 @@
+"""
+Module for the SumCommand class that computes the compensated sum of numbers.
+
+This module defines the SumCommand class, which reads numbers, inline lists,
+vector files, text files or standard input in one pass (see
+calculator.streamstats) and prints the compensated sum of the values,
+computed with Neumaier-compensated summation, so long streams do not drift
+the way chained `add` calls do.
+"""
+
+import logging
+from calculator import streamstats
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class SumCommand(streamstats.StatisticCommand):
+    """
+    SumCommand class to compute the compensated sum of numbers.
+
+    This command class inherits from the StatisticCommand class, which reads
+    the sources and prints the statistic computed by the statistic method.
+    """
+
+    label = "sum"
+
+    def statistic(self, stats):
+        """
+        Computes the compensated sum of the values.
+
+        Args:
+            stats (StreamingStats): The summary of the values.
+
+        Returns:
+            number: The compensated sum of the values.
+        """
+        return stats.sum
+
+# Expose the SumCommand class for external use
+__all__ = ["SumCommand"]
@@ -0,0 +1,41 @@
+"""
+Module for the VarCommand class that computes the sample variance of numbers.
+
+This module defines the VarCommand class, which reads numbers, inline lists,
+vector files, text files or standard input in one pass (see
+calculator.streamstats) and prints the sample variance of the values,
+computed with Welford's algorithm, which stays accurate when the values are
+large and close together.
+"""
+
+import logging
+from calculator import streamstats
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class VarCommand(streamstats.StatisticCommand):
+    """
+    VarCommand class to compute the sample variance of numbers.
+
+    This command class inherits from the StatisticCommand class, which reads
+    the sources and prints the statistic computed by the statistic method.
+    """
+
+    label = "variance"
+
+    def statistic(self, stats):
+        """
+        Computes the sample variance of the values.
+
+        Args:
+            stats (StreamingStats): The summary of the values.
+
+        Returns:
+            number: The sample variance of the values.
+        """
+        return stats.variance()
+
+# Expose the VarCommand class for external use
+__all__ = ["VarCommand"]
@@ -7,6 +7,7 @@ message when executed.
 
 import logging
 from calculator.commands import Command
+from calculator.signatures import Signature
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +21,8 @@ class WelcomeCommand(Command):
     to display a welcome message when executed.
     """
 
+    signature = Signature()
+
     def execute(self):
         """
         Executes the welcome command.
@@ -0,0 +1,345 @@
+"""
+Module for serving the calculator to many clients from one process.
+
+The CalculatorServer class accepts TCP or Unix socket connections with
+asyncio and executes each line a client sends through a single, already
+initialized CommandHandler, so logging, settings and plugins are set up
+once for all clients. Commands run on a thread pool, so a slow command (or
+one waiting for its deadline, see calculator.deadlines) does not stall the
+event loop and the other clients.
+
+Every connection gets its own remote Session (for example its own `let`
+variables). Remote sessions may not use the server's files or standard
+input: file operands, "-" and the local-only commands such as `column` and
+`history` are refused, and their commands are not journaled.
+
+Protocol: the client sends one command per line. For each line the server
+answers with a header line "<outcome> <length>", where outcome is "ok" or an
+error kind such as "division_by_zero", followed by the <length> bytes of
+UTF-8 text the command printed, so responses of any size are framed exactly.
+Sending "quit" closes the connection. Responses are written in request
+order, and the server waits for each response to drain before reading the
+next request, so a client that stops reading stops being served instead of
+growing server memory.
+
+Addresses are written "tcp://HOST:PORT", "HOST:PORT" or "unix:PATH".
+"""
+
+import io
+import sys
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from calculator.commands import CommandHandler, capture_output, split_command_line
+from calculator.session import Session, use_session
+
+logger = logging.getLogger(__name__)
+
+MAX_LINE_LENGTH = 64 * 1024
+
+def parse_address(address: str):
+    """
+    Parses a server address.
+
+    Args:
+        address (str): "tcp://HOST:PORT", "HOST:PORT" or "unix:PATH".
+
+    Returns:
+        tuple: ("unix", path) or ("tcp", (host, port)).
+
+    Raises:
+        ValueError: If the address cannot be parsed.
+    """
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    if address.startswith("tcp://"):
+        address = address[len("tcp://"):]
+    host, separator, port = address.rpartition(":")
+    if not separator or not port.isdigit():
+        raise ValueError(f"Invalid server address {address!r}, expected HOST:PORT or unix:PATH")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+def format_response(outcome: str, output: str) -> bytes:
+    """
+    Encodes a response in the line protocol.
+
+    Args:
+        outcome (str): "ok" or an error kind.
+        output (str): The text the command printed.
+
+    Returns:
+        bytes: The header line followed by the encoded output.
+    """
+    body = output.encode()
+    return f"{outcome} {len(body)}\n".encode() + body
+
+class CalculatorServer:
+    """
+    asyncio server executing client command lines through one CommandHandler.
+
+    Attributes:
+        command_handler (CommandHandler): Executes the commands of every client.
+        connections (int): The number of currently open connections.
+        requests (int): The number of requests served so far.
+    """
+
+    def __init__(self, command_handler: CommandHandler, max_workers: int = None):
+        """
+        Initializes the CalculatorServer.
+
+        Args:
+            command_handler (CommandHandler): The handler with the plugins already loaded.
+            max_workers (int): The number of threads commands run on. Defaults to the ThreadPoolExecutor default.
+        """
+        self.command_handler = command_handler
+        self.connections = 0
+        self.requests = 0
+        self._server = None
+        self._tasks = set()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="server")
+
+    def execute_line(self, line: str, session: Session = None) -> bytes:
+        """
+        Executes one command line and encodes the response.
+
+        Runs on a worker thread; the printed output is captured per thread (see
+        capture_output()), so output of two clients cannot mix.
+
+        Args:
+            line (str): The command line.
+            session (Session): The client's session. Defaults to a new remote session.
+
+        Returns:
+            bytes: The encoded response.
+        """
+        command_name, args = split_command_line(line)
+        if not command_name:
+            return format_response("invalid_command", "Please enter a valid command.")
+        output = io.StringIO()  # Replaced by the capture; empty if the capture could not start.
+        try:
+            with use_session(session if session is not None else Session(remote=True)), capture_output() as output:
+                outcome = self.command_handler.execute_command(command_name, *args).outcome
+        except (Exception, SystemExit) as e:  # pylint: disable=broad-exception-caught
+            # A command calling sys.exit() (such as quit) must not end the worker thread without a response.
+            logger.error("Command %r raised %s: %s", line, type(e).__name__, e)
+            outcome = "exception"
+            output.write(f"Error: {type(e).__name__}: {e}\n")
+        return format_response(outcome, output.getvalue())
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serves one client connection until it sends quit or disconnects.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's reader.
+            writer (asyncio.StreamWriter): The connection's writer.
+        """
+        self.connections += 1
+        self._tasks.add(asyncio.current_task())
+        loop = asyncio.get_running_loop()
+        session = Session(remote=True)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # Over-long line or reset connection.
+                if not line:
+                    break
+                text = line.decode("utf-8", "replace").strip()
+                if text.lower() == "quit":
+                    break
+                self.requests += 1
+                writer.write(await loop.run_in_executor(self._executor, self.execute_line, text, session))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            self._tasks.discard(asyncio.current_task())
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self, address: str):
+        """
+        Starts listening on an address.
+
+        Args:
+            address (str): "tcp://HOST:PORT", "HOST:PORT" or "unix:PATH". Port 0 picks a free port.
+
+        Returns:
+            asyncio.Server: The listening server.
+        """
+        kind, where = parse_address(address)
+        if kind == "unix":
+            self._server = await asyncio.start_unix_server(self.handle_connection, where, limit=MAX_LINE_LENGTH)
+        else:
+            host, port = where
+            self._server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_LENGTH,
+                                                      backlog=1024)
+        logger.info("Calculator server listening on %s", self.addresses())
+        return self._server
+
+    def addresses(self) -> list:
+        """
+        Returns the addresses the server is listening on.
+
+        Returns:
+            list: Addresses in the form accepted by start() and CalculatorClient.
+        """
+        result = []
+        for listening_socket in self._server.sockets:
+            name = listening_socket.getsockname()
+            result.append(f"unix:{name}" if isinstance(name, str) else f"{name[0]}:{name[1]}")
+        return result
+
+    async def close(self, timeout: float = 5.0):
+        """
+        Stops accepting connections, waits for open connections to finish and stops the worker threads.
+
+        Args:
+            timeout (float): Seconds to wait before cancelling connections that are still open.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._tasks:
+            _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+            for task in pending:
+                task.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def serve_forever(self, address: str):
+        """
+        Listens on an address and serves clients until cancelled.
+
+        Args:
+            address (str): "tcp://HOST:PORT", "HOST:PORT" or "unix:PATH".
+        """
+        server = await self.start(address)
+        async with server:
+            await server.serve_forever()
+
+class CalculatorClient:
+    """
+    asyncio client for the calculator server's line protocol.
+
+    Requests may be pipelined: send() several lines, then read the responses
+    in order with receive().
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, address: str):
+        """
+        Connects to a calculator server.
+
+        Args:
+            address (str): "tcp://HOST:PORT", "HOST:PORT" or "unix:PATH".
+
+        Returns:
+            CalculatorClient: The connected client.
+        """
+        kind, where = parse_address(address)
+        if kind == "unix":
+            reader, writer = await asyncio.open_unix_connection(where, limit=MAX_LINE_LENGTH)
+        else:
+            reader, writer = await asyncio.open_connection(*where, limit=MAX_LINE_LENGTH)
+        return cls(reader, writer)
+
+    def send(self, line: str):
+        """
+        Queues one command line for sending.
+
+        Args:
+            line (str): The command line.
+        """
+        self.writer.write(line.strip().encode() + b"\n")
+
+    async def receive(self):
+        """
+        Reads the next response.
+
+        Returns:
+            tuple: The outcome and the list of output lines.
+
+        Raises:
+            ConnectionError: If the server closed the connection.
+        """
+        header = await self.reader.readline()
+        if not header:
+            raise ConnectionError("Connection closed by the calculator server")
+        outcome, length = header.decode().split()
+        try:
+            body = await self.reader.readexactly(int(length))
+        except asyncio.IncompleteReadError:
+            raise ConnectionError("Connection closed by the calculator server") from None
+        return outcome, body.decode().splitlines()
+
+    async def request(self, line: str):
+        """
+        Sends one command line and waits for its response.
+
+        Args:
+            line (str): The command line.
+
+        Returns:
+            tuple: The outcome and the list of output lines.
+        """
+        self.send(line)
+        await self.writer.drain()
+        return await self.receive()
+
+    async def close(self):
+        """Says quit and closes the connection."""
+        try:
+            self.writer.write(b"quit\n")
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+async def run_client(address: str, stream=None, output=None) -> int:
+    """
+    Sends command lines from a stream to a server and prints the responses.
+
+    Args:
+        address (str): The server address.
+        stream: An iterable of command lines. Defaults to sys.stdin.
+        output: The text stream responses are written to. Defaults to sys.stdout.
+
+    Returns:
+        int: 0 if every command succeeded, 1 otherwise.
+    """
+    stream = stream if stream is not None else sys.stdin
+    output = output if output is not None else sys.stdout
+    client = await CalculatorClient.connect(address)
+    status = 0
+    try:
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            if line.lower() == "quit":
+                break
+            outcome, lines = await client.request(line)
+            for text in lines:
+                output.write(text + "\n")
+            output.flush()
+            if outcome != "ok":
+                status = 1
+    finally:
+        await client.close()
+    return status
+
+__all__ = ["CalculatorServer", "CalculatorClient", "run_client", "parse_address", "format_response"]
@@ -0,0 +1,74 @@
+"""
+Module for per-session calculator state.
+
+A Session holds the state that belongs to one user of the calculator rather
+than to the command handler, such as expression variables bound with `let`
+and the numeric backend chosen with `mode`. Sessions of network clients
+are marked remote, which keeps them away from the server's files, standard
+input and history journal. Sessions whose standard input is not the user's,
+such as batches read from stdin, are marked non-interactive, so commands do
+not read standard input as data.
+Commands look the session up with current_session(). The interactive CLI
+uses a single process-wide session; callers serving several users set their
+own session for the duration of each request with use_session().
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+class Session:
+    """
+    State belonging to one calculator session.
+
+    Attributes:
+        variables (dict): Expression variables bound in this session, by name.
+        backend (NumericBackend): The numeric backend chosen for this session, or None for the default.
+        remote (bool): True for the session of a network client, which may not read or write the
+            server's files or standard input, or use its history journal.
+        interactive (bool): True if commands may read standard input as data, as `sum -` does.
+    """
+
+    def __init__(self, remote: bool = False, interactive: bool = None):
+        """
+        Initializes the Session.
+
+        Args:
+            remote (bool): True for the session of a network client.
+            interactive (bool): Whether commands may read standard input. Defaults to True for local sessions.
+        """
+        self.variables = {}
+        self.backend = None
+        self.remote = remote
+        self.interactive = not remote if interactive is None else interactive and not remote
+
+_default_session = Session()
+_current_session: ContextVar = ContextVar("current_session", default=None)
+
+def current_session() -> Session:
+    """
+    Returns the session of the current caller.
+
+    Returns:
+        Session: The session set with use_session(), or the process-wide default session.
+    """
+    session = _current_session.get()
+    return session if session is not None else _default_session
+
+@contextmanager
+def use_session(session: Session):
+    """
+    Makes a session current for the duration of a with block.
+
+    Args:
+        session (Session): The session to use.
+
+    Yields:
+        Session: The session.
+    """
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(token)
+
+__all__ = ["Session", "current_session", "use_session"]
@@ -0,0 +1,150 @@
+"""
+Module for the calculator's settings.
+
+Settings is a read-only, typed view of the process environment. Nothing is
+copied: lookups read os.environ directly. The .env file is loaded into the
+environment on first access rather than at startup, and python-dotenv is
+only imported if a .env file actually exists, so short-lived invocations
+that never read a setting do not pay for it.
+"""
+
+import os
+import logging
+from collections.abc import Mapping
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+
+def find_env_file(start: str = None):
+    """
+    Finds the .env file the way python-dotenv's load_dotenv() does when called from this package.
+
+    The search starts in the calculator package directory and walks up to the filesystem root.
+
+    Args:
+        start (str): The directory to start from. Defaults to the calculator package directory.
+
+    Returns:
+        str: The path of the nearest .env file, or None if there is none.
+    """
+    directory = os.path.abspath(start or os.path.dirname(os.path.dirname(__file__)))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+class Settings(Mapping):
+    """
+    Lazy, read-only view of the environment with typed accessors.
+
+    Attributes:
+        environ (Mapping): The underlying environment, os.environ by default.
+    """
+
+    def __init__(self, environ=None, env_file_search: str = None):
+        """
+        Initializes the Settings view without reading anything.
+
+        Args:
+            environ (Mapping): The environment to view. Defaults to os.environ.
+            env_file_search (str): The directory to start the .env search from.
+        """
+        self.environ = environ if environ is not None else os.environ
+        self._env_file_search = env_file_search
+        self._loaded = environ is not None
+
+    def load(self):
+        """
+        Loads the .env file into the environment, once. Existing variables are not overridden.
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        path = find_env_file(self._env_file_search)
+        if path is not None:
+            from dotenv import load_dotenv  # pylint: disable=import-outside-toplevel
+            load_dotenv(path)
+            logging.info("Environment variables loaded from %s.", path)
+
+    def __getitem__(self, key):
+        self.load()
+        return self.environ[key]
+
+    def __iter__(self):
+        self.load()
+        return iter(self.environ)
+
+    def __len__(self):
+        self.load()
+        return len(self.environ)
+
+    def get_str(self, key: str, default: str = None) -> str:
+        """
+        Returns a setting as a string.
+
+        Args:
+            key (str): The setting name.
+            default (str): The value if the setting is unset or empty.
+
+        Returns:
+            str: The setting value.
+        """
+        value = self.get(key)
+        return value if value else default
+
+    def get_bool(self, key: str, default: bool = False) -> bool:
+        """
+        Returns a setting as a boolean (1/true/yes/on or 0/false/no/off, case-insensitive).
+
+        Args:
+            key (str): The setting name.
+            default (bool): The value if the setting is unset or empty.
+
+        Returns:
+            bool: The setting value.
+
+        Raises:
+            ValueError: If the value is not a recognized boolean.
+        """
+        value = self.get_str(key)
+        if value is None:
+            return default
+        if value.lower() in _TRUE:
+            return True
+        if value.lower() in _FALSE:
+            return False
+        raise ValueError(f"Setting {key} must be a boolean, got {value!r}")
+
+    def get_int(self, key: str, default: int = None) -> int:
+        """
+        Returns a setting as an integer.
+
+        Args:
+            key (str): The setting name.
+            default (int): The value if the setting is unset or empty.
+
+        Returns:
+            int: The setting value.
+        """
+        value = self.get_str(key)
+        return default if value is None else int(value)
+
+    def get_float(self, key: str, default: float = None) -> float:
+        """
+        Returns a setting as a float.
+
+        Args:
+            key (str): The setting name.
+            default (float): The value if the setting is unset or empty.
+
+        Returns:
+            float: The setting value.
+        """
+        value = self.get_str(key)
+        return default if value is None else float(value)
+
+__all__ = ["Settings", "find_env_file"]
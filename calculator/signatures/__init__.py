@@ -0,0 +1,212 @@
+"""
+Module for declarative command signatures.
+
+A command declares the arguments it takes as a class attribute,
+
+    class RecallCommand(Command):
+        signature = Signature(Param("n", int, minimum=1))
+
+and CommandHandler compiles the signature once, when the command is
+registered, into a parser specialized for it. On every call the handler
+runs the parser and invokes the command with the converted values, so the
+command itself no longer checks arity, converts strings or handles
+conversion errors, and every command reports bad arguments the same way:
+"invalid_arity" for a wrong number of arguments and "invalid_input" for an
+argument that does not convert or is out of range, with a usage line.
+
+Omitted optional parameters are not passed at all, so the defaults of the
+command's execute() method apply. Commands without a signature receive the
+raw argument strings, as before.
+"""
+
+from decimal import InvalidOperation
+
+# Exceptions a converter raises for text it cannot convert.
+CONVERSION_ERRORS = (ValueError, TypeError, ArithmeticError, InvalidOperation)
+
+class SignatureError(Exception):
+    """
+    Raised by a compiled parser for arguments that do not match the signature.
+
+    Attributes:
+        kind (str): The error kind reported for the command, "invalid_arity" or "invalid_input".
+    """
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+
+class Param:
+    """
+    One declared parameter.
+
+    Attributes:
+        name (str): The parameter name shown in usage lines.
+        type (callable): Converts the argument text, raising ValueError or InvalidOperation if it cannot.
+        optional (bool): Whether the argument may be omitted; only trailing parameters may be optional.
+        choices (tuple): The allowed converted values, or None for any.
+        minimum: The smallest allowed converted value, or None.
+        maximum: The largest allowed converted value, or None.
+        variadic (bool): Whether the parameter takes all remaining arguments; only the last may be variadic.
+        min_count (int): The minimum number of arguments a variadic parameter takes.
+    """
+
+    __slots__ = ("name", "type", "optional", "choices", "minimum", "maximum", "variadic", "min_count")
+
+    def __init__(self, name: str, type=str, *, optional: bool = False, choices=None,  # pylint: disable=redefined-builtin,too-many-arguments
+                 minimum=None, maximum=None, variadic: bool = False, min_count: int = 0):
+        self.name = name
+        self.type = type
+        self.optional = optional
+        self.choices = tuple(choices) if choices is not None else None
+        self.minimum = minimum
+        self.maximum = maximum
+        self.variadic = variadic
+        self.min_count = min_count
+
+    def usage(self) -> str:
+        """
+        Returns the parameter as shown in a usage line.
+
+        Returns:
+            str: e.g. "N", "[COUNT]" or "OPERAND OPERAND [OPERAND ...]".
+        """
+        name = "|".join(map(str, self.choices)) if self.choices else self.name.upper()
+        if self.variadic:
+            return " ".join([name] * self.min_count + [f"[{name} ...]"])
+        return f"[{name}]" if self.optional else name
+
+    def compile(self, usage: str):
+        """
+        Builds the function converting and validating one argument.
+
+        Args:
+            usage (str): The command's usage line, for error messages.
+
+        Returns:
+            callable: Takes the argument text and returns the converted value.
+        """
+        name, convert, choices = self.name, self.type, self.choices
+        minimum, maximum = self.minimum, self.maximum
+
+        def invalid(message: str):
+            return SignatureError("invalid_input", f"{message}. Usage: {usage}")
+
+        if choices is None and minimum is None and maximum is None:
+            if convert is str:
+                return str
+
+            def convert_only(text: str):
+                try:
+                    return convert(text)
+                except CONVERSION_ERRORS:
+                    raise invalid(f"Invalid {name}: {text!r}") from None
+            return convert_only
+
+        def check(text: str):
+            try:
+                value = convert(text)
+            except CONVERSION_ERRORS:
+                raise invalid(f"Invalid {name}: {text!r}") from None
+            if choices is not None and value not in choices:
+                raise invalid(f"{name} must be one of {', '.join(map(str, choices))}, got {text!r}")
+            if minimum is not None and value < minimum:
+                raise invalid(f"{name} must be at least {minimum}, got {text}")
+            if maximum is not None and value > maximum:
+                raise invalid(f"{name} must be at most {maximum}, got {text}")
+            return value
+        return check
+
+class Signature:
+    """
+    The declared parameters of a command.
+
+    Attributes:
+        params (tuple): The parameters, in order.
+    """
+
+    def __init__(self, *params: Param):
+        """
+        Initializes the Signature.
+
+        Args:
+            *params (Param): The parameters, in order.
+
+        Raises:
+            ValueError: If a required parameter follows an optional one, or a variadic one is not last.
+        """
+        for index, param in enumerate(params):
+            if param.variadic and index != len(params) - 1:
+                raise ValueError(f"Only the last parameter may be variadic, not {param.name}")
+            if not param.optional and not param.variadic and any(p.optional for p in params[:index]):
+                raise ValueError(f"Required parameter {param.name} follows an optional one")
+        self.params = params
+
+    def usage(self, command_name: str) -> str:
+        """
+        Returns the usage line of a command with this signature.
+
+        Args:
+            command_name (str): The command name.
+
+        Returns:
+            str: e.g. "recall N".
+        """
+        return " ".join([command_name] + [param.usage() for param in self.params])
+
+    def compile(self, command_name: str):
+        """
+        Builds the parser for this signature.
+
+        Args:
+            command_name (str): The name the command is registered under, for usage lines.
+
+        Returns:
+            callable: Takes the tuple of argument strings and returns the tuple of converted
+                values, raising SignatureError if they do not match.
+        """
+        usage = self.usage(command_name)
+        variadic = self.params[-1] if self.params and self.params[-1].variadic else None
+        fixed = self.params[:-1] if variadic else self.params
+        checks = tuple(param.compile(usage) for param in fixed)
+        minimum = sum(1 for param in fixed if not param.optional) + (variadic.min_count if variadic else 0)
+        maximum = None if variadic else len(fixed)
+        arity_message = f"Wrong number of arguments. Usage: {usage}"
+
+        if variadic is None and not checks:
+            def parse_none(args: tuple) -> tuple:
+                if args:
+                    raise SignatureError("invalid_arity", arity_message)
+                return args
+            return parse_none
+
+        if variadic is None:
+            def parse_fixed(args: tuple) -> tuple:
+                if not minimum <= len(args) <= maximum:
+                    raise SignatureError("invalid_arity", arity_message)
+                return tuple(check(arg) for check, arg in zip(checks, args))
+            return parse_fixed
+
+        rest = variadic.compile(usage)
+        if not fixed and variadic.choices is None and variadic.minimum is None and variadic.maximum is None:
+            # The common case of the arithmetic commands: any number of arguments of one type.
+            # The bare converter is mapped; only a failing call is repeated to report the argument.
+            convert = variadic.type
+            def parse_variadic(args: tuple) -> tuple:
+                if len(args) < minimum:
+                    raise SignatureError("invalid_arity", arity_message)
+                try:
+                    return tuple(map(convert, args))
+                except CONVERSION_ERRORS:
+                    return tuple(map(rest, args))
+            return parse_variadic
+
+        def parse(args: tuple) -> tuple:
+            if len(args) < minimum:
+                raise SignatureError("invalid_arity", arity_message)
+            count = len(checks)
+            return (tuple(check(arg) for check, arg in zip(checks, args[:count]))
+                    + tuple(map(rest, args[count:])))
+        return parse
+
+__all__ = ["Signature", "Param", "SignatureError", "CONVERSION_ERRORS"]
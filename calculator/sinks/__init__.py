@@ -0,0 +1,343 @@
+"""
+Module for rendering command results through interchangeable output sinks.
+
+execute_command returns a CommandContext, the structured result of a
+command: its operation (command_name), status (outcome) and value (result).
+A sink turns these results into one output format:
+
+    text     what the commands print, as at the interactive prompt
+    jsonl    one JSON object per result
+    csv      operation,args,status,value rows after a header row
+    binary   length-prefixed records (see BinarySink), read back with read_binary()
+
+Every sink buffers its writes and hands them to the underlying stream in
+large chunks, so a batch of small results does not cost a write each. Call
+flush() (or close(), or use the sink as a context manager) when done.
+
+Exact numbers (Decimal, Fraction) are written as text so no precision is
+lost; floats and integers are written as JSON numbers.
+"""
+
+import sys
+import csv
+import json
+import math
+import struct
+from json.encoder import encode_basestring as encode_string
+from array import array
+from numbers import Integral
+from calculator.vectors import Vector
+
+DEFAULT_BUFFER_SIZE = 65536
+
+BINARY_MAGIC = b"CALCB\x01"
+# Record header: operation length, status length, value kind, payload length.
+_RECORD = struct.Struct("<HHBI")
+VALUE_NONE, VALUE_TEXT, VALUE_FLOAT, VALUE_INTEGER, VALUE_FLOAT_VECTOR, VALUE_TEXT_VECTOR = range(6)
+
+def value_text(value) -> str:
+    """
+    Formats a result value as text, vectors in full as [a,b,c].
+
+    Args:
+        value: The result value.
+
+    Returns:
+        str: The text, or "" for None.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, Vector):
+        return "[" + ",".join(map(str, value.tolist())) + "]"
+    return str(value)
+
+def json_value(value):
+    """
+    Converts a result value to a JSON-compatible value.
+
+    Args:
+        value: The result value.
+
+    Returns:
+        None, bool, int, float, str or list: Exact numbers become strings.
+    """
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, Integral):
+        return int(value)
+    if isinstance(value, float):
+        return value if math.isfinite(value) else str(value)
+    if isinstance(value, Vector):
+        return [json_value(item) for item in value.tolist()]
+    return str(value)
+
+class DiscardStream:
+    """
+    Text stream that drops everything written to it, for the printed text of commands
+    whose results go to a structured sink.
+    """
+
+    def write(self, text: str) -> int:
+        """Drops the text; returns its length as if it had been written."""
+        return len(text)
+
+    def flush(self):
+        """Does nothing; nothing is buffered."""
+
+class Sink:
+    """
+    Base class of the output sinks: a buffered writer that renders results.
+
+    Attributes:
+        stream: The underlying stream, text or binary depending on the sink.
+        buffer_size (int): The number of buffered characters or bytes that triggers a flush.
+    """
+
+    format = None
+    empty = ""
+
+    def __init__(self, stream=None, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        Initializes the Sink.
+
+        Args:
+            stream: The stream to write to. Defaults to sys.stdout (its binary buffer for binary sinks).
+            buffer_size (int): The number of buffered characters or bytes that triggers a flush.
+        """
+        self.stream = stream if stream is not None else self.default_stream()
+        self.buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+
+    def default_stream(self):
+        """Returns the stream written to when none is given."""
+        return sys.stdout
+
+    def write(self, data) -> int:
+        """
+        Buffers data, flushing to the underlying stream once the buffer is full.
+
+        Args:
+            data: The text (or bytes, for binary sinks) to write.
+
+        Returns:
+            int: The length of the data.
+        """
+        self._parts.append(data)
+        self._size += len(data)
+        if self._size >= self.buffer_size:
+            self.flush()
+        return len(data)
+
+    def emit(self, context):
+        """
+        Renders one result.
+
+        Args:
+            context (CommandContext): The result of a command.
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """Writes all buffered data to the underlying stream."""
+        if self._parts:
+            self.stream.write(self.empty.join(self._parts))
+            self._parts.clear()
+            self._size = 0
+        self.stream.flush()
+
+    def close(self):
+        """Flushes the sink; the underlying stream is left open."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class TextSink(Sink):
+    """
+    Writes what each command printed.
+
+    Text written to the sink directly, for example by redirecting stdout to it, is
+    passed through, so results without captured output add nothing more.
+    """
+
+    format = "text"
+
+    def emit(self, context):
+        if context.output:
+            self.write(context.output)
+
+class JsonLinesSink(Sink):
+    """
+    Writes each result as a JSON object on its own line, with the keys
+    operation, args, status and value.
+    """
+
+    format = "jsonl"
+
+    def __init__(self, stream=None, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        super().__init__(stream, buffer_size)
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+    def emit(self, context):
+        # The fixed keys are formatted directly; only lists and numbers go through the encoder.
+        value = json_value(context.result)
+        if value is None:
+            value = "null"
+        elif isinstance(value, str):
+            value = encode_string(value)
+        else:
+            value = self._encode(value)
+        self.write(f'{{"operation":{encode_string(context.command_name)},'
+                   f'"args":[{",".join(map(encode_string, context.args))}],'
+                   f'"status":{encode_string(context.outcome)},"value":{value}}}\n')
+
+class CsvSink(Sink):
+    """
+    Writes a header row and then one operation,args,status,value row per result;
+    the arguments are joined with spaces.
+    """
+
+    format = "csv"
+
+    def __init__(self, stream=None, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        super().__init__(stream, buffer_size)
+        self._writer = csv.writer(self, lineterminator="\n")
+        self._writer.writerow(("operation", "args", "status", "value"))
+
+    def emit(self, context):
+        self._writer.writerow((context.command_name, " ".join(context.args), context.outcome,
+                               value_text(context.result)))
+
+class BinarySink(Sink):
+    """
+    Writes results as compact binary records after the BINARY_MAGIC header.
+
+    Each record is a little-endian header (operation length: uint16, status length:
+    uint16, value kind: uint8, payload length: uint32) followed by the UTF-8 operation,
+    the UTF-8 status and the payload. Floats and float vectors are stored as float64,
+    integers as int64 when they fit, and exact numbers as UTF-8 text (vectors of them
+    comma separated).
+    """
+
+    format = "binary"
+    empty = b""
+
+    def __init__(self, stream=None, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        super().__init__(stream, buffer_size)
+        self.write(BINARY_MAGIC)
+
+    def default_stream(self):
+        return sys.stdout.buffer
+
+    def emit(self, context):
+        kind, payload = self.encode_value(context.result)
+        operation = context.command_name.encode()
+        status = context.outcome.encode()
+        self.write(_RECORD.pack(len(operation), len(status), kind, len(payload)) + operation + status + payload)
+
+    @staticmethod
+    def encode_value(value):
+        """
+        Encodes a result value.
+
+        Args:
+            value: The result value.
+
+        Returns:
+            tuple: The value kind and the payload bytes.
+        """
+        if value is None:
+            return VALUE_NONE, b""
+        if isinstance(value, float):
+            return VALUE_FLOAT, struct.pack("<d", value)
+        if isinstance(value, Integral) and not isinstance(value, bool) and -2 ** 63 <= value < 2 ** 63:
+            return VALUE_INTEGER, struct.pack("<q", value)
+        if not isinstance(value, Vector):
+            return VALUE_TEXT, str(value).encode()
+        values = value.values
+        if getattr(values, "dtype", None) is not None or isinstance(values, array):
+            data = array("d", values)
+            if sys.byteorder == "big":
+                data.byteswap()
+            return VALUE_FLOAT_VECTOR, data.tobytes()
+        return VALUE_TEXT_VECTOR, ",".join(map(str, values)).encode()
+
+def read_binary(stream):
+    """
+    Reads the records written by a BinarySink.
+
+    Args:
+        stream: A binary stream positioned at the BINARY_MAGIC header.
+
+    Yields:
+        tuple: The operation, status and value of each record. Exact numbers are
+            returned as text and vectors as lists.
+
+    Raises:
+        ValueError: If the stream is not a binary sink's output or is truncated.
+    """
+    if stream.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ValueError("not a calculator binary result stream")
+    while True:
+        header = stream.read(_RECORD.size)
+        if not header:
+            return
+        if len(header) != _RECORD.size:
+            raise ValueError("truncated record header")
+        operation_length, status_length, kind, payload_length = _RECORD.unpack(header)
+        body = stream.read(operation_length + status_length + payload_length)
+        if len(body) != operation_length + status_length + payload_length:
+            raise ValueError("truncated record")
+        operation = body[:operation_length].decode()
+        status = body[operation_length:operation_length + status_length].decode()
+        payload = body[operation_length + status_length:]
+        if kind == VALUE_NONE:
+            value = None
+        elif kind == VALUE_FLOAT:
+            (value,) = struct.unpack("<d", payload)
+        elif kind == VALUE_INTEGER:
+            (value,) = struct.unpack("<q", payload)
+        elif kind == VALUE_FLOAT_VECTOR:
+            data = array("d")
+            data.frombytes(payload)
+            if sys.byteorder == "big":
+                data.byteswap()
+            value = data.tolist()
+        elif kind == VALUE_TEXT_VECTOR:
+            value = payload.decode().split(",") if payload else []
+        else:
+            value = payload.decode()
+        yield operation, status, value
+
+SINKS = {sink.format: sink for sink in (TextSink, JsonLinesSink, CsvSink, BinarySink)}
+
+def create_sink(output_format: str, stream=None, buffer_size: int = DEFAULT_BUFFER_SIZE) -> Sink:
+    """
+    Creates the sink for an output format.
+
+    Args:
+        output_format (str): One of text, jsonl, csv or binary.
+        stream: The stream to write to. Defaults to sys.stdout. A binary sink given
+            a text stream writes to its binary buffer.
+        buffer_size (int): The number of buffered characters or bytes that triggers a flush.
+
+    Returns:
+        Sink: The sink.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    try:
+        sink_class = SINKS[output_format]
+    except KeyError:
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {', '.join(SINKS)}") from None
+    if sink_class is BinarySink and hasattr(stream, "encoding"):
+        stream = stream.buffer
+    return sink_class(stream, buffer_size)
+
+__all__ = ["Sink", "DiscardStream", "TextSink", "JsonLinesSink", "CsvSink", "BinarySink", "SINKS", "create_sink", "read_binary",
+           "value_text", "json_value", "BINARY_MAGIC", "DEFAULT_BUFFER_SIZE"]
@@ -0,0 +1,701 @@
+"""
+Module for single-pass summary statistics over streams of numbers.
+
+The statistics commands (sum, mean, var, stddev, min, max and quantile)
+read their values once, from any mix of sources:
+
+    3.5             a number
+    [1,2,3]         an inline list
+    @values.npy     a .npy file, or a raw float64 file with any other extension
+    @values.txt     a text file of numbers separated by whitespace or commas
+    -               the same, read from standard input
+
+(remote clients of the calculator server may only use numbers and lists, and
+"-" is only read in interactive sessions, not while standard input holds a
+batch of commands), and keep only a StreamingStats, whose size does not
+depend on the number of values: the count, a compensated (Neumaier) sum, the
+Welford mean and sum of squared deviations, the extremes, and, for the
+quantile command, a QuantileSketch. Files are read a chunk at a time. With `mode float`, each chunk is summarized at once
+(math.fsum, and NumPy when it is installed); the exact backends add value by
+value in their own number type.
+
+States are mergeable, so shards summarized separately (in other processes or
+on other machines, exchanged with to_dict() and from_dict()) combine into the
+statistics of the whole data set:
+
+    total = StreamingStats()
+    for state in shard_states:
+        total.merge(StreamingStats.from_dict(state))
+"""
+
+import sys
+import math
+import logging
+from abc import abstractmethod
+from array import array
+from collections import Counter
+from decimal import Decimal, InvalidOperation, Overflow
+from fractions import Fraction
+from calculator.commands import Command, report_error, report_result
+from calculator.numeric import FloatBackend, current_backend
+from calculator.session import current_session
+from calculator.signatures import Param, Signature
+from calculator.vectors import Vector, iter_array, numpy_module, parse_operand
+
+logger = logging.getLogger(__name__)
+
+# Values read from files and streams per batch.
+BATCH_SIZE = 65536
+
+# Files read as text rather than as binary arrays.
+TEXT_SUFFIXES = (".txt", ".csv")
+
+class StatisticsError(ValueError):
+    """Raised for a statistic that is undefined for the values seen, e.g. the mean of no values."""
+
+class _Bins:
+    """The bucket counts of one sign of a QuantileSketch."""
+
+    __slots__ = ("counts", "floor")
+
+    def __init__(self):
+        self.counts = {}
+        self.floor = None
+
+    def add(self, index: int, count: int, max_bins: int):
+        """
+        Counts values in a bucket, merging the buckets nearest zero beyond max_bins.
+
+        Args:
+            index (int): The bucket index.
+            count (int): The number of values.
+            max_bins (int): The most buckets kept.
+        """
+        if self.floor is not None and index < self.floor:
+            index = self.floor
+        counts = self.counts
+        counts[index] = counts.get(index, 0) + count
+        if len(counts) > max_bins:
+            # Merge the buckets closest to zero, where relative errors matter least.
+            keys = sorted(counts)
+            excess = len(keys) - max_bins
+            self.floor = keys[excess]
+            counts[self.floor] += sum(counts.pop(key) for key in keys[:excess])
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with a relative error guarantee (DDSketch).
+
+    A value x is counted in the logarithmic bucket ceil(log(|x|) / log(gamma)), with
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy), so every quantile is
+    returned within relative_accuracy of a value of the right rank. Two sketches
+    with the same accuracy merge by adding bucket counts. Beyond max_bins buckets per
+    sign, the buckets nearest zero are merged.
+
+    Attributes:
+        relative_accuracy (float): The relative error bound of the quantiles.
+        max_bins (int): The most buckets kept for positive values, and for negative ones.
+        count (int): The number of values added.
+        zeros (int): The number of values equal to zero.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        """
+        Initializes an empty QuantileSketch.
+
+        Args:
+            relative_accuracy (float): The relative error bound, between 0 and 1.
+            max_bins (int): The most buckets kept per sign.
+
+        Raises:
+            ValueError: If the accuracy is not between 0 and 1 or max_bins is not positive.
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"Relative accuracy must be between 0 and 1, got {relative_accuracy}")
+        if max_bins < 1:
+            raise ValueError(f"max_bins must be at least 1, got {max_bins}")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.count = 0
+        self.zeros = 0
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive = _Bins()
+        self._negative = _Bins()
+
+    def add(self, value):
+        """
+        Adds one value.
+
+        Args:
+            value: A number within the range of floats.
+
+        Raises:
+            ValueError: If the value is not a finite float.
+        """
+        number = float(value)
+        if number > 0:
+            bins = self._positive
+        elif number < 0:
+            bins, number = self._negative, -number
+        elif number == 0:
+            self.zeros += 1
+            self.count += 1
+            return
+        else:
+            raise ValueError(f"Not a finite number: {value}")
+        try:
+            index = math.ceil(math.log(number) / self._log_gamma)
+        except OverflowError:
+            raise ValueError(f"Cannot estimate quantiles of {value}: it is outside the range of floats") from None
+        bins.add(index, 1, self.max_bins)
+        self.count += 1
+
+    def add_floats(self, values):
+        """
+        Adds a batch of floats, such as an array("d").
+
+        Args:
+            values (iterable): Finite floats.
+
+        Raises:
+            ValueError: If a value is not finite.
+        """
+        log, ceil, log_gamma = math.log, math.ceil, self._log_gamma
+        try:
+            positive = Counter(ceil(log(value) / log_gamma) for value in values if value > 0)
+            negative = Counter(ceil(log(-value) / log_gamma) for value in values if value < 0)
+        except OverflowError:
+            raise ValueError("Not a finite number in the values") from None
+        zeros = len(values) - positive.total() - negative.total()
+        if zeros and zeros != sum(1 for value in values if value == 0):
+            raise ValueError("Not a finite number in the values")
+        for bins, counts in ((self._positive, positive), (self._negative, negative)):
+            for index, count in counts.items():
+                bins.add(index, count, self.max_bins)
+        self.zeros += zeros
+        self.count += len(values)
+
+    def add_array(self, values):
+        """
+        Adds the elements of a NumPy array at once.
+
+        Args:
+            values: A one-dimensional NumPy array of finite numbers.
+
+        Raises:
+            ValueError: If an element is not finite.
+        """
+        numpy = numpy_module()
+        values = numpy.asarray(values, dtype=numpy.float64)
+        if not numpy.isfinite(values).all():
+            raise ValueError("Not a finite number in the values")
+        for bins, magnitudes in ((self._positive, values[values > 0]), (self._negative, -values[values < 0])):
+            if len(magnitudes):
+                indexes = numpy.ceil(numpy.log(magnitudes) / self._log_gamma).astype(numpy.int64)
+                unique, counts = numpy.unique(indexes, return_counts=True)
+                for index, count in zip(unique.tolist(), counts.tolist()):
+                    bins.add(index, count, self.max_bins)
+        self.zeros += int(numpy.count_nonzero(values == 0))
+        self.count += len(values)
+
+    def merge(self, other: "QuantileSketch"):
+        """
+        Adds the values of another sketch to this one.
+
+        Args:
+            other (QuantileSketch): A sketch with the same relative accuracy.
+
+        Raises:
+            ValueError: If the relative accuracies differ.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError(f"Cannot merge sketches of relative accuracy {other.relative_accuracy} "
+                             f"and {self.relative_accuracy}")
+        for bins, counts in zip((self._positive, self._negative), other.bins()):
+            for index, count in counts.items():
+                bins.add(index, count, self.max_bins)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def bins(self) -> tuple:
+        """
+        Returns the bucket counts of the positive values and of the negative ones.
+
+        Returns:
+            tuple: Two dicts of counts by bucket index.
+        """
+        return self._positive.counts, self._negative.counts
+
+    def _value(self, index: int) -> float:
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def quantile(self, fraction: float) -> float:
+        """
+        Estimates a quantile.
+
+        Args:
+            fraction (float): The quantile, between 0 (the minimum) and 1 (the maximum).
+
+        Returns:
+            float: A value within relative_accuracy of the value of rank fraction * (count - 1).
+
+        Raises:
+            StatisticsError: If the sketch is empty.
+        """
+        if not self.count:
+            raise StatisticsError("quantile of no values")
+        rank = fraction * (self.count - 1)
+        seen = 0
+        for index in sorted(self._negative.counts, reverse=True):
+            seen += self._negative.counts[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        positive = sorted(self._positive.counts)
+        for index in positive:
+            seen += self._positive.counts[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(positive[-1])
+
+    def to_dict(self) -> dict:
+        """
+        Returns the sketch as JSON-serializable data.
+
+        Returns:
+            dict: The accuracy, counts and buckets.
+        """
+        return {"relative_accuracy": self.relative_accuracy, "max_bins": self.max_bins,
+                "count": self.count, "zeros": self.zeros,
+                "positive": sorted(self._positive.counts.items()), "positive_floor": self._positive.floor,
+                "negative": sorted(self._negative.counts.items()), "negative_floor": self._negative.floor}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        """
+        Rebuilds a sketch from to_dict() data.
+
+        Args:
+            data (dict): The data.
+
+        Returns:
+            QuantileSketch: The sketch.
+        """
+        sketch = cls(data["relative_accuracy"], data["max_bins"])
+        sketch.count, sketch.zeros = data["count"], data["zeros"]
+        for bins, name in ((sketch._positive, "positive"), (sketch._negative, "negative")):
+            bins.counts = {int(index): int(count) for index, count in data[name]}
+            bins.floor = data[f"{name}_floor"]
+        return sketch
+
+# Number types of the serialized states.
+_NUMBER_TYPES = {"int": int, "float": float, "decimal": Decimal, "fraction": Fraction}
+
+def _encode(value):
+    return None if value is None else [type(value).__name__.lower(), str(value)]
+
+def _decode(value):
+    return None if value is None else _NUMBER_TYPES[value[0]](value[1])
+
+def _sqrt(value):
+    if isinstance(value, Decimal):
+        return value.sqrt()
+    if isinstance(value, Fraction):
+        return Fraction(math.sqrt(value))
+    return math.sqrt(value)
+
+class StreamingStats:
+    """
+    Summary statistics of a stream of numbers, in constant memory.
+
+    Values are accumulated in their own type: floats, Decimals (in the current
+    decimal context) or Fractions.
+
+    Attributes:
+        count (int): The number of values.
+        minimum: The smallest value, or None.
+        maximum: The largest value, or None.
+        sketch (QuantileSketch): The quantile sketch of the values, or None if quantiles are not tracked.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048, quantiles: bool = True):
+        """
+        Initializes an empty StreamingStats.
+
+        Args:
+            relative_accuracy (float): The relative error bound of the quantiles.
+            max_bins (int): The most quantile sketch buckets kept per sign.
+            quantiles (bool): Whether to keep a quantile sketch. Without one, values need not fit in a float.
+        """
+        self.count = 0
+        self._sum = 0
+        self._compensation = 0
+        self._mean = 0
+        self._m2 = 0
+        self.minimum = None
+        self.maximum = None
+        self.sketch = QuantileSketch(relative_accuracy, max_bins) if quantiles else None
+
+    def _add_to_sum(self, value):
+        # Neumaier's variant of Kahan summation: the low-order part lost by each addition
+        # is accumulated separately, whichever operand is larger.
+        total = self._sum + value
+        if abs(self._sum) >= abs(value):
+            self._compensation += (self._sum - total) + value
+        else:
+            self._compensation += (value - total) + self._sum
+        self._sum = total
+
+    def add(self, value):
+        """
+        Adds one value.
+
+        Args:
+            value: A finite number.
+
+        Raises:
+            InvalidOperation: If quantiles are tracked and the value is not a finite float.
+        """
+        if self.sketch is not None:
+            try:
+                self.sketch.add(value)
+            except ValueError as e:
+                raise InvalidOperation(str(e)) from None
+        self.count += 1
+        self._add_to_sum(value)
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def update(self, values):
+        """
+        Adds a batch of values.
+
+        Float arrays (array("d") or NumPy arrays) are summarized at once; other
+        iterables are added value by value.
+
+        Args:
+            values: The values.
+
+        Raises:
+            InvalidOperation: If a value is not finite.
+            Overflow: If the sum of a float batch is too large to be finite.
+        """
+        numpy = numpy_module()
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            self._update_floats(numpy.asarray(values, dtype=numpy.float64), numpy)
+        elif isinstance(values, array) and values.typecode in "fd":
+            self._update_floats(values, None)
+        else:
+            for value in values:
+                self.add(value)
+
+    def _update_floats(self, values, numpy):
+        count = len(values)
+        if not count:
+            return
+        try:
+            if self.sketch is not None and numpy is not None:
+                self.sketch.add_array(values)
+            elif self.sketch is not None:
+                self.sketch.add_floats(values)
+            total = math.fsum(values)  # Raises ValueError for inf - inf, OverflowError past the float range.
+        except ValueError:
+            raise InvalidOperation("Not a finite number in the values") from None
+        except OverflowError:
+            raise Overflow("The sum of the values is too large") from None
+        if not math.isfinite(total):
+            raise InvalidOperation("Not a finite number in the values")
+        mean = total / count
+        if numpy is not None:
+            m2 = float(numpy.square(values - mean).sum())
+            minimum, maximum = float(values.min()), float(values.max())
+        else:
+            m2 = math.fsum((value - mean) ** 2 for value in values)
+            minimum, maximum = min(values), max(values)
+        self._combine((count, total, 0, mean, m2, minimum, maximum))
+
+    def _combine(self, moments: tuple):
+        # Chan et al.'s pairwise update of the mean and the sum of squared deviations.
+        count, total, compensation, mean, m2, minimum, maximum = moments
+        combined = self.count + count
+        delta = mean - self._mean
+        self._mean += delta * count / combined
+        self._m2 += m2 + delta * delta * self.count * count / combined
+        self._add_to_sum(total)
+        self._compensation += compensation
+        self.count = combined
+        if self.minimum is None or minimum < self.minimum:
+            self.minimum = minimum
+        if self.maximum is None or maximum > self.maximum:
+            self.maximum = maximum
+
+    def merge(self, other: "StreamingStats"):
+        """
+        Adds the values summarized by another StreamingStats, e.g. of another shard.
+
+        Quantiles stay available only if both summaries track them.
+
+        Args:
+            other (StreamingStats): The other summary, with the same quantile accuracy.
+        """
+        if not other.count:
+            return
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+        else:
+            self.sketch = None
+        self._combine(other.moments())
+
+    def moments(self) -> tuple:
+        """
+        Returns the state that merge() combines.
+
+        Returns:
+            tuple: The count, the sum and its compensation, the mean, the sum of squared
+                deviations, the minimum and the maximum.
+        """
+        return self.count, self._sum, self._compensation, self._mean, self._m2, self.minimum, self.maximum
+
+    def _require(self, count: int, statistic: str):
+        if self.count < count:
+            raise StatisticsError(f"{statistic} needs at least {count} value{'s' if count > 1 else ''}, "
+                                  f"got {self.count}")
+
+    @property
+    def sum(self):
+        """The compensated sum of the values."""
+        return self._sum + self._compensation
+
+    @property
+    def mean(self):
+        """The arithmetic mean of the values."""
+        self._require(1, "mean")
+        return self.sum / self.count
+
+    def variance(self, sample: bool = True):
+        """
+        Returns the variance of the values.
+
+        Args:
+            sample (bool): The sample variance (divided by count - 1) rather than the population variance.
+
+        Returns:
+            The variance, of the values' type.
+
+        Raises:
+            StatisticsError: If there are too few values.
+        """
+        self._require(2 if sample else 1, "variance")
+        return max(self._m2, 0) / (self.count - 1 if sample else self.count)
+
+    def stddev(self, sample: bool = True):
+        """
+        Returns the standard deviation of the values.
+
+        Args:
+            sample (bool): The sample standard deviation rather than the population one.
+
+        Returns:
+            The standard deviation; a float for Fraction values.
+
+        Raises:
+            StatisticsError: If there are too few values.
+        """
+        return _sqrt(self.variance(sample))
+
+    def quantile(self, fraction: float) -> float:
+        """
+        Estimates a quantile from the sketch.
+
+        Args:
+            fraction (float): The quantile, between 0 and 1.
+
+        Returns:
+            float: The estimate, within the sketch's relative accuracy.
+
+        Raises:
+            StatisticsError: If there are no values, or quantiles are not tracked.
+        """
+        if self.sketch is None:
+            raise StatisticsError("quantiles are not tracked by this summary")
+        return self.sketch.quantile(fraction)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the state as JSON-serializable data, numbers as [type, text] pairs.
+
+        Returns:
+            dict: The state.
+        """
+        return {"count": self.count, "sum": _encode(self._sum), "compensation": _encode(self._compensation),
+                "mean": _encode(self._mean), "m2": _encode(self._m2), "minimum": _encode(self.minimum),
+                "maximum": _encode(self.maximum), "sketch": self.sketch.to_dict() if self.sketch is not None else None}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StreamingStats":
+        """
+        Rebuilds a state from to_dict() data.
+
+        Args:
+            data (dict): The data.
+
+        Returns:
+            StreamingStats: The state.
+        """
+        stats = cls()
+        stats.count = data["count"]
+        stats._sum, stats._compensation = _decode(data["sum"]), _decode(data["compensation"])
+        stats._mean, stats._m2 = _decode(data["mean"]), _decode(data["m2"])
+        stats.minimum, stats.maximum = _decode(data["minimum"]), _decode(data["maximum"])
+        stats.sketch = QuantileSketch.from_dict(data["sketch"]) if data["sketch"] is not None else None
+        return stats
+
+def _text_batches(stream, backend):
+    # Float batches are packed into arrays, which StreamingStats.update() summarizes at once.
+    pack = (lambda batch: array("d", batch)) if isinstance(backend, FloatBackend) else list
+    batch = []
+    for line in stream:
+        batch += [backend.parse(token) for token in line.replace(",", " ").split()]
+        if len(batch) >= BATCH_SIZE:
+            yield pack(batch)
+            batch = []
+    if batch:
+        yield pack(batch)
+
+def iter_batches(source: str, backend):
+    """
+    Reads the values of one source, a batch at a time.
+
+    Args:
+        source (str): A number, an inline list, @path or "-" for standard input.
+        backend (NumericBackend): The session's numeric backend.
+
+    Yields:
+        Batches of values of the backend's type; float arrays with the float backend.
+
+    Raises:
+        InvalidOperation: If the source cannot be read or holds something other than numbers, names
+            a file in a remote session, or is standard input outside an interactive session.
+    """
+    if source == "-":
+        if not current_session().interactive:
+            raise InvalidOperation("Standard input is only read in interactive sessions")
+        yield from _text_batches(sys.stdin, backend)
+        return
+    if not source.startswith("@"):
+        value = parse_operand(source, backend)
+        yield value.values if isinstance(value, Vector) else [value]
+        return
+    if current_session().remote:
+        raise InvalidOperation("Files are not available to remote clients")
+    path = source[1:]
+    try:
+        if path.endswith(TEXT_SUFFIXES):
+            with open(path, encoding="utf-8") as text_file:
+                yield from _text_batches(text_file, backend)
+            return
+        for chunk in iter_array(path):
+            if isinstance(backend, FloatBackend):
+                yield chunk if getattr(chunk, "typecode", "d") == "d" else array("d", chunk)
+            else:
+                yield [backend.convert(value) for value in chunk.tolist()]
+    except (OSError, ValueError, KeyError, SyntaxError) as e:
+        raise InvalidOperation(f"Cannot read {path}: {e}") from None
+
+def summarize(sources, backend, quantiles: bool = True) -> StreamingStats:
+    """
+    Summarizes the values of several sources in one pass.
+
+    Args:
+        sources (iterable): Sources as accepted by iter_batches.
+        backend (NumericBackend): The session's numeric backend.
+        quantiles (bool): Whether to keep a quantile sketch of the values.
+
+    Returns:
+        StreamingStats: The summary.
+
+    Raises:
+        InvalidOperation: If a source cannot be read or holds something other than finite numbers.
+        Overflow: If the sum of the values is too large to be finite.
+    """
+    stats = StreamingStats(quantiles=quantiles)
+    for source in sources:
+        for batch in iter_batches(source, backend):
+            stats.update(batch)
+    return stats
+
+class StatisticCommand(Command):
+    """
+    Base class of the statistics commands, which print one statistic of their sources.
+
+    Subclasses set label and implement statistic(), and set quantiles if the statistic
+    needs the quantile sketch. Plugins import this module rather than the class, so
+    that the loader does not register the base class as a command.
+    """
+
+    signature = Signature(Param("source", variadic=True, min_count=1))
+    label = None
+    quantiles = False
+
+    def execute(self, *sources):
+        """
+        Summarizes the sources and prints the statistic.
+
+        Args:
+            *sources (str): Numbers, inline lists, @paths or "-" for standard input.
+        """
+        self.report(sources, self.statistic, self.label)
+
+    @abstractmethod
+    def statistic(self, stats: StreamingStats):
+        """
+        Computes the command's statistic.
+
+        Args:
+            stats (StreamingStats): The summary of the values.
+
+        Returns:
+            The statistic.
+        """
+
+    def report(self, sources: tuple, statistic, label: str):
+        """
+        Summarizes the sources with the session's backend, then prints and reports a statistic.
+
+        Args:
+            sources (tuple): The sources.
+            statistic (callable): Computes the statistic from a StreamingStats.
+            label (str): The name of the statistic in the printed line.
+        """
+        logger.info("Computing the %s of %s", label, sources)
+        backend = current_backend()
+        try:
+            stats = backend.apply(summarize, sources, backend, self.quantiles)
+            result = backend.apply(statistic, stats)
+            if isinstance(result, float) and not isinstance(backend, FloatBackend):
+                result = backend.convert(result)
+            backend.check(result)
+        except Overflow as e:
+            report_error("overflow")
+            logger.error("Overflow computing the %s: %s", label, e)
+            print(f"Error: {e}")
+            return
+        except (InvalidOperation, StatisticsError) as e:
+            report_error("invalid_input")
+            logger.error("Cannot compute the %s: %s", label, e)
+            print(f"Error: {e}")
+            return
+        report_result(result)
+        logger.info("The %s of %d values is %s", label, stats.count, result)
+        print(f"The {label} is {result}")
+
+__all__ = ["StreamingStats", "QuantileSketch", "StatisticsError", "StatisticCommand", "summarize", "iter_batches",
+           "BATCH_SIZE", "TEXT_SUFFIXES"]
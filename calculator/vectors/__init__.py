@@ -0,0 +1,392 @@
+"""
+Module for the N-operand and vector arithmetic of the arithmetic commands.
+
+The arithmetic commands accept two or more operands and fold them from the
+left: `subtract 10 2 3` is (10 - 2) - 3. An operand is either a scalar or a
+vector:
+
+    [1,2,3]         an inline list (no spaces, as arguments are split on whitespace)
+    @prices.npy     a one-dimensional NumPy .npy file
+    @prices.f64     any other file holds raw native-endian float64 values
+
+Operations between vectors are elementwise and need vectors of the same
+length; a scalar is broadcast against every element of a vector.
+
+The element type follows the session's numeric backend. With `mode float`,
+vectors are stored as NumPy float64 arrays and computed with NumPy's ufuncs
+when NumPy is installed, or as array("d") buffers otherwise. With the
+decimal (default) and fraction backends, vectors are lists of exact numbers
+computed element by element, so exact Decimal semantics stay available.
+
+NumPy is optional and only imported when the first vector is used. Files
+that cannot be read or are not vectors raise InvalidOperation, like any
+other invalid operand, and so does a file operand in a remote session.
+"""
+
+import ast
+import sys
+import struct
+import functools
+import itertools
+from array import array
+from decimal import DivisionByZero, InvalidOperation, Overflow
+from calculator.numeric import FloatBackend, current_backend
+from calculator.session import current_session
+
+NPY_MAGIC = b"\x93NUMPY"
+MAX_DISPLAY_ELEMENTS = 1000
+
+# .npy type codes and the array module type codes with the same layout.
+_NPY_TYPECODES = {"f8": "d", "f4": "f", "i8": "q", "i4": "i", "i2": "h", "i1": "b",
+                  "u8": "Q", "u4": "I", "u2": "H", "u1": "B"}
+
+class _NumPy:
+    """Whether NumPy has been looked for, and the module if it is installed."""
+
+    checked = False
+    module = None
+
+def numpy_module():
+    """
+    Imports NumPy on first use.
+
+    Returns:
+        module: The numpy module, or None if it is not installed.
+    """
+    if not _NumPy.checked:
+        _NumPy.checked = True
+        try:
+            import numpy  # pylint: disable=import-outside-toplevel
+            _NumPy.module = numpy
+        except ImportError:
+            _NumPy.module = None
+    return _NumPy.module
+
+class ShapeMismatch(ValueError):
+    """Raised when an elementwise operation gets vectors of different lengths."""
+
+class Vector:
+    """
+    A one-dimensional vector operand or result.
+
+    Attributes:
+        values: The elements: a NumPy array, an array("d") or a list of exact numbers.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __eq__(self, other):
+        return isinstance(other, Vector) and self.tolist() == other.tolist()
+
+    __hash__ = None
+
+    def tolist(self) -> list:
+        """
+        Returns the elements as a list of Python numbers.
+
+        Returns:
+            list: The elements.
+        """
+        if hasattr(self.values, "tolist"):
+            return self.values.tolist()
+        return list(self.values)
+
+    def __str__(self):
+        if len(self.values) > MAX_DISPLAY_ELEMENTS:
+            head = ", ".join(map(str, self.tolist()[:3]))
+            tail = ", ".join(map(str, self.tolist()[-3:]))
+            return f"[{head}, ..., {tail}] ({len(self.values)} elements)"
+        return "[" + ", ".join(map(str, self.tolist())) + "]"
+
+    def __repr__(self):
+        return f"Vector({self})"
+
+def make_vector(values, backend) -> Vector:
+    """
+    Stores numbers already in the backend's type as a vector.
+
+    Args:
+        values (iterable): The elements.
+        backend (NumericBackend): The session's numeric backend.
+
+    Returns:
+        Vector: The vector, stored as the backend computes best.
+    """
+    if isinstance(backend, FloatBackend):
+        numpy = numpy_module()
+        if numpy is not None:
+            return Vector(numpy.array(values, dtype=numpy.float64))
+        return Vector(array("d", values))
+    return Vector(list(values))
+
+def read_npy(path: str) -> array:
+    """
+    Reads a one-dimensional .npy file without NumPy.
+
+    Args:
+        path (str): The file.
+
+    Returns:
+        array: The elements.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not a supported one-dimensional .npy array.
+    """
+    with open(path, "rb") as npy_file:
+        typecode, length, swap = _read_npy_header(npy_file)
+        data = array(typecode)
+        data.frombytes(npy_file.read(length * data.itemsize))
+    if len(data) != length:
+        raise ValueError("truncated .npy file")
+    if swap:
+        data.byteswap()
+    return data
+
+def _read_npy_header(npy_file) -> tuple:
+    """Reads a .npy header, returning the array type code, the length and whether bytes need swapping."""
+    if npy_file.read(len(NPY_MAGIC)) != NPY_MAGIC:
+        raise ValueError("not a .npy file")
+    major = npy_file.read(2)[0]
+    length_format = "<H" if major == 1 else "<I"
+    (header_length,) = struct.unpack(length_format, npy_file.read(struct.calcsize(length_format)))
+    header = ast.literal_eval(npy_file.read(header_length).decode("latin1"))
+    descr, shape = header["descr"], header["shape"]
+    typecode = _NPY_TYPECODES.get(descr[1:])
+    if typecode is None or array(typecode).itemsize != int(descr[2:]):
+        raise ValueError(f"unsupported .npy dtype {descr}")
+    if len(shape) != 1:
+        raise ValueError(f"expected a one-dimensional array, got shape {shape}")
+    swap = descr[0] in "<>" and descr[0] != ("<" if sys.byteorder == "little" else ">")
+    return typecode, shape[0], swap
+
+def write_npy(path: str, values):
+    """
+    Writes numbers as a one-dimensional float64 .npy file without NumPy.
+
+    Args:
+        path (str): The file.
+        values (iterable): The numbers.
+    """
+    data = array("d", map(float, values))
+    order = "<" if sys.byteorder == "little" else ">"
+    header = repr({"descr": f"{order}f8", "fortran_order": False, "shape": (len(data),)})
+    # The header is padded with spaces so the data starts on a 64-byte boundary.
+    padding = -(len(NPY_MAGIC) + 2 + 2 + len(header) + 1) % 64
+    header = (header + " " * padding + "\n").encode("latin1")
+    with open(path, "wb") as npy_file:
+        npy_file.write(NPY_MAGIC + bytes((1, 0)) + struct.pack("<H", len(header)) + header)
+        data.tofile(npy_file)
+
+def read_array(path: str):
+    """
+    Reads the numbers of a .npy file, or of a raw float64 file with any other extension.
+
+    Args:
+        path (str): The file.
+
+    Returns:
+        A one-dimensional NumPy array if NumPy is installed, otherwise an array.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not a one-dimensional array of numbers.
+    """
+    numpy = numpy_module()
+    if path.endswith(".npy"):
+        if numpy is None:
+            return read_npy(path)
+        data = numpy.load(path, allow_pickle=False)
+        if data.ndim != 1 or data.dtype.kind not in "biuf":
+            raise ValueError(f"expected a one-dimensional numeric array, got {data.dtype} {data.shape}")
+        return data
+    if numpy is not None:
+        return numpy.fromfile(path, dtype=numpy.float64)
+    data = array("d")
+    with open(path, "rb") as raw_file:
+        data.frombytes(raw_file.read())
+    return data
+
+def iter_array(path: str, chunk_size: int = 65536):
+    """
+    Reads the numbers of a file like read_array, a chunk at a time, so memory stays bounded.
+
+    Args:
+        path (str): The file.
+        chunk_size (int): The largest number of elements per chunk.
+
+    Yields:
+        One-dimensional NumPy arrays if NumPy is installed, otherwise arrays.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not a one-dimensional array of numbers.
+    """
+    numpy = numpy_module()
+    if path.endswith(".npy") and numpy is not None:
+        data = numpy.load(path, mmap_mode="r", allow_pickle=False)
+        if data.ndim != 1 or data.dtype.kind not in "biuf":
+            raise ValueError(f"expected a one-dimensional numeric array, got {data.dtype} {data.shape}")
+        for start in range(0, len(data), chunk_size):
+            yield numpy.array(data[start:start + chunk_size])
+        return
+    with open(path, "rb") as array_file:
+        if path.endswith(".npy"):
+            typecode, remaining, swap = _read_npy_header(array_file)
+        else:
+            typecode, remaining, swap = "d", None, False
+        itemsize = array(typecode).itemsize
+        while remaining is None or remaining > 0:
+            count = chunk_size if remaining is None else min(chunk_size, remaining)
+            block = array_file.read(count * itemsize)
+            if not block:
+                break
+            if numpy is not None and not swap:
+                chunk = numpy.frombuffer(block, dtype=numpy.dtype(typecode))
+            else:
+                chunk = array(typecode)
+                chunk.frombytes(block)
+                if swap:
+                    chunk.byteswap()
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+        if remaining:
+            raise ValueError("truncated .npy file")
+
+def load_vector(path: str, backend) -> Vector:
+    """
+    Loads a vector operand from a file.
+
+    Args:
+        path (str): The file.
+        backend (NumericBackend): The session's numeric backend.
+
+    Returns:
+        Vector: The vector.
+
+    Raises:
+        InvalidOperation: If the file cannot be read or is not a vector.
+    """
+    try:
+        data = read_array(path)
+    except (OSError, ValueError, KeyError, SyntaxError) as e:
+        raise InvalidOperation(f"Cannot read vector {path}: {e}") from None
+    if isinstance(backend, FloatBackend):
+        numpy = numpy_module()
+        if numpy is not None:
+            return Vector(numpy.asarray(data, dtype=numpy.float64))
+        return Vector(data if data.typecode == "d" else array("d", data))
+    values = data.tolist()
+    return Vector([backend.convert(value) for value in values])
+
+def parse_operand(text: str, backend):
+    """
+    Parses a scalar or vector operand.
+
+    Args:
+        text (str): A number, an inline list such as [1,2,3], or @path.
+        backend (NumericBackend): The session's numeric backend.
+
+    Returns:
+        A number of the backend's type, or a Vector.
+
+    Raises:
+        InvalidOperation: If the operand is not a number or vector.
+    """
+    if not text.startswith(("[", "@")):
+        return backend.parse(text)
+    if text.startswith("@"):
+        if current_session().remote:
+            raise InvalidOperation("File operands are not available to remote clients")
+        return load_vector(text[1:], backend)
+    if not text.endswith("]"):
+        raise InvalidOperation(f"Invalid vector: {text!r}")
+    inner = text[1:-1]
+    return make_vector([backend.parse(item) for item in inner.split(",")] if inner else [], backend)
+
+def operand(text: str):
+    """
+    Parses an operand with the session's numeric backend; the Param type of the arithmetic commands.
+
+    Args:
+        text (str): A number, an inline list or @path.
+
+    Returns:
+        A number of the backend's type, or a Vector.
+
+    Raises:
+        InvalidOperation: If the operand is not a number or vector.
+    """
+    backend = current_backend()
+    if text.startswith(("[", "@")):
+        return parse_operand(text, backend)
+    return backend.parse(text)
+
+def _combine(calculate, left, right, ufunc: str):
+    """Applies calculate to two operands, elementwise if either is a vector."""
+    left_is_vector, right_is_vector = isinstance(left, Vector), isinstance(right, Vector)
+    if not (left_is_vector or right_is_vector):
+        return calculate(left, right)
+    if left_is_vector and right_is_vector and len(left) != len(right):
+        raise ShapeMismatch(f"Cannot combine vectors of {len(left)} and {len(right)} elements")
+    left_values = left.values if left_is_vector else left
+    right_values = right.values if right_is_vector else right
+    values = left_values if left_is_vector else right_values
+    if isinstance(values, (array, list)):
+        lefts = left_values if left_is_vector else itertools.repeat(left_values)
+        rights = right_values if right_is_vector else itertools.repeat(right_values)
+        results = map(calculate, lefts, rights)
+        return Vector(array("d", results) if isinstance(values, array) else list(results))
+    numpy = numpy_module()
+    if ufunc == "divide" and not numpy.all(right_values):
+        raise DivisionByZero("Division by zero is not allowed.")
+    with numpy.errstate(all="ignore"):
+        return Vector(getattr(numpy, ufunc)(left_values, right_values))
+
+def _fold(calculate, operands, ufunc: str):
+    return functools.reduce(lambda left, right: _combine(calculate, left, right, ufunc), operands)
+
+def fold(calculate, operands, backend, ufunc: str):
+    """
+    Folds operands from the left with a calculation, elementwise for vectors.
+
+    Args:
+        calculate (callable): The scalar calculation, e.g. AddCommand().calculate.
+        operands (sequence): Two or more numbers or Vectors from parse_operand.
+        backend (NumericBackend): The session's numeric backend.
+        ufunc (str): The NumPy ufunc equivalent to calculate, e.g. "add" or "divide".
+
+    Returns:
+        A number, or a Vector if any operand is a vector.
+
+    Raises:
+        ShapeMismatch: If two vectors have different lengths.
+        DivisionByZero: If an element is divided by zero.
+        Overflow: If the result, or an element of it, is not a finite number.
+    """
+    if len(operands) == 2 and not isinstance(operands[0], Vector) and not isinstance(operands[1], Vector):
+        return backend.check(backend.apply(calculate, *operands))
+    result = backend.apply(_fold, calculate, operands, ufunc)
+    if not isinstance(result, Vector):
+        return backend.check(result)
+    values = result.values
+    numpy = numpy_module() if not isinstance(values, (array, list)) else None
+    if numpy is not None:
+        if not numpy.isfinite(values).all():
+            raise Overflow("The result has elements that are not finite numbers")
+    elif not all(map(backend.is_finite, values)):
+        raise Overflow("The result has elements that are not finite numbers")
+    return result
+
+__all__ = ["Vector", "ShapeMismatch", "fold", "operand", "parse_operand", "load_vector", "make_vector", "read_array",
+           "iter_array", "read_npy", "write_npy", "numpy_module", "NPY_MAGIC"]
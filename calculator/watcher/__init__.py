@@ -0,0 +1,299 @@
+"""
+Module for reloading changed plugins into a running calculator.
+
+A long-running REPL or server would otherwise have to be restarted, paying
+for startup again and dropping its sessions, to pick up a new or edited
+plugin. PluginWatcher fingerprints each plugin under `calculator.plugins`
+separately (the sizes and modification times of its files) and, when one
+changes, re-imports only that plugin and swaps its commands into the
+CommandHandler in one step; commands already running finish with the old
+version. Plugins that were removed have their commands unregistered, and
+unchanged plugins are left alone, including lazy proxies that were never
+imported.
+
+A plugin that fails to import or defines no commands keeps its last good
+version: its old modules are put back and its commands stay registered,
+and it is tried again when its files change next.
+
+The watcher polls every `interval` seconds. On Linux it also watches the
+plugin directories with inotify (through ctypes, so nothing needs to be
+installed) and checks as soon as a file is written.
+"""
+
+import os
+import sys
+import select
+import logging
+import pkgutil
+import importlib
+import importlib.util
+import threading
+import atexit
+from calculator.commands import CommandHandler
+from calculator.loader import LazyCommand, plugin_commands
+import calculator.plugins
+
+logger = logging.getLogger(__name__)
+
+# Seconds to let an editor finish writing a file before reading it.
+SETTLE_DELAY = 0.05
+
+def plugin_snapshot(package=calculator.plugins) -> dict:
+    """
+    Fingerprints every plugin of a package separately.
+
+    Args:
+        package: The plugin package.
+
+    Returns:
+        dict: For each plugin module name, a tuple of (path, size, modification time) of its source files.
+    """
+    snapshot = {}
+    for module_info in pkgutil.iter_modules(package.__path__, package.__name__ + "."):
+        root = os.path.join(module_info.module_finder.path, module_info.name.rsplit(".", 1)[-1])
+        paths = []
+        if module_info.ispkg:
+            for directory, subdirectories, files in os.walk(root):
+                subdirectories[:] = sorted(d for d in subdirectories if d != "__pycache__")
+                paths += [os.path.join(directory, name) for name in sorted(files) if name.endswith(".py")]
+        else:
+            paths.append(root + ".py")
+        files = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:  # Deleted while walking; the next check sees the result.
+                continue
+            files.append((path, stat.st_size, stat.st_mtime_ns))
+        snapshot[module_info.name] = tuple(files)
+    return snapshot
+
+class _Inotify:
+    """
+    Minimal inotify watch on directories, used only to wake the watcher up early.
+    """
+
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200
+
+    def __init__(self, libc, fd: int):
+        self._libc = libc
+        self._fd = fd
+
+    @classmethod
+    def create(cls):
+        """
+        Opens an inotify instance.
+
+        Returns:
+            _Inotify: The instance, or None if inotify is not available.
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            import ctypes  # pylint: disable=import-outside-toplevel
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        return cls(libc, fd) if fd >= 0 else None
+
+    def fileno(self) -> int:
+        """Returns the file descriptor that becomes readable when a watched directory changes."""
+        return self._fd
+
+    def watch(self, directories):
+        """
+        Adds watches for directories; directories already watched are not watched twice.
+
+        Args:
+            directories (iterable): The directory paths.
+        """
+        for directory in directories:
+            self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK)
+
+    def drain(self):
+        """Discards the pending events."""
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        """Closes the inotify instance."""
+        os.close(self._fd)
+
+class PluginWatcher:
+    """
+    Reloads changed, added and removed plugins into a CommandHandler.
+
+    Call check() to reload once, or start() to check in a background thread.
+
+    Attributes:
+        command_handler (CommandHandler): The handler whose commands are swapped.
+        package: The plugin package being watched.
+        interval (float): Seconds between polls.
+        plugins (dict): The names of the commands registered by each plugin module.
+    """
+
+    def __init__(self, command_handler: CommandHandler, package=calculator.plugins, interval: float = 1.0):
+        """
+        Initializes the PluginWatcher with the plugins as they are now.
+
+        Args:
+            command_handler (CommandHandler): The handler with the plugins already loaded.
+            package: The plugin package to watch.
+            interval (float): Seconds between polls.
+        """
+        self.command_handler = command_handler
+        self.package = package
+        self.interval = interval
+        self.plugins = {}
+        for command_name, command in command_handler.commands.items():
+            module_name = self.plugin_of(command)
+            if module_name is not None:
+                self.plugins.setdefault(module_name, set()).add(command_name)
+        self._snapshot = plugin_snapshot(package)
+        self._check_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._inotify = None
+        self._wake = None
+
+    def plugin_of(self, command):
+        """
+        Finds the plugin module a registered command comes from.
+
+        Args:
+            command (Command): A registered command or lazy proxy.
+
+        Returns:
+            str: The plugin module name, e.g. "calculator.plugins.add", or None for other commands.
+        """
+        module_name = command.module_name if isinstance(command, LazyCommand) else type(command).__module__
+        prefix = self.package.__name__ + "."
+        if not module_name.startswith(prefix):
+            return None
+        return prefix + module_name[len(prefix):].split(".", 1)[0]
+
+    def check(self) -> dict:
+        """
+        Reloads the plugins whose files changed since the last check.
+
+        Returns:
+            dict: What happened to each changed plugin module: "added", "reloaded", "removed" or "failed".
+        """
+        with self._check_lock:
+            snapshot = plugin_snapshot(self.package)
+            changed = sorted(name for name in snapshot.keys() | self._snapshot.keys()
+                             if snapshot.get(name) != self._snapshot.get(name))
+            changes = {}
+            if changed:
+                importlib.invalidate_caches()
+            for module_name in changed:
+                if module_name not in snapshot:
+                    self._remove(module_name)
+                    changes[module_name] = "removed"
+                elif self._reload(module_name, snapshot[module_name]):
+                    changes[module_name] = "added" if module_name not in self._snapshot else "reloaded"
+                else:
+                    changes[module_name] = "failed"
+            self._snapshot = snapshot
+            if changes and self.command_handler.result_cache is not None:
+                # Cached results were computed by the old versions of the commands.
+                self.command_handler.result_cache.clear()
+            return changes
+
+    def _remove(self, module_name: str):
+        removed = self.plugins.pop(module_name, set())
+        self.command_handler.update_commands({}, removed)
+        for name in [name for name in sys.modules if name == module_name or name.startswith(module_name + ".")]:
+            del sys.modules[name]
+        logger.info("Plugin %s removed, unregistered: %s", module_name, ", ".join(sorted(removed)) or "nothing")
+
+    def _reload(self, module_name: str, files: tuple) -> bool:
+        old_modules = {name: module for name, module in sys.modules.items()
+                       if name == module_name or name.startswith(module_name + ".")}
+        for name in old_modules:
+            del sys.modules[name]
+        for path, _, _ in files:
+            # Bytecode is only checked against the whole-second mtime and size of its source,
+            # so an edit within the same second could otherwise load the old code.
+            try:
+                os.remove(importlib.util.cache_from_source(path))
+            except OSError:
+                pass
+        try:
+            module = importlib.import_module(module_name)
+            commands = plugin_commands(module, self.command_handler)
+            if not commands:
+                raise ImportError("no commands defined")
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            for name in [name for name in sys.modules if name == module_name or name.startswith(module_name + ".")]:
+                del sys.modules[name]
+            sys.modules.update(old_modules)
+            logger.error("Error reloading plugin %s, keeping the last good version: %s", module_name, e)
+            return False
+
+        previous = self.plugins.get(module_name, set())
+        self.command_handler.update_commands({name: command for name, (command, _) in commands.items()},
+                                             previous - commands.keys())
+        self.plugins[module_name] = set(commands)
+        logger.info("Plugin %s reloaded: %s", module_name, ", ".join(sorted(commands)))
+        return True
+
+    def _directories(self):
+        directories = []
+        for root in self.package.__path__:
+            for directory, subdirectories, _ in os.walk(root):
+                subdirectories[:] = [d for d in subdirectories if d != "__pycache__"]
+                directories.append(directory)
+        return directories
+
+    def start(self):
+        """Starts checking for changed plugins in a background thread."""
+        self._stopped.clear()
+        self._inotify = _Inotify.create()
+        if self._inotify is not None:
+            self._inotify.watch(self._directories())
+            self._wake = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="plugin-watcher", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        logger.info("Watching plugins for changes every %.1fs%s.", self.interval,
+                    " and with inotify" if self._inotify is not None else "")
+
+    def _run(self):
+        while not self._stopped.is_set():
+            if self._inotify is None:
+                if self._stopped.wait(self.interval):
+                    break
+            elif select.select([self._inotify, self._wake[0]], [], [], self.interval)[0]:
+                if self._stopped.wait(SETTLE_DELAY):
+                    break
+                self._inotify.drain()
+            try:
+                if self.check() and self._inotify is not None:
+                    self._inotify.watch(self._directories())  # New plugin directories.
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Plugin check failed.")
+
+    def stop(self):
+        """Stops the background thread."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        if self._wake is not None:
+            os.write(self._wake[1], b"x")
+        self._thread.join()
+        self._thread = None
+        atexit.unregister(self.stop)
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+            for fd in self._wake:
+                os.close(fd)
+            self._wake = None
+
+__all__ = ["PluginWatcher", "plugin_snapshot"]
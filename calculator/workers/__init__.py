@@ -0,0 +1,39 @@
+"""
+Module for setting up the worker processes that execute commands.
+
+Batch mode (see calculator.batch) and the watchdog (see calculator.deadlines)
+execute commands in worker processes. start_worker() prepares such a
+process once, when it starts: it keeps only warnings and errors, written to
+stderr, so that several processes never contend on the rotating log file,
+and builds the process's CommandHandler with the plugins registered.
+"""
+
+import sys
+import logging
+from calculator.commands import CommandHandler
+from calculator.loader import load_plugins, scan_plugins
+
+def start_worker(manifest_path: str = None, **handler_options) -> CommandHandler:
+    """
+    Configures the logging of a worker process and builds its CommandHandler.
+
+    Args:
+        manifest_path (str): The plugin manifest to load the commands from, or None to scan the plugins.
+        **handler_options: Passed to CommandHandler, such as budgets or result_cache.
+
+    Returns:
+        CommandHandler: The handler with the plugins registered.
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.StreamHandler(sys.stderr))
+    root.setLevel(logging.WARNING)
+    command_handler = CommandHandler(**handler_options)
+    if manifest_path:
+        load_plugins(command_handler, manifest_path)
+    else:
+        scan_plugins(command_handler)
+    return command_handler
+
+__all__ = ["start_worker"]
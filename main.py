@@ -2,12 +2,135 @@
 Module for running the Calculator CLI.
 
 This module initializes and runs the Calculator CLI, allowing the user to 
-interact with the command-line calculator.
+interact with the command-line calculator, to run a file of commands
+non-interactively with --batch, to serve and connect to a calculator
+server with --serve and --connect, to run a warm daemon for the calc.py
+client shim with --daemon, or to run a single command given on the
+command line, such as `python main.py add 1 2`.
 """
 
+import os
+import sys
+import argparse
 from calculator import Calculator
 
-if __name__ == "__main__":
-    # Initialize and start the calculator
+def parse_arguments(argv=None):
+    """
+    Parses the command-line arguments.
+
+    Args:
+        argv (list): The arguments to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Command-line calculator.")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="run the commands in FILE ('-' for stdin) without the interactive prompt")
+    parser.add_argument("--keep-going", action="store_true",
+                        help="in batch mode, collect errors instead of stopping at the first one")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="in batch mode, evaluate lines on N worker processes (0 = one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=256, metavar="LINES",
+                        help="in parallel batch mode, the number of lines sent to a worker at a time")
+    parser.add_argument("--format", choices=("text", "jsonl", "csv", "binary"), default="text",
+                        help="how results are written: the printed text (default), JSON lines, CSV rows "
+                             "or binary records")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="serve clients on HOST:PORT or unix:PATH instead of the interactive prompt")
+    parser.add_argument("--connect", metavar="ADDRESS",
+                        help="send commands from stdin to the server at HOST:PORT or unix:PATH")
+    parser.add_argument("--daemon", nargs="?", const="", metavar="SOCKET",
+                        help="run a warm daemon for calc.py on the Unix socket SOCKET "
+                             "(default: $CALCULATOR_DAEMON_SOCKET or .cache/calculator.sock)")
+    parser.add_argument("command", nargs=argparse.REMAINDER,
+                        help="run this single command with its arguments and exit, e.g. 'add 1 2'")
+    return parser.parse_args(argv)
+
+def run_daemon(socket_path: str) -> int:
+    """
+    Runs the warm daemon for calc.py until it is interrupted.
+
+    Args:
+        socket_path (str): The Unix socket to listen on; empty for $CALCULATOR_DAEMON_SOCKET or the default.
+
+    Returns:
+        int: The process exit status.
+    """
+    from calculator.daemon import DEFAULT_SOCKET_PATH, WarmDaemon  # pylint: disable=import-outside-toplevel
+    socket_path = socket_path or os.environ.get("CALCULATOR_DAEMON_SOCKET") or DEFAULT_SOCKET_PATH
+    try:
+        WarmDaemon(socket_path).serve_forever()
+    except KeyboardInterrupt:
+        print("\nDaemon stopped.")
+    return 0
+
+def run_server(calculator: Calculator, address: str) -> int:
+    """
+    Serves clients with the calculator's commands until interrupted.
+
+    Args:
+        calculator (Calculator): The calculator whose commands are served.
+        address (str): HOST:PORT or unix:PATH.
+
+    Returns:
+        int: The process exit status.
+    """
+    import asyncio  # pylint: disable=import-outside-toplevel
+    from calculator.server import CalculatorServer  # pylint: disable=import-outside-toplevel
+    calculator.watch_plugins()
+    try:
+        asyncio.run(CalculatorServer(calculator.command_handler).serve_forever(address))
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+    finally:
+        calculator.shutdown_logging()
+    return 0
+
+def run_batch_file(calculator: Calculator, arguments: argparse.Namespace) -> int:
+    """
+    Runs the batch file named on the command line, or stdin for '-'.
+
+    Args:
+        calculator (Calculator): The calculator that executes the commands.
+        arguments (argparse.Namespace): The parsed command-line arguments.
+
+    Returns:
+        int: The exit status of the batch.
+    """
+    options = {"fail_fast": not arguments.keep_going, "jobs": arguments.jobs, "chunk_size": arguments.chunk_size,
+               "output_format": arguments.format}
+    if arguments.batch == "-":
+        return calculator.run_batch(sys.stdin, **options)
+    with open(arguments.batch, encoding="utf-8") as batch_file:
+        return calculator.run_batch(batch_file, **options)
+
+def main(argv=None):
+    """
+    Runs the calculator interactively, in batch mode, as a server or for a single command.
+
+    Args:
+        argv (list): The command-line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The process exit status.
+    """
+    arguments = parse_arguments(argv)
+    if arguments.command:
+        return Calculator(lazy=True).run_command(*arguments.command, output_format=arguments.format)
+    if arguments.daemon is not None:
+        return run_daemon(arguments.daemon)
+    if arguments.connect is not None:
+        import asyncio  # pylint: disable=import-outside-toplevel
+        from calculator.server import run_client  # pylint: disable=import-outside-toplevel
+        return asyncio.run(run_client(arguments.connect))
     calculator = Calculator()
-    calculator.start()
+    if arguments.serve is not None:
+        return run_server(calculator, arguments.serve)
+    if arguments.batch is None:
+        calculator.start(arguments.format)
+        return 0
+    return run_batch_file(calculator, arguments)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+Shared fixtures for the test suite.
+"""
+
+import os
+import shutil
+import pytest
+from calculator.commands import CommandHandler
+from calculator.loader import scan_plugins
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def working_directory(tmp_path, monkeypatch):
+    """
+    Runs each test in its own temporary directory holding a copy of logging.conf.
+
+    The calculator writes its log file, history journal and plugin manifest relative to
+    the working directory, so tests never touch the checkout's logs/ and .cache/.
+    """
+    shutil.copy(os.path.join(ROOT, "logging.conf"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(name="command_handler")
+def fixture_command_handler():
+    """A handler with every plugin registered."""
+    command_handler = CommandHandler()
+    scan_plugins(command_handler)
+    return command_handler
@@ -0,0 +1,62 @@
+"""
+Test suite for the asynchronous, queue-based logging pipeline.
+"""
+
+import queue
+import logging
+import pytest
+from calculator.asynclog import AsyncLogging, BoundedQueueHandler
+
+
+class ListHandler(logging.Handler):
+    """Handler that keeps the messages it receives."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+def make_record(message):
+    """Builds an INFO record with the given message."""
+    return logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+
+def test_drop_policy_counts_discarded_records():
+    """Test that the drop policy discards new records once the queue is full."""
+    handler = BoundedQueueHandler(queue.Queue(2), policy="drop")
+    for i in range(5):
+        handler.handle(make_record(f"record {i}"))
+    assert handler.dropped == 3
+    assert [handler.queue.get_nowait().getMessage() for _ in range(2)] == ["record 0", "record 1"]
+
+def test_drop_oldest_policy_keeps_newest_records():
+    """Test that the drop-oldest policy evicts queued records to make room."""
+    handler = BoundedQueueHandler(queue.Queue(2), policy="drop-oldest")
+    for i in range(5):
+        handler.handle(make_record(f"record {i}"))
+    assert handler.dropped == 3
+    assert [handler.queue.get_nowait().getMessage() for _ in range(2)] == ["record 3", "record 4"]
+
+def test_unknown_policy_is_rejected():
+    """Test that an unknown overflow policy raises ValueError."""
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(queue.Queue(2), policy="spill")
+
+def test_stop_flushes_all_records_and_restores_handlers():
+    """Test that stopping the pipeline delivers every queued record to the original handler."""
+    target = logging.getLogger("tests.asynclog")
+    target.propagate = False
+    list_handler = ListHandler()
+    target.addHandler(list_handler)
+
+    async_logging = AsyncLogging(queue_size=10, policy="block", target=target)
+    async_logging.start()
+    assert target.handlers == [async_logging.handler]
+    for i in range(100):
+        target.warning("message %d", i)
+    async_logging.stop()
+
+    assert target.handlers == [list_handler]
+    assert list_handler.messages == [f"message {i}" for i in range(100)]
+    target.removeHandler(list_handler)
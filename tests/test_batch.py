@@ -0,0 +1,115 @@
+"""
+Test suite for running the calculator in batch mode.
+"""
+
+import io
+import os
+import logging
+from calculator import Calculator
+from calculator.batch import BatchRunner, ParallelBatchRunner, read_command_lines
+from calculator.commands import CommandHandler
+from calculator.deadlines import Budget, Budgets
+from calculator.journal import Journal, JournalReader
+from calculator.metrics import CommandMetrics
+from calculator.plugins.add import AddCommand
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH = """\
+add 1 2
+# comments and blank lines are skipped
+
+divide 1 0
+multiply 3 4
+quit
+add 5 5
+"""
+
+def test_read_command_lines_stops_at_quit():
+    """Test that comments and blank lines are skipped and 'quit' ends the batch."""
+    lines = list(read_command_lines(io.StringIO(BATCH)))
+    assert lines == [(1, "add 1 2"), (4, "divide 1 0"), (5, "multiply 3 4")]
+
+def test_batch_fail_fast():
+    """Test that the batch stops at the first failing line with a non-zero status."""
+    calculator = Calculator()
+    runner = BatchRunner(calculator.command_handler, fail_fast=True)
+    output = io.StringIO()
+    assert runner.run(io.StringIO(BATCH), output=output) == 1
+    assert "The Solution of addition is 3" in output.getvalue()
+    assert "multiplication" not in output.getvalue()
+    assert [(error.line_number, error.outcome) for error in runner.errors] == [(4, "division_by_zero")]
+    logger.info("Fail-fast batch test passed.")
+
+def test_batch_keep_going_collects_errors():
+    """Test that all lines run and every error is collected when fail_fast is off."""
+    calculator = Calculator()
+    runner = BatchRunner(calculator.command_handler, fail_fast=False)
+    output = io.StringIO()
+    status = runner.run(io.StringIO("add 1 2\nfoo\nsubtract 5 x\nmultiply 3 4\n"), output=output)
+    assert status == 1
+    assert runner.lines_processed == 4
+    assert [error.outcome for error in runner.errors] == ["unknown_command", "invalid_input"]
+    assert "The solution of multiplication is 12" in output.getvalue()
+    logger.info("Keep-going batch test passed.")
+
+def test_parallel_batch_keeps_input_order(tmp_path):
+    """Test that results from worker processes are written in input order."""
+    runner = ParallelBatchRunner(fail_fast=False, jobs=2, chunk_size=3,
+                                 manifest_path=str(tmp_path / "manifest.json"))
+    lines = "".join(f"multiply {i} 2\n" for i in range(50)) + "divide 1 0\nadd 1 1\n"
+    output = io.StringIO()
+    assert runner.run(io.StringIO(lines), output=output) == 1
+    expected = [f"The solution of multiplication is {i * 2}" for i in range(50)]
+    expected += ["Error: Division by zero is not allowed.", "The Solution of addition is 2"]
+    assert output.getvalue().splitlines() == expected
+    assert [(error.line_number, error.outcome) for error in runner.errors] == [(51, "division_by_zero")]
+
+def test_parallel_batch_fail_fast_stops_output_at_error(tmp_path):
+    """Test that nothing after the first failing line is written in fail-fast mode."""
+    runner = ParallelBatchRunner(fail_fast=True, jobs=2, chunk_size=4,
+                                 manifest_path=str(tmp_path / "manifest.json"))
+    lines = "add 1 1\nsubtract 1 x\n" + "add 2 2\n" * 20
+    output = io.StringIO()
+    assert runner.run(io.StringIO(lines), output=output) == 1
+    assert output.getvalue().splitlines() == [
+        "The Solution of addition is 2", "Error: Invalid operand: 'x'. Usage: subtract OPERAND OPERAND [OPERAND ...]"]
+    assert runner.lines_processed == 2
+
+def test_parallel_batch_budgets_and_metrics(tmp_path):
+    """Test that workers apply the handler's budgets and the parent records each line's metrics and journal."""
+    command_handler = CommandHandler(metrics=CommandMetrics(), journal=Journal(str(tmp_path / "history.journal")),
+                                     budgets=Budgets(Budget(max_length=12)))
+    runner = ParallelBatchRunner(command_handler, fail_fast=False, jobs=2, chunk_size=2,
+                                 manifest_path=str(tmp_path / "manifest.json"))
+    output = io.StringIO()
+    assert runner.run(io.StringIO("add 1 1\nadd 1 1234567890123\nmultiply 2 3\n"), output=output) == 1
+    assert [(error.line_number, error.outcome) for error in runner.errors] == [(2, "over_budget")]
+    assert "The solution of multiplication is 6" in output.getvalue()
+    assert (command_handler.metrics.commands["add"].calls, command_handler.metrics.commands["add"].errors) == \
+        (2, {"over_budget": 1})
+    command_handler.journal.close()
+    with JournalReader(str(tmp_path / "history.journal")) as reader:
+        assert [entry.outcome for entry in reader] == ["ok", "over_budget", "ok"]
+
+def test_parallel_batch_reports_a_crashed_worker(tmp_path, monkeypatch):
+    """Test that a worker dying mid-chunk fails that chunk's lines and ends the batch with a report."""
+    calculate = AddCommand.calculate
+
+    def crashing_calculate(self, left, right):
+        if left == 999:
+            os._exit(1)
+        return calculate(self, left, right)
+
+    # The workers are forked, so they inherit the patched method.
+    monkeypatch.setattr(AddCommand, "calculate", crashing_calculate)
+    runner = ParallelBatchRunner(fail_fast=False, jobs=1, chunk_size=2, manifest_path=str(tmp_path / "manifest.json"))
+    assert runner.run(io.StringIO("add 1 1\nadd 999 1\nadd 2 2\n"), output=io.StringIO()) == 1
+    assert [(error.line_number, error.outcome) for error in runner.errors] == \
+        [(1, "BrokenProcessPool"), (2, "BrokenProcessPool")]
+    report = io.StringIO()
+    runner.report(report)
+    assert "2 error(s)" in report.getvalue()
@@ -0,0 +1,32 @@
+"""
+Test suite running the performance benchmarks as a regression gate.
+
+The benchmarks themselves only run when CALCULATOR_BENCHMARKS=1 is set,
+since their results depend on the machine; the comparison logic is always tested.
+"""
+
+import os
+import pytest
+from benchmarks.suite import compare, load_baseline, run_benchmarks
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    """Test that only changes in the worse direction beyond the tolerance are reported."""
+    baseline = {"results": {"latency": {"value": 100.0, "unit": "us", "better": "lower"},
+                            "throughput": {"value": 1000.0, "unit": "ops/s", "better": "higher"}},
+                "tolerances": {"throughput": 0.5}}
+    fine = {"latency": {"value": 110.0, "unit": "us", "better": "lower"},
+            "throughput": {"value": 600.0, "unit": "ops/s", "better": "higher"}}
+    assert not compare(fine, baseline, tolerance=0.25)
+
+    worse = {"latency": {"value": 130.0, "unit": "us", "better": "lower"},
+             "throughput": {"value": 400.0, "unit": "ops/s", "better": "higher"},
+             "new_benchmark": {"value": 1.0, "unit": "us", "better": "lower"}}
+    regressions = compare(worse, baseline, tolerance=0.25)
+    assert [regression.split(":")[0] for regression in regressions] == ["latency", "throughput"]
+
+@pytest.mark.skipif(os.environ.get("CALCULATOR_BENCHMARKS") != "1", reason="set CALCULATOR_BENCHMARKS=1 to run")
+def test_no_performance_regressions():
+    """Test that no benchmark regressed beyond its tolerance against the stored baseline."""
+    regressions = compare(run_benchmarks(), load_baseline())
+    assert not regressions, "\n".join(regressions)
@@ -0,0 +1,137 @@
+"""
+Test suite for the high-precision power, root, factorial and constant commands.
+"""
+
+import math
+import random
+import logging
+from decimal import Decimal, InvalidOperation, Overflow, localcontext
+from fractions import Fraction
+import pytest
+from calculator import bigmath
+from calculator.engine import Engine
+from calculator.session import Session, use_session
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _reference(function, digits: int) -> Decimal:
+    """Computes a value with the decimal module 20 digits beyond a precision, then rounds it to the precision."""
+    with localcontext() as context:
+        context.prec = digits + 20
+        value = function()
+    with localcontext() as context:
+        context.prec = digits
+        return +value
+
+def test_roots_match_the_decimal_module():
+    """Test that Newton roots with precision doubling agree with the decimal module's powers, and exact roots are exact."""
+    rng = random.Random(5)
+    for digits in (10, 28, 300, 2000):
+        for degree in (2, 3, 7, 100):
+            value = Decimal(rng.randint(1, 10 ** 12)).scaleb(rng.randint(-400, 400))
+            with localcontext() as context:
+                context.prec = digits
+                expected = _reference(lambda value=value, degree=degree: value ** (Decimal(1) / degree), digits)
+                assert bigmath.nthroot(value, degree) == expected
+    with localcontext() as context:
+        context.prec = 500
+        assert bigmath.sqrt(Decimal(2)) == Decimal(2).sqrt()
+        assert str(bigmath.nthroot(Decimal("3.375"), 3)) == "1.5"
+    assert str(bigmath.nthroot(Decimal(-27), Decimal(3))) == "-3"
+    assert bigmath.nthroot(Fraction(8, 27), Fraction(3)) == Fraction(2, 3)
+    assert bigmath.nthroot(27.0, 3.0) == 3.0
+    for x, n in ((Decimal(-4), 2), (Decimal(4), 0), (Decimal(4), Decimal("2.5"))):
+        with pytest.raises(InvalidOperation):
+            bigmath.nthroot(x, n)
+
+def test_power():
+    """Test integer and fractional exponents in every backend, and bases whose powers are not real."""
+    with localcontext() as context:
+        context.prec = 1000
+        assert bigmath.power(Decimal(2), Decimal("2.125")) == _reference(lambda: Decimal(2) ** Decimal("2.125"), 1000)
+        assert bigmath.power(Decimal(3), Decimal(-2000)) == _reference(lambda: Decimal(3) ** -2000, 1000)
+    assert bigmath.power(Fraction(4, 9), Fraction(-3, 2)) == Fraction(27, 8)
+    assert bigmath.power(Fraction(-8), Fraction(2, 3)) == 4
+    assert bigmath.power(2.0, 0.5) == math.sqrt(2)
+    with pytest.raises(InvalidOperation):
+        bigmath.power(Decimal(-8), Decimal("0.5"))
+    with pytest.raises(Overflow):
+        bigmath.power(Fraction(2), Fraction(10 ** 6))
+
+def test_factorial_and_binomial():
+    """Test that factorials and binomial coefficients are rounded exact values, and huge ones fail at once."""
+    with localcontext() as context:
+        context.prec = 50
+        assert bigmath.factorial(Decimal(3000)) == +Decimal(math.factorial(3000))
+        assert bigmath.binomial(Decimal(10 ** 6), Decimal(500)) == +Decimal(math.comb(10 ** 6, 500))
+    assert bigmath.factorial(Fraction(25)) == math.factorial(25)
+    assert bigmath.binomial(10.0, 3.0) == 120.0
+    assert bigmath.binomial(Decimal(5), Decimal(7)) == 0
+    for function, args in ((bigmath.factorial, (Decimal("1e9"),)), (bigmath.factorial, (Fraction(5000),)),
+                           (bigmath.factorial, (400.0,)), (bigmath.binomial, (Decimal(10 ** 9), Decimal(10 ** 8)))):
+        with pytest.raises(Overflow):
+            function(*args)
+    with pytest.raises(InvalidOperation):
+        bigmath.factorial(Decimal("2.5"))
+
+def test_constants_are_cached_per_precision(monkeypatch):
+    """Test pi and e against Machin's formula and the series of 1/k! on ints, and that lower precisions reuse them."""
+    unity = 10 ** 1010
+
+    def arctan_inverse(divisor):
+        total = term = unity // divisor
+        for n in range(3, 2000, 2):
+            term //= divisor * divisor
+            total += -(term // n) if n % 4 == 3 else term // n
+        return total
+
+    pi = 4 * (4 * arctan_inverse(5) - arctan_inverse(239))
+    e = sum(unity // math.factorial(k) for k in range(500))
+    bigmath.clear_constants()
+    computed = []
+    compute_pi, float_pi = bigmath._CONSTANTS["pi"]  # pylint: disable=protected-access
+    monkeypatch.setitem(bigmath._CONSTANTS, "pi", (lambda: computed.append(1) or compute_pi(), float_pi))  # pylint: disable=protected-access
+    for digits in (1000, 28, 500):
+        with localcontext() as context:
+            context.prec = digits
+            assert bigmath.constant("pi") == +Decimal(pi).scaleb(-1010)
+            assert bigmath.constant("e") == +Decimal(e).scaleb(-1010)
+    assert len(computed) == 1
+    assert bigmath.constant("pi", float) == math.pi
+
+def test_commands_in_every_numeric_mode():
+    """Test the commands' output and outcomes with the decimal, fraction and float backends, and from expressions."""
+    with Engine() as engine, use_session(Session()):
+        assert engine.execute("pow 2 10").output == "The power is 1024\n"
+        assert engine.execute("nthroot 27 3").output == "The root is 3\n"
+        assert engine.execute("pi 30").output == "The value of pi is 3.14159265358979323846264338328\n"
+        assert engine.execute("factorial 100").result == +Decimal(math.factorial(100))
+        assert engine.execute("expr sqrt(16) * pow(2, 3) + factorial(3)").result == 38
+        assert engine.execute("expr pi(10) + e(5)").output == "The result of the expression is 5.859892654\n"
+        assert engine.execute("expr pi(2.5)").outcome == "invalid_input"
+        assert engine.execute("expr e(0)").outcome == "invalid_input"
+        assert engine.execute("factorial 1e9").outcome == "overflow"
+        assert engine.execute("pow 0 -1").outcome == "division_by_zero"
+        assert engine.execute("sqrt -1").outcome == "invalid_input"
+        assert engine.execute("binomial 5").outcome == "invalid_arity"
+        engine.execute("mode fraction")
+        assert engine.execute("sqrt 16/9").output == "The square root is 4/3\n"
+        assert engine.execute("binomial 30 15").result == math.comb(30, 15)
+        assert engine.execute("expr pi(5) * 2").output == "The result of the expression is 3927/625\n"
+        engine.execute("mode float")
+        assert engine.execute("e").result == math.e
+        assert engine.execute("pi 30").outcome == "invalid_input"
+        assert engine.execute("factorial 171").outcome == "overflow"
+
+def test_constant_commands_describe_their_digits(caplog):
+    """Test that the constants log the digits they compute, and function commands must implement calculate()."""
+    with Engine() as engine, use_session(Session()), caplog.at_level(logging.INFO, logger="calculator.bigmath"):
+        assert engine.execute("pi 60").ok
+        assert engine.execute("e").ok
+    assert "Computing the value of pi to 60 digits" in caplog.text
+    assert "Computing the value of e\n" in caplog.text
+    with pytest.raises(TypeError):
+        bigmath.FunctionCommand()  # pylint: disable=abstract-class-instantiated
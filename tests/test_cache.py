@@ -0,0 +1,69 @@
+"""
+Test suite for the result cache of pure commands.
+"""
+
+import decimal
+from calculator.cache import ResultCache
+from calculator.commands import CommandHandler
+from calculator.plugins.divide import DivideCommand
+from calculator.plugins.welcome import WelcomeCommand
+
+
+def make_handler(cache):
+    """Builds a handler with a pure and an impure command."""
+    handler = CommandHandler(result_cache=cache)
+    handler.register_command("divide", DivideCommand())
+    handler.register_command("welcome", WelcomeCommand())
+    return handler
+
+def test_repeated_pure_command_is_served_from_cache(capfd):
+    """Test that a repeated call replays the output and outcome of the first one."""
+    cache = ResultCache()
+    handler = make_handler(cache)
+    first = handler.execute_command("divide", "1", "3")
+    second = handler.execute_command("divide", "1", "3")
+    failed = handler.execute_command("divide", "1", "0")
+    again = handler.execute_command("divide", "1", "0")
+
+    output = capfd.readouterr().out.splitlines()
+    assert output[0] == output[1]
+    assert output[2] == output[3]
+    assert second.result == first.result
+    assert (failed.outcome, again.outcome) == ("division_by_zero", "division_by_zero")
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+def test_key_depends_on_decimal_precision():
+    """Test that results computed under another precision are not reused."""
+    cache = ResultCache()
+    handler = make_handler(cache)
+    with decimal.localcontext() as context:
+        context.prec = 5
+        short = handler.execute_command("divide", "1", "3").result
+    full = handler.execute_command("divide", "1", "3").result
+    assert short != full
+    assert cache.hits == 0
+
+def test_impure_commands_are_never_cached():
+    """Test that commands that are not pure always run."""
+    cache = ResultCache()
+    handler = make_handler(cache)
+    handler.execute_command("welcome")
+    handler.execute_command("welcome")
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 0
+
+def test_eviction_by_entries_and_bytes():
+    """Test that the least recently used entries are evicted to stay within bounds."""
+    cache = ResultCache(max_entries=2)
+    for i in range(3):
+        cache.put(("add", (str(i),), 28, "ROUND_HALF_EVEN"), "out", "ok", i)
+    assert len(cache) == 2
+    assert cache.get(("add", ("0",), 28, "ROUND_HALF_EVEN")) is None
+    assert cache.evictions == 1
+
+    cache = ResultCache(max_entries=100, max_bytes=300)
+    for i in range(10):
+        cache.put(("add", (str(i),), 28, "ROUND_HALF_EVEN"), "x" * 50, "ok", i)
+    assert cache.size <= 300
+    assert 0 < len(cache) < 10
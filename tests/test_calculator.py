@@ -3,7 +3,9 @@ Test suite for the Calculator class with logging and environment variables.
 """
 
 import os
+import sys
 import logging
+import subprocess
 from calculator import Calculator
 
 
@@ -44,3 +46,16 @@ def test_calculator_start_unknown_command(capfd, monkeypatch):
     assert "No such command: unknown_command" in captured.out  # Check the unknown command message
     assert "Goodbye!" in captured.out  # Adjusted to match actual output
     logger.info("Unknown command handling test passed.")
+
+def test_one_shot_command(working_directory):
+    """Test that `main.py add 1 2` runs the command and exits with its status, writing no log or journal files."""
+    main = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    result = subprocess.run([sys.executable, main, "add", "1", "2"],
+                            capture_output=True, text=True, check=False)
+    assert result.returncode == 0
+    assert "The Solution of addition is 3" in result.stdout
+    assert not (working_directory / "logs").exists()
+    result = subprocess.run([sys.executable, main, "divide", "1", "0"],
+                            capture_output=True, text=True, check=False)
+    assert result.returncode == 1
+    assert "Division by zero" in result.stdout
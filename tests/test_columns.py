@@ -0,0 +1,73 @@
+"""
+Test suite for the CSV column engine and the column command.
+"""
+
+import logging
+from decimal import Decimal
+import pytest
+from calculator.columns import ColumnEngine, ColumnError
+from calculator.commands import CommandHandler
+from calculator.loader import scan_plugins
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def add(left, right):
+    """The calculation under test."""
+    return left + right
+
+def test_columns_by_name_and_number(tmp_path):
+    """Test column-by-column and column-by-scalar calculations, one output line per input row."""
+    source = tmp_path / "data.csv"
+    source.write_text("id,price,qty\n1,2.5,4\n2,oops,1\n3,1,2\n4\n", encoding="utf-8")
+    output = tmp_path / "out.csv"
+
+    engine = ColumnEngine(add)
+    assert engine.run(str(source), "price", "$3", str(output)) == 4
+    assert output.read_text(encoding="utf-8").split("\n") == ["result", "6.5", "", "3", "", ""]
+    assert (engine.malformed, engine.failed) == (2, 0)
+
+    engine.run(str(source), "qty", "0.5", str(output))
+    assert output.read_text(encoding="utf-8").split("\n")[1:4] == ["4.5", "1.5", "2.5"]
+
+def test_no_header_quotes_and_chunk_boundaries(tmp_path):
+    """Test that rows spanning chunk boundaries and quoted fields are parsed correctly."""
+    source = tmp_path / "data.csv"
+    rows = [f'"row, {index}",{index},{index}.25\r\n' for index in range(2000)]
+    source.write_text("".join(rows), encoding="utf-8", newline="")
+    output = tmp_path / "out.csv"
+
+    engine = ColumnEngine(add, chunk_size=4096)
+    assert engine.run(str(source), "$2", "$3", str(output), header=False) == 2000
+    results = output.read_text(encoding="utf-8").splitlines()
+    assert results == [str(Decimal(index) * 2 + Decimal("0.25")) for index in range(2000)]
+    assert engine.malformed == 0
+
+def test_invalid_operands(tmp_path):
+    """Test that unknown columns and scalar-only jobs are rejected."""
+    source = tmp_path / "data.csv"
+    source.write_text("a,b\n1,2\n", encoding="utf-8")
+    engine = ColumnEngine(add)
+    with pytest.raises(ColumnError):
+        engine.run(str(source), "a", "missing", str(tmp_path / "out.csv"))
+    with pytest.raises(ColumnError):
+        engine.run(str(source), "1", "2", str(tmp_path / "out.csv"))
+
+def test_column_command(tmp_path, capsys):
+    """Test the column command with a plugin operation and division by zero."""
+    source = tmp_path / "data.csv"
+    source.write_text("x,y\n6,3\n1,0\n", encoding="utf-8")
+    output = tmp_path / "out.csv"
+    command_handler = CommandHandler()
+    scan_plugins(command_handler)
+
+    context = command_handler.execute_command("column", "divide", str(source), "x", "y", str(output))
+    assert (context.outcome, context.result) == ("ok", 2)
+    assert output.read_text(encoding="utf-8") == "result\n2\n\n"
+    assert "Processed 2 rows" in capsys.readouterr().out
+    assert command_handler.execute_command("column", "menu", str(source), "x", "y", str(output)).outcome == "invalid_input"
+    assert command_handler.execute_command("column", "factorial", str(source), "x", "y", str(output)).outcome == "invalid_input"
+    assert command_handler.execute_command("column", "add", str(tmp_path / "missing.csv"), "x", "y",
+                                           str(output)).outcome == "invalid_input"
@@ -0,0 +1,139 @@
+"""
+Test suite for sharing a CommandHandler between threads.
+"""
+
+import sys
+import logging
+import threading
+from decimal import Decimal
+from calculator.cache import ResultCache
+from calculator.commands import Command, CommandHandler, capture_output, report_result
+from calculator.loader import load_plugins, scan_plugins
+from calculator.metrics import CommandMetrics
+from calculator.signatures import Param, Signature
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ConstantCommand(Command):
+    """Prints and reports a constant, one character at a time to provoke interleaving."""
+
+    def __init__(self, value: str):
+        self.value = value
+
+    def execute(self, *_args):
+        for character in self.value:
+            sys.stdout.write(character)
+        print()
+        report_result(self.value)
+
+class IntegerCommand(Command):
+    """Reports its argument plus one; the argument is converted by its signature."""
+
+    signature = Signature(Param("number", int))
+
+    def execute(self, number):  # pylint: disable=arguments-differ
+        report_result(number + 1)
+
+class TextCommand(Command):
+    """Reports its raw argument with an exclamation mark."""
+
+    def execute(self, *args):
+        report_result(args[0] + "!")
+
+class FailingCommand(Command):
+    """Raises an exception."""
+
+    def execute(self, *args):
+        raise RuntimeError("boom")
+
+def test_execute_many_keeps_order_and_output(capsys):
+    """Test that execute_many yields futures in input order with each command's own output."""
+    command_handler = CommandHandler(result_cache=ResultCache())
+    scan_plugins(command_handler)
+    command_handler.register_command("fail", FailingCommand())
+    lines = [f"add {index} 1" for index in range(200)] + ["fail"] + [("multiply", "3", "4")]
+    futures = list(command_handler.execute_many(lines, max_workers=8))
+
+    assert [future.result().result for future in futures[:200]] == [Decimal(index + 1) for index in range(200)]
+    assert all(future.result().output == f"The Solution of addition is {index + 1}\n"
+               for index, future in enumerate(futures[:200]))
+    assert isinstance(futures[200].exception(), RuntimeError)
+    assert futures[201].result().output == "The solution of multiplication is 12\n"
+    assert "The Solution of addition" not in capsys.readouterr().out
+
+def test_capture_output_is_per_thread():
+    """Test that threads capturing at the same time each get only their own output."""
+    captured = {}
+
+    def worker(name: str):
+        with capture_output() as output:
+            for _ in range(200):
+                print(name, end="")
+        captured[name] = output.getvalue()
+
+    threads = [threading.Thread(target=worker, args=(f"<{index}>",)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert captured == {f"<{index}>": f"<{index}>" * 200 for index in range(8)}
+
+def test_concurrent_register_and_execute(tmp_path):
+    """Stress test: threads register commands while others execute them through execute_many."""
+    manifest_path = str(tmp_path / "manifest.json")
+    load_plugins(CommandHandler(), manifest_path)
+    metrics = CommandMetrics()
+    command_handler = CommandHandler(result_cache=ResultCache(max_entries=64), metrics=metrics)
+    load_plugins(command_handler, manifest_path)
+    errors = []
+    rounds = []
+    stop = threading.Event()
+
+    def register(offset: int):
+        try:
+            for index in range(offset, 2000, 4):
+                command_handler.register_command(f"const{index}", ConstantCommand(f"value-{index}"))
+                # Each command must always be dispatched with its own parser.
+                command_handler.register_command("flip", IntegerCommand() if index % 2 else TextCommand())
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            errors.append(e)
+
+    def execute():
+        try:
+            while not rounds or not stop.is_set():
+                lines = [f"add {index} {index}" for index in range(50)]
+                lines += [f"const{index}" for index in range(0, 2000, 97)] + ["menu"] + ["flip 7"] * 20
+                for line, future in zip(lines, command_handler.execute_many(lines, max_workers=4)):
+                    context = future.result()
+                    details = (line, context.outcome, context.result, context.output)
+                    if line.startswith("add"):
+                        assert context.result == Decimal(int(line.split()[1]) * 2), details
+                    elif line == "flip 7":
+                        assert context.result in (8, "7!"), details
+                    elif line == "menu":
+                        assert context.ok and " - add " in context.output, details
+                    elif context.outcome == "ok":
+                        assert context.output == f"value-{line[5:]}\n", details
+                    else:
+                        assert context.outcome == "unknown_command", details
+                rounds.append(len(lines))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            errors.append(e)
+
+    executors = [threading.Thread(target=execute) for _ in range(3)]
+    registrars = [threading.Thread(target=register, args=(offset,)) for offset in range(4)]
+    with capture_output():
+        for thread in executors + registrars:
+            thread.start()
+        for thread in registrars:
+            thread.join()
+        stop.set()
+        for thread in executors:
+            thread.join()
+
+    assert not errors, errors
+    assert all(f"const{index}" in command_handler.commands for index in range(2000))
+    assert metrics.commands["add"].calls == 50 * len(rounds)
@@ -0,0 +1,84 @@
+"""
+Test suite for the warm calculator daemon and its client shim.
+"""
+
+import os
+import sys
+import time
+import logging
+import subprocess
+import calculator.daemon
+from calculator.commands import CommandHandler
+from calculator.daemon import WarmDaemon
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_shim(socket_path, *argv, stdin=None):
+    """Runs calc.py against the daemon at socket_path."""
+    return subprocess.run([sys.executable, os.path.join(ROOT, "calc.py"), *argv], input=stdin, capture_output=True, text=True,
+                          env=dict(os.environ, CALCULATOR_DAEMON_SOCKET=socket_path), check=False, timeout=30)
+
+def test_daemon_relays_output_and_status(tmp_path):
+    """Test one-shot commands and stdin batches through the daemon."""
+    socket_path = str(tmp_path / "calculator.sock")
+    with subprocess.Popen([sys.executable, os.path.join(ROOT, "main.py"), "--daemon", socket_path],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) as daemon:
+        try:
+            deadline = time.monotonic() + 20
+            while not os.path.exists(socket_path):
+                assert daemon.poll() is None and time.monotonic() < deadline
+                time.sleep(0.05)
+
+            result = run_shim(socket_path, "add", "1", "2")
+            assert (result.returncode, result.stdout) == (0, "The Solution of addition is 3\n")
+            result = run_shim(socket_path, "divide", "1", "0")
+            assert result.returncode == 1
+            assert "Division by zero" in result.stdout
+            result = run_shim(socket_path, stdin="add 1 2\nmultiply 3 4\n")
+            assert result.returncode == 0
+            assert result.stdout.splitlines() == ["The Solution of addition is 3", "The solution of multiplication is 12"]
+            assert "Processed 2 lines" in result.stderr
+        finally:
+            daemon.terminate()
+            daemon.wait(timeout=10)
+    assert not os.path.exists(socket_path)
+
+def test_shim_falls_back_without_daemon(tmp_path):
+    """Test that calc.py runs the command itself when no daemon is listening."""
+    result = run_shim(str(tmp_path / "missing.sock"), "subtract", "5", "3")
+    assert result.returncode == 0
+    assert "2" in result.stdout
+
+class _StubCalculator:
+    """Minimal stand-in for Calculator, counting how often it is built."""
+
+    built = 0
+
+    def __init__(self):
+        _StubCalculator.built += 1
+        self.command_handler = CommandHandler()
+
+    def shutdown_logging(self):
+        """Nothing to shut down."""
+
+def test_rewarm_when_plugins_change(monkeypatch):
+    """Test that the daemon warms up again only when the plugin fingerprint changes."""
+    fingerprint = ["one"]
+    monkeypatch.setattr(calculator.daemon, "plugin_fingerprint", lambda: fingerprint[0])
+    plugin_modules = {name: module for name, module in sys.modules.items() if name.startswith("calculator.plugins.")}
+    daemon = WarmDaemon(factory=_StubCalculator, check_interval=0)
+    try:
+        daemon.warm()
+        assert daemon.generation == 1
+        assert not daemon.check_plugins()
+        fingerprint[0] = "two"
+        assert daemon.check_plugins()
+        assert daemon.generation == 2
+        assert _StubCalculator.built == 2
+    finally:
+        sys.modules.update(plugin_modules)  # The re-warm dropped them; keep the other tests' classes.
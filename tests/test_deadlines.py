@@ -0,0 +1,87 @@
+"""
+Test suite for per-command deadlines and operand-size budgets.
+"""
+
+import time
+import logging
+import pytest
+from calculator.deadlines import Budget, Budgets, parse_budgets
+from calculator.engine import Engine
+from calculator.metrics import CommandMetrics
+from calculator.plugins.add import AddCommand
+from calculator.session import Session, use_session
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_over_budget_arguments_fail_before_parsing():
+    """Test that arguments beyond the length or exponent limits fail without running the command."""
+    metrics = CommandMetrics()
+    with Engine(budgets=Budgets(Budget(max_length=12, max_exponent=1000)), metrics=metrics) as engine:
+        result = engine.execute("multiply 2 9e999999999")
+        assert (result.outcome, result.output) == ("over_budget", "Error: Exponent 999999999 exceeds the limit of 1000\n")
+        assert engine.execute("add 1 1234567890123").outcome == "over_budget"
+        assert engine.execute("add [1,2e1001] 1").outcome == "over_budget"
+        assert engine.execute("add 1e1000 1").outcome == "ok"
+        assert engine.execute("add 1.5E-3 0").result is not None
+    assert metrics.commands["multiply"].errors == {"over_budget": 1}
+
+def test_parse_budgets():
+    """Test that per-command budgets override only the limits they name."""
+    default = Budget(timeout=5, max_length=100, max_exponent=10)
+    budgets = parse_budgets("multiply:timeout=1; divide:max_length=7,max_exponent=3", default)
+    assert (budgets["multiply"].timeout, budgets["multiply"].max_length) == (1.0, 100)
+    assert (budgets["divide"].timeout, budgets["divide"].max_length, budgets["divide"].max_exponent) == (5, 7, 3)
+    for text in ("multiply", "multiply:deadline=1", "multiply:timeout=soon"):
+        with pytest.raises(ValueError):
+            parse_budgets(text, default)
+
+def test_overrunning_call_is_stopped(monkeypatch):
+    """Test that a supervised call past its deadline fails cleanly and the next call gets a fresh worker."""
+    calculate = AddCommand.calculate
+
+    def slow_calculate(self, left, right):
+        if left == 999:
+            time.sleep(30)
+        return calculate(self, left, right)
+
+    # The workers are forked, so they inherit the patched method.
+    monkeypatch.setattr(AddCommand, "calculate", slow_calculate)
+    budgets = Budgets(Budget(), {"add": Budget(timeout=0.5), "divide": Budget(timeout=5)})
+    metrics = CommandMetrics()
+    with Engine(budgets=budgets, metrics=metrics) as engine, use_session(Session()):
+        started = time.perf_counter()
+        result = engine.execute("add 999 1")
+        assert time.perf_counter() - started < 5
+        assert (result.outcome, result.output) == ("timeout", "Error: add exceeded its deadline of 0.5s\n")
+        result = engine.execute("add 1 2")
+        assert (result.outcome, result.result, result.output) == ("ok", 3, "The Solution of addition is 3\n")
+        assert engine.execute("divide 1 0").outcome == "division_by_zero"
+        assert engine.execute("mode fraction").outcome == "ok"
+        assert engine.execute("divide 1 3").output == "The solution of division is 1/3\n"
+        assert budgets.watchdog.timeouts == 1
+    assert metrics.commands["add"].errors == {"timeout": 1}
+
+def test_expression_without_variables_is_supervised(monkeypatch):
+    """Test that expr runs under the watchdog with its own timeout unless it uses session variables."""
+    calculate = AddCommand.calculate
+
+    def slow_calculate(self, left, right):
+        if left == 999:
+            time.sleep(30)
+        return calculate(self, left, right)
+
+    monkeypatch.setattr(AddCommand, "calculate", slow_calculate)
+    budgets = Budgets(Budget(), {"expr": Budget(timeout=0.5)})
+    with Engine(budgets=budgets) as engine, use_session(Session()):
+        started = time.perf_counter()
+        result = engine.execute("expr 2 * (999 + 1)")
+        assert time.perf_counter() - started < 5
+        assert (result.outcome, result.output) == ("timeout", "Error: expr exceeded its deadline of 0.5s\n")
+        result = engine.execute("expr 2 * (1 + 2)")
+        assert (result.outcome, result.result) == ("ok", 6)
+        assert engine.execute("let x = 4").outcome == "ok"
+        assert engine.execute("expr x * (1 + 2)").result == 12
+        assert budgets.watchdog.timeouts == 1
@@ -0,0 +1,72 @@
+"""
+Test suite for the expression engine and the expr and let commands.
+"""
+
+from decimal import Decimal, DivisionByZero
+import pytest
+from calculator.commands import CommandHandler
+from calculator.expression import ExpressionError, compile_expression
+from calculator.loader import scan_plugins
+from calculator.session import Session, use_session
+
+
+@pytest.fixture(name="handler")
+def handler_fixture():
+    """Builds a handler with every plugin registered."""
+    command_handler = CommandHandler()
+    scan_plugins(command_handler)
+    return command_handler
+
+@pytest.mark.parametrize("text, expected", [
+    ("(2 + 3) * 4 / 8", Decimal("2.5")),
+    ("2 + 3 * 4", Decimal("14")),
+    ("10 - 4 - 3", Decimal("3")),
+    ("-2 * -(1 + 1)", Decimal("4")),
+    ("add(1.5, multiply(2, 3))", Decimal("7.5")),
+    ("1e2 / .5", Decimal("2E+2")),
+])
+def test_expressions(handler, text, expected):
+    """Test operator precedence, nesting and calls to plugin commands."""
+    assert compile_expression(text).evaluate(handler) == expected
+
+@pytest.mark.parametrize("text", ["2 +", "(1 + 2", "1 2", "3 $ 4", "", "nope(1)", "welcome(1)", "x + 1"])
+def test_invalid_expressions(handler, text):
+    """Test that malformed expressions and bad names raise ExpressionError."""
+    with pytest.raises(ExpressionError):
+        compile_expression(text).evaluate(handler)
+
+def test_division_by_zero_propagates(handler):
+    """Test that errors raised by plugin commands reach the caller."""
+    with pytest.raises(DivisionByZero):
+        compile_expression("1 / (2 - 2)").evaluate(handler)
+
+def test_template_is_compiled_once(handler):
+    """Test that a template is parsed once and evaluated over many bindings."""
+    compile_expression.cache_clear()
+    bindings = [{"a": Decimal(i), "b": Decimal(2), "c": Decimal(1)} for i in range(100)]
+    template = compile_expression("a * b + c")
+    results = list(template.evaluate_many(handler, bindings))
+    assert results[:3] == [Decimal(1), Decimal(3), Decimal(5)]
+    assert compile_expression("a * b + c") is template
+    assert template.variables == frozenset({"a", "b", "c"})
+    assert compile_expression.cache_info().misses == 1
+
+def test_let_and_expr_use_session_variables(handler, capfd):
+    """Test that variables bound with let are visible to expr in the same session only."""
+    with use_session(Session()):
+        handler.execute_command("let", "a", "=", "6")
+        context = handler.execute_command("expr", "a", "/", "4")
+    assert context.result == Decimal("1.5")
+    with use_session(Session()):
+        assert handler.execute_command("expr", "a").outcome == "invalid_expression"
+    assert "The result of the expression is 1.5" in capfd.readouterr().out
+
+def test_malformed_input_is_reported_not_raised(handler):
+    """Test that wrong call arity, deep nesting, long sign runs and overflow become command outcomes."""
+    with use_session(Session()):
+        assert handler.execute_command("expr", "factorial(3, 4)").outcome == "invalid_expression"
+        assert handler.execute_command("expr", "add(1)").outcome == "invalid_expression"
+        assert handler.execute_command("expr", "(" * 3000 + "1" + ")" * 3000).outcome == "invalid_expression"
+        assert handler.execute_command("let", "x", "=", "-" * 5001 + "2").result == Decimal(-2)
+        assert handler.execute_command("expr", "+".join(["1"] * 5000)).result == Decimal(5000)
+        assert handler.execute_command("expr", "9e999999*9e999999").outcome == "overflow"
@@ -0,0 +1,96 @@
+"""
+Test suite for the command history journal and the history, recall and replay commands.
+"""
+
+import os
+import logging
+import pytest
+from calculator.commands import CommandHandler
+from calculator.journal import Journal, JournalEntry, JournalReader, encode_entry
+from calculator.loader import scan_plugins
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def make_handler(path):
+    """Builds a handler with every plugin registered and a journal at path."""
+    command_handler = CommandHandler(journal=Journal(str(path), fsync_interval=0))
+    scan_plugins(command_handler)
+    return command_handler
+
+def test_round_trip_and_recent(tmp_path):
+    """Test that entries read back forwards and backwards as written."""
+    path = str(tmp_path / "history.journal")
+    journal = Journal(path)
+    for index in range(1000):
+        journal.append(JournalEntry(float(index), "add", (str(index), "1"), "ok", str(index + 1)))
+    journal.append(JournalEntry(1000.0, "divide", ("1", "0"), "division_by_zero"))
+    journal.close()
+
+    with JournalReader(path) as reader:
+        entries = list(reader)
+        recent = reader.recent(3)
+    assert len(entries) == 1001
+    assert (entries[5].command_name, entries[5].args, entries[5].result) == ("add", ("5", "1"), "6")
+    assert [str(entry) for entry in recent] == ["add 998 1 -> 999", "add 999 1 -> 1000", "divide 1 0 -> division_by_zero"]
+    assert recent[-1].result is None
+
+def test_torn_record_is_ignored_and_truncated(tmp_path):
+    """Test that a partial record left by a crash is invisible to readers and removed on reopen."""
+    path = str(tmp_path / "history.journal")
+    journal = Journal(path)
+    journal.append(JournalEntry(0.0, "add", ("1", "2"), "ok", "3"))
+    journal.close()
+    complete_size = os.path.getsize(path)
+    with open(path, "ab") as journal_file:
+        journal_file.write(encode_entry(JournalEntry(0.0, "add", ("2", "2"), "ok", "4"))[:-3])
+
+    with JournalReader(path) as reader:
+        assert [entry.line for entry in reader.recent(5)] == ["add 1 2"]
+    Journal(path).close()
+    assert os.path.getsize(path) == complete_size
+
+def test_not_a_journal(tmp_path):
+    """Test that other files are rejected instead of being appended to."""
+    path = tmp_path / "other.txt"
+    path.write_bytes(b"not a journal at all")
+    with pytest.raises(ValueError):
+        Journal(str(path))
+    with pytest.raises(ValueError):
+        JournalReader(str(path))
+    assert path.read_bytes() == b"not a journal at all"
+
+def test_history_and_recall(tmp_path, capsys):
+    """Test that computing commands are journaled and listed, and display-only commands are not."""
+    command_handler = make_handler(tmp_path / "history.journal")
+    command_handler.execute_command("add", "1", "2")
+    command_handler.execute_command("menu")
+    command_handler.execute_command("divide", "1", "0")
+    capsys.readouterr()
+
+    command_handler.execute_command("history")
+    assert capsys.readouterr().out.splitlines() == ["    2  add 1 2 -> 3", "    1  divide 1 0 -> division_by_zero"]
+    assert command_handler.execute_command("recall", "2").ok
+    assert capsys.readouterr().out == "add 1 2 -> 3\n"
+    assert command_handler.execute_command("recall", "7").outcome == "invalid_input"
+
+def test_replay_reports_mismatches(tmp_path, capsys):
+    """Test that replay re-executes a journal, pauses journaling and reports changed results."""
+    fixture = str(tmp_path / "fixture.journal")
+    journal = Journal(fixture)
+    journal.append(JournalEntry(0.0, "add", ("1", "2"), "ok", "3"))
+    journal.append(JournalEntry(0.0, "multiply", ("3", "4"), "ok", "13"))
+    journal.append(JournalEntry(0.0, "divide", ("1", "0"), "division_by_zero"))
+    journal.append(JournalEntry(0.0, "history", (), "invalid_input"))
+    journal.close()
+
+    command_handler = make_handler(tmp_path / "history.journal")
+    context = command_handler.execute_command("replay", fixture)
+    assert context.outcome == "replay_mismatch"
+    output = capsys.readouterr().out
+    assert "Replayed 3 entries" in output
+    assert "multiply 3 4: expected 13, got 12" in output
+    with JournalReader(command_handler.journal.path) as reader:
+        assert [entry.command_name for entry in reader] == ["replay"]
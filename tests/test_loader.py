@@ -0,0 +1,54 @@
+"""
+Test suite for lazy plugin loading backed by the plugin manifest.
+"""
+
+import json
+import logging
+from calculator.commands import CommandHandler
+from calculator.loader import LazyCommand, load_plugins
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_manifest_is_built_then_used_lazily(tmp_path, capfd):
+    """Test that the first load scans plugins and the next one registers lazy proxies."""
+    manifest_path = str(tmp_path / "manifest.json")
+
+    handler = CommandHandler()
+    assert load_plugins(handler, manifest_path) is False
+    assert not any(isinstance(command, LazyCommand) for command in handler.commands.values())
+
+    handler = CommandHandler()
+    assert load_plugins(handler, manifest_path) is True
+    assert {"add", "divide", "menu", "quit"} <= set(handler.commands)
+    assert all(isinstance(command, LazyCommand) for command in handler.commands.values())
+
+    handler.execute_command("add", "2", "3")
+    assert "The Solution of addition is 5" in capfd.readouterr().out
+    assert not isinstance(handler.commands["add"], LazyCommand)
+    assert isinstance(handler.commands["divide"], LazyCommand)
+    logger.info("Lazy manifest loading test passed.")
+
+def test_stale_manifest_is_rebuilt(tmp_path):
+    """Test that a manifest whose fingerprint no longer matches triggers a rescan."""
+    manifest_path = tmp_path / "manifest.json"
+    load_plugins(CommandHandler(), str(manifest_path))
+
+    manifest = json.loads(manifest_path.read_text())
+    manifest["fingerprint"] = "stale"
+    manifest_path.write_text(json.dumps(manifest))
+
+    assert load_plugins(CommandHandler(), str(manifest_path)) is False
+    assert json.loads(manifest_path.read_text())["fingerprint"] != "stale"
+
+def test_lazy_menu_receives_command_handler(tmp_path, capfd):
+    """Test that a lazily loaded command taking the handler lists all commands."""
+    manifest_path = str(tmp_path / "manifest.json")
+    load_plugins(CommandHandler(), manifest_path)
+    handler = CommandHandler()
+    load_plugins(handler, manifest_path)
+
+    handler.execute_command("menu")
+    assert " - subtract " in capfd.readouterr().out
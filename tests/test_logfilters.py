@@ -0,0 +1,119 @@
+"""
+Test suite for the sampling, rate-limiting and duplicate log filters.
+"""
+
+import logging
+import pytest
+from calculator.asynclog import AsyncLogging
+from calculator.logfilters import DuplicateFilter, RateLimitFilter, SamplingFilter, install_filters
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ListHandler(logging.Handler):
+    """Collects the formatted messages of the records it handles."""
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+class Unformattable:
+    """An argument that fails the test if a record using it is ever formatted."""
+    def __str__(self):
+        raise AssertionError("a filtered record was formatted")
+
+def make_logger(name: str, log_filter: logging.Filter) -> tuple:
+    """Returns a logger writing only to a new ListHandler with the filter attached."""
+    handler = ListHandler()
+    log_filter.attach(handler)
+    filtered_logger = logging.getLogger(f"tests.logfilters.{name}")
+    filtered_logger.handlers = [handler]
+    filtered_logger.propagate = False
+    filtered_logger.setLevel(logging.DEBUG)
+    return filtered_logger, handler
+
+def test_sampling_keeps_a_fraction_per_logger():
+    """Test that sampling keeps every n-th low-level record per logger and never formats the rest."""
+    sampling = SamplingFilter(rate=0.25, rates={"tests.logfilters.sampled.quiet": 0.0})
+    sampled_logger, handler = make_logger("sampled", sampling)
+    quiet_logger = sampled_logger.getChild("quiet")
+    quiet_logger.addHandler(handler)
+    quiet_logger.propagate = False
+    for index in range(8):
+        sampled_logger.info("info %d", index)
+        quiet_logger.info("quiet %s", Unformattable())
+    sampled_logger.warning("warning")
+    assert handler.messages == ["info 0", "info 4", "warning"]
+    assert sampling.sampled_out == 14
+
+def test_sampling_rejects_invalid_rates():
+    """Test that a rate outside 0 to 1 is rejected."""
+    with pytest.raises(ValueError):
+        SamplingFilter(rate=2)
+
+def test_rate_limit_per_template(monkeypatch):
+    """Test that each message template gets its own bucket and suppressed records are summarized."""
+    now = [100.0]
+    monkeypatch.setattr("calculator.logfilters.time.monotonic", lambda: now[0])
+    rate_limit = RateLimitFilter(rate=1, burst=2)
+    limited_logger, handler = make_logger("limited", rate_limit)
+    for index in range(5):
+        limited_logger.info("tick %d", index)
+        limited_logger.info("tock")
+    now[0] += 1.0
+    limited_logger.info("tick %d", 5)
+    assert handler.messages == ["tick 0", "tock", "tick 1", "tock",
+                                "Rate limit suppressed 3 records like 'tick %d'", "tick 5"]
+    assert rate_limit.suppressed == 6
+
+def test_duplicates_are_collapsed():
+    """Test that consecutive identical records become one record and a repeat count."""
+    duplicates = DuplicateFilter()
+    repeating_logger, handler = make_logger("repeating", duplicates)
+    for _ in range(4):
+        repeating_logger.warning("disk %s is full", "sda")
+    repeating_logger.warning("disk %s is full", "sdb")
+    repeating_logger.warning("disk %s is full", "sdb")
+    repeating_logger.info("done")
+    assert handler.messages == ["disk sda is full", "Last message repeated 3 times", "disk sdb is full",
+                                "Last message repeated 1 times", "done"]
+
+def test_install_filters_from_config(tmp_path):
+    """Test that the filter sections of a logging configuration attach one filter per handler."""
+    config_path = tmp_path / "logging.conf"
+    config_path.write_text("[filters]\nkeys=sampling\n\n[filter_sampling]\n"
+                           "class=calculator.logfilters.SamplingFilter\nkwargs={'rate': 0.5}\n"
+                           "handlers=first,second\n")
+    handlers = [ListHandler(), ListHandler()]
+    handlers[0].name, handlers[1].name = "first", "second"
+    configured_logger = logging.getLogger("tests.logfilters.configured")
+    configured_logger.handlers = handlers
+    try:
+        installed = install_filters(str(config_path))
+        assert [handler.filters for handler in handlers] == [[installed[0]], [installed[1]]]
+        assert installed[0].rate == 0.5
+        bad_path = tmp_path / "bad.conf"
+        bad_path.write_text(config_path.read_text().replace("second", "missing"))
+        with pytest.raises(ValueError):
+            install_filters(str(bad_path))
+    finally:
+        configured_logger.handlers = []
+
+def test_async_logging_filters_before_queuing():
+    """Test that the asynchronous pipeline applies handler filters before a record is formatted or queued."""
+    sampling = SamplingFilter(rate=0.5)
+    target, handler = make_logger("async", sampling)
+    async_logging = AsyncLogging(queue_size=100, target=target)
+    async_logging.start()
+    try:
+        target.info("kept %s", 0)
+        target.info("sampled out %s", Unformattable())
+        target.info("kept %s", 1)
+    finally:
+        async_logging.stop()
+    assert handler.messages == ["kept 0", "kept 1"]
+    assert async_logging.handler.queue.empty()
@@ -0,0 +1,96 @@
+"""
+Test suite for the JSON-lines log format and the indexed log query tool.
+"""
+
+import os
+import io
+import gzip
+import json
+import logging
+from calculator.commands import CommandHandler
+from calculator.jsonlog import JsonFormatter, install_record_factory
+from calculator.logquery import LogIndex
+from calculator.logrotate import CompressingRotatingFileHandler
+from calculator.plugins.divide import DivideCommand
+
+
+def write_records(path, records):
+    """Appends records to a log file as JSON lines."""
+    with open(path, "a", encoding="utf-8") as log_file:
+        for record in records:
+            log_file.write(json.dumps(record) + "\n")
+
+def test_json_formatter_includes_command_fields():
+    """Test that records emitted during a command carry the command fields."""
+    install_record_factory()
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    plugin_logger = logging.getLogger("calculator.plugins.divide")
+    plugin_logger.addHandler(handler)
+    try:
+        command_handler = CommandHandler()
+        command_handler.register_command("divide", DivideCommand())
+        command_handler.execute_command("divide", "1", "0")
+    finally:
+        plugin_logger.removeHandler(handler)
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    error = [entry for entry in entries if entry["level"] == "ERROR"][0]
+    assert error["command"] == "divide"
+    assert error["operands"] == ["1", "0"]
+    assert error["outcome"] == "division_by_zero"
+    assert error["duration_ms"] >= 0
+
+def test_index_follows_rotation_incrementally(tmp_path):
+    """Test that rotated files are not re-indexed and appended records are picked up."""
+    log_path = str(tmp_path / "app.log")
+    write_records(log_path, [{"ts": 100.0, "level": "INFO", "command": "add", "outcome": "ok"},
+                             {"ts": 101.0, "level": "ERROR", "command": "divide", "outcome": "division_by_zero"}])
+    with LogIndex(log_path) as index:
+        assert index.update() == 2
+
+        os.rename(log_path, log_path + ".1")
+        write_records(log_path, [{"ts": 200.0, "level": "ERROR", "command": "divide", "outcome": "division_by_zero"}])
+        assert index.update() == 1
+
+        assert index.count(outcome="division_by_zero") == 2
+        assert index.count(since=150.0, command="divide") == 1
+        assert index.count(level="ERROR") == 2
+        assert [record["ts"] for record in index.query(command="divide")] == [101.0, 200.0]
+        assert [record["ts"] for record in index.query(limit=1)] == [200.0]
+
+        os.remove(log_path + ".1")
+        index.update()
+        assert index.count() == 1
+
+def test_index_keeps_compressed_segments(tmp_path):
+    """Test that segments stay queryable once compressed, and archives never indexed are read too."""
+    log_path = str(tmp_path / "app.log")
+    segment = log_path + ".20261017-194130-123456"
+    write_records(segment, [{"ts": 100.0, "level": "ERROR", "command": "divide", "outcome": "division_by_zero"}])
+    write_records(log_path, [{"ts": 300.0, "level": "INFO", "command": "add", "outcome": "ok"}])
+    with LogIndex(log_path) as index:
+        assert index.update() == 2
+
+        write_records(segment, [{"ts": 101.0, "level": "ERROR", "command": "divide", "outcome": "division_by_zero"}])
+        CompressingRotatingFileHandler(log_path, delay=True).close()  # Compresses the leftover segment.
+        with gzip.open(log_path + ".20261016-120000-000000.gz", "wt", encoding="utf-8") as archive:
+            archive.write(json.dumps({"ts": 50.0, "level": "ERROR", "command": "divide", "outcome": "overflow"}) + "\n")
+        assert index.update() == 2
+        assert index.update() == 0
+
+        assert [path.rsplit("/", 1)[-1] for path in index.log_files()] == [
+            "app.log", "app.log.20261017-194130-123456.gz", "app.log.20261016-120000-000000.gz"]
+        assert index.count(command="divide") == 3
+        assert [record["ts"] for record in index.query(level="ERROR")] == [50.0, 100.0, 101.0]
+        assert [record["ts"] for record in index.query()] == [50.0, 100.0, 101.0, 300.0]
+
+def test_index_reads_free_text_lines(tmp_path):
+    """Test that lines in the older free-text format are indexed too."""
+    log_path = tmp_path / "app.log"
+    log_path.write_text("2024-01-01 10:00:00,123 - calculator.plugins.add - WARNING - Bad arity\n"
+                        "Traceback (most recent call last):\n")
+    with LogIndex(str(log_path)) as index:
+        assert index.update() == 1
+        assert index.query(level="WARNING")[0]["message"] == "Bad arity"
@@ -0,0 +1,111 @@
+"""
+Test suite for the background compressing log rotation.
+"""
+
+import os
+import gzip
+import time
+import logging
+from calculator.logquery import LogIndex
+from calculator.logrotate import CompressingRotatingFileHandler
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def make_logger(handler: logging.Handler) -> logging.Logger:
+    """Returns a logger writing only to the given handler."""
+    rotation_logger = logging.getLogger(f"tests.logrotate.{id(handler)}")
+    rotation_logger.propagate = False
+    rotation_logger.setLevel(logging.INFO)
+    rotation_logger.addHandler(handler)
+    return rotation_logger
+
+def read_segments(handler: CompressingRotatingFileHandler) -> list:
+    """Reads the lines of every segment, oldest first, then of the active file."""
+    lines = []
+    for path, suffix in handler.segments():
+        opener = gzip.open if suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as segment:
+            lines += segment.read().splitlines()
+    with open(handler.baseFilename, encoding="utf-8") as active:
+        return lines + active.read().splitlines()
+
+def test_size_rotation_compresses_in_background(tmp_path):
+    """Test that size-based rotation keeps every record, in order, in gzip segments and the active file."""
+    handler = CompressingRotatingFileHandler(str(tmp_path / "app.log"), max_bytes=500)
+    rotation_logger = make_logger(handler)
+    for index in range(200):
+        rotation_logger.info("record %04d", index)
+    handler.wait()
+
+    segments = handler.segments()
+    assert len(segments) == 4
+    assert all(suffix == ".gz" for _, suffix in segments)
+    assert read_segments(handler) == [f"record {index:04d}" for index in range(200)]
+    assert (tmp_path / "app.log").stat().st_size <= 500
+    handler.close()
+
+def test_retention_budget_prunes_oldest_segments(tmp_path):
+    """Test that the oldest segments are deleted until the segments fit the retention budget."""
+    handler = CompressingRotatingFileHandler(str(tmp_path / "app.log"), max_bytes=1000, retention_bytes=3000,
+                                             compression="none")
+    rotation_logger = make_logger(handler)
+    for index in range(1000):
+        rotation_logger.info("record %04d", index)
+    handler.close()
+
+    segments = handler.segments()
+    assert sum((tmp_path / path).stat().st_size for path, _ in segments) <= 3000
+    assert read_segments(handler)[-1] == "record 0999"
+    assert "record 0000" not in read_segments(handler)
+
+def test_time_rotation(tmp_path):
+    """Test that a record after the end of the interval starts a new segment."""
+    handler = CompressingRotatingFileHandler(str(tmp_path / "app.log"), interval=0.2, compression="xz")
+    rotation_logger = make_logger(handler)
+    rotation_logger.info("first")
+    time.sleep(0.25)
+    rotation_logger.info("second")
+    handler.close()
+    assert [suffix for _, suffix in handler.segments()] == [".xz"]
+    assert (tmp_path / "app.log").read_text(encoding="utf-8") == "second\n"
+
+def test_leftover_segments_are_compressed_and_indexed(tmp_path):
+    """Test that uncompressed segments are compressed on start, and stay indexed by LogIndex once compressed."""
+    log_path = tmp_path / "app.log"
+    log_path.write_text("active\n")
+    (tmp_path / "app.log.20260101-000000-000000").write_text("older\n")
+    (tmp_path / "app.log.20260102-000000-000000").write_text("old\n")
+    with LogIndex(str(log_path)) as index:
+        assert [path.rsplit("/", 1)[-1] for path in index.log_files()] == [
+            "app.log", "app.log.20260102-000000-000000", "app.log.20260101-000000-000000"]
+
+    handler = CompressingRotatingFileHandler(str(log_path))
+    handler.close()
+    assert [suffix for _, suffix in handler.segments()] == [".gz", ".gz"]
+    assert read_segments(handler) == ["older", "old", "active"]
+    with LogIndex(str(log_path)) as index:
+        assert [path.rsplit("/", 1)[-1] for path in index.log_files()] == [
+            "app.log", "app.log.20260102-000000-000000.gz", "app.log.20260101-000000-000000.gz"]
+
+def test_detached_child_leaves_rotation_to_parent(tmp_path):
+    """Test that a forked child that detached the handler appends without rotating, and the parent still rotates."""
+    handler = CompressingRotatingFileHandler(str(tmp_path / "app.log"), max_bytes=500)
+    rotation_logger = make_logger(handler)
+    rotation_logger.info("parent")
+    pid = os.fork()
+    if pid == 0:
+        handler.detach()
+        for index in range(100):
+            rotation_logger.info("child %04d", index)
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert not handler.segments()
+    assert read_segments(handler) == ["parent"] + [f"child {index:04d}" for index in range(100)]
+
+    rotation_logger.info("parent again")
+    handler.wait()
+    assert [suffix for _, suffix in handler.segments()] == [".gz"]
+    handler.close()
@@ -0,0 +1,63 @@
+"""
+Test suite for command metrics, the stats command and the Prometheus exporter.
+"""
+
+from calculator.commands import CommandHandler
+from calculator.loader import scan_plugins
+from calculator.metrics import UNKNOWN_COMMAND, CommandMetrics, PrometheusFileExporter
+
+
+def make_handler():
+    """Builds a handler with metrics and every plugin registered."""
+    handler = CommandHandler(metrics=CommandMetrics())
+    scan_plugins(handler)
+    return handler
+
+def test_calls_errors_and_latency_are_recorded():
+    """Test that calls, error kinds and latencies are recorded per command."""
+    handler = make_handler()
+    handler.execute_command("divide", "4", "2")
+    handler.execute_command("divide", "1", "0")
+    handler.execute_command("divide", "x", "1")
+    handler.execute_command("nope")
+
+    divide = handler.metrics.commands["divide"]
+    assert divide.calls == 3
+    assert divide.errors == {"division_by_zero": 1, "invalid_input": 1}
+    assert sum(divide.buckets) == 3
+    assert divide.total_seconds > 0
+    assert handler.metrics.commands[UNKNOWN_COMMAND].errors == {"unknown_command": 1}
+
+def test_histogram_buckets_and_quantiles():
+    """Test bucket placement and the quantile estimate."""
+    metrics = CommandMetrics(bounds=(0.001, 0.01, 0.1))
+    for seconds in (0.0005, 0.0005, 0.005, 0.05, 5.0):
+        metrics.record("add", "ok", seconds)
+    stats = metrics.commands["add"]
+    assert stats.buckets == [2, 1, 1, 1]
+    assert stats.quantile(0.4, metrics.bounds) == 0.001
+    assert stats.quantile(0.6, metrics.bounds) == 0.01
+    assert stats.quantile(1.0, metrics.bounds) == float("inf")
+
+def test_prometheus_file_export(tmp_path):
+    """Test that the exporter writes cumulative histogram buckets in the text format."""
+    metrics = CommandMetrics(bounds=(0.001, 0.01))
+    metrics.record("add", "ok", 0.0001)
+    metrics.record("add", "invalid_input", 0.005)
+    path = tmp_path / "calculator.prom"
+    PrometheusFileExporter(metrics, str(path)).write()
+    text = path.read_text()
+    assert 'calculator_command_calls_total{command="add"} 2' in text
+    assert 'calculator_command_errors_total{command="add",kind="invalid_input"} 1' in text
+    assert 'calculator_command_duration_seconds_bucket{command="add",le="0.001"} 1' in text
+    assert 'calculator_command_duration_seconds_bucket{command="add",le="+Inf"} 2' in text
+
+def test_stats_command(capfd):
+    """Test that the stats command lists the recorded commands."""
+    handler = make_handler()
+    handler.execute_command("divide", "1", "0")
+    handler.execute_command("stats")
+    output = capfd.readouterr().out
+    assert "division_by_zero=1" in output
+    handler.execute_command("stats", "reset")
+    assert list(handler.metrics.commands) == ["stats"]
@@ -0,0 +1,104 @@
+"""
+Test suite for the numeric backends and the mode command.
+"""
+
+import logging
+from decimal import Decimal, DivisionByZero, InvalidOperation, Overflow
+from fractions import Fraction
+import pytest
+from calculator.cache import ResultCache
+from calculator.commands import Command
+from calculator.expression import compile_expression
+from calculator.numeric import MAX_PRECISION, create_backend, current_backend, max_precision, set_max_precision
+from calculator.session import Session, use_session
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.mark.parametrize("name, expected", [("float", 0.1 + 0.2), ("decimal", Decimal("0.3")),
+                                            ("fraction", Fraction(3, 10))])
+def test_backends_compute_in_their_type(command_handler, name, expected):
+    """Test that the arithmetic commands compute with the session's backend."""
+    with use_session(Session()) as session:
+        session.backend = create_backend(name)
+        context = command_handler.execute_command("add", "0.1", "0.2")
+    assert context.result == expected
+    assert type(context.result) is type(expected)
+
+@pytest.mark.parametrize("name", ["float", "decimal", "fraction"])
+def test_errors_are_consistent(command_handler, name):
+    """Test that every backend reports invalid input and division by zero the same way."""
+    backend = create_backend(name)
+    with pytest.raises(InvalidOperation):
+        backend.parse("abc")
+    with pytest.raises(DivisionByZero):
+        backend.apply(command_handler.commands["divide"].calculate, backend.parse("1"), backend.parse("0"))
+    with use_session(Session()) as session:
+        session.backend = backend
+        assert command_handler.execute_command("multiply", "x", "2").outcome == "invalid_input"
+        assert command_handler.execute_command("divide", "1", "0").outcome == "division_by_zero"
+        assert command_handler.execute_command("subtract", "inf", "inf").outcome == "invalid_input"
+        if name != "fraction":
+            large = "1e200" if name == "float" else "9e999999"
+            assert command_handler.execute_command("multiply", large, large, "2").outcome == "overflow"
+            assert command_handler.execute_command("multiply", f"[1,{large}]", large).outcome == "overflow"
+
+def test_decimal_precision_and_rounding(command_handler):
+    """Test that the decimal backend applies its own precision and rounding mode."""
+    backend = create_backend("decimal", 5, "half_up")
+    assert backend.rounding == "ROUND_HALF_UP"
+    with use_session(Session()) as session:
+        session.backend = backend
+        assert command_handler.execute_command("divide", "2", "3").result == Decimal("0.66667")
+    with pytest.raises(ValueError):
+        create_backend("decimal", 5, "sideways")
+    with pytest.raises(ValueError):
+        create_backend("float", 5)
+    with pytest.raises(ValueError):
+        create_backend("decimal", MAX_PRECISION + 1)
+    with use_session(Session()):
+        assert command_handler.execute_command("mode", "decimal", str(MAX_PRECISION + 1)).outcome == "invalid_input"
+
+def test_mode_command_is_per_session(command_handler, capsys):
+    """Test that mode changes only the current session's backend."""
+    with use_session(Session()):
+        assert command_handler.execute_command("mode", "fraction").ok
+        assert command_handler.execute_command("divide", "1", "3").result == Fraction(1, 3)
+        assert command_handler.execute_command("mode", "bogus").outcome == "invalid_input"
+        assert current_backend().name == "fraction"
+    assert current_backend().name == "decimal"
+    assert "Numeric mode: fraction" in capsys.readouterr().out
+
+def test_expressions_and_cache_follow_the_backend(command_handler):
+    """Test that expressions use the backend and cached results are not shared between backends."""
+    cache = ResultCache()
+    with use_session(Session()) as session:
+        decimal_key = cache.make_key("add", ("1", "2"))
+        session.backend = create_backend("fraction")
+        assert cache.make_key("add", ("1", "2")) != decimal_key
+        session.variables["a"] = Decimal("0.5")
+        assert compile_expression("1 / 3 + a").evaluate(command_handler, session.variables) == Fraction(5, 6)
+
+def test_maximum_precision_and_unreported_overflow(command_handler):
+    """Test that the maximum precision bounds mode and the constants, and an uncaught Overflow is an overflow."""
+    class OverflowCommand(Command):
+        """A command leaving the decimal module's Overflow to the dispatcher."""
+
+        def execute(self):
+            raise Overflow("too large")
+
+    command_handler.register_command("overflow", OverflowCommand())
+    set_max_precision(50)
+    try:
+        with use_session(Session()):
+            assert command_handler.execute_command("mode", "decimal", "51").outcome == "invalid_input"
+            assert command_handler.execute_command("pi", "51").outcome == "invalid_input"
+            assert command_handler.execute_command("e", "50").ok
+    finally:
+        set_max_precision(MAX_PRECISION)
+    assert max_precision() == MAX_PRECISION
+    with pytest.raises(ValueError):
+        set_max_precision(0)
+    assert command_handler.execute_command("overflow").outcome == "overflow"
@@ -0,0 +1,136 @@
+"""
+Test suite for the asyncio calculator server and client.
+"""
+
+import time
+import asyncio
+import logging
+from calculator.commands import Command, CommandHandler
+from calculator.loader import scan_plugins
+from calculator.server import CalculatorClient, CalculatorServer, parse_address
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLIENTS = 100
+REQUESTS_PER_CLIENT = 20
+
+def make_server():
+    """Builds a server around a handler with every plugin registered."""
+    command_handler = CommandHandler()
+    scan_plugins(command_handler)
+    return CalculatorServer(command_handler)
+
+def test_parse_address():
+    """Test the accepted address forms."""
+    assert parse_address("tcp://localhost:9000") == ("tcp", ("localhost", 9000))
+    assert parse_address(":9000") == ("tcp", ("127.0.0.1", 9000))
+    assert parse_address("unix:/tmp/calc.sock") == ("unix", "/tmp/calc.sock")
+
+def test_concurrent_clients_throughput_and_latency():
+    """Test many concurrent loopback clients, reporting requests/sec and p99 latency."""
+    plugin_logger = logging.getLogger("calculator.plugins")
+    previous_level = plugin_logger.level
+    plugin_logger.setLevel(logging.WARNING)  # Measure the server, not the log handlers.
+
+    async def client_session(address, index, latencies):
+        client = await CalculatorClient.connect(address)
+        try:
+            outcome, lines = await client.request(f"let x = {index}")
+            assert outcome == "ok"
+            for _ in range(REQUESTS_PER_CLIENT):
+                started = time.perf_counter()
+                outcome, lines = await client.request("expr x * 2")
+                latencies.append(time.perf_counter() - started)
+                assert (outcome, lines) == ("ok", [f"The result of the expression is {index * 2}"])
+            assert await client.request("divide 1 0") == ("division_by_zero", ["Error: Division by zero is not allowed."])
+        finally:
+            await client.close()
+
+    async def run():
+        server = make_server()
+        await server.start("127.0.0.1:0")
+        address = server.addresses()[0]
+        latencies = []
+        started = time.perf_counter()
+        await asyncio.gather(*(client_session(address, index, latencies) for index in range(CLIENTS)))
+        elapsed = time.perf_counter() - started
+        await server.close()
+        return server, latencies, elapsed
+
+    try:
+        server, latencies, elapsed = asyncio.run(run())
+    finally:
+        plugin_logger.setLevel(previous_level)
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    logger.info("Served %d requests in %.3fs: %.0f requests/sec, p99 latency %.2f ms",
+                server.requests, elapsed, server.requests / elapsed, p99 * 1000)
+    assert server.requests == CLIENTS * (REQUESTS_PER_CLIENT + 2)
+    assert server.connections == 0
+    assert p99 < 5.0
+
+def test_unix_socket_pipelining(tmp_path):
+    """Test pipelined requests over a Unix socket come back in order."""
+    async def run():
+        server = make_server()
+        await server.start(f"unix:{tmp_path / 'calc.sock'}")
+        client = await CalculatorClient.connect(server.addresses()[0])
+        for i in range(10):
+            client.send(f"add {i} 1")
+        responses = [await client.receive() for _ in range(10)]
+        await client.close()
+        await server.close()
+        return responses
+
+    responses = asyncio.run(run())
+    assert responses == [("ok", [f"The Solution of addition is {i + 1}"]) for i in range(10)]
+
+def test_large_responses_and_remote_restrictions(tmp_path):
+    """Test that responses larger than the line limit arrive whole, and remote sessions cannot touch server files."""
+    data_path = tmp_path / "values.txt"
+    data_path.write_text("1 2 3\n", encoding="utf-8")
+
+    async def run():
+        server = make_server()
+        await server.start("127.0.0.1:0")
+        client = await CalculatorClient.connect(server.addresses()[0])
+        try:
+            return [await client.request(line) for line in (
+                "pi 100000", f"sum @{data_path}", "sum -", f"add @{data_path} 1",
+                f"column add {data_path} $1 $2 {tmp_path / 'out.csv'} --no-header", "history", "sum 1 2 3")]
+        finally:
+            await client.close()
+            await server.close()
+
+    pi, *refused, total = asyncio.run(run())
+    assert pi[0] == "ok" and len(pi[1][0]) > 100000
+    assert [outcome for outcome, _ in refused] == ["invalid_input"] * 3 + ["not_permitted"] * 2
+    assert total == ("ok", ["The sum is 6"])
+    assert not (tmp_path / "out.csv").exists()
+
+def test_command_exiting_gets_a_response():
+    """Test that a command calling sys.exit answers with an error instead of dropping the connection."""
+    class ExitCommand(Command):
+        """A command ending the process, as quit does."""
+
+        def execute(self):
+            raise SystemExit("Bye Bye")
+
+    async def run():
+        server = make_server()
+        server.command_handler.register_command("leave", ExitCommand())
+        await server.start("127.0.0.1:0")
+        client = await CalculatorClient.connect(server.addresses()[0])
+        try:
+            return [await client.request(line) for line in ("leave", "add 1 1")]
+        finally:
+            await client.close()
+            await server.close()
+
+    exited, added = asyncio.run(run())
+    assert exited == ("exception", ["Error: SystemExit: Bye Bye"])
+    assert added == ("ok", ["The Solution of addition is 2"])
@@ -0,0 +1,51 @@
+"""
+Test suite for the lazy, typed Settings view.
+"""
+
+import os
+import logging
+import pytest
+from calculator.settings import Settings, find_env_file
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_typed_getters():
+    """Test that settings are converted to the requested types, with defaults for unset values."""
+    settings = Settings({"FLAG": "Yes", "OFF": "0", "SIZE": "42", "RATE": "2.5", "EMPTY": ""})
+    assert settings.get_bool("FLAG") is True
+    assert settings.get_bool("OFF", True) is False
+    assert settings.get_bool("MISSING", True) is True
+    assert settings.get_bool("EMPTY", True) is True
+    assert settings.get_int("SIZE") == 42
+    assert settings.get_int("MISSING", 7) == 7
+    assert settings.get_float("RATE") == 2.5
+    assert settings.get_str("EMPTY", "default") == "default"
+    with pytest.raises(ValueError):
+        settings.get_bool("SIZE")
+
+def test_settings_is_a_live_view():
+    """Test that settings are read from the environment when accessed, not copied."""
+    environ = {}
+    settings = Settings(environ)
+    environ["LATE"] = "1"
+    assert settings["LATE"] == "1"
+    assert dict(settings) == {"LATE": "1"}
+
+def test_env_file_loaded_on_first_access(tmp_path, monkeypatch):
+    """Test that the .env file is only loaded when a setting is first read and does not override the environment."""
+    (tmp_path / ".env").write_text("CALCULATOR_TEST_FROM_FILE=file\nCALCULATOR_TEST_OVERRIDE=file\n")
+    nested = tmp_path / "package" / "calculator"
+    nested.mkdir(parents=True)
+    assert find_env_file(str(nested)) == str(tmp_path / ".env")
+    monkeypatch.delenv("CALCULATOR_TEST_FROM_FILE", raising=False)
+    monkeypatch.setenv("CALCULATOR_TEST_OVERRIDE", "environment")
+
+    settings = Settings(env_file_search=str(nested))
+    assert "CALCULATOR_TEST_FROM_FILE" not in os.environ
+    try:
+        assert settings.get_str("CALCULATOR_TEST_FROM_FILE") == "file"
+        assert settings.get_str("CALCULATOR_TEST_OVERRIDE") == "environment"
+    finally:
+        monkeypatch.delenv("CALCULATOR_TEST_FROM_FILE", raising=False)
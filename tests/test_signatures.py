@@ -0,0 +1,76 @@
+"""
+Test suite for declarative command signatures.
+"""
+
+import logging
+from decimal import Decimal
+import pytest
+from calculator.commands import Command, CommandHandler
+from calculator.loader import LazyCommand, load_plugins
+from calculator.signatures import Param, Signature, SignatureError
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class EchoCommand(Command):
+    """Reports the values it is invoked with."""
+
+    signature = Signature(Param("count", int, minimum=1, maximum=9), Param("unit", optional=True, choices=("s", "ms")))
+
+    def execute(self, count, unit="s"):  # pylint: disable=arguments-differ
+        print(f"{count}{unit}")
+
+def test_compiled_parser():
+    """Test arity, conversion, range and choice checks of a compiled signature."""
+    parse = EchoCommand.signature.compile("echo")
+    assert parse(("3",)) == (3,)
+    assert parse(("3", "ms")) == (3, "ms")
+    for args, kind in [((), "invalid_arity"), (("1", "s", "x"), "invalid_arity"), (("x",), "invalid_input"),
+                       (("0",), "invalid_input"), (("10",), "invalid_input"), (("1", "h"), "invalid_input")]:
+        with pytest.raises(SignatureError) as error:
+            parse(args)
+        assert error.value.kind == kind
+        assert str(error.value).endswith("Usage: echo COUNT [s|ms]")
+
+def test_variadic_parser():
+    """Test a variadic parameter with a minimum count, and invalid declarations."""
+    signature = Signature(Param("operand", Decimal, variadic=True, min_count=2))
+    parse = signature.compile("add")
+    assert signature.usage("add") == "add OPERAND OPERAND [OPERAND ...]"
+    assert parse(("1", "2", "3")) == (Decimal(1), Decimal(2), Decimal(3))
+    with pytest.raises(SignatureError, match="Invalid operand: 'x'"):
+        parse(("1", "x"))
+    with pytest.raises(SignatureError):
+        parse(("1",))
+    with pytest.raises(ValueError):
+        Signature(Param("a", optional=True), Param("b"))
+    with pytest.raises(ValueError):
+        Signature(Param("a", variadic=True), Param("b"))
+
+def test_handler_invokes_with_converted_values(capsys):
+    """Test that the handler passes converted values and reports bad arguments uniformly."""
+    command_handler = CommandHandler()
+    command_handler.register_command("echo", EchoCommand())
+    assert command_handler.execute_command("echo", "4").ok
+    assert command_handler.execute_command("echo", "4", "ms").ok
+    assert capsys.readouterr().out == "4s\n4ms\n"
+    assert command_handler.execute_command("echo", "0").outcome == "invalid_input"
+    assert capsys.readouterr().out == "Error: count must be at least 1, got 0. Usage: echo COUNT [s|ms]\n"
+
+def test_plugin_signatures(tmp_path, capsys):
+    """Test plugin signatures, including a lazily loaded plugin's first call."""
+    manifest_path = str(tmp_path / "manifest.json")
+    load_plugins(CommandHandler(), manifest_path)
+    command_handler = CommandHandler()
+    load_plugins(command_handler, manifest_path)
+    assert isinstance(command_handler.commands["multiply"], LazyCommand)
+    assert "multiply" not in command_handler.parsers
+    assert command_handler.execute_command("multiply", "2", "3").result == Decimal(6)
+    assert "multiply" in command_handler.parsers
+    assert command_handler.execute_command("multiply", "2").outcome == "invalid_arity"
+    assert command_handler.execute_command("menu", "extra").outcome == "invalid_arity"
+    assert command_handler.execute_command("mode", "binary").outcome == "invalid_input"
+    assert command_handler.execute_command("mode", "decimal", "0").outcome == "invalid_input"
+    capsys.readouterr()
@@ -0,0 +1,111 @@
+"""
+Test suite for structured results, the output sinks and the headless engine.
+"""
+
+import io
+import json
+import logging
+from decimal import Decimal
+from calculator.batch import BatchRunner, ParallelBatchRunner
+from calculator.commands import CommandContext
+from calculator.engine import Engine
+from calculator.numeric import FloatBackend
+from calculator.sinks import BinarySink, CsvSink, JsonLinesSink, TextSink, create_sink, read_binary
+from calculator.vectors import Vector, make_vector
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def make_result(operation: str, args: tuple, outcome: str, result) -> CommandContext:
+    """Builds a CommandContext as execute_command returns it."""
+    context = CommandContext(operation, args)
+    context.outcome, context.result = outcome, result
+    return context
+
+RESULTS = [make_result("add", ("1", "2"), "ok", Decimal("3")),
+           make_result("divide", ("1", "0"), "division_by_zero", None),
+           make_result("multiply", ("[1,2]", "0.5"), "ok", Vector([0.5, 1.0])),
+           make_result("recall", ("2",), "ok", 7),
+           make_result("mode", ("float",), "ok", 0.1)]
+
+def test_json_lines_and_csv_sinks():
+    """Test that the JSON lines and CSV sinks write one record per result, exact numbers as text."""
+    output = io.StringIO()
+    with JsonLinesSink(output) as sink:
+        for result in RESULTS:
+            sink.emit(result)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert records[0] == {"operation": "add", "args": ["1", "2"], "status": "ok", "value": "3"}
+    assert [record["value"] for record in records[1:]] == [None, [0.5, 1.0], 7, 0.1]
+
+    output = io.StringIO()
+    with CsvSink(output) as sink:
+        for result in RESULTS[:3]:
+            sink.emit(result)
+    assert output.getvalue() == ("operation,args,status,value\nadd,1 2,ok,3\ndivide,1 0,division_by_zero,\n"
+                                 'multiply,"[1,2] 0.5",ok,"[0.5,1.0]"\n')
+
+def test_binary_sink_round_trip():
+    """Test that read_binary returns what the binary sink wrote."""
+    output = io.BytesIO()
+    with BinarySink(output) as sink:
+        for result in RESULTS:
+            sink.emit(result)
+        sink.emit(make_result("multiply", ("@v.npy", "2"), "ok", make_vector([1.5, -2.0], FloatBackend())))
+    output.seek(0)
+    assert list(read_binary(output)) == [
+        ("add", "ok", "3"), ("divide", "division_by_zero", None), ("multiply", "ok", ["0.5", "1.0"]),
+        ("recall", "ok", 7), ("mode", "ok", 0.1), ("multiply", "ok", [1.5, -2.0])]
+
+def test_sinks_batch_their_writes():
+    """Test that a sink only writes to its stream when its buffer fills or it is flushed."""
+    writes = []
+
+    class Recorder(io.StringIO):
+        """Counts the writes reaching the stream."""
+        def write(self, text):
+            writes.append(text)
+            return super().write(text)
+
+    sink = TextSink(Recorder(), buffer_size=1000)
+    result = make_result("add", ("1", "2"), "ok", Decimal(3))
+    result.output = "The Solution of addition is 3\n"
+    for _ in range(100):
+        sink.emit(result)
+    assert len(writes) == 2
+    sink.flush()
+    assert len(writes) == 3
+
+def test_batch_writes_json_lines():
+    """Test that batch mode renders results through the selected sink instead of the printed text."""
+    with Engine() as engine:
+        runner = BatchRunner(engine.command_handler, fail_fast=False, output_format="jsonl")
+        output = io.StringIO()
+        assert runner.run(io.StringIO("add 1 2\ndivide 1 0\n"), output=output) == 1
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [(record["status"], record["value"]) for record in records] == [("ok", "3"), ("division_by_zero", None)]
+
+def test_parallel_batch_writes_csv(tmp_path):
+    """Test that results from worker processes reach the sink with their values."""
+    runner = ParallelBatchRunner(fail_fast=False, jobs=2, chunk_size=2, output_format="csv",
+                                 manifest_path=str(tmp_path / "manifest.json"))
+    output = io.StringIO()
+    assert runner.run(io.StringIO("".join(f"multiply {i} 2\n" for i in range(5))), output=output) == 0
+    assert output.getvalue().splitlines()[1:] == [f"multiply,{i} 2,ok,{i * 2}" for i in range(5)]
+
+def test_engine_returns_results_quietly(capsys, caplog):
+    """Test that the engine returns structured results without printing or logging."""
+    with caplog.at_level(logging.INFO):
+        with Engine() as engine:
+            result = engine.execute("add 1 2")
+            assert (result.command_name, result.outcome, result.result) == ("add", "ok", Decimal(3))
+            assert result.output == "The Solution of addition is 3\n"
+            assert engine.execute("divide", "1", "0").outcome == "division_by_zero"
+            output = io.StringIO()
+            assert engine.run(["subtract 5 2", "foo"], create_sink("jsonl", output)) == 1
+    assert capsys.readouterr().out == ""
+    assert not [record for record in caplog.records if record.name.startswith("calculator")]
+    assert [json.loads(line)["status"] for line in output.getvalue().splitlines()] == ["ok", "unknown_command"]
+    assert logging.getLogger("calculator").level == logging.NOTSET
@@ -0,0 +1,138 @@
+"""
+Test suite for the single-pass statistics commands and their mergeable state.
+"""
+
+import io
+import json
+import math
+import random
+import logging
+from array import array
+from decimal import Decimal, InvalidOperation
+import pytest
+from calculator.batch import BatchRunner
+from calculator.commands import CommandHandler
+from calculator.engine import Engine
+from calculator.loader import scan_plugins
+from calculator.session import Session, use_session
+from calculator.streamstats import QuantileSketch, StatisticsError, StreamingStats
+from calculator.vectors import iter_array, write_npy
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_compensated_sum_and_welford_variance():
+    """Test that the sum does not lose small values and the variance stays exact for large close values."""
+    stats = StreamingStats()
+    for value in [1e100, 1.0, -1e100] + [0.1] * 10:
+        stats.add(value)
+    assert stats.sum == 2.0
+
+    stats = StreamingStats()
+    for value in (4, 7, 13, 16):
+        stats.add(1e9 + value)
+    assert stats.variance() == 30.0
+    assert stats.variance(sample=False) == 22.5
+    assert (stats.minimum, stats.maximum) == (1e9 + 4, 1e9 + 16)
+
+def test_float_batches_match_value_by_value():
+    """Test that summarizing a float array at once gives the statistics of adding its values one by one."""
+    values = [random.Random(7).uniform(-1000, 1000) for _ in range(5000)]
+    batched, single = StreamingStats(), StreamingStats()
+    batched.update(array("d", values[:1234]))
+    batched.update(array("d", values[1234:]))
+    for value in values:
+        single.add(value)
+    assert batched.sum == math.fsum(values) == pytest.approx(single.sum, abs=1e-9)
+    assert batched.variance() == pytest.approx(single.variance(), rel=1e-12)
+    assert batched.quantile(0.9) == single.quantile(0.9)
+    with pytest.raises(InvalidOperation):
+        batched.update(array("d", [1.0, float("nan"), 0.0]))
+
+def test_shard_states_merge_through_json():
+    """Test that per-shard states serialized as JSON merge into the statistics of the whole data set."""
+    rng = random.Random(11)
+    values = [Decimal(rng.randint(-10**6, 10**6)) / 1000 for _ in range(3000)]
+    whole = StreamingStats()
+    whole.update(values)
+    states = []
+    for start in range(0, 3000, 1000):
+        shard = StreamingStats()
+        shard.update(values[start:start + 1000])
+        states.append(json.dumps(shard.to_dict()))
+    merged = StreamingStats()
+    for state in states:
+        merged.merge(StreamingStats.from_dict(json.loads(state)))
+    assert (merged.count, merged.sum, merged.minimum, merged.maximum) == (3000, sum(values), min(values), max(values))
+    assert merged.variance() == pytest.approx(whole.variance(), rel=Decimal("1e-20"))
+    assert merged.quantile(0.25) == whole.quantile(0.25)
+
+def test_quantile_sketch_relative_error():
+    """Test that sketch quantiles are within the relative accuracy of the exact quantiles, in bounded memory."""
+    rng = random.Random(3)
+    values = [rng.lognormvariate(0, 3) * rng.choice((-1, 1)) for _ in range(20000)] + [0.0] * 100
+    sketch = QuantileSketch(relative_accuracy=0.01, max_bins=4096)
+    for value in values:
+        sketch.add(value)
+    ordered = sorted(values)
+    for q in (0, 0.01, 0.25, 0.5, 0.75, 0.99, 1):
+        exact = ordered[math.floor(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.0101, abs=1e-300)
+    with pytest.raises(StatisticsError):
+        QuantileSketch().quantile(0.5)
+    with pytest.raises(ValueError):
+        sketch.add(float("nan"))
+
+def test_iter_array_reads_in_chunks(tmp_path):
+    """Test that arrays are read a chunk at a time, from .npy and raw float64 files."""
+    write_npy(str(tmp_path / "values.npy"), range(1000))
+    with open(tmp_path / "values.f64", "wb") as raw_file:
+        array("d", range(1000)).tofile(raw_file)
+    for name in ("values.npy", "values.f64"):
+        chunks = list(iter_array(str(tmp_path / name), chunk_size=300))
+        assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+        assert [value for chunk in chunks for value in chunk.tolist()] == list(range(1000))
+
+def test_statistics_commands(tmp_path, monkeypatch):
+    """Test the statistics commands over numbers, lists, files and standard input, in two numeric modes."""
+    (tmp_path / "values.txt").write_text("1 2 3\n4,5\n")
+    write_npy(str(tmp_path / "values.npy"), [10, 20])
+    monkeypatch.setattr("sys.stdin", io.StringIO("6\n7\n"))
+    with Engine() as engine, use_session(Session()):
+        result = engine.execute(f"sum @{tmp_path / 'values.txt'} [0.5,0.5] @{tmp_path / 'values.npy'} - 100")
+        assert (result.outcome, result.result) == ("ok", Decimal("159.0"))
+        assert engine.execute("var 1 2 3 4").result == Decimal(5) / Decimal(3)
+        assert engine.execute("min 3 -1 2").output == "The minimum is -1\n"
+        assert engine.execute("quantile 0.5 1 2 3 4 5").result == pytest.approx(Decimal(3), rel=Decimal("0.01"))
+        assert engine.execute("var 1").outcome == "invalid_input"
+        assert engine.execute("mean 1 x").outcome == "invalid_input"
+        assert engine.execute("quantile 1.5 1").outcome == "invalid_input"
+        engine.execute("mode float")
+        assert engine.execute("sum " + " ".join(["0.1"] * 10)).result == 1.0
+        assert engine.execute(f"stddev @{tmp_path / 'values.txt'}").result == pytest.approx(math.sqrt(2.5))
+        assert engine.execute("max inf").outcome == "invalid_input"
+
+def test_values_beyond_floats_and_batch_standard_input(monkeypatch):
+    """Test that only quantiles need float-range values, overflow is reported, and batches do not read stdin."""
+    with Engine() as engine, use_session(Session()):
+        assert engine.execute("sum 1e400 1").outcome == "ok"
+        assert engine.execute("quantile 0.5 1e400 1").outcome == "invalid_input"
+        engine.execute("mode float")
+        assert engine.execute("sum 1e308 1e308").outcome == "overflow"
+        assert engine.execute("mean [1e308,1e308]").outcome == "overflow"
+    stats = StreamingStats(quantiles=False)
+    stats.add(Decimal("1e400"))
+    with pytest.raises(StatisticsError):
+        stats.quantile(0.5)
+    merged = StreamingStats()
+    merged.add(Decimal(1))
+    merged.merge(stats)
+    assert merged.sketch is None and merged.count == 2
+
+    monkeypatch.setattr("sys.stdin", io.StringIO("1\n2\n"))
+    runner = BatchRunner(CommandHandler(), fail_fast=False)
+    scan_plugins(runner.command_handler)
+    assert runner.run(io.StringIO("sum -\nsum 1 2\n"), output=io.StringIO()) == 1
+    assert [error.outcome for error in runner.errors] == ["invalid_input"]
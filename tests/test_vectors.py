@@ -0,0 +1,80 @@
+"""
+Test suite for N-operand and vector arithmetic.
+"""
+
+import logging
+from array import array
+from decimal import Decimal
+from fractions import Fraction
+import pytest
+from calculator import vectors
+from calculator.cache import ResultCache
+from calculator.numeric import create_backend
+from calculator.session import Session, use_session
+from calculator.vectors import Vector, read_npy, write_npy
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture(name="without_numpy")
+def fixture_without_numpy(monkeypatch):
+    """Forces the pure-Python vector path."""
+    monkeypatch.setattr(vectors._NumPy, "checked", True)  # pylint: disable=protected-access
+    monkeypatch.setattr(vectors._NumPy, "module", None)  # pylint: disable=protected-access
+
+@pytest.mark.parametrize("command, args, expected", [
+    ("add", ("1", "2", "3.5"), Decimal("6.5")),
+    ("subtract", ("10", "2", "3"), Decimal("5")),
+    ("multiply", ("2", "3", "4"), Decimal("24")),
+    ("divide", ("100", "5", "2"), Decimal("10")),
+])
+def test_operands_are_folded(command_handler, command, args, expected):
+    """Test that more than two operands are folded from the left."""
+    assert command_handler.execute_command(command, *args).result == expected
+
+@pytest.mark.parametrize("command", ["add", "subtract", "multiply", "divide"])
+def test_too_few_operands(command_handler, command):
+    """Test that every arithmetic command rejects fewer than two operands."""
+    assert command_handler.execute_command(command, "1").outcome == "invalid_arity"
+
+def test_exact_vectors(command_handler):
+    """Test elementwise operations and broadcasting with exact Decimal elements."""
+    context = command_handler.execute_command("add", "[0.1,0.2]", "[0.2,0.1]", "1")
+    assert context.result == Vector([Decimal("1.3"), Decimal("1.3")])
+    assert str(context.result) == "[1.3, 1.3]"
+    assert command_handler.execute_command("divide", "1", "[2,4]").result.tolist() == [Decimal("0.5"),
+                                                                                     Decimal("0.25")]
+    assert command_handler.execute_command("add", "[1,2]", "[1,2,3]").outcome == "shape_mismatch"
+    assert command_handler.execute_command("divide", "[1,2]", "[1,0]").outcome == "division_by_zero"
+    assert command_handler.execute_command("multiply", "[1,x]", "2").outcome == "invalid_input"
+
+@pytest.mark.usefixtures("without_numpy")
+def test_float_vectors_without_numpy(command_handler):
+    """Test that the float backend computes vectors in array buffers without NumPy."""
+    with use_session(Session()) as session:
+        session.backend = create_backend("float")
+        context = command_handler.execute_command("multiply", "[1,2,3]", "[4,5,6]")
+    assert isinstance(context.result.values, array)
+    assert context.result.tolist() == [4.0, 10.0, 18.0]
+
+@pytest.mark.usefixtures("without_numpy")
+def test_file_operands(command_handler, tmp_path):
+    """Test .npy and raw float64 file operands, which are not cached."""
+    npy_path = tmp_path / "values.npy"
+    write_npy(str(npy_path), [1.5, 2.5, 3.5])
+    assert read_npy(str(npy_path)).tolist() == [1.5, 2.5, 3.5]
+    raw_path = tmp_path / "values.f64"
+    raw_path.write_bytes(array("d", [1.0, 2.0, 4.0]).tobytes())
+
+    command_handler.result_cache = ResultCache()
+    context = command_handler.execute_command("add", f"@{npy_path}", f"@{raw_path}")
+    assert context.result.tolist() == [Decimal("2.5"), Decimal("4.5"), Decimal("7.5")]
+    assert len(command_handler.result_cache) == 0
+    with use_session(Session()) as session:
+        session.backend = create_backend("fraction")
+        assert command_handler.execute_command("divide", f"@{raw_path}", "3").result.tolist()[0] == Fraction(1, 3)
+    assert command_handler.execute_command("add", "@missing.npy", "1").outcome == "invalid_input"
+    (tmp_path / "bad.npy").write_bytes(b"not numpy")
+    assert command_handler.execute_command("add", f"@{tmp_path / 'bad.npy'}", "1").outcome == "invalid_input"
@@ -0,0 +1,105 @@
+"""
+Test suite for reloading changed plugins into a running CommandHandler.
+"""
+
+import sys
+import time
+import logging
+import importlib
+import pytest
+from calculator.cache import ResultCache
+from calculator.commands import CommandHandler
+from calculator.loader import scan_plugins
+from calculator.watcher import PluginWatcher
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PLUGIN_SOURCE = """
+from calculator.commands import Command, report_result
+
+class {name}Command(Command):
+    pure = True
+
+    def execute(self, *args):
+        print("{text}")
+        report_result("{text}")
+"""
+
+def write_plugin(package_path, name: str, text: str):
+    """Writes a plugin package whose command prints and reports text."""
+    plugin_path = package_path / name
+    plugin_path.mkdir(exist_ok=True)
+    (plugin_path / "__init__.py").write_text(PLUGIN_SOURCE.format(name=name.capitalize(), text=text))
+
+@pytest.fixture(name="plugins")
+def fixture_plugins(tmp_path, monkeypatch):
+    """A temporary plugin package with the plugins greet and shout."""
+    package_path = tmp_path / "hotplugins"
+    package_path.mkdir()
+    (package_path / "__init__.py").write_text("")
+    write_plugin(package_path, "greet", "hello")
+    write_plugin(package_path, "shout", "HEY")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield package_path, importlib.import_module("hotplugins")
+    for name in [name for name in sys.modules if name == "hotplugins" or name.startswith("hotplugins.")]:
+        del sys.modules[name]
+
+def test_changed_added_and_removed_plugins(plugins):
+    """Test that only changed plugins are re-imported, new ones registered and removed ones unregistered."""
+    package_path, package = plugins
+    command_handler = CommandHandler(result_cache=ResultCache())
+    scan_plugins(command_handler, package)
+    watcher = PluginWatcher(command_handler, package)
+    shout = command_handler.commands["shout"]
+    assert command_handler.execute_command("greet").result == "hello"
+    assert not watcher.check()
+
+    write_plugin(package_path, "greet", "bonjour")
+    write_plugin(package_path, "count", "1 2 3")
+    assert watcher.check() == {"hotplugins.count": "added", "hotplugins.greet": "reloaded"}
+    assert command_handler.execute_command("greet").result == "bonjour"  # Not the cached result.
+    assert command_handler.execute_command("count").result == "1 2 3"
+    assert command_handler.commands["shout"] is shout
+
+    (package_path / "count" / "__init__.py").unlink()
+    (package_path / "count").rmdir()
+    assert watcher.check() == {"hotplugins.count": "removed"}
+    assert "count" not in command_handler.commands
+    assert command_handler.execute_command("count").outcome == "unknown_command"
+
+def test_broken_plugin_keeps_last_good_version(plugins):
+    """Test that a plugin failing to import stays registered as it was until it is fixed."""
+    package_path, package = plugins
+    command_handler = CommandHandler()
+    scan_plugins(command_handler, package)
+    watcher = PluginWatcher(command_handler, package)
+    greet = command_handler.commands["greet"]
+
+    (package_path / "greet" / "__init__.py").write_text("def broken(:\n")
+    assert watcher.check() == {"hotplugins.greet": "failed"}
+    assert command_handler.commands["greet"] is greet
+    assert sys.modules["hotplugins.greet"].GreetCommand is type(greet)
+    assert command_handler.execute_command("greet").result == "hello"
+
+    write_plugin(package_path, "greet", "fixed")
+    assert watcher.check() == {"hotplugins.greet": "reloaded"}
+    assert command_handler.execute_command("greet").result == "fixed"
+
+def test_background_watcher_reloads(plugins):
+    """Test that the watcher thread picks up a change without an explicit check."""
+    package_path, package = plugins
+    command_handler = CommandHandler()
+    scan_plugins(command_handler, package)
+    watcher = PluginWatcher(command_handler, package, interval=0.05)
+    watcher.start()
+    try:
+        write_plugin(package_path, "shout", "HEY THERE")
+        deadline = time.monotonic() + 5
+        while command_handler.execute_command("shout").result != "HEY THERE":
+            assert time.monotonic() < deadline, "plugin was not reloaded"
+            time.sleep(0.02)
+    finally:
+        watcher.stop()